@@ -0,0 +1,52 @@
+"""
+bench_async_fanout.py
+
+Compares N sequential OpenRouter queries with N concurrent ones against a local mock server.
+
+Usage:
+    python -m benchmarks.bench_async_fanout --n 16 --latency 0.3 --per-host 8
+
+The mock answers every request after --latency seconds, standing in for model generation time.
+"""
+
+import argparse
+import time
+from llm.async_openrouter_client import AsyncOpenRouterClient
+from llm.openrouter_client import OpenRouterClient
+from tests.openrouter_stub import OpenRouterStub
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n', type=int, default=16, help='Prompts per batch')
+    parser.add_argument('--latency', type=float, default=0.3, help='Mock server seconds per response')
+    parser.add_argument('--per-host', type=int, default=8, help='Concurrent connections to the host')
+    args = parser.parse_args()
+
+    prompts = [f"Summarise section {i}" for i in range(args.n)]
+    with OpenRouterStub(delay=args.latency) as stub:
+        sync_client = OpenRouterClient(api_key='bench', model='bench', api_url=stub.url)
+        start = time.perf_counter()
+        for prompt in prompts:
+            sync_client.query(prompt)
+        sequential = time.perf_counter() - start
+        sync_client.close()
+
+        async_client = AsyncOpenRouterClient(api_key='bench', model='bench', api_url=stub.url,
+                                             per_host=args.per_host)
+        async_client.query("warm up")  # start the loop thread and open a connection
+        start = time.perf_counter()
+        async_client.gather_queries(prompts)
+        concurrent = time.perf_counter() - start
+        in_flight = async_client.stats['max_in_flight']
+        async_client.close()
+
+    print(f"N={args.n}, server latency {args.latency:.2f} s, per-host limit {args.per_host}")
+    print(f"{'mode':<12}{'total s':>9}{'per query ms':>14}")
+    print(f"{'sequential':<12}{sequential:>9.2f}{1000 * sequential / args.n:>14.1f}")
+    print(f"{'concurrent':<12}{concurrent:>9.2f}{1000 * concurrent / args.n:>14.1f}")
+    print(f"Speed-up: {sequential / concurrent:.1f}x (max {in_flight} in flight)")
+
+
+if __name__ == '__main__':
+    main()
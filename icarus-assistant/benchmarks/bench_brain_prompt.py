@@ -0,0 +1,104 @@
+"""
+bench_brain_prompt.py
+
+Reports tokens per LLMBrain.parse_intent request before and after the compact system prompt,
+and the time to build each prompt.
+
+Usage:
+    python -m benchmarks.bench_brain_prompt --history 10 --runs 2000
+
+Tokens are counted with tiktoken (cl100k_base); if its encoding file cannot be downloaded the
+counts fall back to a 4-characters-per-token estimate, which is printed in the header.
+"""
+
+import argparse
+import datetime
+import json
+import time
+from orchestrator.llm_brain import LLMBrain
+from utils.token_counter import count_message_tokens, is_exact
+
+TURNS = [
+    ("user", "What's on my calendar tomorrow?"),
+    ("assistant", "You have a design review at ten and lunch with Priya at one, sir."),
+    ("user", "Search for the review slides"),
+    ("assistant", "I found review_slides_v3.pptx in Documents/Projects."),
+    ("user", "Open it in PowerPoint"),
+]
+
+
+class FakeMemory:
+    """Serves a fixed history with timestamps and metadata, like MemoryManager rows."""
+    def __init__(self, turns: int):
+        start = datetime.datetime(2025, 1, 1, 9, 0)
+        self.rows = [{'role': role, 'content': content,
+                      'timestamp': (start + datetime.timedelta(seconds=30 * i)).isoformat(), 'metadata': None}
+                     for i, (role, content) in enumerate((TURNS * turns)[:turns])]
+
+    def get_recent(self, session_id, n):
+        return self.rows[-n:]
+
+
+def legacy_prompt(user_query: str, context: dict) -> str:
+    """The previous single user message: everything pretty-printed on every call."""
+    return f"""
+You are the brain of Icarus Assistant. You have access to all tools and functions.
+
+CONTEXT:
+- Conversation History: {json.dumps(context['conversation_history'], indent=2)}
+- Available Tools: {json.dumps(context['available_tools'], indent=2)}
+- Available Functions: {json.dumps(context['available_functions'], indent=2)}
+- Possible Outputs: {json.dumps(context['possible_outputs'], indent=2)}
+
+USER QUERY: \"{user_query}\"
+
+TASK: Analyze the query and decide what to do. Return a JSON response with:
+{{
+    "action": "tool_call|function_call|direct_response|plan_mode",
+    "target": "tool_name|function_name|response_text|plan_request",
+    "parameters": {{...}},
+    "confidence": 0.95,
+    "reasoning": "Why this action was chosen"
+}}
+
+If the query is too complex, set action to "plan_mode".
+"""
+
+
+def timed(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return 1e6 * (time.perf_counter() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history', type=int, default=10, help='Messages in the session history')
+    parser.add_argument('--runs', type=int, default=2000, help='Prompt builds to time')
+    args = parser.parse_args()
+
+    brain = LLMBrain(None, FakeMemory(args.history))
+    query = "Summarize the slides and email the summary to Priya"
+    context = brain._build_context('bench')
+
+    old_messages = [{'role': 'user', 'content': legacy_prompt(query, context)}]
+    tail = brain._create_brain_prompt(query, context)
+    new_messages = [{'role': 'system', 'content': brain.system_prompt}, {'role': 'user', 'content': tail}]
+    old_tokens = count_message_tokens(old_messages)
+    new_tokens = count_message_tokens(new_messages)
+    static_tokens = count_message_tokens(new_messages[:1]) - 3
+
+    old_us = timed(lambda: legacy_prompt(query, brain._build_context('bench')), args.runs)
+    new_us = timed(lambda: brain._create_brain_prompt(query, brain._build_context('bench')), args.runs)
+
+    print(f"History: {args.history} messages; token counts {'from tiktoken' if is_exact() else 'ESTIMATED (4 chars/token)'}")
+    print(f"{'prompt':<10}{'tokens/request':>16}{'cacheable prefix':>18}{'build us':>10}")
+    print(f"{'before':<10}{old_tokens:>16}{0:>18}{old_us:>10.1f}")
+    print(f"{'after':<10}{new_tokens:>16}{static_tokens:>18}{new_us:>10.1f}")
+    print(f"Tokens per request: -{100 * (1 - new_tokens / old_tokens):.0f}%; "
+          f"{new_tokens - static_tokens} tokens change between requests")
+
+
+if __name__ == '__main__':
+    main()
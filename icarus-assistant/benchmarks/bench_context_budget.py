@@ -0,0 +1,74 @@
+"""
+bench_context_budget.py
+
+Replays a synthetic session and reports history tokens per prompt: the last 10 messages verbatim
+(the previous behaviour) against ContextBuilder's budgeted summary + recent turns.
+
+Usage:
+    python -m benchmarks.bench_context_budget --turns 500 --budget 1500
+
+Every 12th assistant message is a pasted file or plan result of 1-4k characters. Summaries use
+the offline extractive summarizer, so the run needs no API key; only token counts are compared.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from orchestrator.context_builder import ContextBuilder
+from orchestrator.memory_manager import MemoryManager
+from utils.token_counter import count_tokens, is_exact
+
+QUESTIONS = ["What's the status of the {x} report?", "Search for {x} notes", "Read {x}.txt",
+             "Summarize the {x} meeting", "Remind me what we decided about {x}", "Open the {x} spreadsheet"]
+TOPICS = ["quarterly", "budget", "roadmap", "hiring", "design", "launch", "security", "vendor"]
+FILLER = "Line {n}: revenue, costs and forecast figures for the period with notes from finance. "
+
+
+def synthetic_turns(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n):
+        topic = rng.choice(TOPICS)
+        yield 'user', rng.choice(QUESTIONS).format(x=topic)
+        if i % 12 == 11:
+            yield 'assistant', ''.join(FILLER.format(n=k) for k in range(rng.randint(12, 48)))
+        else:
+            yield 'assistant', f"Here is what I found about the {topic} item, sir. It was last updated on day {i}."
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=500)
+    parser.add_argument('--budget', type=int, default=1500, help='History token budget')
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    memory = MemoryManager(db_path=path)
+    builder = ContextBuilder(memory, default_budget=args.budget)
+    legacy, budgeted, build_ms = [], [], []
+    for turn, (role, content) in enumerate(synthetic_turns(args.turns)):
+        memory.store_message('bench', role, content)
+        if role != 'user':
+            continue
+        recent = memory.get_recent('bench', 10)
+        legacy.append(sum(count_tokens(m['content']) + 4 for m in recent))
+        start = time.perf_counter()
+        budgeted.append(builder.build('bench')['tokens'])
+        build_ms.append(1000 * (time.perf_counter() - start))
+    os.remove(path)
+
+    print(f"{args.turns} turns, budget {args.budget} tokens; counts {'from tiktoken' if is_exact() else 'ESTIMATED (4 chars/token)'}")
+    print(f"{'context':<22}{'mean':>7}{'p95':>7}{'max':>7}{'total':>10}")
+    for name, values in (('last 10 messages', legacy), ('budget + summary', budgeted)):
+        print(f"{name:<22}{np.mean(values):>7.0f}{np.percentile(values, 95):>7.0f}{max(values):>7}{sum(values):>10}")
+    print(f"Total tokens {100 * (sum(budgeted) / sum(legacy) - 1):+.0f}%, worst prompt {100 * (max(budgeted) / max(legacy) - 1):+.0f}%; "
+          f"the budgeted context also covers all earlier turns through its summary")
+    print(f"Summarizer calls: {builder.stats['summaries']} for {builder.stats['folded_messages']} folded messages; "
+          f"build p50 {np.median(build_ms):.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+bench_intent_dispatch.py
+
+Measures time from sending the intent prompt to having an intent to act on, for a reasoning
+model that opens its reply with a <think> block.
+
+Usage:
+    python -m benchmarks.bench_intent_dispatch --tokens-per-s 40 --runs 5
+
+Before: query() waited for the whole reply, json.loads failed on the reasoning block, and main.py
+asked the LLM again for a plain chat answer. Now the reply is streamed, the reasoning skipped and
+the intent returned once its action and the fields that action needs are complete. A local stub
+streams the replies at --tokens-per-s.
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from llm.openrouter_client import OpenRouterClient
+from orchestrator.llm_brain import LLMBrain
+from tests.openrouter_stub import OpenRouterStub, completion
+from utils.json_extractor import INTENT_SCHEMA, extract_json_stream
+
+THINK = ("<think>The user wants to know the weather before heading out. There is a get_weather function "
+         "that needs no parameters, so a function call is better than answering from memory, and it is "
+         "not complex enough for a plan.</think>\n")
+INTENT = {"action": "function_call", "target": "get_weather", "parameters": {}, "confidence": 0.93,
+          "reasoning": "The user asked about the current weather, which the get_weather function returns "
+                       "directly; no other tools are needed and no clarification is required."}
+CHAT = "It looks mild outside today, around eighteen degrees with a light breeze and no rain expected."
+PROMPT = "User query: \"Do I need an umbrella today?\""
+
+
+def ready(fields) -> bool:
+    needed = LLMBrain.DISPATCH_FIELDS.get(fields.get('action'))
+    return needed is not None and all(field in fields for field in needed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--tokens-per-s', type=float, default=40.0, help='Stub generation speed')
+    args = parser.parse_args()
+
+    reply = THINK + "```json\n" + json.dumps(INTENT) + "\n```"
+    stub = OpenRouterStub(delay=0.2, token_delay=1.0 / args.tokens_per_s).start()
+    blocking_delay = lambda text: 0.2 + len(stub.tokenize(text)) / args.tokens_per_s
+    client = OpenRouterClient(api_key='bench-key', model='deepseek/deepseek-r1-0528:free', api_url=stub.url)
+
+    before, after = [], []
+    for _ in range(args.runs):
+        stub.delay = blocking_delay(reply)
+        stub.script((200, {}, completion(reply)))
+        start = time.perf_counter()
+        try:
+            json.loads(client.query(PROMPT))
+        except json.JSONDecodeError:
+            # The old fallback: a second, plain chat request
+            stub.delay = blocking_delay(CHAT)
+            stub.script((200, {}, completion(CHAT)))
+            client.query(PROMPT)
+        before.append(time.perf_counter() - start)
+
+        stub.delay = 0.2
+        stub.script((200, {}, completion(reply)))
+        start = time.perf_counter()
+        intent = extract_json_stream(client.query_stream(PROMPT), INTENT_SCHEMA, until=ready)
+        after.append(time.perf_counter() - start)
+        assert intent['target'] == 'get_weather'
+
+    print(f"Runs: {args.runs}, {len(stub.tokenize(reply))} tokens per reply at {args.tokens_per_s:.0f} tokens/s")
+    print(f"{'flow':<44}{'time to dispatch ms':>20}")
+    print(f"{'blocking + json.loads + chat re-query':<44}{1000 * np.median(before):>20.0f}")
+    print(f"{'streaming extractor':<44}{1000 * np.median(after):>20.0f}")
+    client.close()
+    stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+bench_intent_tiers.py
+
+Routes a mix of utterances through TieredIntentRouter and reports how many each tier answered and
+at what latency, against sending every utterance to the LLM.
+
+Usage:
+    python -m benchmarks.bench_intent_tiers --llm-latency 0.8 --rounds 50
+
+The LLM tier is simulated with a fixed delay (--llm-latency), roughly an OpenRouter round-trip;
+only the local tiers are actually timed.
+"""
+
+import argparse
+import time
+from orchestrator.fast_intent import TieredIntentRouter
+
+UTTERANCES = [
+    "what time is it", "What's the date today?", "cpu usage", "ram usage please", "battery",
+    "hello", "goodbye", "tell me a joke", "whats the time", "how is the weather",
+    "open chrome", "search for plan.md", "explain how black holes form", "write an email to my boss",
+    "what time did the titanic sink", "summarize report.pdf",
+]
+
+
+class SimulatedLLMRouter:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def route_intent(self, user_input, session_id):
+        time.sleep(self.latency)
+        return [('direct_response', {'target': user_input})]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=50, help='Passes over the utterance list for the local tiers')
+    parser.add_argument('--llm-latency', type=float, default=0.8, help='Simulated LLM routing seconds')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    router = TieredIntentRouter(SimulatedLLMRouter(0.0))
+    build_ms = 1000 * (time.perf_counter() - start)
+    for _ in range(args.rounds):
+        for text in UTTERANCES:
+            router.route_intent(text, 'bench')
+    stats = router.stats
+
+    print(f"{len(UTTERANCES)} utterances x {args.rounds} rounds; classifier built in {build_ms:.1f} ms")
+    print(f"{'tier':<9}{'share':>7}{'p50 ms':>9}{'p95 ms':>9}")
+    for tier, tier_stats in stats.items():
+        p50 = tier_stats['p50_ms'] if tier != 'llm' else 1000 * args.llm_latency
+        p95 = tier_stats['p95_ms'] if tier != 'llm' else 1000 * args.llm_latency
+        print(f"{tier:<9}{tier_stats['share']:>7.0%}{p50:>9.3f}{p95:>9.3f}")
+    local_share = stats['keyword']['share'] + stats['ngram']['share']
+    print(f"Mean routing latency: {1000 * (1 - local_share) * args.llm_latency:.0f} ms tiered "
+          f"vs {1000 * args.llm_latency:.0f} ms LLM-only ({local_share:.0%} answered locally)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+bench_memory_manager.py
+
+Measures MemoryManager write throughput and history read latency: the previous connect-per-call
+access against the persistent WAL connection, with and without the batched write queue, and
+history reads without the messages indexes against get_recent / iter_history with them.
+
+Usage:
+    python -m benchmarks.bench_memory_manager --messages 2000000 --sessions 1000
+
+Inserts go one store_message at a time, as the assistant makes them; the batched figure includes
+the final flush. Read latency is measured for one session of a database holding --messages rows.
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import tempfile
+import time
+import numpy as np
+from orchestrator.memory_manager import MIGRATIONS, MemoryManager
+
+
+def legacy_store(db_path: str, session_id: str, role: str, content: str) -> None:
+    """The previous store_message: a new connection and commit for every message."""
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute('''INSERT INTO messages (session_id, role, content, timestamp, metadata)
+                 VALUES (?, ?, ?, ?, ?)''', (session_id, role, content, datetime.datetime.now().isoformat(), None))
+    c.execute('''UPDATE sessions SET last_activity = ? WHERE session_id = ?''', (datetime.datetime.now().isoformat(), session_id))
+    conn.commit()
+    conn.close()
+
+
+def legacy_context_window(db_path: str, session_id: str, max_messages: int):
+    """The previous get_context_window: a new connection, the whole session read, the tail sliced off."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('''SELECT role, content, timestamp, metadata FROM messages WHERE session_id = ?
+                           ORDER BY timestamp ASC''', (session_id,)).fetchall()
+    conn.close()
+    return rows[-max_messages:]
+
+
+def temp_path() -> str:
+    fd, path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    return path
+
+
+def remove(path: str) -> None:
+    for p in (path, path + '-wal', path + '-shm'):
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def inserts_per_s(store, n: int, done=lambda: None) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        store('bench', 'user' if i % 2 == 0 else 'assistant', f"Message {i} about the quarterly report, sir.")
+    done()
+    return n / (time.perf_counter() - start)
+
+
+def fill(memory: MemoryManager, n: int, sessions: int) -> None:
+    """Bulk-loads n messages spread over `sessions` sessions."""
+    start = datetime.datetime(2025, 1, 1)
+    rows = ((f's{i % sessions}', 'user' if i % 2 == 0 else 'assistant', f"Message {i} about item {i % 97}.",
+             (start + datetime.timedelta(seconds=i)).isoformat(), None) for i in range(n))
+    conn = memory._conn()
+    with conn:
+        conn.executemany('INSERT INTO messages (session_id, role, content, timestamp, metadata) VALUES (?, ?, ?, ?, ?)', rows)
+
+
+def latency_ms(fn, runs: int):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(1000 * (time.perf_counter() - start))
+    return np.percentile(times, 50), np.percentile(times, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=100000, help='Rows in the database for the read tests')
+    parser.add_argument('--sessions', type=int, default=100, help='Sessions the rows are spread over')
+    parser.add_argument('--inserts', type=int, default=2000, help='store_message calls per write test')
+    parser.add_argument('--runs', type=int, default=200, help='get_history calls per latency test')
+    args = parser.parse_args()
+
+    print(f"{'writes':<32}{'inserts/s':>12}")
+    path = temp_path()
+    MemoryManager(db_path=path).close()  # schema only; the legacy writer uses the default rollback journal
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.close()
+    print(f"{'connect per call (before)':<32}{inserts_per_s(lambda *m: legacy_store(path, *m), args.inserts):>12.0f}")
+    remove(path)
+    for label, batched in (('persistent WAL connection', False), ('persistent + write queue', True)):
+        path = temp_path()
+        memory = MemoryManager(db_path=path, batch_writes=batched)
+        print(f"{label:<32}{inserts_per_s(memory.store_message, args.inserts, memory.flush):>12.0f}")
+        memory.close()
+        remove(path)
+
+    path = temp_path()
+    memory = MemoryManager(db_path=path)
+    conn = memory._conn()
+    conn.execute('DROP INDEX idx_messages_session_time')
+    conn.execute('DROP INDEX idx_messages_session')
+    start = time.perf_counter()
+    fill(memory, args.messages, args.sessions)
+    print(f"\nLoaded {args.messages} messages in {time.perf_counter() - start:.1f} s; "
+          f"reading one session of {args.messages // args.sessions}")
+    print(f"{'reads':<44}{'p50 ms':>10}{'p95 ms':>10}")
+    before = (
+        ('last 10, no index, connect per call (before)', lambda: legacy_context_window(path, 's7', 10)),
+        ('get_recent(10), no index', lambda: memory.get_recent('s7', 10)),
+    )
+    for label, fn in before:
+        p50, p95 = latency_ms(fn, max(1, args.runs // 10))
+        print(f"{label:<44}{p50:>10.2f}{p95:>10.2f}")
+
+    start = time.perf_counter()
+    for statement in MIGRATIONS[1]:
+        conn.execute(statement)
+    print(f"Indexes built in {time.perf_counter() - start:.1f} s")
+    after = (
+        ('get_recent(10)', lambda: memory.get_recent('s7', 10)),
+        ('get_context_window(10)', lambda: memory.get_context_window('s7', 10)),
+        ('iter_history, first page of 50', lambda: next(iter(memory.iter_history('s7', page_size=50)))),
+        ('iter_history, whole session', lambda: sum(1 for _ in memory.iter_history('s7'))),
+    )
+    for label, fn in after:
+        p50, p95 = latency_ms(fn, args.runs)
+        print(f"{label:<44}{p50:>10.2f}{p95:>10.2f}")
+    memory.close()
+    remove(path)
+
+if __name__ == '__main__':
+    main()
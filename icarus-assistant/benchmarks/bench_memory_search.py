@@ -0,0 +1,96 @@
+"""
+bench_memory_search.py
+
+Measures MemoryManager.search (SQLite FTS5, BM25) on a database with millions of messages,
+against the previous option of loading every message into Python and filtering there.
+
+Usage:
+    python -m benchmarks.bench_memory_search --messages 1000000
+
+Queries mix rare words (a few hundred matches) and common ones (each in about a quarter of all
+messages); the Python scan is timed on a handful of queries only, since each reads the whole table.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import numpy as np
+from orchestrator.memory_manager import MemoryManager
+
+WORDS = ("report budget meeting invoice flight hotel dentist spreadsheet roadmap launch vendor hiring "
+         "design security review forecast playlist weather battery calendar reminder slides contract").split()
+RARE = ["tangerine", "zeppelin", "okapi", "quasar", "marzipan", "fjord"]
+QUERIES = ["what did we say about the tangerine contract", "zeppelin", "okapi slides", "budget",
+           "budget review meeting", "flight hotel", "quasar forecast", "calendar reminder dentist"]
+
+
+def message(i: int, rng: random.Random) -> str:
+    words = rng.sample(WORDS, 6)
+    if i % 5000 == 0:
+        words.append(rng.choice(RARE))
+    return f"Message {i}: the {words[0]} and {words[1]} for the {words[2]} {' '.join(words[3:])}."
+
+
+def python_scan(db_path: str, query: str):
+    """The previous way: every message loaded, then matched word by word in Python."""
+    words = [w for w in query.lower().split() if len(w) > 3]
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT id, session_id, role, content FROM messages').fetchall()
+    conn.close()
+    return [r for r in rows if any(w in r[3].lower() for w in words)][:10]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=1000000)
+    parser.add_argument('--runs', type=int, default=20, help='Timed searches per query')
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    memory = MemoryManager(db_path=path)
+    rng = random.Random(0)
+    start = datetime.datetime(2025, 1, 1)
+    t0 = time.perf_counter()
+    conn = memory._conn()
+    with conn:
+        conn.executemany('INSERT INTO messages (session_id, role, content, timestamp, metadata) VALUES (?, ?, ?, ?, ?)',
+                         ((f's{i % 2000}', 'user' if i % 2 == 0 else 'assistant', message(i, rng),
+                           (start + datetime.timedelta(seconds=i)).isoformat(), None) for i in range(args.messages)))
+    print(f"Loaded and indexed {args.messages} messages in {time.perf_counter() - t0:.1f} s "
+          f"({os.path.getsize(path) / 2 ** 20:.0f} MB)")
+
+    print(f"{'query':<48}{'hits':>6}{'p50 ms':>10}{'p95 ms':>10}")
+    for query in QUERIES:
+        times = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            hits = memory.search(query, limit=10)
+            times.append(1000 * (time.perf_counter() - t0))
+        print(f"{query:<48}{len(hits):>6}{np.percentile(times, 50):>10.2f}{np.percentile(times, 95):>10.2f}")
+    for query in ('zeppelin', 'budget review meeting'):
+        times = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            hits = memory.search(query, session_id='s0', limit=10)
+            times.append(1000 * (time.perf_counter() - t0))
+        print(f"{query + ', one session':<48}{len(hits):>6}{np.percentile(times, 50):>10.2f}{np.percentile(times, 95):>10.2f}")
+
+    scan_ms = []
+    for query in QUERIES[:3]:
+        t0 = time.perf_counter()
+        python_scan(path, query)
+        scan_ms.append(1000 * (time.perf_counter() - t0))
+    print(f"Python scan of the whole table (before): {np.median(scan_ms):.0f} ms per query")
+    memory.close()
+    for p in (path, path + '-wal', path + '-shm'):
+        if os.path.exists(p):
+            os.remove(p)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+bench_mic_stream.py
+
+Compares wake-to-record latency and device churn of reopening the microphone per activation versus
+subscribing to the shared MicrophoneStream. Needs PyAudio and an input device.
+
+Usage:
+    python -m benchmarks.bench_mic_stream --cycles 20
+
+Latency = time from "wake-word detected" to the first command audio being available to the recorder.
+"""
+
+import argparse
+import time
+import numpy as np
+from utils.mic_stream import MicrophoneStream
+
+RATE = 16000
+CHUNK = 1600
+
+
+def reopen_cycle(audio, pyaudio) -> float:
+    """The old flow: the recorder opens its own stream after the wake-word listener closed its one."""
+    start = time.perf_counter()
+    stream = audio.open(format=pyaudio.paInt16, channels=1, rate=RATE, input=True, frames_per_buffer=CHUNK)
+    stream.read(CHUNK, exception_on_overflow=False)
+    latency = time.perf_counter() - start
+    stream.stop_stream()
+    stream.close()
+    return latency
+
+
+def shared_cycle(mic: MicrophoneStream, pre_roll_s: float) -> float:
+    """The new flow: the recorder subscribes, starting just before the wake-word decision."""
+    start = time.perf_counter()
+    with mic.subscribe(pre_roll_s=pre_roll_s) as subscription:
+        subscription.read(timeout=1.0)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cycles', type=int, default=20)
+    parser.add_argument('--pre-roll', type=float, default=0.3, help='Seconds of pre-roll per activation')
+    args = parser.parse_args()
+    try:
+        import pyaudio
+    except ImportError as e:
+        raise SystemExit(f"PyAudio is required: {e}")
+
+    audio = pyaudio.PyAudio()
+    reopen = [reopen_cycle(audio, pyaudio) for _ in range(args.cycles)]
+
+    mic = MicrophoneStream(rate=RATE, chunk=CHUNK)
+    mic.start()
+    time.sleep(args.pre_roll + CHUNK / RATE)  # let the pre-roll buffer fill
+    shared = []
+    for _ in range(args.cycles):
+        shared.append(shared_cycle(mic, args.pre_roll))
+        time.sleep(0.05)
+    mic.stop()
+    audio.terminate()
+
+    print(f"{'flow':<10}{'device opens':>14}{'p50 ms':>9}{'max ms':>9}{'pre-roll ms':>13}")
+    print(f"{'reopen':<10}{args.cycles:>14}{1000 * np.median(reopen):>9.1f}{1000 * max(reopen):>9.1f}{0:>13.0f}")
+    print(f"{'shared':<10}{mic.stats['device_opens']:>14}{1000 * np.median(shared):>9.1f}"
+          f"{1000 * max(shared):>9.1f}{1000 * args.pre_roll:>13.0f}")
+
+
+if __name__ == '__main__':
+    main()
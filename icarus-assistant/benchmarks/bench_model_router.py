@@ -0,0 +1,97 @@
+"""
+bench_model_router.py
+
+Replays recorded prompts for each route (intent, planning, chat, ...) against local stub endpoints
+that imitate each model's latency profile, and reports latency per route for three setups: one
+model for everything (the old single `model`), routing by profile, and routing with a speculative
+race on the intent route.
+
+Usage:
+    python -m benchmarks.bench_model_router --rounds 20 --time-scale 0.1
+    python -m benchmarks.bench_model_router --prompts recorded.jsonl
+
+--prompts takes JSON lines {"route": ..., "prompt": ..., "answer": ...}; the built-in set is used
+otherwise. Stub latency is the profile's time to first token with log-normal jitter plus the
+answer's tokens at the profile's tokens/s, multiplied by --time-scale to keep runs short.
+"""
+
+import argparse
+import json
+import random
+import numpy as np
+from llm.model_router import MODEL_PROFILES, ModelRouter
+from llm.openrouter_client import OpenRouterClient
+from tests.openrouter_stub import OpenRouterStub, completion
+
+RECORDED = [
+    {'route': 'intent', 'prompt': 'User query: "what is on my calendar tomorrow"',
+     'answer': '{"action": "tool_call", "target": "calendar", "parameters": {"day": "tomorrow"}, "confidence": 0.9}'},
+    {'route': 'intent', 'prompt': 'User query: "open spotify"',
+     'answer': '{"action": "tool_call", "target": "launch_app", "parameters": {"app": "spotify"}, "confidence": 0.95}'},
+    {'route': 'disambiguation', 'prompt': 'Available apps: Spotify, Steam, Slack\nUser request: open the music app',
+     'answer': 'Spotify'},
+    {'route': 'planning', 'prompt': 'You are a task planner. The user has a complex request: "summarize every pdf in reports"',
+     'answer': json.dumps({'steps': [{'step_id': i, 'description': f'Step {i} of the report summary',
+                                      'action': 'tool_call', 'target': 'summarize_pdf',
+                                      'parameters': {'file_path': f'reports/{i}.pdf'}, 'depends_on': []}
+                                     for i in range(1, 6)]})},
+    {'route': 'chat', 'prompt': 'Tell me something interesting about octopuses.',
+     'answer': 'Octopuses have three hearts and blue blood, and most of their neurons are in their arms, '
+               'which can taste what they touch. They are also escape artists that can squeeze through any '
+               'gap larger than their beak.'},
+    {'route': 'summary', 'prompt': 'Summarize the earlier conversation in two sentences.',
+     'answer': 'The user planned a trip to Lisbon and asked about flights. They also set a reminder for the dentist.'},
+]
+SINGLE = 'deepseek/deepseek-r1-0528:free'
+MODELS = ['openai/gpt-4o-mini', 'google/gemini-2.0-flash-001', 'anthropic/claude-3.5-sonnet', SINGLE]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20, help='Replays of the whole prompt set per setup')
+    parser.add_argument('--time-scale', type=float, default=0.1)
+    parser.add_argument('--jitter', type=float, default=0.5, help='Sigma of the log-normal latency jitter')
+    parser.add_argument('--prompts', help='JSON lines of recorded prompts')
+    args = parser.parse_args()
+
+    recorded = RECORDED
+    if args.prompts:
+        with open(args.prompts, encoding='utf-8') as f:
+            recorded = [json.loads(line) for line in f if line.strip()]
+    rng = random.Random(0)
+    stubs = {model: OpenRouterStub().start() for model in MODELS}
+
+    def stubbed_latency(model: str, answer: str) -> float:
+        profile = MODEL_PROFILES[model]
+        first_token = profile['latency_s'] * rng.lognormvariate(0, args.jitter)
+        return args.time_scale * (first_token + len(OpenRouterStub.tokenize(answer)) / profile['tokens_per_s'])
+
+    setups = {
+        'single model': ModelRouter('bench', [SINGLE]),
+        'routed': ModelRouter('bench', MODELS[:3]),
+        'routed + race': ModelRouter('bench', MODELS[:3], routes={'intent': {'speculative': True}}),
+    }
+    print(f"{len(recorded)} recorded prompts x {args.rounds} rounds, latencies x{args.time_scale}")
+    print(f"{'setup':<16}{'route':<16}{'models':<56}{'p50 ms':>8}{'p95 ms':>8}")
+    for name, router in setups.items():
+        router.client_factory = lambda model: OpenRouterClient('bench', model, api_url=stubs[model].url)
+        cost = 0.0
+        for _ in range(args.rounds):
+            for item in recorded:
+                for model in router.models_for(item['route']):
+                    stubs[model].delay = stubbed_latency(model, item['answer'])
+                    stubs[model].script((200, {}, completion(item['answer'])))
+                    cost += MODEL_PROFILES[model]['cost_per_mtok'] * len(OpenRouterStub.tokenize(item['answer'])) / 1e6
+                router.query(item['route'], item['prompt'])
+        for route, stats in router.report().items():
+            if stats['calls']:
+                print(f"{name:<16}{route:<16}{' vs '.join(stats['models']):<56}"
+                      f"{stats['p50_ms'] / args.time_scale:>8.0f}{stats['p95_ms'] / args.time_scale:>8.0f}")
+        print(f"{name:<16}estimated output cost ${cost:.4f} (p50/p95 rescaled to real time)")
+        router.close()
+    for stub in stubs.values():
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
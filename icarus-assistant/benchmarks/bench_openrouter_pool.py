@@ -0,0 +1,68 @@
+"""
+bench_openrouter_pool.py
+
+Measures per-call latency of chat completion requests with and without HTTP connection reuse.
+
+Usage:
+    python -m benchmarks.bench_openrouter_pool --calls 50
+    python -m benchmarks.bench_openrouter_pool --url https://openrouter.ai/api/v1/chat/completions --key sk-... --calls 5
+
+By default a local stub server answers instantly, so the numbers isolate connection set-up cost.
+Against the real endpoint the gap also includes the TLS handshake saved by keep-alive.
+"""
+
+import argparse
+import time
+import numpy as np
+import requests
+from llm.openrouter_client import OpenRouterClient
+from tests.openrouter_stub import OpenRouterStub
+
+
+def fresh_connection_call(url: str, key: str, model: str, prompt: str) -> str:
+    """The old behaviour: a module-level requests.post, so every call opens a new connection."""
+    response = requests.post(url, json={'model': model, 'messages': [{'role': 'user', 'content': prompt}]},
+                             headers={'Authorization': f'Bearer {key}'}, timeout=30)
+    response.raise_for_status()
+    return response.json()['choices'][0]['message']['content']
+
+
+def timed(fn, calls: int):
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        fn(f"ping {i}")
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--url', help='Chat completions endpoint (default: local stub)')
+    parser.add_argument('--key', default='bench-key')
+    parser.add_argument('--model', default='openai/gpt-4o-mini')
+    args = parser.parse_args()
+
+    stub = None if args.url else OpenRouterStub().start()
+    url = args.url or stub.url
+    client = OpenRouterClient(api_key=args.key, model=args.model, api_url=url)
+    connections_before = stub.connections if stub else None
+
+    fresh = timed(lambda p: fresh_connection_call(url, args.key, args.model, p), args.calls)
+    connections_fresh = stub.connections - connections_before if stub else None
+    pooled = timed(client.query, args.calls)
+    connections_pooled = stub.connections - connections_before - connections_fresh if stub else None
+
+    print(f"Endpoint: {url}, calls: {args.calls}")
+    print(f"{'mode':<10}{'p50 ms':>9}{'p95 ms':>9}{'mean ms':>9}{'connections':>13}")
+    for name, timings, conns in (('fresh', fresh, connections_fresh), ('pooled', pooled, connections_pooled)):
+        print(f"{name:<10}{np.percentile(timings, 50):>9.2f}{np.percentile(timings, 95):>9.2f}"
+              f"{timings.mean():>9.2f}{conns if conns is not None else '-':>13}")
+    client.close()
+    if stub:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+bench_response_cache.py
+
+Measures how many OpenRouter calls and how much latency the response cache saves on a stream of
+utterances where some are repeated or paraphrased.
+
+Usage:
+    python -m benchmarks.bench_response_cache --queries 200 --repeat-ratio 0.6 --latency 0.05
+    python -m benchmarks.bench_response_cache --similarity 0.9
+
+The utterances are drawn from a small set of everyday commands, with a share of exact repeats
+(differing only in case and punctuation) and, with --similarity, light paraphrases.
+"""
+
+import argparse
+import random
+import time
+import numpy as np
+from llm.openrouter_client import OpenRouterClient
+from llm.response_cache import ResponseCache
+from tests.openrouter_stub import OpenRouterStub
+
+COMMON = ["what time is it", "cpu usage", "hello", "ram usage", "battery status", "system info",
+          "what can you do", "how is the weather"]
+PARAPHRASES = {"what time is it": "what time is it now", "cpu usage": "cpu usage please",
+               "battery status": "battery status now", "what can you do": "what can you do for me"}
+
+
+def utterances(n: int, repeat_ratio: float, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n):
+        if rng.random() >= repeat_ratio:
+            yield f"tell me something new number {i}"
+            continue
+        text = rng.choice(COMMON)
+        if text in PARAPHRASES and rng.random() < 0.3:
+            text = PARAPHRASES[text]
+        yield rng.choice([text, text.capitalize() + "?", text.upper()])
+
+
+def run(stub, cache, prompts):
+    client = OpenRouterClient(api_key='bench', model='bench', api_url=stub.url, cache=cache)
+    before = len(stub.requests)
+    latencies = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        client.query(prompt)
+        latencies.append(time.perf_counter() - start)
+    client.close()
+    return len(stub.requests) - before, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--repeat-ratio', type=float, default=0.6, help='Share of utterances from the common set')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock server seconds per response')
+    parser.add_argument('--similarity', type=float, default=None, help='Enable the similarity tier at this threshold')
+    args = parser.parse_args()
+
+    prompts = list(utterances(args.queries, args.repeat_ratio))
+    with OpenRouterStub(delay=args.latency) as stub:
+        uncached_calls, uncached = run(stub, None, prompts)
+        cache = ResponseCache(path=None, similarity_threshold=args.similarity)
+        cached_calls, cached = run(stub, cache, prompts)
+
+    stats = cache.stats
+    ms = lambda values, q: f"{1000 * np.percentile(values, q):.1f}"
+    print(f"Queries: {args.queries}, repeat ratio {args.repeat_ratio:.0%}, server latency {args.latency:.2f} s")
+    print(f"{'mode':<10}{'API calls':>10}{'p50 ms':>9}{'p95 ms':>9}{'total s':>9}")
+    print(f"{'uncached':<10}{uncached_calls:>10}{ms(uncached, 50):>9}{ms(uncached, 95):>9}{sum(uncached):>9.2f}")
+    print(f"{'cached':<10}{cached_calls:>10}{ms(cached, 50):>9}{ms(cached, 95):>9}{sum(cached):>9.2f}")
+    print(f"Hit rate {stats['hit_rate']:.0%} ({stats['similar_hits']} by similarity); "
+          f"{uncached_calls - cached_calls} paid calls saved")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+bench_route_intent.py
+
+Times verb matching in route_intent: the compiled single-pass regex against the original
+keyword-by-keyword cascade, over a generated corpus of utterances.
+
+Usage:
+    python -m benchmarks.bench_route_intent --utterances 5000 --repeat 5
+
+Both matchers are checked to pick the same verb for every utterance before timing.
+"""
+
+import argparse
+import random
+import time
+from orchestrator.intent_keywords import INTENT_EXAMPLES, INTENT_KEYWORDS, INTENT_PREFIXES
+from orchestrator.intent_router import match_verb, route_intent
+
+CHATTER = ["could you", "please", "i was wondering", "right now", "for me", "thanks", "about the project",
+           "in the downloads folder", "to 0.5", "notes.txt", "report.pdf", "tomorrow", "quickly"]
+OPEN_ENDED = ["explain how rainbows form", "write a haiku about autumn", "who won the world cup in 2010",
+              "translate good night into french", "what should i cook tonight"]
+
+
+def cascade_verb(text: str):
+    """The original if/elif chain: scan every keyword of every verb in priority order."""
+    for verb, phrases in INTENT_KEYWORDS:
+        if any(k in text for k in phrases) or any(text.startswith(p) for p in INTENT_PREFIXES.get(verb, [])):
+            return verb
+    return None
+
+
+def corpus(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    phrases = [p for _, ps in INTENT_KEYWORDS for p in ps] + [p for ps in INTENT_PREFIXES.values() for p in ps]
+    phrases += [e for es in INTENT_EXAMPLES.values() for e in es]
+    for _ in range(n):
+        if rng.random() < 0.3:
+            yield rng.choice(OPEN_ENDED)
+            continue
+        words = [rng.choice(phrases)] + rng.sample(CHATTER, rng.randint(0, 3))
+        rng.shuffle(words)
+        yield ' '.join(words)
+
+
+def timed(fn, texts, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--utterances', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5, help='Timing runs; the fastest is reported')
+    args = parser.parse_args()
+
+    texts = [t.lower() for t in corpus(args.utterances)]
+    mismatches = [t for t in texts if cascade_verb(t) != match_verb(t)]
+    if mismatches:
+        raise SystemExit(f"Matchers disagree on {len(mismatches)} utterances, e.g. {mismatches[0]!r}")
+
+    cascade = timed(cascade_verb, texts, args.repeat)
+    compiled = timed(match_verb, texts, args.repeat)
+    full = timed(route_intent, texts, args.repeat)
+    us = lambda seconds: 1e6 * seconds / len(texts)
+    print(f"{len(texts)} utterances, fastest of {args.repeat} runs; both matchers agree on every verb")
+    print(f"{'matcher':<22}{'us/utterance':>13}")
+    print(f"{'keyword cascade':<22}{us(cascade):>13.2f}")
+    print(f"{'compiled regex':<22}{us(compiled):>13.2f}")
+    print(f"{'route_intent (full)':<22}{us(full):>13.2f}")
+    print(f"Verb matching speed-up: {cascade / compiled:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
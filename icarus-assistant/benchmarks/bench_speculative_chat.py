@@ -0,0 +1,104 @@
+"""
+bench_speculative_chat.py
+
+Compares time to the first word of a chat reply when the intent parse and the chat completion
+run one after the other versus concurrently (SpeculativeChat), over a mix of conversational and
+tool turns served by local stubs.
+
+Usage:
+    python -m benchmarks.bench_speculative_chat --turns 20 --chat-share 0.6
+
+Conversational turns gain the overlap of the two requests; tool turns discard the speculative
+reply, which costs the characters generated before it was cancelled.
+"""
+
+import argparse
+import json
+import random
+import time
+import numpy as np
+from llm.openrouter_client import OpenRouterClient
+from orchestrator.llm_brain import LLMBrain
+from orchestrator.speculative_chat import SpeculativeChat
+from tests.openrouter_stub import OpenRouterStub, completion
+from utils.json_extractor import INTENT_SCHEMA, extract_json_stream
+
+CHAT_INTENT = json.dumps({"action": "direct_response", "target": "Happy to chat! Octopuses have three hearts.",
+                          "parameters": {}, "confidence": 0.8, "reasoning": "Small talk, no tool needed."})
+TOOL_INTENT = json.dumps({"action": "function_call", "target": "get_weather", "parameters": {},
+                          "confidence": 0.9, "reasoning": "Weather question."})
+REPLY = ("Octopuses have three hearts and blue blood. Most of their neurons sit in their arms, "
+         "which can taste what they touch.")
+
+
+def ready(fields) -> bool:
+    needed = LLMBrain.DISPATCH_FIELDS.get(fields.get('action'))
+    return needed is not None and all(field in fields for field in needed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=20)
+    parser.add_argument('--chat-share', type=float, default=0.6, help='Share of conversational turns')
+    parser.add_argument('--tokens-per-s', type=float, default=40.0)
+    parser.add_argument('--first-token-s', type=float, default=0.5)
+    args = parser.parse_args()
+
+    token_delay = 1.0 / args.tokens_per_s
+    intent_stub = OpenRouterStub(delay=args.first_token_s, token_delay=token_delay).start()
+    chat_stub = OpenRouterStub(delay=args.first_token_s, token_delay=token_delay).start()
+    intent_client = OpenRouterClient('bench-key', 'intent-model', api_url=intent_stub.url)
+    chat_client = OpenRouterClient('bench-key', 'chat-model', api_url=chat_stub.url)
+    speculative = SpeculativeChat(chat_client)
+    rng = random.Random(0)
+
+    serial, overlapped = [], []
+    for _ in range(args.turns):
+        conversational = rng.random() < args.chat_share
+        intent = CHAT_INTENT if conversational else TOOL_INTENT
+
+        # Serial: parse the intent, then request the reply
+        intent_stub.script((200, {}, completion(intent)))
+        start = time.perf_counter()
+        parsed = extract_json_stream(intent_client.query_stream('intent'), INTENT_SCHEMA, until=ready)
+        if parsed['action'] == 'direct_response':
+            chat_stub.script((200, {}, completion(REPLY)))
+            stream = chat_client.query_stream('chat')
+            next(stream)
+            serial.append(time.perf_counter() - start)
+            stream.close()
+
+        # Speculative: both at once; the intent only needs its action
+        intent_stub.script((200, {}, completion(intent)))
+        chat_stub.script((200, {}, completion(REPLY)))
+        start = time.perf_counter()
+        speculation = speculative.start('chat')
+        parsed = extract_json_stream(intent_client.query_stream('intent'), INTENT_SCHEMA,
+                                     until=lambda f: f.get('action') == 'direct_response' or ready(f))
+        if parsed['action'] == 'direct_response':
+            chunks = speculative.use(speculation, 1000 * (time.perf_counter() - start))
+            next(chunks)
+            overlapped.append(time.perf_counter() - start)
+            speculation.cancel()
+            for _ in chunks:
+                pass
+        else:
+            speculative.discard(speculation)
+        time.sleep(0.05)
+
+    stats = speculative.stats
+    print(f"{args.turns} turns, {stats['wins']} conversational; stubs at {args.tokens_per_s:.0f} tokens/s, "
+          f"{1000 * args.first_token_s:.0f} ms to first token")
+    print(f"{'flow':<24}{'first word p50 ms':>18}{'p95 ms':>10}")
+    print(f"{'serial':<24}{1000 * np.percentile(serial, 50):>18.0f}{1000 * np.percentile(serial, 95):>10.0f}")
+    print(f"{'speculative':<24}{1000 * np.percentile(overlapped, 50):>18.0f}{1000 * np.percentile(overlapped, 95):>10.0f}")
+    print(f"Speculation used {stats['win_rate']:.0%} of turns, saved p50 {stats['saved_p50_ms']:.0f} ms per used turn, "
+          f"discarded {stats['wasted_chars']} chars on tool turns")
+    for client in (intent_client, chat_client):
+        client.close()
+    for stub in (intent_stub, chat_stub):
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+bench_stream_tts.py
+
+Compares when the first sentence is ready for TTS: after the full blocking response versus
+sentence-by-sentence from the SSE stream.
+
+Usage:
+    python -m benchmarks.bench_stream_tts --tokens-per-s 40 --runs 5
+    python -m benchmarks.bench_stream_tts --url https://openrouter.ai/api/v1/chat/completions --key sk-... --model openai/gpt-4o-mini
+
+By default a local stub streams a fixed multi-sentence answer at --tokens-per-s.
+"""
+
+import argparse
+import time
+import numpy as np
+from llm.openrouter_client import OpenRouterClient
+from tests.openrouter_stub import OpenRouterStub, completion
+from utils.sentence_segmenter import SentenceSegmenter
+
+ANSWER = ("The capital of Australia is Canberra. It was chosen as a compromise between Sydney and Melbourne. "
+          "Construction began in 1913, and Parliament first met there in 1927. Today it is home to about "
+          "four hundred thousand people. Many national institutions are located in the city.")
+PROMPT = "Tell me about the capital of Australia in five sentences."
+
+
+def blocking_first_sentence(client: OpenRouterClient) -> float:
+    """Old flow: wait for query(), then the first sentence can be spoken."""
+    start = time.perf_counter()
+    client.query(PROMPT)
+    return time.perf_counter() - start
+
+
+def streaming_first_sentence(client: OpenRouterClient):
+    """New flow: the first sentence is handed to TTS as soon as the segmenter completes it."""
+    start = time.perf_counter()
+    segmenter = SentenceSegmenter()
+    first = None
+    for chunk in client.query_stream(PROMPT):
+        if first is None and segmenter.feed(chunk):
+            first = time.perf_counter() - start
+    segmenter.flush()
+    total = time.perf_counter() - start
+    return (first if first is not None else total), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--tokens-per-s', type=float, default=40.0, help='Stub generation speed')
+    parser.add_argument('--url', help='Chat completions endpoint (default: local stub)')
+    parser.add_argument('--key', default='bench-key')
+    parser.add_argument('--model', default='openai/gpt-4o-mini')
+    args = parser.parse_args()
+
+    stub, blocking_delay = None, 0.0
+    if not args.url:
+        stub = OpenRouterStub(delay=0.2, token_delay=1.0 / args.tokens_per_s).start()
+        # A blocking response arrives once every token has been generated
+        blocking_delay = 0.2 + len(stub.tokenize(ANSWER)) / args.tokens_per_s
+    client = OpenRouterClient(api_key=args.key, model=args.model, api_url=args.url or stub.url)
+
+    blocking, first, total = [], [], []
+    for _ in range(args.runs):
+        if stub:
+            stub.delay = blocking_delay
+            stub.script((200, {}, completion(ANSWER)))
+        blocking.append(blocking_first_sentence(client))
+        if stub:
+            stub.delay = 0.2
+            stub.script((200, {}, completion(ANSWER)))
+        f, t = streaming_first_sentence(client)
+        first.append(f)
+        total.append(t)
+
+    ms = lambda values: f"{1000 * np.median(values):.0f}"
+    print(f"Runs: {args.runs}, endpoint: {args.url or 'stub'}")
+    print(f"{'flow':<12}{'first sentence ms':>18}{'full reply ms':>15}")
+    print(f"{'blocking':<12}{ms(blocking):>18}{ms(blocking):>15}")
+    print(f"{'streaming':<12}{ms(first):>18}{ms(total):>15}")
+    client.close()
+    if stub:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
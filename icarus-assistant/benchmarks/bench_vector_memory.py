@@ -0,0 +1,122 @@
+"""
+bench_vector_memory.py
+
+Measures VectorMemory at 100k vectors: indexing throughput, reload time, top-k query latency and
+recall of planted facts queried with paraphrases among synthetic distractor messages.
+
+Usage:
+    python -m benchmarks.bench_vector_memory --vectors 100000 --embedder hashed
+
+`--embedder sentence` uses sentence-transformers (all-MiniLM-L6-v2) if installed; the default hashed
+trigram vectors need no model download.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from llm.response_cache import HashedTrigramEmbedder
+from orchestrator.memory_manager import MemoryManager
+from orchestrator.vector_memory import VectorMemory, load_embedder
+
+PEOPLE = ["Priya", "Marco", "Aiko", "Dmitri", "Fatima", "Jonas", "Lucia", "Omar", "Sven", "Wen"]
+THINGS = ["passport", "spare key", "tax folder", "camera charger", "wedding album", "toolbox", "laptop stand"]
+PLACES = ["hall cupboard", "blue drawer", "garage shelf", "desk cabinet", "attic box", "car boot"]
+CITIES = ["Lisbon", "Osaka", "Denver", "Nairobi", "Oslo", "Quito", "Hanoi", "Perth"]
+DISTRACTORS = [
+    "Search for the {thing} receipts from last {month}",
+    "Remind {person} to call about the {city} invoice",
+    "What's the weather like in {city} this weekend?",
+    "Open the spreadsheet {person} shared about the {thing}",
+    "Play the playlist {person} made for the {city} trip",
+    "The meeting with {person} moved to {month} {day}",
+]
+MONTHS = ["January", "March", "May", "July", "September", "November"]
+
+
+def planted_facts(n: int, rng: random.Random):
+    """(fact, paraphrased query) pairs, each about a unique combination."""
+    seen, facts = set(), []
+    while len(facts) < n:
+        person, thing, place, city = (rng.choice(PEOPLE), rng.choice(THINGS), rng.choice(PLACES), rng.choice(CITIES))
+        if rng.random() < 0.5 and (person, thing, place) not in seen:
+            seen.add((person, thing, place))
+            facts.append((f"{person} left the {thing} in the {place}", f"where did {person} leave the {thing}?"))
+        elif (person, city) not in seen:
+            seen.add((person, city))
+            facts.append((f"{person}'s flight to {city} leaves at {rng.randint(6, 22)}:{rng.choice(['05', '30', '45'])}",
+                          f"when does {person}'s flight to {city} leave?"))
+    return facts
+
+
+def distractor(rng: random.Random) -> str:
+    return rng.choice(DISTRACTORS).format(thing=rng.choice(THINGS), person=rng.choice(PEOPLE), city=rng.choice(CITIES),
+                                          month=rng.choice(MONTHS), day=rng.randint(1, 28)) + f" (#{rng.randint(0, 10 ** 6)})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vectors', type=int, default=100000)
+    parser.add_argument('--facts', type=int, default=200, help='Planted facts queried for recall')
+    parser.add_argument('--embedder', choices=['hashed', 'sentence'], default='hashed')
+    parser.add_argument('--k', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    facts = planted_facts(args.facts, rng)
+    texts = [distractor(rng) for _ in range(args.vectors - len(facts))]
+    for fact, _ in facts:
+        texts.insert(rng.randrange(len(texts) + 1), fact)
+
+    fd, path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    memory = MemoryManager(db_path=path)
+    start = datetime.datetime(2025, 1, 1)
+    conn = memory._conn()
+    with conn:
+        conn.executemany('INSERT INTO messages (session_id, role, content, timestamp, metadata) VALUES (?, ?, ?, ?, ?)',
+                         ((f's{i % 500}', 'user', t, (start + datetime.timedelta(seconds=i)).isoformat(), None)
+                          for i, t in enumerate(texts)))
+    embedder = HashedTrigramEmbedder() if args.embedder == 'hashed' else load_embedder()
+
+    vectors = VectorMemory(memory, embedder)
+    t0 = time.perf_counter()
+    added = vectors.sync(page_size=2000)
+    index_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    reloaded = VectorMemory(memory, embedder)
+    load_s = time.perf_counter() - t0
+
+    hits_at_1 = hits_at_k = 0
+    latencies = []
+    for fact, query in facts:
+        t0 = time.perf_counter()
+        results = reloaded.search(query, k=args.k)
+        latencies.append(1000 * (time.perf_counter() - t0))
+        contents = [r['content'] for r in results]
+        hits_at_1 += contents[:1] == [fact]
+        hits_at_k += fact in contents
+    session_ms = []
+    for i in range(len(facts)):
+        t0 = time.perf_counter()
+        reloaded.search(facts[i][1], k=args.k, session_id=f's{i % 500}')
+        session_ms.append(1000 * (time.perf_counter() - t0))
+    memory.close()
+    for p in (path, path + '-wal', path + '-shm'):
+        if os.path.exists(p):
+            os.remove(p)
+
+    print(f"{added} vectors ({reloaded.model}), {reloaded.dim * 4 * added / 2 ** 20:.0f} MB as float32")
+    print(f"Indexed in {index_s:.1f} s ({added / index_s:.0f} messages/s); reloaded from SQLite in {load_s:.2f} s")
+    print(f"{'query':<28}{'p50 ms':>10}{'p95 ms':>10}")
+    print(f"{'top-' + str(args.k) + ', all sessions':<28}{np.percentile(latencies, 50):>10.2f}{np.percentile(latencies, 95):>10.2f}")
+    print(f"{'top-' + str(args.k) + ', one session':<28}{np.percentile(session_ms, 50):>10.2f}{np.percentile(session_ms, 95):>10.2f}")
+    print(f"Recall of {len(facts)} planted facts from paraphrased queries: "
+          f"@1 {100 * hits_at_1 / len(facts):.0f}%, @{args.k} {100 * hits_at_k / len(facts):.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+bench_wakeword.py
+
+Reports CPU usage and detection latency of the offline wake-word spotter on a replayed audio stream.
+
+Usage:
+    python -m benchmarks.bench_wakeword
+    python -m benchmarks.bench_wakeword --templates data/wakeword/icarus.npz --audio stream.wav --keyword-ends 2.1 7.4
+
+Without arguments, a synthetic keyword is enrolled and a minute of noise with keywords and distractors
+is replayed. CPU% = process CPU time / audio duration, i.e. the share of one core needed in real time.
+Latency = time from the end of a keyword in the audio to the chunk on which it fired.
+"""
+
+import argparse
+import time
+import numpy as np
+from orchestrator.keyword_spotter import KeywordSpotter
+from stt.streaming_transcriber import iter_wav_chunks
+
+RATE = 16000
+
+
+def synthetic_keyword(stretch: float = 1.0, pitch: float = 1.0, amp: float = 0.3) -> np.ndarray:
+    """Three gliding harmonic syllables standing in for a spoken keyword."""
+    parts = []
+    for a, b, d in [(300, 500, 0.15), (700, 400, 0.2), (450, 900, 0.18)]:
+        n = int(RATE * d * stretch)
+        phase = 2 * np.pi * np.cumsum(np.linspace(a, b, n) * pitch) / RATE
+        parts.append(amp * np.hanning(n) * sum(np.sin(k * phase) / k for k in range(1, 6)))
+        parts.append(np.zeros(int(RATE * 0.03)))
+    return np.concatenate(parts).astype(np.float32)
+
+
+def synthetic_stream(seconds: float, rng: np.random.Generator):
+    """Noise with a keyword every ~6 s and a distractor tone in between; returns (audio, keyword ends)."""
+    audio = (0.003 * rng.standard_normal(int(RATE * seconds))).astype(np.float32)
+    ends = []
+    for start in np.arange(2.0, seconds - 2.0, 6.0):
+        word = synthetic_keyword(rng.uniform(0.85, 1.2), rng.uniform(0.97, 1.03), rng.uniform(0.1, 0.3))
+        i = int(start * RATE)
+        audio[i:i + len(word)] += word
+        ends.append((i + len(word)) / RATE)
+        n = int(RATE * 0.55)
+        phase = 2 * np.pi * np.cumsum(np.linspace(1200, 600, n)) / RATE
+        j = i + 3 * RATE
+        audio[j:j + n] += (0.3 * np.hanning(n) * np.sin(phase)).astype(np.float32)
+    return audio, ends
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--templates', help='Enrolled .npz templates (default: synthetic keyword)')
+    parser.add_argument('--audio', help='16 kHz mono WAV to replay (default: 60 s synthetic stream)')
+    parser.add_argument('--keyword-ends', nargs='*', type=float, default=[],
+                        help='Seconds at which each keyword ends in --audio, for latency')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--chunk', type=int, default=1600)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    spotter = KeywordSpotter(threshold=args.threshold)
+    if args.templates:
+        if not spotter.load(args.templates):
+            raise SystemExit(f"No templates at {args.templates}")
+    else:
+        for stretch in (0.95, 1.0, 1.05):
+            pad = (0.003 * rng.standard_normal(int(RATE * 0.3))).astype(np.float32)
+            spotter.enroll(np.concatenate([pad, synthetic_keyword(stretch), pad]))
+
+    if args.audio:
+        audio = np.concatenate(list(iter_wav_chunks(args.audio)))
+        ends = args.keyword_ends
+    else:
+        audio, ends = synthetic_stream(60.0, rng)
+    duration = len(audio) / RATE
+
+    detections = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for i in range(0, len(audio), args.chunk):
+        result = spotter.process(audio[i:i + args.chunk])
+        if result:
+            detections.append((min(i + args.chunk, len(audio)) / RATE, result))
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    print(f"Audio: {duration:.1f} s, templates: {len(spotter.templates)}, threshold: {args.threshold}")
+    print(f"CPU: {cpu:.2f} s ({100 * cpu / duration:.2f}% of one core), wall: {wall:.2f} s, "
+          f"scoring passes: {spotter.scoring_passes}")
+    latencies, hits = [], set()
+    for fired_at, result in detections:
+        match = next((e for e in ends if e not in hits and abs(result['end_s'] - e) < 0.5), None)
+        label = 'hit' if match is not None else 'false alarm'
+        if match is not None:
+            hits.add(match)
+            latencies.append(fired_at - match)
+        print(f"  {fired_at:7.2f} s  score {result['score']:.3f}  {label}")
+    if ends:
+        print(f"Detected {len(hits)}/{len(ends)} keywords, {len(detections) - len(hits)} false alarms")
+    if latencies:
+        print(f"Latency after keyword end: mean {1000 * np.mean(latencies):.0f} ms, "
+              f"max {1000 * np.max(latencies):.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
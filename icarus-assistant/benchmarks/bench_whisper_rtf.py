@@ -0,0 +1,63 @@
+"""
+bench_whisper_rtf.py
+
+Reports load time, warm-up time and real-time factor (RTF) of each Whisper model size and backend on CPU.
+
+Usage:
+    python -m benchmarks.bench_whisper_rtf --sizes tiny base small --backends openai ctranslate2
+    python -m benchmarks.bench_whisper_rtf --audio sample.wav --runs 5
+
+RTF = transcription time / audio duration; below 1.0 is faster than real time.
+"""
+
+import argparse
+import time
+import wave
+import numpy as np
+from stt.model_pool import WhisperModelPool
+
+
+def load_audio(path: str = None, seconds: float = 10.0) -> np.ndarray:
+    """Loads a 16 kHz mono int16 WAV, or synthesises a voiced-like test signal."""
+    if path:
+        with wave.open(path, 'rb') as wf:
+            pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        return pcm.astype(np.float32) / 32768.0
+    t = np.arange(int(16000 * seconds)) / 16000
+    envelope = (np.sin(2 * np.pi * 2 * t) > 0).astype(np.float32)
+    return (0.3 * envelope * np.sin(2 * np.pi * 180 * t)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', default=['tiny', 'base', 'small'])
+    parser.add_argument('--backends', nargs='+', default=['openai', 'ctranslate2'])
+    parser.add_argument('--compute-type', default='int8')
+    parser.add_argument('--audio', help='16 kHz mono WAV to transcribe (default: 10 s synthetic signal)')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    audio = load_audio(args.audio)
+    duration = len(audio) / 16000
+    print(f"Audio: {duration:.1f} s, runs per configuration: {args.runs}")
+    print(f"{'size':<8}{'backend':<13}{'load s':>8}{'warmup s':>10}{'mean s':>9}{'RTF':>7}")
+    for size in args.sizes:
+        for backend in args.backends:
+            try:
+                pool = WhisperModelPool(model_size=size, backend=backend, compute_type=args.compute_type,
+                                        device='cpu', workers=1)
+            except ImportError as e:
+                print(f"{size:<8}{backend:<13}  skipped ({e})")
+                continue
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                pool.transcribe(audio)
+                timings.append(time.perf_counter() - start)
+            mean = sum(timings) / len(timings)
+            print(f"{size:<8}{backend:<13}{pool.load_s:>8.2f}{pool.warmup_s:>10.2f}{mean:>9.2f}{mean / duration:>7.3f}")
+            pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
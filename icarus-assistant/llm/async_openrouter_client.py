@@ -0,0 +1,214 @@
+"""
+async_openrouter_client.py
+
+asyncio client for the OpenRouter API that runs many requests concurrently over a bounded connection pool.
+"""
+
+import asyncio
+import random
+import threading
+from typing import Dict, List, Optional, Sequence
+from llm.openrouter_client import DEFAULT_API_URL, RETRY_STATUSES
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class AsyncOpenRouterClient:
+    """Async counterpart of OpenRouterClient built on aiohttp.
+
+    One aiohttp session holds a keep-alive pool capped at pool_size connections in total and
+    per_host connections per host; a semaphore caps requests in flight. Retries, backoff and the
+    circuit breaker behave like OpenRouterClient's.
+
+    Async code awaits aquery()/agather(). Synchronous code calls query()/gather_queries(), which
+    run on a private event loop thread so the connection pool survives between calls.
+
+    Methods:
+        aquery(prompt, system=None) -> str: Sends one prompt.
+        agather(prompts) -> List[str]: Sends prompts concurrently, results in input order.
+        query(prompt) -> str: Blocking aquery, drop-in for OpenRouterClient.query.
+        gather_queries(prompts) -> List[str]: Blocking agather.
+        close() -> None: Closes the session and stops the loop thread.
+    """
+    def __init__(self, api_key: str, model: str, api_url: str = DEFAULT_API_URL,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0, pool_size: int = 16,
+                 per_host: int = 8, max_concurrency: Optional[int] = None,
+                 breaker_threshold: int = 5, breaker_reset_s: float = 30.0):
+        """Initializes the client; no connection is made until the first request.
+
+        Args:
+            api_key (str): OpenRouter API key.
+            model (str): Model name to use.
+            api_url (str): Chat completions endpoint.
+            connect_timeout (float): Seconds to establish a connection.
+            read_timeout (float): Seconds to wait between response bytes.
+            max_retries (int): Retries after the first attempt for retryable failures.
+            backoff_base (float): First backoff ceiling in seconds; doubles on every retry.
+            backoff_max (float): Upper bound for a single backoff.
+            pool_size (int): Total connections in the pool.
+            per_host (int): Connections per host.
+            max_concurrency (int, optional): Requests in flight at once (defaults to per_host).
+            breaker_threshold (int): Consecutive failed calls that open the circuit.
+            breaker_reset_s (float): Seconds before a trial call is let through an open circuit.
+        """
+        self.api_key = api_key
+        self.model = model
+        self.api_url = api_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.per_host = per_host
+        self.max_concurrency = max_concurrency or per_host
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset_s)
+        self.stats = {'calls': 0, 'attempts': 0, 'retries': 0, 'failures': 0, 'short_circuited': 0,
+                      'max_in_flight': 0}
+        self._in_flight = 0
+        self._session = None
+        self._session_loop = None
+        self._semaphore = None
+        self._loop = None
+        self._loop_thread = None
+        self._lock = threading.Lock()
+
+    async def _get_session(self):
+        # An aiohttp session belongs to the loop it was created on
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            import aiohttp
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.per_host)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            })
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._session_loop = loop
+        return self._session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _post(self, data: Dict) -> Dict:
+        """POSTs a request body with retries, backoff and the circuit breaker; returns the JSON body."""
+        import aiohttp
+        session = await self._get_session()
+        self.stats['calls'] += 1
+        if not self.breaker.allow():
+            self.stats['short_circuited'] += 1
+            raise CircuitOpenError("OpenRouter circuit is open after repeated failures")
+        # Every outcome is recorded, so a half-open trial can never leave the breaker stuck
+        healthy = False
+        try:
+            attempt = 0
+            while True:
+                self.stats['attempts'] += 1
+                retry_after = None
+                try:
+                    async with self._semaphore:
+                        self._in_flight += 1
+                        self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self._in_flight)
+                        try:
+                            async with session.post(self.api_url, json=data) as response:
+                                if response.status not in RETRY_STATUSES:
+                                    healthy = True
+                                    if response.status != 200:
+                                        print(f"API Error: {await response.text()}")
+                                    response.raise_for_status()
+                                    return await response.json(content_type=None)
+                                retry_after = response.headers.get("Retry-After")
+                                error = aiohttp.ClientResponseError(
+                                    response.request_info, response.history, status=response.status,
+                                    message=f"{response.status} from OpenRouter")
+                        finally:
+                            self._in_flight -= 1
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    error = e
+                if attempt >= self.max_retries:
+                    self.stats['failures'] += 1
+                    raise error
+                delay = self._backoff(attempt, retry_after)
+                attempt += 1
+                self.stats['retries'] += 1
+                await asyncio.sleep(delay)
+        finally:
+            if healthy:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    async def aquery(self, prompt: str, system: Optional[str] = None) -> str:
+        """Sends a prompt to the LLM and returns the response.
+
+        Args:
+            prompt (str): The prompt to send.
+            system (str, optional): System message sent ahead of the prompt.
+
+        Returns:
+            str: LLM response.
+        Raises:
+            Exception: If API call fails or response is invalid.
+        """
+        data = {
+            "model": self.model,
+            "messages": ([{"role": "system", "content": system}] if system else [])
+                        + [{"role": "user", "content": prompt}]
+        }
+        try:
+            result = await self._post(data)
+            return result['choices'][0]['message']['content']
+        except Exception as e:
+            print(f"Error querying OpenRouter LLM: {e}")
+            raise
+
+    async def agather(self, prompts: Sequence[str], return_exceptions: bool = False) -> List:
+        """Sends all prompts concurrently (bounded by max_concurrency).
+
+        Args:
+            prompts (Sequence[str]): Prompts to send.
+            return_exceptions (bool): Put exceptions in the result list instead of raising the first.
+
+        Returns:
+            List: Responses (or exceptions) in the same order as prompts.
+        """
+        return await asyncio.gather(*(self.aquery(p) for p in prompts), return_exceptions=return_exceptions)
+
+    def _run(self, coro):
+        """Runs a coroutine on the private loop thread and waits for its result."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever,
+                                                     name='openrouter-async', daemon=True)
+                self._loop_thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def query(self, prompt: str, system: Optional[str] = None) -> str:
+        """Blocking version of aquery for synchronous callers."""
+        return self._run(self.aquery(prompt, system))
+
+    def gather_queries(self, prompts: Sequence[str], return_exceptions: bool = False) -> List:
+        """Blocking version of agather: overlaps the network wait of a batch of prompts."""
+        return self._run(self.agather(prompts, return_exceptions))
+
+    async def aclose(self) -> None:
+        """Closes the aiohttp session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def close(self) -> None:
+        """Closes the session and stops the private loop thread, if one was started."""
+        if self._loop is None:
+            return
+        self._run(self.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=2.0)
+        self._loop.close()
+        self._loop = None
@@ -15,13 +15,9 @@ class LangChainLLM:
 
     def query(self, prompt: str, session_id: Optional[str] = None) -> str:
         """Query the LLM with prompt and session context."""
-        # Fetch history from memory_manager
-        history = self.memory_manager.get_history(session_id) if session_id else []
-        
-        # Build context from history
-        context = ""
-        if history:
-            context = self.memory_manager.get_context_window(session_id, max_messages=10)
+        # Build context from the last messages of the session
+        context = self.memory_manager.get_context_window(session_id, max_messages=10) if session_id else ""
+        if context:
             context += "\n\n"
         
         full_prompt = context + "User: " + prompt + "\nAssistant:"
@@ -0,0 +1,235 @@
+"""
+model_router.py
+
+Picks an OpenRouter model per task (intent, planning, chat, ...) from latency/cost/quality profiles, optionally racing two models.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional
+import numpy as np
+from llm.openrouter_client import OpenRouterClient
+from utils.json_extractor import JSONExtractionError, extract_json
+
+# Rough profiles: seconds to first token, output tokens/s, USD per million output tokens, quality
+# on a 1-5 scale. Entries under `models` in the config override or extend these.
+MODEL_PROFILES = {
+    'meta-llama/llama-3.1-8b-instruct': {'latency_s': 0.3, 'tokens_per_s': 120, 'cost_per_mtok': 0.05, 'quality': 2},
+    'google/gemini-2.0-flash-001': {'latency_s': 0.4, 'tokens_per_s': 150, 'cost_per_mtok': 0.4, 'quality': 3},
+    'openai/gpt-4o-mini': {'latency_s': 0.5, 'tokens_per_s': 80, 'cost_per_mtok': 0.6, 'quality': 3},
+    'openai/gpt-4o': {'latency_s': 0.8, 'tokens_per_s': 70, 'cost_per_mtok': 10.0, 'quality': 5},
+    'anthropic/claude-3.5-sonnet': {'latency_s': 1.2, 'tokens_per_s': 60, 'cost_per_mtok': 15.0, 'quality': 5},
+    'deepseek/deepseek-r1-0528:free': {'latency_s': 3.0, 'tokens_per_s': 30, 'cost_per_mtok': 0.0, 'quality': 4},
+}
+DEFAULT_PROFILE = {'latency_s': 1.0, 'tokens_per_s': 50, 'cost_per_mtok': 1.0, 'quality': 3}
+
+# What each task optimises for among the registered models. A route may instead name its `model`,
+# and `speculative: true` (or `race: [a, b]`) sends each prompt to two models at once.
+DEFAULT_ROUTES = {
+    'intent': {'optimize': 'latency', 'min_quality': 3},
+    'disambiguation': {'optimize': 'latency', 'min_quality': 2},
+    'planning': {'optimize': 'quality'},
+    'chat': {'optimize': 'quality', 'max_latency_s': 1.5},
+    'summary': {'optimize': 'cost', 'min_quality': 2},
+}
+_SORT_KEYS = {
+    'latency': lambda p: (p['latency_s'], -p['quality']),
+    'cost': lambda p: (p['cost_per_mtok'], p['latency_s']),
+    'quality': lambda p: (-p['quality'], p['latency_s']),
+}
+
+
+def json_validator(schema: Optional[Dict] = None) -> Callable[[str], bool]:
+    """A race validator accepting answers that contain a JSON object matching the schema."""
+    def validate(text: str) -> bool:
+        try:
+            extract_json(text, schema)
+        except JSONExtractionError:
+            return False
+        return True
+    return validate
+
+
+class RoutedClient:
+    """Drop-in for OpenRouterClient (query, query_stream, model) that sends every call through one route."""
+    def __init__(self, router: 'ModelRouter', route: str, validate: Optional[Callable[[str], bool]] = None):
+        self.router = router
+        self.route = route
+        self.validate = validate
+
+    @property
+    def model(self) -> str:
+        return self.router.models_for(self.route)[0]
+
+    def query(self, prompt: str, system: Optional[str] = None) -> str:
+        return self.router.query(self.route, prompt, system, self.validate)
+
+    def query_stream(self, prompt: str, system: Optional[str] = None) -> Iterator[str]:
+        return self.router.query_stream(self.route, prompt, system, self.validate)
+
+
+class ModelRouter:
+    """Registry of models with profiles, and the routes that map tasks to them.
+
+    Each route resolves to the best registered model for what it optimises (latency, cost or
+    quality) within its quality and latency bounds; with a single registered model every route
+    uses it. A speculative route sends the prompt to its two best models at once and returns the
+    first answer that passes the caller's validator, or the first answer if neither passes; the
+    other request runs to completion in the background and is discarded. Latency is recorded per
+    route and model.
+
+    Methods:
+        client(route, validate) -> RoutedClient: Client object bound to a route.
+        models_for(route) -> List[str]: Model, or the two raced models, a route uses.
+        query(route, prompt, system, validate) -> str: Sends a prompt through a route.
+        query_stream(route, prompt, system, validate) -> Iterator[str]: Streams through a route.
+        report() -> Dict: Calls, p50/p95 latency and answers per model for each route.
+    """
+    def __init__(self, api_key: str, models, routes: Optional[Dict[str, Dict]] = None,
+                 client_factory: Optional[Callable[[str], object]] = None, history: int = 1000,
+                 **client_options):
+        """Initializes the registry; clients are created on first use of each model.
+
+        Args:
+            api_key (str): OpenRouter API key.
+            models: Model names, or name -> profile overrides (merged over MODEL_PROFILES).
+            routes (Dict[str, Dict], optional): Route settings merged over DEFAULT_ROUTES.
+            client_factory (callable, optional): model -> client with query/query_stream; defaults
+                to an OpenRouterClient with client_options (e.g. cache, timeouts, api_url).
+            history (int): Latency samples kept per route.
+        """
+        overrides = models if isinstance(models, dict) else {name: {} for name in models}
+        self.profiles = {name: dict(DEFAULT_PROFILE, **MODEL_PROFILES.get(name, {}), **(profile or {}))
+                         for name, profile in overrides.items()}
+        if not self.profiles:
+            raise ValueError("ModelRouter needs at least one model")
+        self.routes = {name: dict(settings) for name, settings in DEFAULT_ROUTES.items()}
+        for name, settings in (routes or {}).items():
+            self.routes[name] = dict(self.routes.get(name, {}), **settings)
+        self.client_factory = client_factory or (
+            lambda model: OpenRouterClient(api_key=api_key, model=model, **client_options))
+        self._clients: Dict[str, object] = {}
+        self._samples: Dict[str, deque] = {}
+        self._history = history
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def client(self, route: str, validate: Optional[Callable[[str], bool]] = None) -> RoutedClient:
+        return RoutedClient(self, route, validate)
+
+    def _client(self, model: str):
+        with self._lock:
+            if model not in self._clients:
+                self._clients[model] = self.client_factory(model)
+            return self._clients[model]
+
+    def models_for(self, route: str) -> List[str]:
+        """The route's model first; a second model if the route is speculative."""
+        settings = self.routes.get(route, {})
+        if settings.get('race'):
+            return list(settings['race'])[:2]
+        if settings.get('model'):
+            ranked = [settings['model']]
+        else:
+            def fits(p):
+                return (p['quality'] >= settings.get('min_quality', 0)
+                        and p['latency_s'] <= settings.get('max_latency_s', float('inf')))
+            candidates = [name for name, p in self.profiles.items() if fits(p)] or list(self.profiles)
+            key = _SORT_KEYS[settings.get('optimize', 'quality')]
+            ranked = sorted(candidates, key=lambda name: key(self.profiles[name]))
+        if settings.get('speculative'):
+            others = [name for name in sorted(self.profiles, key=lambda n: _SORT_KEYS['latency'](self.profiles[n]))
+                      if name not in ranked[:1]]
+            return ranked[:1] + (ranked[1:2] or others[:1])
+        return ranked[:1]
+
+    def _record(self, route: str, model: str, started: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(route, deque(maxlen=self._history))
+            samples.append((1000 * (time.perf_counter() - started), model))
+
+    def _race(self, models: List[str], prompt: str, system: Optional[str],
+              validate: Optional[Callable[[str], bool]]):
+        """The first (model, answer) to arrive that passes validate.
+
+        If no answer passes, the first one that arrived is returned anyway, so the caller's own
+        parsing (e.g. LLMBrain's fallback to a direct response) handles it as it would unraced.
+        Raises only if every model failed.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='model-race')
+        futures = {self._pool.submit(self._client(model).query, prompt, system): model for model in models}
+        error: Exception = RuntimeError("no model answered")
+        unvalidated = None
+        for future in as_completed(futures):
+            try:
+                answer = future.result()
+            except Exception as e:
+                error = e
+                continue
+            if validate is None or validate(answer):
+                return futures[future], answer
+            if unvalidated is None:
+                unvalidated = futures[future], answer
+        if unvalidated is not None:
+            return unvalidated
+        raise error
+
+    def query(self, route: str, prompt: str, system: Optional[str] = None,
+              validate: Optional[Callable[[str], bool]] = None) -> str:
+        """Sends a prompt to the route's model, or races the route's two models.
+
+        Raises:
+            Exception: Whatever the client raises; in a race, the last failure if every model
+                failed (an answer that fails validation is still returned).
+        """
+        models = self.models_for(route)
+        started = time.perf_counter()
+        if len(models) > 1:
+            model, answer = self._race(models, prompt, system, validate)
+        else:
+            model, answer = models[0], self._client(models[0]).query(prompt, system=system)
+        self._record(route, model, started)
+        return answer
+
+    def query_stream(self, route: str, prompt: str, system: Optional[str] = None,
+                     validate: Optional[Callable[[str], bool]] = None) -> Iterator[str]:
+        """Streams from the route's model; a speculative route yields the race winner in one piece."""
+        models = self.models_for(route)
+        if len(models) > 1:
+            yield self.query(route, prompt, system, validate)
+            return
+        started = time.perf_counter()
+        try:
+            yield from self._client(models[0]).query_stream(prompt, system=system)
+        finally:
+            # Also when the caller stops reading early, e.g. once an intent is complete
+            self._record(route, models[0], started)
+
+    def report(self) -> Dict[str, Dict]:
+        """Per route: its models, calls, p50_ms and p95_ms, and answers per model (race wins)."""
+        with self._lock:
+            samples = {route: list(values) for route, values in self._samples.items()}
+        report = {}
+        for route in sorted(set(self.routes) | set(samples)):
+            values = samples.get(route, [])
+            latencies = [ms for ms, _ in values] or [0.0]
+            answers: Dict[str, int] = {}
+            for _, model in values:
+                answers[model] = answers.get(model, 0) + 1
+            report[route] = {'models': self.models_for(route), 'calls': len(values),
+                             'p50_ms': float(np.percentile(latencies, 50)),
+                             'p95_ms': float(np.percentile(latencies, 95)), 'answers': answers}
+        return report
+
+    def close(self) -> None:
+        """Closes every model's client and the race pool."""
+        for client in self._clients.values():
+            close = getattr(client, 'close', None)
+            if close is not None:
+                close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
@@ -4,58 +4,222 @@ openrouter_client.py
 Client for interacting with OpenRouter LLM API via direct HTTP requests.
 """
 
+import json
+import random
+import time
+from typing import Dict, Iterator, List, Optional
 import requests
+from requests.adapters import HTTPAdapter
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+DEFAULT_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
 
 class OpenRouterClient:
     """Client for OpenRouter LLM API.
 
+    Requests go through one pooled requests.Session, so the TCP/TLS connection is reused between
+    calls. Rate limits (429), server errors (5xx), timeouts and connection errors are retried with
+    jittered exponential backoff; repeated failures open a circuit breaker so callers fail fast.
+    An optional ResponseCache answers repeated prompts without a request.
+
     Methods:
-        query(prompt: str) -> str: Sends prompt to LLM and returns response.
+        query(prompt: str, system: str = None) -> str: Sends prompt to LLM and returns response.
+        query_stream(prompt: str, system: str = None) -> Iterator[str]: Yields the response text as it is generated.
+        close() -> None: Closes pooled connections.
     """
-    def __init__(self, api_key: str, model: str):
+    def __init__(self, api_key: str, model: str, api_url: str = DEFAULT_API_URL,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0, pool_size: int = 4,
+                 breaker_threshold: int = 5, breaker_reset_s: float = 30.0, cache=None):
         """Initializes the client with API key and model.
 
         Args:
             api_key (str): OpenRouter API key.
             model (str): Model name to use.
+            api_url (str): Chat completions endpoint.
+            connect_timeout (float): Seconds to establish a connection.
+            read_timeout (float): Seconds to wait for the response.
+            max_retries (int): Retries after the first attempt for retryable failures.
+            backoff_base (float): First backoff ceiling in seconds; doubles on every retry.
+            backoff_max (float): Upper bound for a single backoff.
+            pool_size (int): Keep-alive connections kept per host.
+            breaker_threshold (int): Consecutive failed calls that open the circuit.
+            breaker_reset_s (float): Seconds before a trial call is let through an open circuit.
+            cache (ResponseCache, optional): Response cache consulted before every request.
         """
         self.api_key = api_key
         self.model = model
-        self.api_url = "https://openrouter.ai/api/v1/chat/completions"
+        self.api_url = api_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset_s)
+        self.cache = cache
+        self.stats = {'calls': 0, 'attempts': 0, 'retries': 0, 'failures': 0, 'short_circuited': 0}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        })
         if self.api_key:
             print(f"API Key loaded: {self.api_key[:10]}...")
         else:
             print("No API key found!")
 
-    def query(self, prompt: str) -> str:
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait before retry number `attempt` (0-based), honouring Retry-After."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps clients that failed together from retrying together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _post(self, data: Dict, **kwargs) -> requests.Response:
+        """POSTs a request body with retries, backoff and the circuit breaker.
+
+        Returns:
+            requests.Response: A successful (2xx) response.
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            requests.RequestException: If the call fails after all retries.
+        """
+        self.stats['calls'] += 1
+        if not self.breaker.allow():
+            self.stats['short_circuited'] += 1
+            raise CircuitOpenError("OpenRouter circuit is open after repeated failures")
+        # Every outcome is recorded, so a half-open trial can never leave the breaker stuck
+        healthy = False
+        try:
+            attempt = 0
+            while True:
+                self.stats['attempts'] += 1
+                response = None
+                try:
+                    response = self.session.post(self.api_url, json=data, timeout=self.timeout, **kwargs)
+                    retryable = response.status_code in RETRY_STATUSES
+                    if response.status_code != 200:
+                        print(f"API Error: {response.text}")
+                    if not retryable:
+                        # Client errors (bad key, bad request) say nothing about the service's health
+                        healthy = True
+                        response.raise_for_status()
+                        return response
+                    error = requests.HTTPError(f"{response.status_code} from OpenRouter", response=response)
+                    # A streamed body left unread would keep its pooled connection until collected
+                    response.close()
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                if attempt >= self.max_retries:
+                    self.stats['failures'] += 1
+                    raise error
+                delay = self._backoff(attempt, response)
+                attempt += 1
+                self.stats['retries'] += 1
+                time.sleep(delay)
+        finally:
+            if healthy:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def _messages(self, prompt: str, system: Optional[str]) -> List[Dict]:
+        """Chat messages for a request; a fixed system message goes first so providers can cache it."""
+        messages = [{"role": "system", "content": system}] if system else []
+        return messages + [{"role": "user", "content": prompt}]
+
+    def query(self, prompt: str, system: Optional[str] = None) -> str:
         """Sends a prompt to the LLM and returns the response.
 
         Args:
             prompt (str): The prompt to send.
+            system (str, optional): System message sent ahead of the prompt.
 
         Returns:
             str: LLM response.
         Raises:
             Exception: If API call fails or response is invalid.
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        cache_key = f"{system}\n\n{prompt}" if system else prompt
+        if self.cache is not None:
+            cached = self.cache.get(cache_key, self.model)
+            if cached is not None:
+                return cached
         data = {
             "model": self.model,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ]
+            "messages": self._messages(prompt, system)
         }
         try:
-            response = requests.post(self.api_url, json=data, headers=headers, timeout=30)
-            if response.status_code != 200:
-                print(f"API Error: {response.text}")
-            response.raise_for_status()
-            result = response.json()
+            result = self._post(data).json()
             # Extract the response text (assuming OpenAI-compatible format)
-            return result['choices'][0]['message']['content']
+            content = result['choices'][0]['message']['content']
         except Exception as e:
             print(f"Error querying OpenRouter LLM: {e}")
             raise
+        if self.cache is not None:
+            self.cache.put(cache_key, self.model, content)
+        return content
+
+    def query_stream(self, prompt: str, system: Optional[str] = None) -> Iterator[str]:
+        """Streams the response as server-sent events and yields each text delta as it arrives.
+
+        Retries and the circuit breaker apply until the stream starts; a stream that breaks
+        midway raises instead of being retried, since part of it has already been consumed.
+
+        Args:
+            prompt (str): The prompt to send.
+            system (str, optional): System message sent ahead of the prompt.
+
+        Yields:
+            str: Successive pieces of the response text.
+        Raises:
+            Exception: If the API call fails or the stream reports an error.
+        """
+        cache_key = f"{system}\n\n{prompt}" if system else prompt
+        if self.cache is not None:
+            cached = self.cache.get(cache_key, self.model)
+            if cached is not None:
+                yield cached
+                return
+        data = {
+            "model": self.model,
+            "messages": self._messages(prompt, system),
+            "stream": True,
+        }
+        try:
+            response = self._post(data, stream=True)
+        except Exception as e:
+            print(f"Error querying OpenRouter LLM: {e}")
+            raise
+        parts = []
+        with response:
+            for line in response.iter_lines():
+                # SSE: 'data: {...}' events, ': comment' keep-alives and blank separators
+                if not line or not line.startswith(b"data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == b"[DONE]":
+                    break
+                event = json.loads(payload)
+                if 'error' in event:
+                    raise RuntimeError(f"OpenRouter stream error: {event['error']}")
+                choices = event.get('choices') or [{}]
+                content = (choices[0].get('delta') or {}).get('content')
+                if content:
+                    parts.append(content)
+                    yield content
+        # Only a stream that ran to completion is cached; an abandoned one never reaches here
+        if self.cache is not None:
+            self.cache.put(cache_key, self.model, ''.join(parts))
+
+    def close(self) -> None:
+        """Closes the pooled HTTP connections."""
+        self.session.close()
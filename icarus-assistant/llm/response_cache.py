@@ -0,0 +1,231 @@
+"""
+response_cache.py
+
+LRU + TTL cache of LLM responses keyed on normalised prompt and model, persisted to SQLite.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+import numpy as np
+
+_WHITESPACE = re.compile(r'\s+')
+_EDGE_PUNCTUATION = re.compile(r'^[\s"\'“”‘’.,!?;:]+|[\s"\'“”‘’.,!?;:]+$')
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-folds, collapses whitespace and strips punctuation at the ends ("What time is it?" == "what time is it")."""
+    return _EDGE_PUNCTUATION.sub('', _WHITESPACE.sub(' ', prompt.casefold()))
+
+
+class HashedTrigramEmbedder:
+    """Dependency-free sentence vectors: hashed character trigrams, L2-normalised.
+
+    Paraphrases that share most of their wording ("what's the time" / "what is the time") score
+    high cosine similarity; unrelated prompts score near zero.
+    """
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f"  {text} "
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode()) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class ResponseCache:
+    """Caches LLM responses in memory (LRU, TTL, byte cap) with write-through to SQLite.
+
+    Lookups first try the exact key (model + normalised prompt). If that misses and the similarity
+    tier is enabled, short prompts are compared by embedding against cached prompts for the same
+    model, and a close enough paraphrase counts as a hit unless the two mention different numbers
+    ("set volume to 5" is not "set volume to 7"). Long prompts (e.g. ones embedding a
+    conversation history) only ever hit exactly, since a shared template would make any two of
+    them look alike.
+
+    Methods:
+        get(prompt, model) -> Optional[str]: Cached response, or None.
+        put(prompt, model, response) -> None: Stores a response.
+        clear() -> None: Drops every entry.
+        stats -> Dict: Hit/miss counters and current size.
+    """
+    def __init__(self, path: Optional[str] = 'data/llm_cache.sqlite', ttl_s: float = 3600.0,
+                 max_entries: int = 1000, max_bytes: int = 2_000_000,
+                 similarity_threshold: Optional[float] = None, similarity_max_chars: int = 200,
+                 embedder=None, clock=time.time):
+        """Initializes the cache and loads unexpired entries from disk.
+
+        Args:
+            path (str, optional): SQLite file for persistence; None keeps the cache in memory only.
+            ttl_s (float): Seconds an entry stays valid.
+            max_entries (int): Entry cap before least-recently-used eviction.
+            max_bytes (int): Cap on the total size of cached prompts and responses.
+            similarity_threshold (float, optional): Cosine similarity for a paraphrase hit; None disables the tier.
+            similarity_max_chars (int): Longest normalised prompt considered by the similarity tier.
+            embedder (optional): Object with embed(text) -> unit np.ndarray; defaults to HashedTrigramEmbedder.
+            clock (callable): Wall-clock time source (replaceable in tests).
+        """
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.similarity_threshold = similarity_threshold
+        self.similarity_max_chars = similarity_max_chars
+        self.embedder = embedder or (HashedTrigramEmbedder() if similarity_threshold is not None else None)
+        self.clock = clock
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                prompt TEXT,
+                response TEXT,
+                created REAL
+            )''')
+            self._conn.commit()
+            self._load()
+
+    @staticmethod
+    def _key(normalized: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\0{normalized}".encode()).hexdigest()
+
+    def _load(self) -> None:
+        cutoff = self.clock() - self.ttl_s
+        self._conn.execute('DELETE FROM llm_cache WHERE created < ?', (cutoff,))
+        self._conn.commit()
+        rows = self._conn.execute('SELECT key, model, prompt, response, created FROM llm_cache '
+                                  'ORDER BY created DESC LIMIT ?', (self.max_entries,)).fetchall()
+        for key, model, prompt, response, created in reversed(rows):
+            self._insert(key, model, prompt, response, created)
+        self._enforce_limits()
+
+    def _insert(self, key: str, model: str, prompt: str, response: str, created: float) -> None:
+        entry = {'model': model, 'prompt': prompt, 'response': response, 'created': created,
+                 'size': len(prompt.encode()) + len(response.encode()), 'vector': None,
+                 'numbers': _NUMBER.findall(prompt)}
+        if self.embedder is not None and len(prompt) <= self.similarity_max_chars:
+            entry['vector'] = self.embedder.embed(prompt)
+        old = self._entries.pop(key, None)
+        if old:
+            self.bytes -= old['size']
+        self._entries[key] = entry
+        self.bytes += entry['size']
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry['size']
+        if self._conn is not None:
+            self._conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+
+    def _enforce_limits(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))  # least recently used
+            self.evictions += 1
+        if self._conn is not None:
+            self._conn.commit()
+
+    def _expired(self, entry: Dict) -> bool:
+        return self.clock() - entry['created'] > self.ttl_s
+
+    def get(self, prompt: str, model: str) -> Optional[str]:
+        """Returns the cached response for this prompt and model, or None.
+
+        Args:
+            prompt (str): The prompt as sent to the LLM.
+            model (str): Model name.
+
+        Returns:
+            Optional[str]: The cached response if fresh, else None.
+        """
+        normalized = normalize_prompt(prompt)
+        key = self._key(normalized, model)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                self._remove(key)
+                self._conn is not None and self._conn.commit()
+                entry = None
+            if entry is None:
+                key = self._similar_key(normalized, model)
+                entry = self._entries.get(key) if key else None
+                if entry is not None:
+                    self.similar_hits += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['response']
+
+    def _similar_key(self, normalized: str, model: str) -> Optional[str]:
+        if self.embedder is None or len(normalized) > self.similarity_max_chars:
+            return None
+        numbers = _NUMBER.findall(normalized)
+        keys = [k for k, e in self._entries.items() if e['vector'] is not None and e['model'] == model
+                and e['numbers'] == numbers and not self._expired(e)]
+        if not keys:
+            return None
+        scores = np.stack([self._entries[k]['vector'] for k in keys]) @ self.embedder.embed(normalized)
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= self.similarity_threshold else None
+
+    def put(self, prompt: str, model: str, response: str) -> None:
+        """Stores a response, evicting least-recently-used entries beyond the caps.
+
+        Args:
+            prompt (str): The prompt as sent to the LLM.
+            model (str): Model name.
+            response (str): The LLM's response.
+        """
+        if not response:
+            return
+        normalized = normalize_prompt(prompt)
+        key = self._key(normalized, model)
+        created = self.clock()
+        with self._lock:
+            self._insert(key, model, normalized, response, created)
+            if self._conn is not None:
+                self._conn.execute('INSERT OR REPLACE INTO llm_cache (key, model, prompt, response, created) '
+                                   'VALUES (?, ?, ?, ?, ?)', (key, model, normalized, response, created))
+            self._enforce_limits()
+
+    def clear(self) -> None:
+        """Drops every cached entry, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM llm_cache')
+                self._conn.commit()
+
+    @property
+    def stats(self) -> Dict:
+        """Counters: hits (including similar_hits), misses, hit_rate, evictions, entries, bytes."""
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'similar_hits': self.similar_hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0, 'evictions': self.evictions,
+                'entries': len(self._entries), 'bytes': self.bytes}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -10,20 +10,31 @@ import json
 import uuid
 import signal
 import sys
+import difflib
 from stt.whisper_wrapper import WhisperSTT
+from stt.model_pool import preload_model_pool
 from llm.openrouter_client import OpenRouterClient
+from llm.async_openrouter_client import AsyncOpenRouterClient
+from llm.model_router import ModelRouter, json_validator
+from llm.response_cache import ResponseCache
 from tts.openvoice_wrapper import OpenVoiceTTS
 from utils.audio_handler import AudioHandler
+from utils.mic_stream import MicrophoneStream
 from actions.read_file import read_file
 from dotenv import load_dotenv
 from orchestrator.intent_router import route_intent, ContextAwareIntentRouter
+from orchestrator.fast_intent import TieredIntentRouter
 from actions.search_files import search_files, present_file_matches, list_files_in_directory, get_system_info
 from actions.launch_app import launch_app, update_app_map, get_app_names, get_app_map
 from utils.confirm import confirm_action
 from utils.path_guard import is_safe_path
 from datetime import datetime
 from orchestrator.wakeword_listener import WakewordListener
+from orchestrator.keyword_spotter import KeywordSpotter
 from orchestrator.memory_manager import MemoryManager
+from orchestrator.context_builder import ContextBuilder, LLMSummarizer
+from orchestrator.vector_memory import VectorMemory, load_embedder
+from orchestrator.tool_executor import ToolExecutor, ToolNotAllowedError
 from orchestrator.conversation_graph import ConversationGraph
 from llm.langchain_integration import LangChainLLM
 from actions.system_tools import get_current_time, get_current_date, get_battery_percentage, get_cpu_usage, get_ram_usage, get_clipboard, set_clipboard, open_url, get_weather, get_random_joke
@@ -32,20 +43,20 @@ from actions.move_files import move_file
 from actions.summarize_pdf import summarize_pdf
 from orchestrator.llm_brain import LLMBrain
 from orchestrator.plan_executor import PlanExecutor
+from orchestrator.plan_store import PlanStore
+from orchestrator.speculative_chat import SpeculativeChat
 from actions.perplexity_search import PerplexitySearch
 from orchestrator.session_manager import SessionManager
 from utils.jarvis_responses import JarvisResponses
+from utils.json_extractor import INTENT_SCHEMA, PLAN_SCHEMA
 
 # TODO: Implement logging to data/logs/interaction_log.json
 
 def check_tts_health(tts_instance):
-    """Check if TTS is working and reinitialize if needed."""
+    """Check if TTS is working and restart its engine in place if needed."""
     if not tts_instance.available:
         try:
-            tts_instance.stop()
-            new_tts = OpenVoiceTTS()
-            if new_tts.available:
-                return new_tts
+            tts_instance.restart()
         except Exception as e:
             print(f"[TTS] Failed to reinitialize TTS: {e}")
     return tts_instance
@@ -64,24 +75,22 @@ def load_config():
     """Loads OpenRouter config from .env.local or config/openrouter.yaml.
 
     Returns:
-        dict: Config dictionary with API key and model.
+        dict: Config dictionary with API key, model and any optional sections (e.g. 'audio').
     """
     # Load .env.local if present
     load_dotenv(dotenv_path='.env.local')
     api_key = os.getenv('OPENROUTER_API_KEY')
-    model = None
+    config_path = os.path.join('config', 'openrouter.yaml')
     if api_key:
-        # Optionally load model from YAML if present
-        config_path = os.path.join('config', 'openrouter.yaml')
+        # Optionally load model and other settings from YAML if present
+        config = {}
         if os.path.exists(config_path):
             with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                model = config.get('model', 'default-model')
-        else:
-            model = 'default-model'
-        return {'api_key': api_key, 'model': model}
+                config = yaml.safe_load(f) or {}
+        config['api_key'] = api_key
+        config.setdefault('model', 'default-model')
+        return config
     # Fallback to YAML config
-    config_path = os.path.join('config', 'openrouter.yaml')
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
@@ -143,6 +152,9 @@ VOICE SETTINGS:
 - "Set speed to <number>" - Adjust speech rate
 - "Mute TTS" / "Unmute TTS" - Toggle speech
 
+MEMORY:
+- "Recall <words>" - Search past conversations
+
 MODE SWITCHING:
 - "Manual" - Switch to text input
 - "Voice" - Switch to voice input
@@ -172,6 +184,92 @@ def show_log():
         print(f"[Log] Error reading log: {e}")
 
 
+def show_cache_stats(cache) -> None:
+    """Prints how many LLM calls the response cache has answered."""
+    if cache is None:
+        print("[Cache] Response cache is disabled.")
+        return
+    stats = cache.stats
+    print(f"[Cache] {stats['hits']} hits ({stats['similar_hits']} by similarity), {stats['misses']} misses, "
+          f"hit rate {stats['hit_rate']:.0%}; {stats['entries']} entries, {stats['bytes'] / 1024:.1f} KB, "
+          f"{stats['evictions']} evicted")
+
+
+def show_router_stats(router) -> None:
+    """Prints how many utterances each routing tier answered and how fast."""
+    for tier, stats in router.stats.items():
+        print(f"[Router] {tier:<8} {stats['hits']:>5} hits ({stats['share']:.0%})  "
+              f"p50 {stats['p50_ms']:.2f} ms  p95 {stats['p95_ms']:.2f} ms")
+
+
+def show_tool_stats(executor) -> None:
+    """Prints calls, cache hits and p50/p95 latency per tool from the tool_executions log."""
+    report = executor.report()
+    if not report:
+        print("[Tools] No tool executions logged yet.")
+    for tool, stats in report.items():
+        print(f"[Tools] {tool:<22} {stats['calls']:>5} calls ({stats['cached']} cached, {stats['errors']} failed)  "
+              f"p50 {stats['p50_ms']:.1f} ms  p95 {stats['p95_ms']:.1f} ms")
+
+
+def show_model_stats(router) -> None:
+    """Prints the model(s) behind each route with its call count and p50/p95 latency."""
+    for route, stats in router.report().items():
+        answers = ', '.join(f"{model} {n}" for model, n in stats['answers'].items()) or 'no calls yet'
+        print(f"[Models] {route:<15} {' vs '.join(stats['models'])}  {stats['calls']:>4} calls  "
+              f"p50 {stats['p50_ms']:.0f} ms  p95 {stats['p95_ms']:.0f} ms  ({answers})")
+
+
+def show_speculation_stats(speculative_chat) -> None:
+    """Prints how often the speculative chat reply was used and the latency it saved."""
+    if speculative_chat is None:
+        print("[Speculation] Disabled (speculative_chat: false in config).")
+        return
+    stats = speculative_chat.stats
+    print(f"[Speculation] {stats['wins']}/{stats['turns']} replies used ({stats['win_rate']:.0%})  "
+          f"saved p50 {stats['saved_p50_ms']:.0f} ms, {stats['saved_total_ms'] / 1000:.1f} s total  "
+          f"{stats['wasted_chars']} chars discarded")
+
+
+def show_recall(memory, query: str) -> int:
+    """Prints the past messages that best match the query, from every session.
+
+    Returns:
+        int: Number of messages found.
+    """
+    results = memory.search(query, limit=5)
+    if not results:
+        print(f"[Recall] Nothing found for '{query}'.")
+    for r in results:
+        print(f"[Recall] {r['timestamp'][:16].replace('T', ' ')}  {r['role']}: {r['snippet']}")
+    return len(results)
+
+
+def stream_llm_reply(prompt: str, llm, tts_instance, speak: bool = True, stream=None) -> str:
+    """Streams an LLM chat reply, printing it as it arrives and speaking each finished sentence.
+
+    The first sentence is spoken while the rest is still being generated, so time-to-first-audio
+    follows the first sentence rather than the whole response. `stream` is a reply already under
+    way (e.g. a speculative one); otherwise the prompt is sent to `llm`.
+
+    Returns:
+        str: The full styled reply.
+    """
+    def echo(chunks):
+        print("Icarus: ", end='', flush=True)
+        for chunk in chunks:
+            print(chunk, end='', flush=True)
+            yield chunk
+        print()
+
+    chunks = echo(JarvisResponses.style_stream(stream if stream is not None else llm.query_stream(prompt)))
+    if not speak:
+        return ''.join(chunks)
+    result = tts_instance.speak_stream(chunks)
+    tts_instance.wait_until_done()
+    return result['text']
+
+
 def llm_disambiguate_apps(user_query: str, app_map: dict, llm) -> list:
     """Use LLM to parse user query and return a list of app names to launch from the app map. Prefer a single best match."""
     prompt = (
@@ -188,30 +286,98 @@ def llm_disambiguate_apps(user_query: str, app_map: dict, llm) -> list:
     return [name.strip() for name in response.split(',') if name.strip() in app_map]
 
 
+def resolve_app_query(parameters: dict, llm) -> dict:
+    """Maps a launch_app query that matches no app by name onto the app map with the LLM.
+
+    Args:
+        parameters (dict): launch_app parameters ('app_query').
+        llm: Client for the 'disambiguation' route.
+
+    Returns:
+        dict: The parameters, with app_query replaced by the best app name if one was found.
+    """
+    app_map = get_app_map()
+    query = str(parameters.get('app_query', '')).lower().strip()
+    # launch_app finds these itself (substring or close match), without an LLM call
+    if (not query or not app_map or any(name in query for name in app_map)
+            or difflib.get_close_matches(query, list(app_map), n=1, cutoff=0.6)):
+        return parameters
+    try:
+        names = llm_disambiguate_apps(query, app_map, llm)
+    except Exception as e:
+        print(f"[Apps] Disambiguation failed: {e}")
+        return parameters
+    return dict(parameters, app_query=names[0]) if names else parameters
+
+
 def main():
     """Main loop for Icarus Assistant Phase 3: persistent, context-aware, hands-free."""
     # Global TTS instance for cleanup
     global tts
     
-    # Load config and initialize components
+    # Load config and start loading the Whisper model in the background
     config = load_config()
+    stt_pool = preload_model_pool(**config.get('stt', {}))
     memory_manager = MemoryManager()
-    openrouter_client = OpenRouterClient(api_key=config['api_key'], model=config['model'])
+    cache_config = dict(config.get('cache', {}))
+    response_cache = ResponseCache(**cache_config) if cache_config.pop('enabled', True) else None
+    # Each task goes to the model that suits it best among those configured (just `model` by default)
+    model_router = ModelRouter(config['api_key'], config.get('models') or [config['model']], config.get('routes'),
+                               cache=response_cache, **config.get('http', {}))
+    openrouter_client = model_router.client('chat')
+    intent_client = model_router.client('intent', json_validator(INTENT_SCHEMA))
+    planning_client = model_router.client('planning', json_validator(PLAN_SCHEMA))
     session_manager = SessionManager(memory_manager)
-    intent_router = ContextAwareIntentRouter(memory_manager, openrouter_client)
-    wakeword = WakewordListener()
+    disambiguation_client = model_router.client('disambiguation')
+    # Fans out the independent LLM steps of a plan, on the planning route's model
+    async_client = AsyncOpenRouterClient(api_key=config['api_key'], model=model_router.models_for('planning')[0],
+                                         **config.get('http', {}))
+    # History is fitted to a token budget; older turns are folded into a summary by a cheap model
+    context_config = dict(config.get('context', {}))
+    summary_model = context_config.pop('summary_model', None)
+    summary_client = (OpenRouterClient(api_key=config['api_key'], model=summary_model, **config.get('http', {}))
+                      if summary_model else model_router.client('summary'))
+    # The summary model is called after each reply, never while a request waits on it
+    context_config.setdefault('background_fold', True)
+    context_builder = ContextBuilder(memory_manager, LLMSummarizer(summary_client), **context_config)
+    # Earlier messages relevant to the query are recalled by embedding search, across sessions
+    vector_config = config.get('vector_memory', {})
+    vector_memory = (VectorMemory(memory_manager, load_embedder(vector_config.get('model', 'all-MiniLM-L6-v2')))
+                     if vector_config.get('enabled', True) else None)
+    if vector_memory is not None:
+        # Messages stored before this run are embedded in the background, not on the first request
+        vector_memory.sync_async()
+    # Tool outputs are embedded too, so later questions can recall them. Only read-only tools run
+    # unattended; anything that edits, moves, launches or opens must be confirmed first
+    tool_executor = ToolExecutor(memory_manager, vector_memory=vector_memory, confirm=confirm_action)
+    # Opt-in: the chat reply starts, from the intent prompt's context, while the intent is parsed; dropped for commands
+    speculative_chat = SpeculativeChat(openrouter_client) if config.get('speculative_chat', False) else None
+    # Common read-only commands are answered locally; the LLM brain handles the rest
+    intent_router = TieredIntentRouter(ContextAwareIntentRouter(memory_manager, intent_client, async_client,
+                                                                context_builder, vector_memory, tool_executor,
+                                                                PlanStore(memory_manager), planning_client,
+                                                                speculative_chat),
+                                       threshold=config.get('router', {}).get('threshold', 0.75))
+    # One capture stream for the whole session, shared by the wake-word detector and the recorder
+    mic_stream = MicrophoneStream()
+    wakeword_config = config.get('wakeword', {})
+    wakeword = WakewordListener(engine=wakeword_config.get('engine', 'auto'),
+                                spotter=KeywordSpotter(threshold=wakeword_config.get('threshold', 0.2)),
+                                mic_stream=mic_stream)
     perplexity = PerplexitySearch()
     
-    # Initialize STT and TTS
-    stt = WhisperSTT()
+    # Initialize TTS while the Whisper model loads in parallel
     tts = OpenVoiceTTS()
-    audio_handler = AudioHandler()
+    audio_handler = AudioHandler(debug_sink=config.get('audio', {}).get('debug_sink', False),
+                                 mic_stream=mic_stream)
     
     # Set up signal handlers for clean shutdown
     def signal_handler(sig, frame):
         print(f"\nIcarus: {JarvisResponses.get_farewell()}")
         if tts:
             tts.stop()
+        mic_stream.stop()
+        memory_manager.close()
         sys.exit(0)
     
     signal.signal(signal.SIGINT, signal_handler)
@@ -233,10 +399,10 @@ def main():
         print(f"[TTS] Error in initial greeting: {tts_error}")
         # Try to reinitialize TTS
         try:
-            tts.stop()
-            tts = OpenVoiceTTS()
+            tts.restart()
         except Exception as reinit_error:
             print(f"[TTS] Failed to reinitialize: {reinit_error}")
+    stt = WhisperSTT(pool=stt_pool.result())
     session_id = None
     manual_mode = False
     tts_check_counter = 0
@@ -255,10 +421,11 @@ def main():
                     continue
                 print("Icarus: I'm listening, sir...")
                 
-                # Record audio and transcribe
-                audio_file = audio_handler.record_audio(duration=5)  # Record for 5 seconds
-                if audio_file:
-                    user_input = stt.transcribe(audio_file)
+                # Stream audio until the speaker stops, starting right where the wake-word ended
+                samples = audio_handler.record_until_silence(
+                    max_duration=10, start_sample=wakeword.last_detection.get('end_sample'))
+                if len(samples):
+                    user_input = stt.transcribe(samples)
                     print(f"You: {user_input}")
                 else:
                     error_msg = JarvisResponses.get_error_response()
@@ -285,6 +452,27 @@ def main():
             elif user_input.lower() == 'help':
                 show_help()
                 continue
+            elif user_input.lower() == 'cache stats':
+                show_cache_stats(response_cache)
+                continue
+            elif user_input.lower() == 'router stats':
+                show_router_stats(intent_router)
+                continue
+            elif user_input.lower() == 'tool stats':
+                show_tool_stats(tool_executor)
+                continue
+            elif user_input.lower() == 'model stats':
+                show_model_stats(model_router)
+                continue
+            elif user_input.lower() == 'speculation stats':
+                show_speculation_stats(speculative_chat)
+                continue
+            elif user_input.lower().startswith('recall '):
+                found = show_recall(memory_manager, user_input[len('recall '):].strip(' .?!'))
+                if not manual_mode:
+                    tts.speak_sync(JarvisResponses.style_response(
+                        f"I found {found} past messages about that" if found else "I couldn't find that in our past conversations"))
+                continue
             
             if not session_id:
                 session_id = str(uuid.uuid4())
@@ -297,6 +485,7 @@ def main():
                 routed = intent_router.route_intent(user_input, session_id)
                 
                 for action, params in routed:
+                    streamed = False
                     if action == 'greeting':
                         response = JarvisResponses.get_greeting()
                     elif action == 'farewell':
@@ -307,65 +496,82 @@ def main():
                         response = JarvisResponses.style_response(params.get('result', 'No result'))
                     elif action == 'direct_response':
                         response = JarvisResponses.style_response(params.get('target', 'No response'))
+                    elif (action in ('tool_call', 'function_call') and 'result' not in params
+                          and tool_executor.has_tool(params.get('target', ''))):
+                        parameters = params.get('parameters') or {}
+                        if params['target'] == 'launch_app':
+                            # "open the music app": pick the app on the small disambiguation model
+                            parameters = resolve_app_query(parameters, disambiguation_client)
+                        try:
+                            result = tool_executor.execute(params['target'], parameters, session_id)
+                        except ToolNotAllowedError as refused:
+                            print(f"[Tools] {refused}")
+                            response = JarvisResponses.style_response("I've left that alone; it was not confirmed or touches a folder I may not change.")
+                        else:
+                            response = JarvisResponses.style_response(
+                                present_file_matches(result) if isinstance(result, list) else str(result))
                     elif action == 'tool_call':
                         response = JarvisResponses.style_response(f"I've executed {params.get('target', 'Unknown tool')}", "confirmation")
+                    elif action == 'function_call' and 'result' in params:
+                        response = JarvisResponses.style_response(params['result'])
                     elif action == 'function_call':
                         response = JarvisResponses.style_response(f"I've executed {params.get('target', 'Unknown function')}", "confirmation")
                     elif action == 'llm_chat':
-                        # Handle direct LLM chat
-                        llm_response = openrouter_client.query(user_input)
-                        response = JarvisResponses.style_response(llm_response)
+                        # Handle direct LLM chat, speaking sentence by sentence as tokens stream in
+                        response = stream_llm_reply(user_input, openrouter_client, tts, speak=not manual_mode,
+                                                    stream=params.get('stream'))
+                        streamed = True
                     else:
                         response = JarvisResponses.style_response("I've processed your request", "confirmation")
                     
-                    print(f"Icarus: {response}")
+                    if not streamed:
+                        print(f"Icarus: {response}")
                     memory_manager.store_message(session_id, 'assistant', response)
                     
                     # Speak response if not in manual mode
-                    if not manual_mode:
+                    if not manual_mode and not streamed:
                         try:
                             tts.speak_sync(response)
                         except Exception as tts_error:
                             print(f"[TTS] Error speaking response: {tts_error}")
                             # Try to reinitialize TTS
                             try:
-                                tts.stop()
-                                tts = OpenVoiceTTS()
+                                tts.restart()
                             except Exception as reinit_error:
                                 print(f"[TTS] Failed to reinitialize: {reinit_error}")
                         
             except Exception as e:
-                # Fallback to direct LLM response
-                try:
-                    llm_response = openrouter_client.query(user_input)
-                    response = JarvisResponses.style_response(llm_response)
-                    print(f"Icarus: {response}")
-                    memory_manager.store_message(session_id, 'assistant', response)
-                    if not manual_mode:
-                        try:
-                            tts.speak_sync(response)
-                        except Exception as tts_error:
-                            print(f"[TTS] Error speaking response: {tts_error}")
-                except Exception as llm_error:
-                    response = JarvisResponses.get_error_response()
-                    print(f"Icarus: {response}")
-                    memory_manager.store_message(session_id, 'assistant', response)
-                    if not manual_mode:
-                        try:
-                            tts.speak_sync(response)
-                        except Exception as tts_error:
-                            print(f"[TTS] Error speaking response: {tts_error}")
+                # Unparseable replies already come back as direct responses, so this is a real
+                # failure (network, tool crash); asking the LLM again would just repeat the wait
+                print(f"[Router] Error handling request: {e}")
+                response = JarvisResponses.get_error_response()
+                print(f"Icarus: {response}")
+                memory_manager.store_message(session_id, 'assistant', response)
+                if not manual_mode:
+                    try:
+                        tts.speak_sync(response)
+                    except Exception as tts_error:
+                        print(f"[TTS] Error speaking response: {tts_error}")
+
+            # Fold turns that outgrew the history budget and index this turn while the user reads or listens
+            context_builder.refresh_async(session_id, intent_client.model)
+            if vector_memory is not None:
+                vector_memory.sync_async()
                     
         except KeyboardInterrupt:
             print(f"\nIcarus: {JarvisResponses.get_farewell()}")
-            # Clean up TTS
+            # Clean up TTS and the microphone
             tts.stop()
+            mic_stream.stop()
             break
         except Exception as e:
             error_msg = JarvisResponses.get_error_response()
             print(f"Icarus: {error_msg}")
             continue
 
+    # Commit any queued messages before exiting
+    memory_manager.close()
+
 
 if __name__ == "__main__":
     main()
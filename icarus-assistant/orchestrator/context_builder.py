@@ -0,0 +1,216 @@
+"""
+context_builder.py
+
+Builds the conversation context for an LLM prompt within a per-model token budget, folding older turns into a rolling summary.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from utils.token_counter import count_tokens
+
+SUMMARY_SYSTEM_PROMPT = ("You maintain a running summary of a conversation between a user and the assistant Icarus. "
+                         "Merge the new messages into the summary. Keep names, files, decisions and open requests; "
+                         "drop pleasantries. Reply with the updated summary only, in at most {words} words.")
+
+
+class LLMSummarizer:
+    """Folds messages into a summary with a (cheap) chat model.
+
+    Methods:
+        __call__(summary, messages) -> str: Returns the updated summary.
+    """
+    def __init__(self, client, max_words: int = 150):
+        """Initializes the summarizer.
+
+        Args:
+            client: LLM client with query(prompt, system=None), ideally configured with a small model.
+            max_words (int): Length cap requested from the model.
+        """
+        self.client = client
+        self.max_words = max_words
+
+    def __call__(self, summary: str, messages: List[Dict]) -> str:
+        transcript = '\n'.join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = f"Current summary:\n{summary or '(empty)'}\n\nNew messages:\n{transcript}"
+        return self.client.query(prompt, system=SUMMARY_SYSTEM_PROMPT.format(words=self.max_words)).strip()
+
+
+def extractive_summary(summary: str, messages: List[Dict], line_chars: int = 120) -> str:
+    """Offline summarizer: appends the first sentence of each message to the summary."""
+    lines = [summary] if summary else []
+    for m in messages:
+        first = m['content'].strip().split('\n', 1)[0]
+        first = first.split('. ', 1)[0]
+        lines.append(f"{m['role']}: {first[:line_chars]}")
+    return '\n'.join(lines)
+
+
+class ContextBuilder:
+    """Keeps recent turns verbatim and older turns as a rolling summary, within a token budget.
+
+    The summary is stored in sessions.context_summary together with the id of the last message it
+    covers, so each fold only sends the messages evicted since the previous one to the summarizer.
+    When the verbatim turns outgrow the budget or max_messages, enough of the oldest are folded to
+    bring them down to `low_water` of both, leaving headroom so the summarizer is not called on
+    every turn. If the summarizer fails, the fold falls back to extractive_summary.
+
+    With background_fold, build() never calls the summarizer: turns due for folding are condensed
+    with extractive_summary for that prompt only, and refresh_async() (called once the reply is out)
+    folds them with the summarizer on a worker thread and stores the result for later builds.
+
+    Methods:
+        budget_for(model) -> int: Token budget for a model.
+        build(session_id, model) -> Dict: Summary, recent messages and their token count.
+        refresh(session_id, model) -> bool: Folds and stores the turns that outgrew the budget.
+        refresh_async(session_id, model) -> Future: refresh() on the background worker.
+        stats -> Dict: Summarizer calls, failures and messages folded.
+    """
+    def __init__(self, memory_manager, summarizer: Optional[Callable[[str, List[Dict]], str]] = None,
+                 budgets: Optional[Dict[str, int]] = None, default_budget: int = 1500, max_messages: int = 12,
+                 message_max_tokens: int = 300, summary_max_tokens: int = 200, low_water: float = 0.6,
+                 encoding: str = 'cl100k_base', background_fold: bool = False):
+        """Initializes the builder.
+
+        Args:
+            memory_manager: MemoryManager (get_messages_since, get_summary, set_summary).
+            summarizer (callable, optional): (summary, messages) -> summary; defaults to extractive_summary.
+            budgets (Dict[str, int], optional): History token budget per model name.
+            default_budget (int): Budget for models not in budgets.
+            max_messages (int): Most recent messages kept verbatim, whatever their size.
+            message_max_tokens (int): Longer messages (pasted files, plan output) are truncated to this.
+            summary_max_tokens (int): Cap on the summary; its oldest lines are dropped beyond it.
+            low_water (float): Fraction of the budget verbatim turns are trimmed to when folding; the
+                summary gets at most the rest.
+            encoding (str): tiktoken encoding used for counting.
+            background_fold (bool): Keep the summarizer off build(); fold in refresh_async() instead.
+        """
+        self.memory = memory_manager
+        self.summarizer = summarizer or extractive_summary
+        self.budgets = budgets or {}
+        self.default_budget = default_budget
+        self.max_messages = max_messages
+        self.message_max_tokens = message_max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.low_water = low_water
+        self.encoding = encoding
+        self.background_fold = background_fold
+        self.stats = {'builds': 0, 'summaries': 0, 'summary_failures': 0, 'folded_messages': 0}
+        self._token_cache: "OrderedDict[int, int]" = OrderedDict()
+        self._fold_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def budget_for(self, model: Optional[str]) -> int:
+        return self.budgets.get(model, self.default_budget)
+
+    def _clip(self, message: Dict) -> Dict:
+        """Truncates an oversized message to message_max_tokens (about 4 characters per token)."""
+        limit = self.message_max_tokens * 4
+        content = message['content'] or ''
+        if len(content) > limit:
+            content = content[:limit] + f" ... [{len(content) - limit} more characters omitted]"
+        return {'id': message['id'], 'role': message['role'], 'content': content}
+
+    def _tokens(self, message: Dict) -> int:
+        # Messages never change once stored, so their counts are cached by id
+        tokens = self._token_cache.get(message['id'])
+        if tokens is None:
+            tokens = count_tokens(message['content'], self.encoding) + 4
+            self._token_cache[message['id']] = tokens
+            if len(self._token_cache) > 4096:
+                self._token_cache.popitem(last=False)
+        return tokens
+
+    def _load(self, session_id: str):
+        summary, upto = self.memory.get_summary(session_id)
+        messages = [self._clip(m) for m in self.memory.get_messages_since(session_id, upto)]
+        return summary, messages, [self._tokens(m) for m in messages]
+
+    def _split(self, summary: str, sizes: List[int], budget: int):
+        """How many of the oldest messages to fold, and the summary's token cap; (0, 0) if none."""
+        summary_tokens = count_tokens(summary, self.encoding) if summary else 0
+        if summary_tokens + sum(sizes) <= budget and len(sizes) <= self.max_messages:
+            return 0, 0
+        # Keep the newest turns that fit under the low-water marks; fold the rest into the summary
+        target = int(self.low_water * budget)
+        summary_cap = min(self.summary_max_tokens, budget - target)
+        floor = len(sizes) - max(1, int(self.low_water * self.max_messages))
+        kept, total = len(sizes), 0
+        while kept > floor and total + sizes[kept - 1] <= target:
+            kept -= 1
+            total += sizes[kept]
+        kept = min(kept, len(sizes) - 1) if sizes else 0  # always keep the latest turn
+        return max(kept, 0), summary_cap
+
+    def build(self, session_id: str, model: Optional[str] = None) -> Dict:
+        """Returns the context for the next prompt of a session.
+
+        Args:
+            session_id (str): Conversation session ID.
+            model (str, optional): Model the prompt is for; selects the budget.
+
+        Returns:
+            Dict: 'summary' (str), 'messages' (recent messages, oldest first, with role and
+            content), 'tokens' (summary plus messages) and 'budget'.
+        """
+        self.stats['builds'] += 1
+        budget = self.budget_for(model)
+        summary, messages, sizes = self._load(session_id)
+        fold, summary_cap = self._split(summary, sizes, budget)
+        if fold:
+            if self.background_fold:
+                # The stored summary is brought up to date by refresh_async(), after the reply
+                summary = self._cap(extractive_summary(summary, messages[:fold]), summary_cap)
+            else:
+                summary = self._fold(summary, messages[:fold], summary_cap)
+                self.memory.set_summary(session_id, summary, messages[fold - 1]['id'])
+            messages, sizes = messages[fold:], sizes[fold:]
+        summary_tokens = count_tokens(summary, self.encoding) if summary else 0
+
+        return {
+            'summary': summary,
+            'messages': [{'role': m['role'], 'content': m['content']} for m in messages],
+            'tokens': summary_tokens + sum(sizes),
+            'budget': budget,
+        }
+
+    def refresh(self, session_id: str, model: Optional[str] = None) -> bool:
+        """Folds the turns that no longer fit the budget into the stored summary.
+
+        Returns:
+            bool: Whether anything was folded.
+        """
+        with self._fold_lock:
+            summary, messages, sizes = self._load(session_id)
+            fold, summary_cap = self._split(summary, sizes, self.budget_for(model))
+            if not fold:
+                return False
+            summary = self._fold(summary, messages[:fold], summary_cap)
+            self.memory.set_summary(session_id, summary, messages[fold - 1]['id'])
+            return True
+
+    def refresh_async(self, session_id: str, model: Optional[str] = None) -> Future:
+        """Runs refresh() on a single background worker, so folds never overlap."""
+        with self._fold_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='context-fold')
+        return self._executor.submit(self.refresh, session_id, model)
+
+    def _fold(self, summary: str, messages: List[Dict], cap: int) -> str:
+        self.stats['summaries'] += 1
+        self.stats['folded_messages'] += len(messages)
+        try:
+            folded = self.summarizer(summary, messages)
+        except Exception as e:
+            # A timeout or open circuit must not cost the turn; the local summary loses little
+            print(f"[ContextBuilder] Summarizer failed, using extractive summary: {e}")
+            self.stats['summary_failures'] += 1
+            folded = extractive_summary(summary, messages)
+        return self._cap(folded, cap)
+
+    def _cap(self, summary: str, cap: int) -> str:
+        # A summary over its own cap loses its oldest lines first
+        while '\n' in summary and count_tokens(summary, self.encoding) > cap:
+            summary = summary.split('\n', 1)[1]
+        return summary
@@ -0,0 +1,262 @@
+"""
+fast_intent.py
+
+Local intent tiers (keyword trie, character n-gram TF-IDF) that answer common commands without the LLM.
+"""
+
+import math
+import re
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from actions import system_tools
+from orchestrator.intent_keywords import FILLER_WORDS, INTENT_EXAMPLES, INTENT_KEYWORDS, INTENT_PREFIXES
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+# Verbs the fast path may answer on its own: they only read state, so a wrong guess costs nothing
+LOCAL_FUNCTIONS = {
+    'system_time': 'get_current_time',
+    'system_date': 'get_current_date',
+    'system_battery': 'get_battery_percentage',
+    'system_cpu': 'get_cpu_usage',
+    'system_ram': 'get_ram_usage',
+    'system_weather': 'get_weather',
+    'system_joke': 'get_random_joke',
+}
+LOCAL_ACTIONS = ('greeting', 'farewell')
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class KeywordTrie:
+    """Word-level trie over the keyword phrases; finds the longest phrase at each position.
+
+    Methods:
+        add(phrase, verb) -> None: Adds a phrase.
+        find(tokens) -> List[Tuple[str, int, int]]: Non-overlapping (verb, start, end) matches.
+    """
+    def __init__(self):
+        self.root: Dict = {}
+
+    def add(self, phrase: str, verb: str) -> None:
+        node = self.root
+        for token in tokenize(phrase):
+            node = node.setdefault(token, {})
+        node.setdefault(None, verb)  # the first verb listed for a phrase keeps it
+
+    def find(self, tokens: Sequence[str]) -> List[Tuple[str, int, int]]:
+        matches = []
+        i = 0
+        while i < len(tokens):
+            node, best = self.root, None
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if None in node:
+                    best = (node[None], i, j + 1)
+            if best:
+                matches.append(best)
+                i = best[2]
+            else:
+                i += 1
+        return matches
+
+
+class NgramIntentModel:
+    """Nearest-centroid classifier over TF-IDF weighted character n-grams.
+
+    Each verb's centroid is the mean of its training phrases' unit vectors, so scores are cosine
+    similarities in [0, 1]. Character n-grams tolerate typos and transcription slips ("wats the
+    tim") that an exact keyword lookup misses.
+
+    Methods:
+        fit(examples) -> NgramIntentModel: Trains on (text, verb) pairs.
+        predict(text) -> Tuple[Optional[str], float, float]: Best verb, its score and the runner-up's.
+    """
+    def __init__(self, n_range: Tuple[int, int] = (2, 4)):
+        self.n_range = n_range
+        self.vocab: Dict[str, int] = {}
+        self.idf = None
+        self.verbs: List[str] = []
+        self.centroids = None
+
+    def _ngrams(self, text: str) -> Counter:
+        grams = Counter()
+        for word in tokenize(text):
+            padded = f" {word} "
+            for n in range(self.n_range[0], self.n_range[1] + 1):
+                grams.update(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return grams
+
+    def _vector(self, grams: Counter) -> np.ndarray:
+        vector = np.zeros(len(self.vocab), dtype=np.float32)
+        for gram, count in grams.items():
+            index = self.vocab.get(gram)
+            if index is not None:
+                vector[index] = (1 + math.log(count)) * self.idf[index]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def fit(self, examples: Sequence[Tuple[str, str]]) -> 'NgramIntentModel':
+        documents = [(self._ngrams(text), verb) for text, verb in examples]
+        df = Counter(gram for grams, _ in documents for gram in grams)
+        self.vocab = {gram: i for i, gram in enumerate(df)}
+        self.idf = np.array([math.log((1 + len(documents)) / (1 + df[g])) + 1 for g in df], dtype=np.float32)
+        self.verbs = sorted({verb for _, verb in examples})
+        rows = {verb: np.zeros(len(self.vocab), dtype=np.float32) for verb in self.verbs}
+        for grams, verb in documents:
+            rows[verb] += self._vector(grams)
+        centroids = np.stack([rows[verb] for verb in self.verbs])
+        self.centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+        return self
+
+    def predict(self, text: str) -> Tuple[Optional[str], float, float]:
+        similarity = self.centroids @ self._vector(self._ngrams(text))
+        if len(similarity) < 2 or not similarity.any():
+            return None, 0.0, 0.0
+        second, best = np.argsort(similarity)[-2:]
+        return self.verbs[best], float(similarity[best]), float(similarity[second])
+
+
+class FastIntentClassifier:
+    """Two local tiers in front of the LLM: a keyword trie, then the n-gram model.
+
+    The trie's confidence is the share of the utterance explained by one verb's keywords plus
+    filler words, so "what time is it" scores 1.0 while "what time did the titanic sink" does not.
+    Utterances naming two different verbs are left to the LLM.
+
+    Methods:
+        classify(text) -> Tuple[Optional[str], float, str]: (verb, confidence, tier) with tier 'keyword' or 'ngram'.
+    """
+    def __init__(self, keywords=INTENT_KEYWORDS, prefixes=INTENT_PREFIXES, examples=INTENT_EXAMPLES,
+                 min_margin: float = 0.1):
+        """Builds the trie and trains the n-gram model.
+
+        Args:
+            keywords: (verb, phrases) pairs.
+            prefixes: Verb to phrases that route_intent only accepts at the start; any position here.
+            examples: Extra training phrases per verb for the n-gram model.
+            min_margin (float): Lead over the runner-up verb the n-gram model needs to be trusted.
+        """
+        self.trie = KeywordTrie()
+        training = []
+        for verb, phrases in list(keywords) + list(prefixes.items()):
+            for phrase in phrases:
+                self.trie.add(phrase, verb)
+                training.append((phrase, verb))
+        training += [(text, verb) for verb, texts in examples.items() for text in texts]
+        self.model = NgramIntentModel().fit(training)
+        self.min_margin = min_margin
+
+    def classify(self, text: str) -> Tuple[Optional[str], float, str]:
+        tokens = tokenize(text)
+        if not tokens:
+            return None, 0.0, 'keyword'
+        matches = self.trie.find(tokens)
+        verbs = {verb for verb, _, _ in matches}
+        if len(verbs) == 1:
+            covered = sum(end - start for _, start, end in matches)
+            covered += sum(1 for i, token in enumerate(tokens) if token in FILLER_WORDS
+                           and not any(start <= i < end for _, start, end in matches))
+            return verbs.pop(), covered / len(tokens), 'keyword'
+        if len(verbs) > 1:
+            return None, 0.0, 'keyword'
+        verb, best, second = self.model.predict(text)
+        if best - second < self.min_margin:
+            return verb, best * 0.5, 'ngram'
+        return verb, best, 'ngram'
+
+
+def run_local(verb: str, text: str) -> Optional[Tuple[str, dict]]:
+    """Answers a side-effect-free verb locally, in the same shape the LLM brain returns.
+
+    Returns:
+        Optional[Tuple[str, dict]]: (action, params) for the main loop, or None if the verb needs the LLM.
+    """
+    if verb in LOCAL_ACTIONS:
+        return verb, {'query': text}
+    function = LOCAL_FUNCTIONS.get(verb)
+    if function is None:
+        return None
+    parameters = {}
+    if verb == 'system_weather':
+        match = re.search(r'weather in ([\w\s]+)', text.lower())
+        if match:
+            parameters['location'] = match.group(1).strip()
+    return 'function_call', {
+        'action': 'function_call',
+        'target': function,
+        'parameters': parameters,
+        'result': getattr(system_tools, function)(**parameters),
+    }
+
+
+class TieredIntentRouter:
+    """Answers common commands locally and sends only the rest to the LLM-backed router.
+
+    Tier 1 is a keyword trie, tier 2 a character n-gram model; an utterance they classify with at
+    least `threshold` confidence as a side-effect-free verb (time, date, battery, CPU, RAM,
+    weather, joke, greeting, farewell) is answered in microseconds. Everything else, including any
+    command that changes state, goes to tier 3, the wrapped ContextAwareIntentRouter.
+
+    Methods:
+        route_intent(user_input, session_id) -> list: Same contract as ContextAwareIntentRouter.
+        stats -> Dict: Per-tier hit counts, shares and latencies.
+    """
+    TIERS = ('keyword', 'ngram', 'llm')
+
+    def __init__(self, fallback, classifier=None, threshold: float = 0.75, window: int = 1000):
+        """Initializes the router.
+
+        Args:
+            fallback: Router with route_intent(user_input, session_id), usually ContextAwareIntentRouter.
+            classifier (FastIntentClassifier, optional): Local classifier; built from the keyword table by default.
+            threshold (float): Confidence the local tiers need to answer on their own.
+            window (int): Latencies kept per tier for the percentiles.
+        """
+        self.fallback = fallback
+        self.classifier = classifier or FastIntentClassifier()
+        self.threshold = threshold
+        self._latencies = {tier: deque(maxlen=window) for tier in self.TIERS}
+        self._hits = dict.fromkeys(self.TIERS, 0)
+
+    def route_intent(self, user_input: str, session_id: str) -> list:
+        """Routes locally when confident, otherwise through the fallback router."""
+        start = time.perf_counter()
+        verb, confidence, tier = self.classifier.classify(user_input)
+        if verb and confidence >= self.threshold:
+            routed = run_local(verb, user_input)
+            if routed is not None:
+                action, params = routed
+                params['confidence'] = confidence
+                params['reasoning'] = f"Local {tier} match for {verb}"
+                self._record(tier, start)
+                return [routed]
+        try:
+            return self.fallback.route_intent(user_input, session_id)
+        finally:
+            self._record('llm', start)
+
+    def _record(self, tier: str, start: float) -> None:
+        self._hits[tier] += 1
+        self._latencies[tier].append(time.perf_counter() - start)
+
+    @property
+    def stats(self) -> Dict:
+        """Per tier: hits, share of all routed utterances, p50 and p95 latency in milliseconds."""
+        total = sum(self._hits.values())
+        report = {}
+        for tier in self.TIERS:
+            latencies = self._latencies[tier]
+            report[tier] = {
+                'hits': self._hits[tier],
+                'share': self._hits[tier] / total if total else 0.0,
+                'p50_ms': 1000 * float(np.percentile(latencies, 50)) if latencies else 0.0,
+                'p95_ms': 1000 * float(np.percentile(latencies, 95)) if latencies else 0.0,
+            }
+        return report
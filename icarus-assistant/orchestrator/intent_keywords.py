@@ -0,0 +1,67 @@
+"""
+intent_keywords.py
+
+Keyword phrases for each intent verb, shared by the keyword router and the local intent classifier.
+"""
+
+# Phrases per verb, in the priority order route_intent checks them; a phrase matches anywhere in the text
+INTENT_KEYWORDS = [
+    ('launch_app', ['launch', 'open app', 'start app', 'run app']),
+    ('list_files', ['list files', 'show files', 'files in', 'what files']),
+    ('search_files', ['search for', 'find file', 'look for', 'search file']),
+    ('read_file', ['read']),
+    ('edit_text', ['edit', 'change', 'modify']),
+    ('move_files', ['move', 'copy', 'relocate']),
+    ('delete_file', ['delete', 'remove', 'erase']),
+    ('system_info', ['system info', 'list running apps', 'show processes', 'cpu', 'memory']),
+    ('tts_mute', ['mute tts', 'mute voice', 'mute speech']),
+    ('tts_unmute', ['unmute tts', 'unmute voice', 'unmute speech']),
+    ('tts_set_voice', ['set voice']),
+    ('tts_set_speed', ['set speed', 'set rate']),
+    ('tts_set_volume', ['set volume']),
+    ('update_app_map', ['add app', 'map app']),
+    ('system_time', ['what time', 'current time', 'time is it']),
+    ('system_date', ['what date', 'current date', 'date is it', 'today']),
+    ('system_battery', ['battery', 'battery percentage', 'battery level']),
+    ('system_cpu', ['cpu usage', 'cpu percent', 'processor usage']),
+    ('system_ram', ['ram usage', 'memory usage', 'ram percent']),
+    ('system_clipboard_get', ['clipboard', 'get clipboard', 'show clipboard']),
+    ('system_clipboard_set', []),
+    ('system_open_url', []),
+    ('system_weather', ['weather', 'forecast']),
+    ('system_joke', ['joke', 'make me laugh']),
+    ('summarize_pdf', ['summarize pdf', 'summarize this pdf', 'summarize file']),
+    ('greeting', ['hello', 'hi', 'hey', 'greetings', 'good morning', 'good afternoon', 'good evening']),
+    ('farewell', ['bye', 'goodbye', 'see you', 'farewell', 'exit', 'quit']),
+]
+
+# Phrases that only count at the start of the text, checked alongside the verb's keywords
+INTENT_PREFIXES = {
+    'launch_app': ['open '],
+    'system_clipboard_set': ['set clipboard to '],
+    'system_open_url': ['open url ', 'go to '],
+    'summarize_pdf': ['summarize'],
+}
+
+# Extra phrasings the local classifier learns from, beyond the keywords themselves
+INTENT_EXAMPLES = {
+    'system_time': ['what is the time', 'whats the time', 'tell me the time', 'time please', 'what time is it now'],
+    'system_date': ['what is the date', 'whats the date today', 'what day is it', 'tell me the date'],
+    'system_battery': ['how much battery is left', 'battery status', 'how is my battery', 'charge level'],
+    'system_cpu': ['how busy is the cpu', 'processor load', 'cpu load', 'show cpu usage'],
+    'system_ram': ['how much memory is used', 'ram status', 'show ram usage', 'memory load'],
+    'system_weather': ['how is the weather', 'whats the weather like', 'will it rain', 'weather today'],
+    'system_joke': ['tell me a joke', 'say something funny', 'know any jokes'],
+    'greeting': ['hello there', 'hi icarus', 'hey icarus', 'good day'],
+    'farewell': ['see you later', 'good night', 'bye for now', 'talk to you later'],
+    'launch_app': ['open chrome', 'start notepad', 'launch spotify'],
+    'search_files': ['find my report', 'where is my file', 'search for notes'],
+    'read_file': ['read the file', 'read notes.txt aloud'],
+    'summarize_pdf': ['summarize report.pdf', 'give me a summary of this document'],
+}
+
+# Words that carry no intent of their own; an utterance made only of keywords and these is unambiguous
+FILLER_WORDS = frozenset("""
+a an the is it its it's me my please now right sir icarus can you could would tell show check what
+whats what's how much level are of current currently today's to do i for there again
+""".split())
@@ -4,12 +4,136 @@ intent_router.py
 Determines user intent and routes to the appropriate tool or LLM.
 """
 
-from typing import Tuple, List
+import re
+import string
+import time
+from typing import Tuple, List, Optional
+from orchestrator.intent_keywords import INTENT_KEYWORDS, INTENT_PREFIXES
 from orchestrator.llm_brain import LLMBrain
 from orchestrator.plan_executor import PlanExecutor
 from actions.perplexity_search import PerplexitySearch
 from orchestrator.session_manager import SessionManager
 
+def _trie_regex(phrases: List[str]) -> str:
+    """Regex matching any of the phrases, factored into a character trie ("cpu(?: usage| percent)?").
+
+    The factored form lets the regex engine rule out most phrases from the first character, and
+    greedy optional tails make it report the longest phrase that matches at a position.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+# Priority of a verb is its position in INTENT_KEYWORDS, mirroring the old if/elif order
+_KEYWORD_PRIORITY = {phrase: priority for priority, (_, phrases) in reversed(list(enumerate(INTENT_KEYWORDS)))
+                     for phrase in phrases}
+# The regex reports the longest keyword at each position; shorter keywords starting there are its prefixes
+_MATCH_PRIORITY = {k: min(p for other, p in _KEYWORD_PRIORITY.items() if k.startswith(other))
+                   for k in _KEYWORD_PRIORITY}
+# Searched at every position (the lookahead consumes nothing), so overlapping keywords are all seen
+_KEYWORD_PATTERN = re.compile(f"(?=({_trie_regex(list(_KEYWORD_PRIORITY))}))")
+_PREFIX_PRIORITY = {phrase: priority for priority, (verb, _) in enumerate(INTENT_KEYWORDS)
+                    for phrase in INTENT_PREFIXES.get(verb, [])}
+_PREFIXES = tuple(_PREFIX_PRIORITY)
+
+
+def _to_float(value: str, default: float) -> float:
+    try:
+        return float(value.rstrip(string.punctuation))
+    except ValueError:
+        return default
+
+
+# Verbs whose only parameter is the text itself
+_QUERY_VERBS = {
+    'search_files': {}, 'read_file': {}, 'launch_app': {}, 'greeting': {}, 'farewell': {},
+    'delete_file': {'needs_confirmation': True},
+}
+
+# verb -> (pattern, params when it matches, params when it doesn't); None sends the text to llm_chat
+_PARAM_RULES = {
+    'list_files': (re.compile(r'(?:in|from)\s+([\w\\/\.-]+)'),
+                   lambda m, text: {'directory': m.group(1)},
+                   lambda text: {'directory': '.'}),
+    'edit_text': (re.compile(r'edit(?: line (\d+))? in ([^ ]+) to (.+)'),
+                  lambda m, text: {'file': m.group(2), 'operation': 'replace', 'content': m.group(3),
+                                   'line': int(m.group(1)) if m.group(1) else None},
+                  lambda text: {'query': text, 'needs_confirmation': True}),
+    'move_files': (re.compile(r'move ([^ ]+) to ([^ ]+)'),
+                   lambda m, text: {'src': m.group(1), 'dst': m.group(2), 'copy': False, 'needs_confirmation': True},
+                   lambda text: {'query': text, 'needs_confirmation': True}),
+    'tts_set_voice': (re.compile(r'set voice to ([\w\s-]+)'),
+                      lambda m, text: {'voice': m.group(1).strip()},
+                      lambda text: {'voice': ''}),
+    'tts_set_speed': (re.compile(r'(?:set speed|set rate) to (\d+)'),
+                      lambda m, text: {'speed': int(m.group(1))},
+                      lambda text: {'speed': 200}),
+    'tts_set_volume': (re.compile(r'set volume to ([0-9.]+)'),
+                       lambda m, text: {'volume': _to_float(m.group(1), 1.0)},
+                       lambda text: {'volume': 1.0}),
+    'update_app_map': (re.compile(r'(?:add|map) app ([\w\s-]+) (?:as|to) ([\w\\/\.-]+)'),
+                       lambda m, text: {'app_name': m.group(1).strip(), 'path': m.group(2).strip()},
+                       lambda text: None),
+    'system_clipboard_set': (re.compile(r'set clipboard to (.+)'),
+                             lambda m, text: {'value': m.group(1)},
+                             lambda text: {'value': ''}),
+    'system_open_url': (re.compile(r'(?:open url|go to) (.+)'),
+                        lambda m, text: {'url': m.group(1)},
+                        lambda text: {'url': ''}),
+    'system_weather': (re.compile(r'weather in ([\w\s]+)'),
+                       lambda m, text: {'location': m.group(1).strip()},
+                       lambda text: {'location': 'your area'}),
+    'summarize_pdf': (re.compile(r'summarize ([^ ]+\.pdf)'),
+                      lambda m, text: {'file': m.group(1)},
+                      lambda text: {'query': text}),
+}
+
+
+def match_verb(text: str) -> Optional[str]:
+    """Returns the highest-priority verb with a keyword in the (lowercased) text, or None.
+
+    Equivalent to checking each verb's keywords in priority order, but in one pass over the text.
+    """
+    best = None
+    if text.startswith(_PREFIXES):
+        best = min(p for prefix, p in _PREFIX_PRIORITY.items() if text.startswith(prefix))
+    for match in _KEYWORD_PATTERN.finditer(text):
+        priority = _MATCH_PRIORITY[match.group(1)]
+        if best is None or priority < best:
+            best = priority
+            if best == 0:
+                break
+    return INTENT_KEYWORDS[best][0] if best is not None else None
+
+
+def extract_params(verb: Optional[str], text: str) -> Tuple[str, dict]:
+    """Builds the (intent, parameters) pair for a verb from the text; unknown text becomes llm_chat."""
+    if verb in _QUERY_VERBS:
+        return verb, {'query': text, **_QUERY_VERBS[verb]}
+    if verb in _PARAM_RULES:
+        pattern, on_match, on_miss = _PARAM_RULES[verb]
+        match = pattern.search(text)
+        params = on_match(match, text) if match else on_miss(text)
+        if params is not None:
+            return verb, params
+    elif verb is not None:
+        return verb, {}
+    return 'llm_chat', {'query': text}
+
+
 def route_intent(user_input: str) -> List[Tuple[str, dict]]:
     """Determines the user's intent(s) and returns a list of (intent, parameters) for each command.
 
@@ -23,223 +147,53 @@ def route_intent(user_input: str) -> List[Tuple[str, dict]]:
     parts = [p.strip() for p in user_input.lower().split(' and ') if p.strip()]
     results = []
     last_verb = None
-    for i, text in enumerate(parts):
-        # Detect verb for this part
-        verb = None
-        if any(k in text for k in ['launch', 'open app', 'start app', 'run app']) or text.startswith('open '):
-            verb = 'launch_app'
-        elif any(k in text for k in ['list files', 'show files', 'files in', 'what files']):
-            verb = 'list_files'
-        elif any(k in text for k in ['search for', 'find file', 'look for', 'search file']):
-            verb = 'search_files'
-        elif text.startswith('read') or 'read' in text:
-            verb = 'read_file'
-        elif any(k in text for k in ['edit', 'change', 'modify']):
-            verb = 'edit_text'
-        elif any(k in text for k in ['move', 'copy', 'relocate']):
-            verb = 'move_files'
-        elif any(k in text for k in ['delete', 'remove', 'erase']):
-            verb = 'delete_file'
-        elif any(k in text for k in ['system info', 'list running apps', 'show processes', 'cpu', 'memory']):
-            verb = 'system_info'
-        elif any(k in text for k in ['mute tts', 'mute voice', 'mute speech']):
-            verb = 'tts_mute'
-        elif any(k in text for k in ['unmute tts', 'unmute voice', 'unmute speech']):
-            verb = 'tts_unmute'
-        elif 'set voice' in text:
-            verb = 'tts_set_voice'
-        elif 'set speed' in text or 'set rate' in text:
-            verb = 'tts_set_speed'
-        elif 'set volume' in text:
-            verb = 'tts_set_volume'
-        elif 'add app' in text or 'map app' in text:
-            verb = 'update_app_map'
-        elif any(k in text for k in ['what time', 'current time', 'time is it']):
-            verb = 'system_time'
-        elif any(k in text for k in ['what date', 'current date', 'date is it', 'today']):
-            verb = 'system_date'
-        elif any(k in text for k in ['battery', 'battery percentage', 'battery level']):
-            verb = 'system_battery'
-        elif any(k in text for k in ['cpu usage', 'cpu percent', 'processor usage']):
-            verb = 'system_cpu'
-        elif any(k in text for k in ['ram usage', 'memory usage', 'ram percent']):
-            verb = 'system_ram'
-        elif any(k in text for k in ['clipboard', 'get clipboard', 'show clipboard']):
-            verb = 'system_clipboard_get'
-        elif text.startswith('set clipboard to '):
-            verb = 'system_clipboard_set'
-        elif text.startswith('open url ') or text.startswith('go to '):
-            verb = 'system_open_url'
-        elif any(k in text for k in ['weather', 'forecast']):
-            verb = 'system_weather'
-        elif any(k in text for k in ['joke', 'make me laugh']):
-            verb = 'system_joke'
-        elif any(k in text for k in ['summarize pdf', 'summarize this pdf', 'summarize file']) or text.startswith('summarize'):
-            verb = 'summarize_pdf'
-        elif any(k in text for k in ['hello', 'hi', 'hey', 'greetings', 'good morning', 'good afternoon', 'good evening']):
-            verb = 'greeting'
-        elif any(k in text for k in ['bye', 'goodbye', 'see you', 'farewell', 'exit', 'quit']):
-            verb = 'farewell'
+    for text in parts:
         # Propagate previous verb if missing
-        if not verb and last_verb:
-            verb = last_verb
+        verb = match_verb(text) or last_verb
         if verb:
             last_verb = verb
-        # Now handle as before, using verb
-        if verb == 'list_files':
-            import re
-            match = re.search(r'(?:in|from)\s+([\w\\/\.-]+)', text)
-            directory = match.group(1) if match else '.'
-            results.append(('list_files', {'directory': directory}))
-            continue
-        if verb == 'search_files':
-            results.append(('search_files', {'query': text}))
-            continue
-        if verb == 'read_file':
-            results.append(('read_file', {'query': text}))
-            continue
-        if verb == 'edit_text':
-            # Example: 'edit line 3 in file.txt to Hello world'
-            import re
-            match = re.search(r'edit(?: line (\d+))? in ([^ ]+) to (.+)', text)
-            if match:
-                line = int(match.group(1)) if match.group(1) else None
-                fname = match.group(2)
-                content = match.group(3)
-                results.append(('edit_text', {'file': fname, 'operation': 'replace', 'content': content, 'line': line}))
-            else:
-                results.append(('edit_text', {'query': text, 'needs_confirmation': True}))
-            continue
-        if verb == 'move_files':
-            # Example: 'move file.txt to folder/'
-            import re
-            match = re.search(r'move ([^ ]+) to ([^ ]+)', text)
-            if match:
-                src = match.group(1)
-                dst = match.group(2)
-                results.append(('move_files', {'src': src, 'dst': dst, 'copy': False, 'needs_confirmation': True}))
-            else:
-                results.append(('move_files', {'query': text, 'needs_confirmation': True}))
-            continue
-        if verb == 'delete_file':
-            results.append(('delete_file', {'query': text, 'needs_confirmation': True}))
-            continue
-        if verb == 'launch_app':
-            results.append(('launch_app', {'query': text}))
-            continue
-        if verb == 'system_info':
-            results.append(('system_info', {}))
-            continue
-        if verb == 'tts_mute':
-            results.append(('tts_mute', {}))
-            continue
-        if verb == 'tts_unmute':
-            results.append(('tts_unmute', {}))
-            continue
-        if verb == 'tts_set_voice':
-            import re
-            match = re.search(r'set voice to ([\w\s-]+)', text)
-            voice = match.group(1).strip() if match else ''
-            results.append(('tts_set_voice', {'voice': voice}))
-            continue
-        if verb == 'tts_set_speed':
-            import re
-            match = re.search(r'(?:set speed|set rate) to (\d+)', text)
-            speed = int(match.group(1)) if match else 200
-            results.append(('tts_set_speed', {'speed': speed}))
-            continue
-        if verb == 'tts_set_volume':
-            import re
-            match = re.search(r'set volume to ([0-9.]+)', text)
-            volume_str = match.group(1) if match else '1.0'
-            # Strip trailing punctuation
-            import string
-            volume_str = volume_str.rstrip(string.punctuation)
-            try:
-                volume = float(volume_str)
-            except Exception:
-                volume = 1.0
-            results.append(('tts_set_volume', {'volume': volume}))
-            continue
-        if verb == 'update_app_map':
-            import re
-            match = re.search(r'(?:add|map) app ([\w\s-]+) (?:as|to) ([\w\\/\.-]+)', text)
-            if match:
-                app_name = match.group(1).strip()
-                path = match.group(2).strip()
-                results.append(('update_app_map', {'app_name': app_name, 'path': path}))
-                continue
-        if verb == 'system_time':
-            results.append(('system_time', {}))
-            continue
-        if verb == 'system_date':
-            results.append(('system_date', {}))
-            continue
-        if verb == 'system_battery':
-            results.append(('system_battery', {}))
-            continue
-        if verb == 'system_cpu':
-            results.append(('system_cpu', {}))
-            continue
-        if verb == 'system_ram':
-            results.append(('system_ram', {}))
-            continue
-        if verb == 'system_clipboard_get':
-            results.append(('system_clipboard_get', {}))
-            continue
-        if verb == 'system_clipboard_set':
-            import re
-            match = re.search(r'set clipboard to (.+)', text)
-            value = match.group(1) if match else ''
-            results.append(('system_clipboard_set', {'value': value}))
-            continue
-        if verb == 'system_open_url':
-            import re
-            match = re.search(r'(?:open url|go to) (.+)', text)
-            url = match.group(1) if match else ''
-            results.append(('system_open_url', {'url': url}))
-            continue
-        if verb == 'system_weather':
-            import re
-            match = re.search(r'weather in ([\w\s]+)', text)
-            location = match.group(1).strip() if match else 'your area'
-            results.append(('system_weather', {'location': location}))
-            continue
-        if verb == 'system_joke':
-            results.append(('system_joke', {}))
-            continue
-        if verb == 'summarize_pdf':
-            # Example: 'summarize file.pdf'
-            import re
-            match = re.search(r'summarize ([^ ]+\.pdf)', text)
-            if match:
-                fname = match.group(1)
-                results.append(('summarize_pdf', {'file': fname}))
-            else:
-                results.append(('summarize_pdf', {'query': text}))
-            continue
-        if verb == 'greeting':
-            results.append(('greeting', {'query': text}))
-            continue
-        if verb == 'farewell':
-            results.append(('farewell', {'query': text}))
-            continue
-        # Default: LLM chat
-        results.append(('llm_chat', {'query': text}))
-    return results 
+        results.append(extract_params(verb, text))
+    return results
+
 
 class ContextAwareIntentRouter:
     """Routes user input to the correct tool/function using LLMBrain."""
-    def __init__(self, memory_manager, openrouter_client):
+    def __init__(self, memory_manager, openrouter_client, async_client=None, context_builder=None,
+                 vector_memory=None, tool_executor=None, plan_store=None, planner_client=None,
+                 speculative_chat=None):
         self.memory = memory_manager
-        self.llm_brain = LLMBrain(openrouter_client, memory_manager)
-        self.plan_executor = PlanExecutor(self.llm_brain, openrouter_client)
+        self.speculative_chat = speculative_chat
+        self.llm_brain = LLMBrain(openrouter_client, memory_manager, context_builder, vector_memory)
+        # Planning may use a larger model than intent parsing (see llm.model_router)
+        self.plan_executor = PlanExecutor(self.llm_brain, planner_client or openrouter_client, async_client,
+                                          tool_executor, plan_store=plan_store)
         self.perplexity = PerplexitySearch()
         self.session_manager = SessionManager(memory_manager)
 
     def route_intent(self, user_input: str, session_id: str) -> list:
-        """Route user input using LLMBrain. Handles plan_mode and Perplexity search."""
-        intent_struct = self.llm_brain.parse_intent(user_input, session_id)
+        """Route user input using LLMBrain. Handles plan_mode and Perplexity search.
+
+        With speculative_chat, a chat reply is requested alongside the intent parse, from the same
+        context (summary, recalled memory, history); a direct response (or a failed parse) is
+        answered from that stream as llm_chat, anything else discards it.
+        """
+        if self.speculative_chat is None:
+            intent_struct = self.llm_brain.parse_intent(user_input, session_id)
+        else:
+            context = self.llm_brain._build_context(session_id, user_input)
+            speculation = self.speculative_chat.start(self.llm_brain.chat_prompt(user_input, context),
+                                                      self.llm_brain.CHAT_SYSTEM_PROMPT)
+            started = time.perf_counter()
+            try:
+                intent_struct = self.llm_brain.parse_intent(user_input, session_id, with_reply=False,
+                                                            context=context)
+            except Exception as e:
+                print(f"[Router] Intent parse failed ({e}); answering from the speculative chat reply")
+                intent_struct = {'action': 'direct_response'}
+            if intent_struct.get('action') == 'direct_response':
+                stream = self.speculative_chat.use(speculation, 1000 * (time.perf_counter() - started))
+                return [('llm_chat', {'query': user_input, 'stream': stream})]
+            self.speculative_chat.discard(speculation)
         action = intent_struct.get('action')
         if action == 'plan_mode':
             plan_result = self.plan_executor.create_and_execute_plan(user_input, session_id)
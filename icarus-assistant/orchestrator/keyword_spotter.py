@@ -0,0 +1,205 @@
+"""
+keyword_spotter.py
+
+Offline wake-word spotting: MFCC front end plus DTW template matching over a continuous frame stream.
+"""
+
+import os
+from typing import Dict, List, Optional
+import numpy as np
+from utils.audio_features import FRAMES_PER_SECOND, IncrementalLogMel, mfcc
+from utils.pcm import AudioBuffer, as_float32
+
+DEFAULT_TEMPLATES = os.path.join('data', 'wakeword', 'icarus.npz')
+
+
+def _features(log_mel: np.ndarray, n_mfcc: int) -> np.ndarray:
+    """Unit-normalised MFCCs without c0, shape (n_frames, n_mfcc - 1), so loudness does not matter."""
+    coeffs = mfcc(log_mel, n_mfcc)[1:].T
+    coeffs = coeffs - coeffs.mean(axis=1, keepdims=True)
+    return coeffs / np.maximum(np.linalg.norm(coeffs, axis=1, keepdims=True), 1e-6)
+
+
+def _frame_energy(log_mel: np.ndarray) -> np.ndarray:
+    """log10 of the total mel power per frame."""
+    return np.log10(np.maximum(np.power(10.0, log_mel).sum(axis=0), 1e-10))
+
+
+def subsequence_dtw(template: np.ndarray, stream: np.ndarray) -> np.ndarray:
+    """Cost of the best alignment of the whole template ending at each stream frame.
+
+    The template may start anywhere in the stream. Steps allow the stream to run between
+    half and double the template's speed. Costs are cosine distances averaged over the template.
+
+    Args:
+        template (np.ndarray): (T, d) unit-norm template features.
+        stream (np.ndarray): (W, d) unit-norm stream features.
+
+    Returns:
+        np.ndarray: (W,) normalised alignment cost ending at each stream frame.
+    """
+    cost = 1.0 - template @ stream.T
+    inf1, inf2 = np.full(1, np.inf), np.full(2, np.inf)
+    prev2 = np.full(cost.shape[1], np.inf)
+    prev = cost[0].copy()
+    for row in cost[1:]:
+        # Steps (1,1), (1,2) and (2,1) keep the warping slope between 1/2 and 2
+        diag = np.concatenate((inf1, prev[:-1]))
+        stream_skip = np.concatenate((inf2, prev[:-2]))
+        template_skip = np.concatenate((inf1, prev2[:-1]))
+        acc = row + np.minimum(np.minimum(diag, stream_skip), template_skip)
+        prev2, prev = prev, acc
+    acc = prev
+    return acc / len(template)
+
+
+class KeywordSpotter:
+    """Detects an enrolled keyword in streamed audio without any network access.
+
+    Audio is turned into log-mel frames once, incrementally. Every hop_s seconds, and only when
+    recent frames carry energy, each template is aligned against the last few seconds with
+    subsequence DTW. A score below the threshold is a detection.
+
+    Methods:
+        enroll(samples) -> None: Adds a template from a recorded example of the keyword.
+        process(samples) -> Optional[Dict]: Feeds streamed audio; returns a detection if one fired.
+        save(path) / load(path): Persist templates as .npz.
+    """
+    def __init__(self, threshold: float = 0.2, n_mfcc: int = 13, hop_s: float = 0.1,
+                 energy_gate: float = 2.0, refractory_s: float = 0.5, settle_s: float = 0.2):
+        """Initializes the spotter.
+
+        Args:
+            threshold (float): Maximum normalised DTW cost that counts as a detection (lower is stricter).
+            n_mfcc (int): Cepstral coefficients per frame.
+            hop_s (float): Seconds between scoring passes.
+            energy_gate (float): log10 energy margin (x10 dB) above the noise floor needed to run the matcher.
+            refractory_s (float): Seconds after a detection during which no new detection fires.
+            settle_s (float): How long a candidate must stay the best match before it fires.
+        """
+        self.threshold = threshold
+        self.n_mfcc = n_mfcc
+        self.hop_frames = max(1, int(hop_s * FRAMES_PER_SECOND))
+        self.energy_gate = energy_gate
+        self.refractory_frames = int(refractory_s * FRAMES_PER_SECOND)
+        self.settle_frames = max(1, int(settle_s * FRAMES_PER_SECOND))
+        self.templates: List[np.ndarray] = []
+        self.scoring_passes = 0
+        self.reset()
+
+    @property
+    def ready(self) -> bool:
+        """True once at least one template is enrolled."""
+        return bool(self.templates)
+
+    def reset(self) -> None:
+        """Clears streaming state (e.g. after reopening the microphone)."""
+        self.mel = IncrementalLogMel()
+        self._next_score = self.hop_frames
+        self._last_detection = -self.refractory_frames
+        self._noise_floor = None
+        self._active_until = 0
+        self._last_match_end = 0
+        self._pending = None
+
+    def enroll(self, samples: AudioBuffer) -> None:
+        """Adds a template from an example recording, trimmed to its voiced frames.
+
+        Args:
+            samples (AudioBuffer): 16 kHz recording of the keyword.
+        Raises:
+            ValueError: If the recording has no voiced content.
+        """
+        mel = IncrementalLogMel()
+        mel.feed(as_float32(samples))
+        mel.finish()
+        log_mel = mel.frames()
+        energy = _frame_energy(log_mel)
+        # Within 30 dB of the peak and at least 10 dB above the quietest frames
+        floor = max(energy.max() - 3.0, np.percentile(energy, 10) + 1.0)
+        voiced = np.flatnonzero(energy > floor)
+        if len(voiced) < 5:
+            raise ValueError("Enrollment sample contains no speech")
+        self.templates.append(_features(log_mel[:, voiced[0]:voiced[-1] + 1], self.n_mfcc))
+
+    def save(self, path: str = DEFAULT_TEMPLATES) -> None:
+        """Writes enrolled templates to an .npz file."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(path, *self.templates)
+
+    def load(self, path: str = DEFAULT_TEMPLATES) -> bool:
+        """Loads templates from an .npz file if it exists.
+
+        Returns:
+            bool: True if templates were loaded.
+        """
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            self.templates = [data[k] for k in sorted((k for k in data.files if k.startswith('arr_')),
+                                                         key=lambda k: int(k[4:]))]
+        return self.ready
+
+    def _window_frames(self) -> int:
+        return int(2 * max(len(t) for t in self.templates)) + self.hop_frames
+
+    def process(self, samples: AudioBuffer) -> Optional[Dict]:
+        """Feeds streamed audio and scores the recent window every hop.
+
+        Args:
+            samples (AudioBuffer): Next chunk of 16 kHz audio.
+
+        Returns:
+            Optional[Dict]: {'score', 'end_s', 'template'} for a detection, else None.
+        """
+        if not self.ready:
+            raise RuntimeError("No wake-word templates enrolled")
+        self.mel.feed(as_float32(samples))
+        detection = None
+        while self.mel.num_frames >= self._next_score:
+            end = self._next_score
+            self._next_score += self.hop_frames
+            result = self._score(end)
+            if result and detection is None:
+                detection = result
+        window = self._window_frames()
+        self.mel.trim(self.mel.num_frames - window)
+        return detection
+
+    def _score(self, end: int) -> Optional[Dict]:
+        window = self._window_frames()
+        start = max(self.mel.first_frame, end - window)
+        log_mel = self.mel.frames(start, end)
+        hop = _frame_energy(log_mel[:, -self.hop_frames:])
+        level = float(np.median(hop))
+        if self._noise_floor is None or level < self._noise_floor:
+            self._noise_floor = level
+        else:
+            self._noise_floor += 0.01 * (level - self._noise_floor)
+        # Cheap gate: only run the matcher while there is (or just was) energy above the noise floor
+        if hop.max() >= self._noise_floor + self.energy_gate:
+            self._active_until = end + 3 * self.hop_frames
+        active = end <= self._active_until and end - self._last_detection >= self.refractory_frames
+        if active and log_mel.shape[1] >= min(len(t) for t in self.templates) // 2:
+            self._match(log_mel, start, end)
+        # A partial keyword often matches too, so a candidate only fires once nothing better
+        # has turned up for settle_s
+        if self._pending is None or end - self._pending['end'] < self.settle_frames:
+            return None
+        detection, self._pending = self._pending, None
+        self._last_detection = end
+        self._last_match_end = detection['end']
+        return {'score': detection['score'], 'end_s': detection['end'] / FRAMES_PER_SECOND,
+                'template': detection['template']}
+
+    def _match(self, log_mel: np.ndarray, start: int, end: int) -> None:
+        self.scoring_passes += 1
+        stream = _features(log_mel, self.n_mfcc)
+        # Matches ending within half a keyword of the previous detection belong to that detection
+        ends = np.arange(start + 1, end + 1)
+        eligible = ends > self._last_match_end + min(len(t) for t in self.templates) // 2
+        for idx, template in enumerate(self.templates):
+            costs = np.where(eligible, subsequence_dtw(template, stream), np.inf)
+            j = int(np.argmin(costs))
+            if costs[j] <= self.threshold and (self._pending is None or costs[j] < self._pending['score']):
+                self._pending = {'score': float(costs[j]), 'end': int(ends[j]), 'template': idx}
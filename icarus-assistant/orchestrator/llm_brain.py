@@ -5,84 +5,155 @@ LLMBrain: Advanced intent parsing using OpenRouter LLM as the agent's brain.
 """
 from typing import Dict, List, Optional
 import json
+from utils.json_extractor import INTENT_SCHEMA, JSONExtractionError, extract_json, extract_json_stream
 
 class LLMBrain:
     """LLM acts as the brain for intent parsing and decision making."""
-    def __init__(self, openrouter_client, memory_manager):
+    HISTORY_TURNS = 10
+    MEMORY_RESULTS = 3
+    MEMORY_MIN_SCORE = 0.35
+    MEMORY_MAX_CHARS = 300
+    # Fields each action needs before it can be dispatched; confidence and reasoning are not waited for
+    DISPATCH_FIELDS = {
+        'plan_mode': ('action',),
+        'direct_response': ('action', 'target'),
+        'tool_call': ('action', 'target', 'parameters'),
+        'function_call': ('action', 'target', 'parameters'),
+    }
+    # System prompt for a reply written directly from the brain's context (see chat_prompt)
+    CHAT_SYSTEM_PROMPT = ("You are Icarus, a voice assistant. Answer the user query directly, using the earlier "
+                          "conversation, relevant memory and history given with it. Reply in short spoken "
+                          "sentences, without markdown.")
+
+    def __init__(self, openrouter_client, memory_manager, context_builder=None, vector_memory=None):
         """Initialize LLMBrain with LLM client and memory manager.
 
         Args:
             openrouter_client: LLM client (OpenRouter).
             memory_manager: Conversation memory manager.
+            context_builder (ContextBuilder, optional): Fits history to a token budget with a rolling
+                summary; without one the last HISTORY_TURNS messages are sent.
+            vector_memory (VectorMemory, optional): Retrieves earlier messages and tool outputs
+                relevant to the query, from any session, beyond the recent history.
         """
         self.llm = openrouter_client
         self.memory = memory_manager
+        self.context_builder = context_builder
+        self.vector_memory = vector_memory
         self.tools = self._load_tools()
         self.functions = self._load_functions()
+        # Identical on every call, so it is rendered once and sent first where prompt caching can reuse it
+        self.system_prompt = self._create_system_prompt()
 
-    def parse_intent(self, user_query: str, session_id: str) -> Dict:
+    def parse_intent(self, user_query: str, session_id: str, with_reply: bool = True,
+                     context: Optional[Dict] = None) -> Dict:
         """Parse user intent using LLM with full context.
 
+        With a streaming client the intent is returned as soon as its action and the fields that
+        action needs have arrived (see DISPATCH_FIELDS); the rest of the completion is not awaited.
+
         Args:
             user_query (str): The user's query.
             session_id (str): Conversation session ID.
+            with_reply (bool): Whether a direct_response must carry its reply text; False when a
+                chat reply is already being generated, so only the action is awaited.
+            context (Dict, optional): Context from _build_context, when the caller already built it
+                (e.g. for the chat_prompt of that reply).
 
         Returns:
             Dict: Structured intent/action output from LLM.
         """
-        context = self._build_context(session_id)
+        if context is None:
+            context = self._build_context(session_id, user_query)
         prompt = self._create_brain_prompt(user_query, context)
-        response = self.llm.query(prompt)
-        return self._parse_llm_response(response)
-
-    def _build_context(self, session_id: str) -> Dict:
-        """Build context for LLM prompt (history, tools, functions, outputs)."""
-        history = self.memory.get_history(session_id)
+        query_stream = getattr(self.llm, 'query_stream', None)
+        if query_stream is None:
+            return self._parse_llm_response(self.llm.query(prompt, system=self.system_prompt))
+        # The stream is read only until the action and the fields it needs are complete
+        ready = self._ready_to_dispatch if with_reply else (
+            lambda fields: fields.get('action') == 'direct_response' or self._ready_to_dispatch(fields))
+        try:
+            return extract_json_stream(query_stream(prompt, system=self.system_prompt), INTENT_SCHEMA, until=ready)
+        except JSONExtractionError as e:
+            return self._fallback_intent(e.text)
+
+    def _ready_to_dispatch(self, fields: Dict) -> bool:
+        needed = self.DISPATCH_FIELDS.get(fields.get('action'))
+        return needed is not None and all(field in fields for field in needed)
+
+    def _build_context(self, session_id: str, user_query: Optional[str] = None) -> Dict:
+        """Build context for LLM prompt (history, relevant memories, tools, functions, outputs)."""
+        summary = ''
+        if self.context_builder is not None:
+            built = self.context_builder.build(session_id, getattr(self.llm, 'model', None))
+            history, summary = built['messages'], built['summary']
+        else:
+            history = self.memory.get_recent(session_id, self.HISTORY_TURNS)
         return {
-            "conversation_history": history[-10:],
+            "conversation_summary": summary,
+            "conversation_history": history,
+            "relevant_memory": self._recall(user_query, history),
             "available_tools": self.tools,
             "available_functions": self.functions,
             "possible_outputs": self._get_possible_outputs(),
             "session_context": self._get_session_context(session_id)
         }
 
+    def _recall(self, user_query: Optional[str], history: List[Dict]) -> List[str]:
+        """Earlier messages and tool outputs similar to the query that are not in the recent history."""
+        if self.vector_memory is None or not user_query:
+            return []
+        # New messages are indexed in the background (VectorMemory.sync_async); the current turn is
+        # in the recent history anyway
+        recent = {m['content'] for m in history}
+        hits = self.vector_memory.search(user_query, k=self.MEMORY_RESULTS + len(history),
+                                         min_score=self.MEMORY_MIN_SCORE)
+        facts = [f"{h['source']}: {h['content'][:self.MEMORY_MAX_CHARS]}" for h in hits if h['content'] not in recent]
+        return facts[:self.MEMORY_RESULTS]
+
+    def _create_system_prompt(self) -> str:
+        """Create the static instructions: tools, functions, outputs and the response format."""
+        compact = lambda value: json.dumps(value, separators=(',', ':'))
+        return f"""You are the brain of Icarus Assistant. You have access to all tools and functions.
+Tools: {compact(self.tools)}
+Functions: {compact(self.functions)}
+Possible outputs: {compact(self._get_possible_outputs())}
+Analyze the user query and decide what to do. Reply with JSON only:
+{{"action":"tool_call|function_call|direct_response|plan_mode","target":"tool_name|function_name|response_text|plan_request","parameters":{{...}},"confidence":0.95,"reasoning":"Why this action was chosen"}}
+If the query is too complex, set action to "plan_mode"."""
+
     def _create_brain_prompt(self, user_query: str, context: Dict) -> str:
-        """Create detailed prompt for LLM brain."""
-        return f"""
-You are the brain of Icarus Assistant. You have access to all tools and functions.
-
-CONTEXT:
-- Conversation History: {json.dumps(context['conversation_history'], indent=2)}
-- Available Tools: {json.dumps(context['available_tools'], indent=2)}
-- Available Functions: {json.dumps(context['available_functions'], indent=2)}
-- Possible Outputs: {json.dumps(context['possible_outputs'], indent=2)}
-
-USER QUERY: \"{user_query}\"
-
-TASK: Analyze the query and decide what to do. Return a JSON response with:
-{{
-    "action": "tool_call|function_call|direct_response|plan_mode",
-    "target": "tool_name|function_name|response_text|plan_request",
-    "parameters": {{...}},
-    "confidence": 0.95,
-    "reasoning": "Why this action was chosen"
-}}
-
-If the query is too complex, set action to "plan_mode".
-"""
+        """Create the per-request part of the prompt: recent history, session and the query."""
+        history = [{'role': m['role'], 'content': m['content']} for m in context['conversation_history']]
+        lines = [f"Earlier conversation (summary): {context['conversation_summary']}"] if context.get('conversation_summary') else []
+        if context.get('relevant_memory'):
+            lines.append(f"Relevant memory: {json.dumps(context['relevant_memory'], separators=(',', ':'))}")
+        lines.append(f"History: {json.dumps(history, separators=(',', ':'))}")
+        if context['session_context']:
+            lines.append(f"Session: {json.dumps(context['session_context'], separators=(',', ':'), default=str)}")
+        lines.append(f"User query: {json.dumps(user_query)}")
+        return '\n'.join(lines)
+
+    def chat_prompt(self, user_query: str, context: Dict) -> str:
+        """The intent prompt's context and query, to be answered directly under CHAT_SYSTEM_PROMPT."""
+        return self._create_brain_prompt(user_query, context)
 
     def _parse_llm_response(self, response: str) -> Dict:
-        """Parse LLM response into structured format."""
+        """Parse LLM response into structured format, skipping reasoning blocks, fences and prose."""
         try:
-            return json.loads(response)
-        except Exception:
-            return {
-                "action": "direct_response",
-                "target": response,
-                "parameters": {},
-                "confidence": 0.5,
-                "reasoning": "Failed to parse structured response"
-            }
+            return extract_json(response, INTENT_SCHEMA)
+        except JSONExtractionError as e:
+            return self._fallback_intent(e.text)
+
+    def _fallback_intent(self, text: str) -> Dict:
+        """A reply without a usable intent is treated as the answer itself (minus its reasoning)."""
+        return {
+            "action": "direct_response",
+            "target": text,
+            "parameters": {},
+            "confidence": 0.5,
+            "reasoning": "Failed to parse structured response"
+        }
 
     def _load_tools(self) -> Dict:
         """Return available tools with descriptions."""
@@ -3,18 +3,188 @@ memory_manager.py
 
 Simple memory manager for persistent conversation context without LangChain dependency.
 """
+import re
 import sqlite3
 import datetime, json
-from typing import Optional, List, Dict
+import queue
+import threading
+import time
+import weakref
+from typing import Iterator, Optional, List, Dict, Tuple
+
+# Schema changes applied in order on top of the base tables; PRAGMA user_version records how many ran
+MIGRATIONS = [
+    # 1: id of the last message folded into sessions.context_summary
+    ['ALTER TABLE sessions ADD COLUMN summary_upto INTEGER DEFAULT 0'],
+    # 2: history reads in time order, and message-id ranges for the rolling summary (rowid is implicit)
+    ['CREATE INDEX IF NOT EXISTS idx_messages_session_time ON messages (session_id, timestamp, id)',
+     'CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id)'],
+    # 3: what each context_embeddings vector was computed from, and with which embedder
+    ['ALTER TABLE context_embeddings ADD COLUMN message_id INTEGER',
+     'ALTER TABLE context_embeddings ADD COLUMN source TEXT',
+     'ALTER TABLE context_embeddings ADD COLUMN content TEXT',
+     'ALTER TABLE context_embeddings ADD COLUMN model TEXT',
+     'CREATE INDEX IF NOT EXISTS idx_embeddings_model ON context_embeddings (model, id)'],
+    # 4: full-text index over message content, kept in step with messages by triggers; session_id is
+    #    indexed too so a session filter narrows the MATCH before the equality check on messages
+    ["""CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+           content, session_id, content='messages', content_rowid='id', tokenize='porter unicode61')""",
+     """CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+           INSERT INTO messages_fts (rowid, content, session_id) VALUES (new.id, new.content, new.session_id);
+       END""",
+     """CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+           INSERT INTO messages_fts (messages_fts, rowid, content, session_id)
+           VALUES ('delete', old.id, old.content, old.session_id);
+       END""",
+     """CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content, session_id ON messages BEGIN
+           INSERT INTO messages_fts (messages_fts, rowid, content, session_id)
+           VALUES ('delete', old.id, old.content, old.session_id);
+           INSERT INTO messages_fts (rowid, content, session_id) VALUES (new.id, new.content, new.session_id);
+       END""",
+     "INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')"],
+    # 5: tool timing for the latency report
+    ['ALTER TABLE tool_executions ADD COLUMN duration_ms REAL',
+     'ALTER TABLE tool_executions ADD COLUMN result_size INTEGER',
+     'ALTER TABLE tool_executions ADD COLUMN cached BOOLEAN DEFAULT 0'],
+    # 6: plans that ran successfully, stored under their query template for reuse (see plan_store)
+    ['''CREATE TABLE IF NOT EXISTS plan_templates (
+           template TEXT PRIMARY KEY,
+           plan TEXT NOT NULL,
+           slots INTEGER NOT NULL,
+           uses INTEGER DEFAULT 0,
+           successes INTEGER DEFAULT 0,
+           failures INTEGER DEFAULT 0,
+           created_at TEXT,
+           last_used TEXT
+       )'''],
+]
+
+# Words too common to help a full-text search; the remaining words are OR-ed and ranked by BM25
+SEARCH_STOPWORDS = {
+    'a', 'about', 'an', 'and', 'are', 'did', 'do', 'for', 'i', 'in', 'is', 'it', 'me', 'my', 'of', 'on',
+    'say', 'said', 'that', 'the', 'this', 'to', 'was', 'we', 'what', 'when', 'where', 'with', 'you',
+}
+
+# Statements are module constants so each thread's connection compiles them once and reuses the
+# prepared statement from its cache (sqlite3 keys the cache on the SQL text)
+INSERT_MESSAGE = 'INSERT INTO messages (session_id, role, content, timestamp, metadata) VALUES (?, ?, ?, ?, ?)'
+TOUCH_SESSION = 'UPDATE sessions SET last_activity = ? WHERE session_id = ?'
+INSERT_TOOL_EXECUTION = '''INSERT INTO tool_executions (session_id, tool_name, parameters, result, timestamp, success,
+                                                        duration_ms, result_size, cached) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+SELECT_TOOL_EXECUTIONS = '''SELECT tool_name, duration_ms, success, cached FROM tool_executions
+                            WHERE duration_ms IS NOT NULL ORDER BY id DESC LIMIT ?'''
+SELECT_HISTORY = '''SELECT role, content, timestamp, metadata FROM messages WHERE session_id = ?
+                    ORDER BY timestamp ASC, id ASC'''
+SELECT_RECENT = '''SELECT id, role, content, timestamp, metadata FROM messages WHERE session_id = ?
+                   ORDER BY timestamp DESC, id DESC LIMIT ?'''
+# Keyset pagination: each page starts after the (timestamp, id) of the previous page's last row
+SELECT_PAGE = '''SELECT id, role, content, timestamp, metadata FROM messages
+                 WHERE session_id = ? AND (timestamp, id) > (?, ?) ORDER BY timestamp ASC, id ASC LIMIT ?'''
+SELECT_SINCE = '''SELECT id, role, content, timestamp, metadata FROM messages WHERE session_id = ? AND id > ?
+                  ORDER BY id ASC'''
+SELECT_SUMMARY = 'SELECT context_summary, summary_upto FROM sessions WHERE session_id = ?'
+INSERT_SESSION = 'INSERT OR IGNORE INTO sessions (session_id, created_at, last_activity, session_name) VALUES (?, ?, ?, ?)'
+UPDATE_SUMMARY = 'UPDATE sessions SET context_summary = ?, summary_upto = ? WHERE session_id = ?'
+UPDATE_NAME = 'UPDATE sessions SET session_name = ? WHERE session_id = ?'
+DELETE_MESSAGES = 'DELETE FROM messages WHERE session_id = ?'
+RESET_SUMMARY = 'UPDATE sessions SET context_summary = NULL, summary_upto = 0 WHERE session_id = ?'
+SELECT_AFTER = 'SELECT id, session_id, role, content, timestamp FROM messages WHERE id > ? ORDER BY id ASC LIMIT ?'
+INSERT_EMBEDDING = '''INSERT INTO context_embeddings (session_id, content_hash, embedding, timestamp, message_id, source, content, model)
+                      VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+SELECT_EMBEDDINGS = '''SELECT id, session_id, message_id, source, content, timestamp, embedding FROM context_embeddings
+                       WHERE model = ? AND id > ? ORDER BY id ASC'''
+# Lowest rowid among the `window` most recent matches; FTS5 walks its doclists in rowid order, so this is cheap
+SEARCH_FLOOR = 'SELECT rowid FROM messages_fts WHERE messages_fts MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?'
+SEARCH_MESSAGES = '''SELECT m.id, m.session_id, m.role, m.timestamp,
+                            snippet(messages_fts, 0, '[', ']', ' ... ', 12), bm25(messages_fts, 1.0, 0.0) AS score
+                     FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid
+                     WHERE messages_fts MATCH ? AND messages_fts.rowid >= ? ORDER BY score LIMIT ?'''
+# The session_id phrase in MATCH narrows the doclists, but tokenized ids can share tokens ('user-1' is a
+# prefix of 'user-1-old'), so the session filter itself is equality on messages.session_id
+SEARCH_FLOOR_SESSION = '''SELECT messages_fts.rowid FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid
+                          WHERE messages_fts MATCH ? AND m.session_id = ?
+                          ORDER BY messages_fts.rowid DESC LIMIT 1 OFFSET ?'''
+SEARCH_SESSION_MESSAGES = '''SELECT m.id, m.session_id, m.role, m.timestamp,
+                                   snippet(messages_fts, 0, '[', ']', ' ... ', 12), bm25(messages_fts, 1.0, 0.0) AS score
+                            FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid
+                            WHERE messages_fts MATCH ? AND m.session_id = ? AND messages_fts.rowid >= ?
+                            ORDER BY score LIMIT ?'''
+SELECT_PLAN_TEMPLATES = 'SELECT template, plan, slots, uses, successes, failures FROM plan_templates'
+SAVE_PLAN_TEMPLATE = '''INSERT INTO plan_templates (template, plan, slots, uses, successes, created_at, last_used)
+    VALUES (?, ?, ?, 1, 1, ?, ?)
+    ON CONFLICT (template) DO UPDATE SET plan = excluded.plan, slots = excluded.slots, uses = uses + 1,
+        successes = successes + 1, last_used = excluded.last_used'''
+RECORD_PLAN_USE = '''UPDATE plan_templates SET uses = uses + 1, successes = successes + ?, failures = failures + ?,
+    last_used = ? WHERE template = ?'''
+SELECT_SESSION = 'SELECT session_id, created_at, last_activity, session_name FROM sessions WHERE session_id = ?'
+
+class _ThreadConnection:
+    """A thread's connection, held in threading.local so it is collected when the thread exits."""
+    __slots__ = ('conn', '__weakref__')
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
 
 class MemoryManager:
-    """Manages conversation memory using SQLite only."""
-    def __init__(self, db_path: str = 'data/memory.sqlite'):
+    """Manages conversation memory using SQLite only.
+
+    Each thread gets one long-lived connection in WAL mode, so readers never wait on the writer;
+    it is closed when the thread exits.
+    store_message and log_tool_execution only queue the row; a writer thread commits queued rows
+    in batches, with one last_activity update per session, in a single transaction. Every read and every other write
+    flushes the queue first, so callers always see their own messages.
+
+    Methods:
+        store_message(session_id, role, content, metadata): Queues a message for writing.
+        log_tool_execution(session_id, tool_name, ...): Queues a tool_executions row for writing.
+        get_recent(session_id, n) -> List[Dict]: The last n messages, oldest first.
+        iter_history(session_id, page_size) -> Iterator[Dict]: Streams a session's messages in pages.
+        search(query, session_id, limit) -> List[Dict]: Full-text search with BM25 ranking and snippets.
+        flush(): Blocks until every queued row is committed.
+        close(): Flushes, stops the writer and closes all connections.
+    """
+    def __init__(self, db_path: str = 'data/memory.sqlite', batch_writes: bool = True,
+                 batch_window_s: float = 0.005, max_batch: int = 256, idle_timeout_s: float = 5.0):
+        """Initializes the manager and the database.
+
+        Args:
+            db_path (str): SQLite database file.
+            batch_writes (bool): Queue messages for the writer thread; False writes them inline.
+            batch_window_s (float): How long the writer waits for more messages before committing.
+            max_batch (int): Most messages committed in one transaction.
+            idle_timeout_s (float): The writer thread exits after this long without messages.
+        """
         self.db_path = db_path
+        self.batch_writes = batch_writes
+        self.batch_window_s = batch_window_s
+        self.max_batch = max_batch
+        self.idle_timeout_s = idle_timeout_s
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        # Reentrant: a connection's finalizer may run on a thread that already holds it
+        self._lock = threading.RLock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending = 0
+        self._writer: Optional[threading.Thread] = None
         self._init_db()
 
+    def _conn(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use and closed when the thread exits."""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            # check_same_thread=False only so close() can close other threads' connections
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False, cached_statements=64)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            holder = self._local.holder = _ThreadConnection(conn)
+            with self._lock:
+                self._connections.append(conn)
+            weakref.finalize(holder, self._release, conn)
+        return holder.conn
+
     def _init_db(self) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn()
         c = conn.cursor()
         c.execute('''CREATE TABLE IF NOT EXISTS sessions (
             id INTEGER PRIMARY KEY,
@@ -48,76 +218,315 @@ class MemoryManager:
             embedding BLOB,
             timestamp TIMESTAMP
         )''')
+        self._migrate(conn)
         conn.commit()
-        conn.close()
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {number}')
 
     def store_message(self, session_id: str, role: str, content: str, metadata: Optional[dict] = None) -> None:
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''INSERT INTO messages (session_id, role, content, timestamp, metadata)
-                     VALUES (?, ?, ?, ?, ?)''',
-                  (session_id, role, content, datetime.datetime.now().isoformat(), json.dumps(metadata) if metadata else None))
-        c.execute('''UPDATE sessions SET last_activity = ? WHERE session_id = ?''', (datetime.datetime.now().isoformat(), session_id))
-        conn.commit()
-        conn.close()
+        row = (session_id, role, content, datetime.datetime.now().isoformat(), json.dumps(metadata) if metadata else None)
+        self._enqueue(INSERT_MESSAGE, row)
 
-    def get_history(self, session_id: str) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''SELECT role, content, timestamp, metadata FROM messages WHERE session_id = ? ORDER BY timestamp ASC''', (session_id,))
-        rows = c.fetchall()
+    def log_tool_execution(self, session_id: Optional[str], tool_name: str, parameters: str, result: str,
+                           success: bool, duration_ms: float, result_size: int, cached: bool = False) -> None:
+        """Queues a tool_executions row; it is committed with the next batch of messages."""
+        row = (session_id, tool_name, parameters, result, datetime.datetime.now().isoformat(), success,
+               duration_ms, result_size, cached)
+        self._enqueue(INSERT_TOOL_EXECUTION, row)
+
+    def _enqueue(self, sql: str, row: tuple) -> None:
+        if not self.batch_writes:
+            self._write_batch([(sql, row)])
+            return
+        with self._lock:
+            self._pending += 1
+            self._queue.put((sql, row))
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name='memory-writer', daemon=True)
+                self._writer.start()
+
+    def _write_batch(self, items: List[Tuple[str, tuple]]) -> None:
+        """Inserts queued rows and touches each messaged session once, in one transaction."""
+        grouped: Dict[str, List[tuple]] = {}
+        for sql, row in items:
+            grouped.setdefault(sql, []).append(row)
+        touched = {row[0]: row[3] for row in grouped.get(INSERT_MESSAGE, [])}
+        conn = self._conn()
+        with conn:
+            for sql, rows in grouped.items():
+                conn.executemany(sql, rows)
+            conn.executemany(TOUCH_SESSION, [(timestamp, session_id) for session_id, timestamp in touched.items()])
+
+    def _write_loop(self) -> None:
+        """Writer thread: commits queued rows in batches until close() queues None or it idles."""
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout_s)
+            except queue.Empty:
+                with self._lock:
+                    # Checked under the lock store_message queues with, so no message is stranded
+                    if self._queue.empty():
+                        self._writer = None
+                        self._drop_connection()
+                        return
+                continue
+            rows, markers, stop = [], [], False
+            deadline = time.monotonic() + self.batch_window_s
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    # A flush() is waiting: commit now rather than at the end of the window
+                    markers.append(item)
+                    break
+                rows.append(item)
+                if len(rows) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if rows:
+                try:
+                    self._write_batch(rows)
+                except sqlite3.Error as e:
+                    print(f"[Memory] Failed to store {len(rows)} rows: {e}")
+                with self._lock:
+                    self._pending -= len(rows)
+            for marker in markers:
+                marker.set()
+            if stop:
+                with self._lock:
+                    self._drop_connection()
+                return
+
+    def _drop_connection(self) -> None:
+        """Closes the calling thread's connection."""
+        holder = getattr(self._local, 'holder', None)
+        if holder is not None:
+            self._local.holder = None
+            self._release(holder.conn)
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        """Forgets and closes a connection; safe to call more than once."""
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
         conn.close()
+
+    def flush(self) -> None:
+        """Blocks until every message queued so far is committed."""
+        if self._pending == 0:
+            return
+        marker = threading.Event()
+        self._queue.put(marker)
+        marker.wait()
+
+    def close(self) -> None:
+        """Commits queued rows, stops the writer thread and closes every connection."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._queue.put(None)
+        if writer is not None:
+            writer.join()
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        self.flush()
+        return self._conn().execute(sql, params).fetchall()
+
+    def _execute(self, *statements: Tuple[str, tuple]) -> None:
+        """Runs write statements in one transaction, after any queued messages."""
+        self.flush()
+        conn = self._conn()
+        with conn:
+            for sql, params in statements:
+                conn.execute(sql, params)
+
+    def get_history(self, session_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """Messages of a session, oldest first; with limit, only the most recent `limit` of them.
+
+        Reads the whole session unless limited; prefer get_recent or iter_history.
+        """
+        if limit is not None:
+            return [{k: m[k] for k in ('role', 'content', 'timestamp', 'metadata')}
+                    for m in self.get_recent(session_id, limit)]
+        rows = self._query(SELECT_HISTORY, (session_id,))
         return [{'role': r, 'content': c, 'timestamp': t, 'metadata': m} for r, c, t, m in rows]
 
+    def get_recent(self, session_id: str, n: int) -> List[Dict]:
+        """The last n messages of a session, oldest first, including their ids.
+
+        Args:
+            session_id (str): Conversation session ID.
+            n (int): Number of messages.
+
+        Returns:
+            List[Dict]: Messages with id, role, content, timestamp and metadata.
+        """
+        rows = self._query(SELECT_RECENT, (session_id, n))[::-1]
+        return [{'id': i, 'role': r, 'content': c, 'timestamp': t, 'metadata': m} for i, r, c, t, m in rows]
+
+    def iter_history(self, session_id: str, page_size: int = 500,
+                     after: Optional[Tuple[str, int]] = None) -> Iterator[Dict]:
+        """Streams the messages of a session, oldest first, one page per query.
+
+        Pages are keyset-paginated on (timestamp, id), so each is an index range scan however deep
+        into the history it starts, and messages stored while iterating are picked up at the end.
+
+        Args:
+            session_id (str): Conversation session ID.
+            page_size (int): Rows fetched per query.
+            after (Tuple[str, int], optional): (timestamp, id) of the last message already seen.
+
+        Yields:
+            Dict: Messages with id, role, content, timestamp and metadata.
+        """
+        timestamp, last_id = after or ('', 0)
+        while True:
+            rows = self._query(SELECT_PAGE, (session_id, timestamp, last_id, page_size))
+            for i, r, c, t, m in rows:
+                yield {'id': i, 'role': r, 'content': c, 'timestamp': t, 'metadata': m}
+            if len(rows) < page_size:
+                return
+            timestamp, last_id = rows[-1][3], rows[-1][0]
+
+    def get_messages_since(self, session_id: str, after_id: int = 0) -> List[Dict]:
+        """Messages of a session with an id above after_id, oldest first, including their ids."""
+        rows = self._query(SELECT_SINCE, (session_id, after_id))
+        return [{'id': i, 'role': r, 'content': c, 'timestamp': t, 'metadata': m} for i, r, c, t, m in rows]
+
+    def get_messages_after(self, after_id: int = 0, limit: int = 500) -> List[Dict]:
+        """Messages of every session with an id above after_id, oldest first (for incremental indexing)."""
+        rows = self._query(SELECT_AFTER, (after_id, limit))
+        return [{'id': i, 'session_id': s, 'role': r, 'content': c, 'timestamp': t} for i, s, r, c, t in rows]
+
+    def get_tool_executions(self, limit: int = 10000) -> List[Dict]:
+        """The most recent timed tool executions, newest first."""
+        rows = self._query(SELECT_TOOL_EXECUTIONS, (limit,))
+        return [{'tool_name': t, 'duration_ms': d, 'success': bool(s), 'cached': bool(c)} for t, d, s, c in rows]
+
+    def store_embeddings(self, rows: List[tuple]) -> None:
+        """Stores context_embeddings rows in one transaction.
+
+        Args:
+            rows (List[tuple]): (session_id, content_hash, embedding blob, timestamp, message_id,
+                source, content, model) per vector.
+        """
+        self.flush()
+        conn = self._conn()
+        with conn:
+            conn.executemany(INSERT_EMBEDDING, rows)
+
+    def load_embeddings(self, model: str, after_id: int = 0) -> List[tuple]:
+        """context_embeddings rows computed by `model` with an id above after_id, oldest first.
+
+        Returns:
+            List[tuple]: (id, session_id, message_id, source, content, timestamp, embedding blob).
+        """
+        return self._query(SELECT_EMBEDDINGS, (model, after_id))
+
+    def get_plan_templates(self) -> List[Dict]:
+        """Every stored plan template, with its plan as a dict and its use counts."""
+        rows = self._query(SELECT_PLAN_TEMPLATES, ())
+        return [{'template': t, 'plan': json.loads(p), 'slots': n, 'uses': u, 'successes': s, 'failures': f}
+                for t, p, n, u, s, f in rows]
+
+    def save_plan_template(self, template: str, plan: Dict, slots: int) -> None:
+        """Stores a plan that ran successfully under its query template (replacing an older one)."""
+        now = datetime.datetime.now().isoformat()
+        self._execute((SAVE_PLAN_TEMPLATE, (template, json.dumps(plan), slots, now, now)))
+
+    def record_plan_use(self, template: str, success: bool) -> None:
+        """Counts a reuse of a stored plan template and whether it succeeded."""
+        self._execute((RECORD_PLAN_USE, (int(success), int(not success), datetime.datetime.now().isoformat(), template)))
+
+    def search(self, query: str, session_id: Optional[str] = None, limit: int = 10,
+               window: int = 2000) -> List[Dict]:
+        """Full-text search over message content, best match first.
+
+        The query is free text: its words (minus SEARCH_STOPWORDS) are matched in any order, with
+        stemming, and ranked by BM25, so rarer words weigh more. BM25 costs time per matching
+        message, so only the `window` most recent matches are ranked; a word found in most of a
+        multi-million-message history still answers in milliseconds.
+
+        Args:
+            query (str): Words to look for.
+            session_id (str, optional): Only search this session; all sessions by default.
+            limit (int): Maximum number of results.
+            window (int): Most recent matching messages that are ranked.
+
+        Returns:
+            List[Dict]: id, session_id, role, timestamp, snippet (matches in [brackets]) and score
+            (BM25, lower is better).
+        """
+        words = [w for w in re.findall(r'\w+', query.lower()) if w not in SEARCH_STOPWORDS]
+        if not words:
+            return []
+        match = '(' + ' OR '.join(f'"{w}"' for w in dict.fromkeys(words)) + ')'
+        if session_id is None:
+            floor = self._query(SEARCH_FLOOR, (match, window - 1))
+            rows = self._query(SEARCH_MESSAGES, (match, floor[0][0] if floor else 0, limit))
+        else:
+            match = 'session_id : "{}" AND {}'.format(session_id.replace('"', '""'), match)
+            floor = self._query(SEARCH_FLOOR_SESSION, (match, session_id, window - 1))
+            rows = self._query(SEARCH_SESSION_MESSAGES, (match, session_id, floor[0][0] if floor else 0, limit))
+        return [{'id': i, 'session_id': s, 'role': r, 'timestamp': t, 'snippet': snippet, 'score': score}
+                for i, s, r, t, snippet, score in rows]
+
+    def get_summary(self, session_id: str) -> Tuple[str, int]:
+        """Returns the rolling summary of a session and the id of the last message it covers."""
+        rows = self._query(SELECT_SUMMARY, (session_id,))
+        return (rows[0][0] or '', rows[0][1] or 0) if rows else ('', 0)
+
+    def set_summary(self, session_id: str, summary: str, upto_id: int) -> None:
+        """Stores the rolling summary of a session, covering messages up to and including upto_id."""
+        now = datetime.datetime.now().isoformat()
+        self._execute((INSERT_SESSION, (session_id, now, now, None)),
+                      (UPDATE_SUMMARY, (summary, upto_id, session_id)))
+
     def create_session(self, session_id: str, session_name: Optional[str] = None) -> None:
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''INSERT OR IGNORE INTO sessions (session_id, created_at, last_activity, session_name) VALUES (?, ?, ?, ?)''',
-                  (session_id, datetime.datetime.now().isoformat(), datetime.datetime.now().isoformat(), session_name))
-        conn.commit()
-        conn.close()
+        now = datetime.datetime.now().isoformat()
+        self._execute((INSERT_SESSION, (session_id, now, now, session_name)))
 
     def set_session_name(self, session_id: str, session_name: str) -> None:
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''UPDATE sessions SET session_name = ? WHERE session_id = ?''', (session_name, session_id))
-        conn.commit()
-        conn.close()
+        self._execute((UPDATE_NAME, (session_name, session_id)))
 
     def summarize_session(self, session_id: str) -> str:
-        """Summarize a long conversation for context window management."""
-        history = self.get_history(session_id)
+        """Summarize a long conversation for context window management.
+
+        The stored context_summary is the rolling summary kept by ContextBuilder, so this quick
+        summary is only returned, not saved.
+        """
+        history = self.get_recent(session_id, 10)
         # Simple summary: join last 10 messages
-        summary = '\n'.join([f"{m['role']}: {m['content']}" for m in history[-10:]])
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''UPDATE sessions SET context_summary = ? WHERE session_id = ?''', (summary, session_id))
-        conn.commit()
-        conn.close()
-        return summary
+        return '\n'.join([f"{m['role']}: {m['content']}" for m in history])
 
     def get_context_window(self, session_id: str, max_messages: int = 10) -> str:
         """Get recent conversation context for LLM input."""
-        history = self.get_history(session_id)
-        recent_messages = history[-max_messages:]
+        recent_messages = self.get_recent(session_id, max_messages)
         return '\n'.join([f"{m['role']}: {m['content']}" for m in recent_messages])
 
     def clear_session(self, session_id: str) -> None:
         """Clear all messages for a session."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''DELETE FROM messages WHERE session_id = ?''', (session_id,))
-        conn.commit()
-        conn.close()
+        self._execute((DELETE_MESSAGES, (session_id,)), (RESET_SUMMARY, (session_id,)))
 
     def get_session_info(self, session_id: str) -> Optional[Dict]:
         """Get session information."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''SELECT session_id, created_at, last_activity, session_name FROM sessions WHERE session_id = ?''', (session_id,))
-        row = c.fetchone()
-        conn.close()
-        if row:
+        rows = self._query(SELECT_SESSION, (session_id,))
+        if rows:
+            row = rows[0]
             return {
                 'session_id': row[0],
                 'created_at': row[1],
@@ -3,16 +3,92 @@ plan_executor.py
 
 PlanExecutor: Hierarchical task planning and execution using LLM.
 """
-from typing import List, Dict
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, List, Dict, Optional
 import json
+import os
 import threading
+import time
+from orchestrator.plan_scheduler import PlanValidationError, build_graph, critical_path, substitute
+from orchestrator.tool_executor import ToolExecutor
+from utils.json_extractor import PLAN_SCHEMA, JSONExtractionError, extract_json
+
+# Tools whose work is CPU-bound Python (PDF text extraction); they run in worker processes so
+# they neither hold the GIL against the assistant nor queue behind I/O-bound steps
+PROCESS_TOOLS = ('summarize_pdf',)
+TOOL_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+PROCESS_WORKERS = 2
+
+_pools: Dict[str, Any] = {}
+_pools_lock = threading.Lock()
+
+
+def shared_thread_pool() -> ThreadPoolExecutor:
+    """The process-wide pool for I/O-bound plan steps, created on first use."""
+    with _pools_lock:
+        if 'threads' not in _pools:
+            _pools['threads'] = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix='plan-step')
+        return _pools['threads']
+
+
+def shared_process_pool() -> ProcessPoolExecutor:
+    """The process-wide pool for CPU-bound plan steps, created on first use."""
+    with _pools_lock:
+        if 'processes' not in _pools:
+            _pools['processes'] = ProcessPoolExecutor(max_workers=PROCESS_WORKERS)
+        return _pools['processes']
+
+
+def _call(function: Callable, parameters: Dict) -> Any:
+    """Runs a tool in a worker process (module level so it can be pickled)."""
+    return function(**parameters)
+
 
 class PlanExecutor:
-    """Executes complex tasks using hierarchical planning."""
-    def __init__(self, llm_brain, openrouter_client):
-        """Initialize PlanExecutor with LLM brain and client."""
+    """Executes complex tasks using hierarchical planning.
+
+    Steps are scheduled by their dependencies (see plan_scheduler): each starts as soon as the
+    steps it depends on finish and receives their outputs through {{step_N.output}} placeholders.
+    Tool steps are dispatched through a ToolExecutor on a shared, bounded thread pool (CPU-bound
+    tools in PROCESS_TOOLS go on to a process pool). Each step has a timeout, a running plan can be
+    cancelled, and every result records its status, start offset and duration. With a plan store,
+    queries shaped like an earlier successful one reuse its plan instead of asking the LLM.
+
+    Methods:
+        create_and_execute_plan(complex_query, session_id) -> str: Plans, runs and summarizes.
+        cancel(): Stops the running plan; steps not yet started are skipped.
+
+    Attributes:
+        last_report (Dict): wall_ms, busy_ms, critical_path and critical_path_ms of the last run.
+    """
+    PLAN_HISTORY_TURNS = 6  # recent messages shown to the planner
+
+    def __init__(self, llm_brain, openrouter_client, async_client=None, tool_executor=None,
+                 step_timeout_s: float = 60.0, process_tools=PROCESS_TOOLS, plan_store=None):
+        """Initialize PlanExecutor with LLM brain and client.
+
+        Args:
+            llm_brain: LLMBrain used for context.
+            openrouter_client: LLM client for plan generation.
+            async_client (optional): Client with gather_queries (e.g. AsyncOpenRouterClient) so the
+                llm_query steps of a parallel group are sent concurrently.
+            tool_executor (ToolExecutor, optional): Runs tool and function steps by name; defaults
+                to one over the actions registry, without logging.
+            step_timeout_s (float): Default time limit per step; a step may set its own "timeout_s".
+            process_tools (tuple): Tools run in the process pool.
+            plan_store (PlanStore, optional): Templates of earlier successful plans, tried before
+                asking the LLM for a new plan.
+        """
         self.brain = llm_brain
         self.llm = openrouter_client
+        self.async_llm = async_client
+        self.tools = tool_executor or ToolExecutor()
+        self.step_timeout_s = step_timeout_s
+        self.process_tools = set(process_tools)
+        self.plan_store = plan_store
+        self._cancelled = threading.Event()
+        self.last_report: Optional[Dict] = None
 
     def create_and_execute_plan(self, complex_query: str, session_id: str) -> str:
         """Create a plan for complex queries and execute it.
@@ -24,22 +100,62 @@ class PlanExecutor:
         Returns:
             str: Aggregated results from plan execution.
         """
-        plan = self._generate_plan(complex_query, session_id)
+        hit = self.plan_store.lookup(complex_query) if self.plan_store is not None else None
+        if hit is not None and self._is_runnable(hit['plan']):
+            print(f"[PlanExecutor] Reusing plan template: {hit['template']}")
+            plan = hit['plan']
+        else:
+            hit = None
+            try:
+                plan = self._generate_plan(complex_query, session_id)
+            except JSONExtractionError as e:
+                print(f"[PlanExecutor] Unusable plan from the LLM: {e}")
+                return "I couldn't work out a plan for that request."
         results = self._execute_plan(plan, session_id)
+        if self.plan_store is not None:
+            succeeded = bool(results) and all(r['status'] == 'ok' for r in results)
+            if hit is not None:
+                self.plan_store.record_use(hit['template'], succeeded)
+            elif succeeded:
+                self.plan_store.promote(complex_query, plan)
         return self._aggregate_results(results)
 
+    def _is_runnable(self, plan: Dict) -> bool:
+        """Whether a plan is a valid graph whose tool steps all name registered tools."""
+        try:
+            steps, _ = build_graph(plan)
+        except PlanValidationError:
+            return False
+        return bool(steps) and all(step.get('action') == 'llm_query' or self.tools.has_tool(step.get('target'))
+                                   for step in steps.values())
+
     def _generate_plan(self, query: str, session_id: str) -> Dict:
-        """Generate step-by-step plan for complex query using LLM."""
+        """Generate step-by-step plan for complex query using LLM.
+
+        Raises:
+            JSONExtractionError: If the reply holds no plan matching PLAN_SCHEMA.
+        """
         context = self.brain._build_context(session_id)
+        # Only what the planner needs, compact: tools, functions and the last few turns
+        planning_context = {
+            'tools': context.get('available_tools', {}),
+            'functions': context.get('available_functions', {}),
+            'history': [{'role': m['role'], 'content': m['content']}
+                        for m in context.get('conversation_history', [])[-self.PLAN_HISTORY_TURNS:]],
+        }
+        if context.get('conversation_summary'):
+            planning_context['summary'] = context['conversation_summary']
         plan_prompt = f"""
 You are a task planner. The user has a complex request: \"{query}\"
 
-CONTEXT: {json.dumps(context, indent=2)}
+CONTEXT: {json.dumps(planning_context, separators=(',', ':'), default=str)}
 
 Create a detailed step-by-step plan. For each step, specify:
-- Whether it can be executed in parallel with other steps
+- The step_ids it needs to finish first (depends_on); steps without dependencies start at once
 - The exact tool/function to use
-- Required parameters
+- Required parameters; "{{{{step_N.output}}}}" in a parameter is replaced by the output of step N
+Steps that only need the language model (drafting, summarising, answering) use action "llm_query"
+with parameters {{"prompt": "..."}}.
 
 Return JSON format:
 {{
@@ -47,61 +163,195 @@ Return JSON format:
         {{
             "step_id": 1,
             "description": "What this step does",
-            "action": "tool_call|function_call",
+            "action": "tool_call|function_call|llm_query",
             "target": "tool_name|function_name",
             "parameters": {{...}},
-            "parallel": false,
             "depends_on": []
         }}
-    ],
-    "parallel_groups": [[1, 2], [3], [4, 5]]
+    ]
 }}
 """
         response = self.llm.query(plan_prompt)
-        return json.loads(response)
+        return extract_json(response, PLAN_SCHEMA)
+
+    def cancel(self) -> None:
+        """Cancels the running plan: queued steps are dropped and no further steps start."""
+        self._cancelled.set()
+
+    def _step_result(self, step: Dict, output: Any, status: str, started: float, finished: float,
+                     plan_start: float) -> Dict:
+        return {
+            'step_id': step.get('step_id'),
+            'description': step.get('description', ''),
+            'action': step.get('action'),
+            'target': step.get('target'),
+            'parameters': step.get('parameters', {}),
+            'output': output,
+            'status': status,
+            'started_ms': 1000 * (started - plan_start),
+            'duration_ms': 1000 * (finished - started),
+        }
+
+    def _run_tool(self, step: Dict, session_id: str, deadline: float) -> Any:
+        """Runs one tool or function step; called on a pool thread."""
+        if self._cancelled.is_set():
+            raise CancelledError()
+        target = step.get('target')
+        run = None
+        if target in self.process_tools:
+            def run(function, parameters):
+                future = shared_process_pool().submit(_call, function, parameters)
+                try:
+                    return future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeout:
+                    future.cancel()
+                    raise
+        # Confirmed with the plan; the path guard still checks the parameters filled in at run time
+        return self.tools.execute(target, step.get('parameters') or {}, session_id, run=run, confirmed=True)
+
+    def _submit(self, step: Dict, session_id: str) -> Dict:
+        """Starts a tool step on the shared pool and returns its future, deadline and start time."""
+        started = time.monotonic()
+        deadline = started + float(step.get('timeout_s') or self.step_timeout_s)
+        future = shared_thread_pool().submit(self._run_tool, step, session_id, deadline)
+        return {'future': future, 'deadline': deadline, 'started': started, 'steps': [step]}
+
+    def _submit_llm(self, steps: List[Dict]) -> Dict:
+        """Sends the prompts of llm_query steps that became ready together as one batch, on the pool."""
+        started = time.monotonic()
+        deadline = started + max(float(step.get('timeout_s') or self.step_timeout_s) for step in steps)
+        prompts = [step.get('parameters', {}).get('prompt', step.get('description', '')) for step in steps]
+        future = shared_thread_pool().submit(self._query_batch, prompts)
+        return {'future': future, 'deadline': deadline, 'started': started, 'steps': steps}
+
+    def _outcomes(self, pending: Dict) -> List:
+        """(output, status) for each step of a finished submission."""
+        future: Future = pending['future']
+        count = len(pending['steps'])
+        try:
+            output = future.result(timeout=0)
+        except CancelledError:
+            return [("Cancelled", 'cancelled')] * count
+        except Exception as e:
+            return [(f"Error: {e}", 'error')] * count
+        if pending['steps'][0].get('action') != 'llm_query':
+            return [(output, 'ok')]
+        return [(f"Error: {answer}", 'error') if isinstance(answer, Exception) else (answer, 'ok')
+                for answer in output]
 
     def _execute_plan(self, plan: Dict, session_id: str) -> List[Dict]:
-        """Execute plan steps sequentially or in parallel.
+        """Execute plan steps as a dependency graph: each step starts once the steps it depends on finish.
+
+        Outputs of finished steps are substituted into the {{step_N.output}} placeholders of later
+        steps; steps downstream of a failed step are skipped. The critical path of the run is kept in
+        last_report. A plan with side-effect tool steps runs only if the user allows them all at once.
 
         Args:
-            plan (Dict): The plan dictionary with steps and parallel groups.
+            plan (Dict): The plan dictionary with steps (and depends_on or parallel_groups).
             session_id (str): Conversation session ID.
 
         Returns:
-            List[Dict]: List of step results.
+            List[Dict]: List of step results, with status, started_ms and duration_ms.
         """
-        steps = {step['step_id']: step for step in plan.get('steps', [])}
-        results = {}
-
-        def run_step(step):
-            # Stub: Replace with actual tool/function dispatch
-            result = {
-                'step_id': step['step_id'],
-                'description': step['description'],
-                'action': step['action'],
-                'target': step['target'],
-                'parameters': step['parameters'],
-                'output': f"Executed {step['action']}:{step['target']} with {step['parameters']}"
-            }
-            return result
-
-        for group in plan.get('parallel_groups', []):
-            threads = []
-            group_results = [None] * len(group)
-            def make_thread(idx, step_id):
-                def target():
-                    group_results[idx] = run_step(steps[step_id])
-                return threading.Thread(target=target)
-            for idx, step_id in enumerate(group):
-                t = make_thread(idx, step_id)
-                threads.append(t)
-                t.start()
-            for t in threads:
-                t.join()
-            for idx, step_id in enumerate(group):
-                results[step_id] = group_results[idx]
+        self._cancelled.clear()
+        self.last_report = None
+        plan_start = time.monotonic()
+        try:
+            steps, deps = build_graph(plan)
+        except PlanValidationError as e:
+            print(f"[PlanExecutor] Invalid plan: {e}")
+            return [self._step_result(step, f"Error: invalid plan: {e}", 'invalid', plan_start, plan_start, plan_start)
+                    for step in plan.get('steps', [])]
+        # Steps that change something are confirmed once, up front, rather than one prompt per pool thread
+        side_effects = [step for step in steps.values()
+                        if step.get('action') != 'llm_query' and self.tools.has_tool(step.get('target'))
+                        and not self.tools.is_read_only(step.get('target'))]
+        if side_effects and not self.tools.confirm_calls([(step.get('target'), step.get('parameters') or {})
+                                                          for step in side_effects]):
+            print(f"[PlanExecutor] Plan not confirmed ({len(side_effects)} steps with side effects)")
+            return [self._step_result(step, "Declined: not confirmed", 'declined', plan_start, plan_start, plan_start)
+                    for step in steps.values()]
+        waiting = {step_id: set(d) for step_id, d in deps.items()}
+        outputs: Dict[str, Any] = {}
+        results: Dict[Any, Dict] = {}
+        running: List[Dict] = []
+
+        def finish(step, output, status, started, finished):
+            results[step['step_id']] = self._step_result(step, output, status, started, finished, plan_start)
+            if status == 'ok':
+                outputs[str(step['step_id'])] = output
+
+        while waiting or running:
+            now = time.monotonic()
+            finished_before = len(results)
+            ready = []
+            for step_id in [s for s, unmet in waiting.items() if unmet <= results.keys()]:
+                unmet = waiting.pop(step_id)
+                failed = sorted((d for d in unmet if results[d]['status'] != 'ok'), key=str)
+                if self._cancelled.is_set():
+                    finish(steps[step_id], "Cancelled", 'cancelled', now, now)
+                elif failed:
+                    finish(steps[step_id], f"Skipped: depends on step {failed[0]} ({results[failed[0]]['status']})",
+                           'skipped', now, now)
+                else:
+                    ready.append(dict(steps[step_id], parameters=substitute(steps[step_id].get('parameters') or {}, outputs)))
+            # LLM steps that became ready together go out as one batch; tool steps go to the pool one by one
+            llm_steps = [step for step in ready if step.get('action') == 'llm_query']
+            if llm_steps:
+                running.append(self._submit_llm(llm_steps))
+            running.extend(self._submit(step, session_id) for step in ready if step.get('action') != 'llm_query')
+            if not running:
+                # Skipped or cancelled steps may have released others; otherwise nothing is left
+                if len(results) > finished_before:
+                    continue
+                break
+            done, _ = wait([p['future'] for p in running], return_when=FIRST_COMPLETED,
+                           timeout=max(0.0, min(p['deadline'] for p in running) - time.monotonic()))
+            now = time.monotonic()
+            still_running = []
+            for pending in running:
+                if pending['future'] in done:
+                    for step, (output, status) in zip(pending['steps'], self._outcomes(pending)):
+                        finish(step, output, status, pending['started'], now)
+                elif now >= pending['deadline']:
+                    # A thread cannot be interrupted; a started step finishes in the background, unused
+                    pending['future'].cancel()
+                    for step in pending['steps']:
+                        finish(step, f"Error: timed out after {pending['deadline'] - pending['started']:.0f}s",
+                               'timeout', pending['started'], now)
+                else:
+                    still_running.append(pending)
+            running = still_running
+
+        path, path_ms = critical_path(deps, {step_id: r['duration_ms'] for step_id, r in results.items()})
+        self.last_report = {
+            'wall_ms': 1000 * (time.monotonic() - plan_start),
+            'busy_ms': sum(r['duration_ms'] for r in results.values()),
+            'critical_path': path,
+            'critical_path_ms': path_ms,
+        }
+        if results:
+            print(f"[PlanExecutor] {len(results)} steps in {self.last_report['wall_ms']:.0f} ms; critical path "
+                  f"{' -> '.join(map(str, path))} ({path_ms:.0f} ms)")
         # Return results in step order
-        return [results[step['step_id']] for step in plan.get('steps', []) if step['step_id'] in results]
+        return [results[step_id] for step_id in steps if step_id in results]
+
+    def _query_batch(self, prompts: List[str]) -> List:
+        """Sends prompts concurrently when an async client is available, else one after another.
+
+        Returns:
+            List: One response or exception per prompt, in order.
+        """
+        gather = getattr(self.async_llm, 'gather_queries', None)
+        if gather is not None:
+            return gather(prompts, return_exceptions=True)
+        answers = []
+        for prompt in prompts:
+            try:
+                answers.append(self.llm.query(prompt))
+            except Exception as e:
+                answers.append(e)
+        return answers
 
     def _aggregate_results(self, results: List[Dict]) -> str:
         """Aggregate results from plan execution.
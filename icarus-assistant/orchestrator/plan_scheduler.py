@@ -0,0 +1,153 @@
+"""
+plan_scheduler.py
+
+Plan validation, dependency graph, output substitution and critical-path analysis for PlanExecutor.
+"""
+
+import re
+from typing import Any, Dict, List, Set, Tuple
+
+# "{{step_3.output}}" in a step's parameters is replaced by step 3's output
+_PLACEHOLDER = re.compile(r'\{\{\s*step_(\w+)\.output\s*\}\}')
+
+
+class PlanValidationError(ValueError):
+    """Raised for plans with duplicate ids, references to missing steps or dependency cycles."""
+
+
+def _placeholder_refs(value: Any) -> Set[str]:
+    if isinstance(value, str):
+        return set(_PLACEHOLDER.findall(value))
+    if isinstance(value, dict):
+        return set().union(*(_placeholder_refs(v) for v in value.values())) if value else set()
+    if isinstance(value, (list, tuple)):
+        return set().union(*(_placeholder_refs(v) for v in value)) if value else set()
+    return set()
+
+
+def build_graph(plan: Dict) -> Tuple[Dict[Any, Dict], Dict[Any, Set]]:
+    """Validates a plan and returns its steps and the dependencies of each.
+
+    A step depends on the steps in its depends_on and on any step its parameters reference with
+    {{step_N.output}}. Steps without a depends_on field fall back to the order of parallel_groups:
+    they depend on every step of the previous group, as under the old group-by-group execution.
+
+    Args:
+        plan (Dict): Plan with "steps" and optionally "parallel_groups".
+
+    Returns:
+        Tuple[Dict, Dict]: step_id -> step, and step_id -> set of step_ids it waits for.
+
+    Raises:
+        PlanValidationError: If step ids repeat, a dependency or placeholder names no step, or the
+            dependencies form a cycle.
+    """
+    steps: Dict[Any, Dict] = {}
+    for step in plan.get('steps', []):
+        if 'step_id' not in step:
+            raise PlanValidationError(f"Step without step_id: {step}")
+        if step['step_id'] in steps:
+            raise PlanValidationError(f"Duplicate step_id {step['step_id']}")
+        steps[step['step_id']] = step
+    by_name = {str(step_id): step_id for step_id in steps}
+
+    previous_group: Dict[Any, List] = {}
+    earlier: List = []
+    for group in plan.get('parallel_groups', []):
+        for step_id in group:
+            previous_group.setdefault(step_id, list(earlier))
+        earlier = [step_id for step_id in group if step_id in steps]
+
+    deps: Dict[Any, Set] = {}
+    for step_id, step in steps.items():
+        wanted = step['depends_on'] if 'depends_on' in step else previous_group.get(step_id, [])
+        refs = _placeholder_refs(step.get('parameters', {}))
+        missing = [d for d in wanted if d not in steps] + [r for r in refs if r not in by_name]
+        if missing:
+            raise PlanValidationError(f"Step {step_id} depends on missing step(s) {missing}")
+        deps[step_id] = set(wanted) | {by_name[r] for r in refs}
+        if step_id in deps[step_id]:
+            raise PlanValidationError(f"Step {step_id} depends on itself")
+
+    # Kahn's algorithm: whatever is never released sits on a cycle
+    remaining = {step_id: set(d) for step_id, d in deps.items()}
+    ready = [step_id for step_id, d in remaining.items() if not d]
+    while ready:
+        done = ready.pop()
+        for step_id, d in remaining.items():
+            if done in d:
+                d.discard(done)
+                if not d:
+                    ready.append(step_id)
+        remaining.pop(done)
+    if remaining:
+        raise PlanValidationError(f"Dependency cycle among steps {sorted(remaining, key=str)}")
+    return steps, deps
+
+
+def substitute(value: Any, outputs: Dict[str, Any]) -> Any:
+    """Replaces {{step_N.output}} placeholders with upstream outputs.
+
+    A string that is exactly one placeholder takes the output as is (a list of files stays a list);
+    placeholders inside longer strings are replaced by the output's text.
+
+    Args:
+        value: Parameter value (str, dict, list or other).
+        outputs (Dict[str, Any]): str(step_id) -> output.
+    """
+    if isinstance(value, str):
+        whole = _PLACEHOLDER.fullmatch(value.strip())
+        if whole:
+            return outputs[whole.group(1)]
+        return _PLACEHOLDER.sub(lambda m: str(outputs[m.group(1)]), value)
+    if isinstance(value, dict):
+        return {k: substitute(v, outputs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [substitute(v, outputs) for v in value]
+    return value
+
+
+def critical_path(deps: Dict[Any, Set], durations: Dict[Any, float]) -> Tuple[List, float]:
+    """The chain of dependent steps with the largest total duration.
+
+    Args:
+        deps (Dict): step_id -> step_ids it waits for (from build_graph).
+        durations (Dict): step_id -> duration in ms.
+
+    Returns:
+        Tuple[List, float]: Step ids from first to last, and their summed duration in ms.
+    """
+    finish: Dict[Any, float] = {}
+    via: Dict[Any, Any] = {}
+
+    def longest(step_id):
+        if step_id not in finish:
+            before = max(deps.get(step_id, ()), key=longest, default=None)
+            via[step_id] = before
+            finish[step_id] = (finish[before] if before is not None else 0.0) + durations.get(step_id, 0.0)
+        return finish[step_id]
+
+    if not deps:
+        return [], 0.0
+    last = max(deps, key=longest)
+    path = [last]
+    while via[path[-1]] is not None:
+        path.append(via[path[-1]])
+    return path[::-1], finish[last]
+
+
+def topological_levels(deps: Dict[Any, Set]) -> List[List]:
+    """Groups steps by depth: each level depends only on earlier levels (the old barrier groups)."""
+    level: Dict[Any, int] = {}
+
+    def depth(step_id):
+        if step_id not in level:
+            level[step_id] = 1 + max((depth(d) for d in deps[step_id]), default=-1)
+        return level[step_id]
+
+    levels: List[List] = []
+    for step_id in deps:
+        d = depth(step_id)
+        levels.extend([] for _ in range(d + 1 - len(levels)))
+        levels[d].append(step_id)
+    return levels
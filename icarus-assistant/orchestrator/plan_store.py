@@ -0,0 +1,179 @@
+"""
+plan_store.py
+
+Reuses plans that ran successfully for queries of the same shape, so recurring requests skip the planning LLM call.
+"""
+
+import copy
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from orchestrator.memory_manager import SEARCH_STOPWORDS
+
+_EDGE_PUNCTUATION = re.compile(r'^[\s"\'“”‘’.,!?;:()]+|[\s"\'“”‘’.,!?;:()]+$')
+_STEP_PLACEHOLDER = re.compile(r'\{\{\s*step_\w+\.output\s*\}\}')
+_SLOT = re.compile(r'\{\{slot_(\d+)\}\}')
+_PARAMETER_WORD = re.compile(r'[^\s/\\*?"\'.,;:()\[\]{}]+')
+
+
+def _tokens(query: str) -> List[str]:
+    """Query words without surrounding punctuation, case kept (slot values may be paths)."""
+    return [core for core in (_EDGE_PUNCTUATION.sub('', token) for token in query.split()) if core]
+
+
+def _parameter_words(value: Any, words: Set[str]) -> Set[str]:
+    """Collects string parameter values, and the words and path parts inside them, case-folded."""
+    if isinstance(value, dict):
+        for v in value.values():
+            _parameter_words(v, words)
+    elif isinstance(value, list):
+        for v in value:
+            _parameter_words(v, words)
+    elif isinstance(value, str):
+        text = _STEP_PLACEHOLDER.sub(' ', value)
+        words.add(text.strip().casefold())
+        words.update(word.casefold() for word in _PARAMETER_WORD.findall(text))
+    return words
+
+
+def _replace_in_strings(value: Any, replace) -> Any:
+    if isinstance(value, dict):
+        return {k: _replace_in_strings(v, replace) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_replace_in_strings(v, replace) for v in value]
+    if isinstance(value, str):
+        return replace(value)
+    return value
+
+
+class PlanStore:
+    """Plan templates keyed by the shape of the query, persisted in the memory database.
+
+    When a plan generated for a query runs with every step ok, it is promoted to a template: query
+    words that reappear in tool parameters (a folder, a file pattern, a search term) become slots,
+    in the query and in the plan alike. "summarize every pdf in reports" and "summarize every docx in
+    invoices" then share the template "summarize every {{slot_0}} in {{slot_1}}", and the second
+    query reuses the plan with its own values filled in. Templates that fail more often than they
+    succeed are no longer offered.
+
+    Methods:
+        lookup(query) -> Optional[Dict]: Filled-in plan and template for a matching query, or None.
+        promote(query, plan) -> str: Stores a successful plan under its query's template.
+        record_use(template, success): Counts the outcome of a reused template.
+        stats -> Dict: Hits, misses, promotions and stored templates.
+    """
+    def __init__(self, memory_manager, min_slot_chars: int = 2):
+        """Loads stored templates.
+
+        Args:
+            memory_manager: MemoryManager (get_plan_templates, save_plan_template, record_plan_use).
+            min_slot_chars (int): Shortest query word that can become a slot.
+        """
+        self.memory = memory_manager
+        self.min_slot_chars = min_slot_chars
+        self.hits = 0
+        self.misses = 0
+        self.promoted = 0
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Dict] = {row['template']: row for row in memory_manager.get_plan_templates()}
+
+    def lookup(self, query: str) -> Optional[Dict]:
+        """Finds a template the query fits and fills its slots.
+
+        Of several matching templates the one with the fewest slots (the most specific) wins, then
+        the one with the most successes.
+
+        Returns:
+            Optional[Dict]: {'template', 'plan', 'slots'} with the plan ready to run, or None.
+        """
+        tokens = _tokens(query)
+        folded = [token.casefold() for token in tokens]
+        best = None
+        with self._lock:
+            for row in self._templates.values():
+                if row['failures'] > row['successes']:
+                    continue
+                pattern = row['template'].split(' ')
+                if len(pattern) != len(tokens):
+                    continue
+                slots: Dict[str, str] = {}
+                for expected, token, word in zip(pattern, tokens, folded):
+                    slot = _SLOT.fullmatch(expected)
+                    if slot:
+                        slots.setdefault(slot.group(1), token)
+                        if slots[slot.group(1)] != token:
+                            break
+                    elif expected != word:
+                        break
+                else:
+                    rank = (-row['slots'], row['successes'])
+                    if best is None or rank > best[0]:
+                        best = (rank, row, slots)
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        _, row, slots = best
+        plan = _replace_in_strings(copy.deepcopy(row['plan']), lambda s: _SLOT.sub(lambda m: slots[m.group(1)], s))
+        return {'template': row['template'], 'plan': plan, 'slots': [slots[k] for k in sorted(slots, key=int)]}
+
+    def template_for(self, query: str, plan: Dict):
+        """The query's template and the plan with the same slots put in.
+
+        Returns:
+            Tuple[str, Dict, int]: Template, templated plan and number of slots.
+        """
+        candidates: Set[str] = set()
+        for step in plan.get('steps', []):
+            if step.get('action') != 'llm_query':
+                _parameter_words(step.get('parameters', {}), candidates)
+        pattern, values = [], []
+        for token in _tokens(query):
+            word = token.casefold()
+            if (len(word) >= self.min_slot_chars and word not in SEARCH_STOPWORDS and word in candidates
+                    and '{' not in word):
+                if token not in values:
+                    values.append(token)
+                pattern.append(f"{{{{slot_{values.index(token)}}}}}")
+            else:
+                pattern.append(word)
+        templated = copy.deepcopy(plan)
+        # Longest values first, so "q3.pdf" is replaced before "q3"
+        for value in sorted(values, key=len, reverse=True):
+            word = re.compile(rf'(?<![\w]){re.escape(value)}(?![\w])', re.IGNORECASE)
+            slot = f"{{{{slot_{values.index(value)}}}}}"
+            templated['steps'] = [dict(step, parameters=_replace_in_strings(step.get('parameters', {}),
+                                                                            lambda s: word.sub(slot, s)))
+                                  for step in templated.get('steps', [])]
+        return ' '.join(pattern), templated, len(values)
+
+    def promote(self, query: str, plan: Dict) -> str:
+        """Stores a plan that ran with every step ok as the template for queries shaped like this one.
+
+        Returns:
+            str: The template.
+        """
+        template, templated, slots = self.template_for(query, plan)
+        self.memory.save_plan_template(template, templated, slots)
+        with self._lock:
+            row = self._templates.get(template, {'uses': 0, 'successes': 0, 'failures': 0})
+            self._templates[template] = dict(row, template=template, plan=templated, slots=slots,
+                                             uses=row['uses'] + 1, successes=row['successes'] + 1)
+            self.promoted += 1
+        return template
+
+    def record_use(self, template: str, success: bool) -> None:
+        """Counts the outcome of running a reused template."""
+        self.memory.record_plan_use(template, success)
+        with self._lock:
+            row = self._templates.get(template)
+            if row is not None:
+                row['uses'] += 1
+                row['successes' if success else 'failures'] += 1
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'promoted': self.promoted,
+                    'templates': len(self._templates)}
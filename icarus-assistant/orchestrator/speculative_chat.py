@@ -0,0 +1,130 @@
+"""
+speculative_chat.py
+
+Starts the chat reply while the intent is still being parsed, and keeps it only if the intent turns out to be conversation.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, Optional
+import numpy as np
+
+_DONE = object()
+
+
+class Speculation:
+    """A chat completion streaming into a buffer on a background thread.
+
+    Methods:
+        chunks() -> Iterator[str]: Buffered chunks, then the rest as it arrives.
+        cancel(): Stops reading; the HTTP stream is closed when its next chunk arrives.
+    """
+    def __init__(self, client, prompt: str, system: Optional[str] = None):
+        self.started = time.perf_counter()
+        self.first_chunk_ms: Optional[float] = None
+        self.chars = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._pump, args=(client, prompt, system), name='speculative-chat', daemon=True)
+        self._thread.start()
+
+    def _pump(self, client, prompt: str, system: Optional[str]) -> None:
+        stream = client.query_stream(prompt, system=system)
+        try:
+            for chunk in stream:
+                if self.first_chunk_ms is None:
+                    self.first_chunk_ms = 1000 * (time.perf_counter() - self.started)
+                self.chars += len(chunk)
+                self._queue.put(chunk)
+                if self._cancelled.is_set():
+                    break
+        except Exception as e:
+            # Raised in whoever reads the chunks
+            self._queue.put(e)
+        finally:
+            close = getattr(stream, 'close', None)
+            if close is not None:
+                close()
+            self._queue.put(_DONE)
+
+    def chunks(self) -> Iterator[str]:
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+
+class SpeculativeChat:
+    """Runs a direct chat completion concurrently with intent parsing.
+
+    If the intent is a direct response (or parsing fails), the chat reply is already on its way
+    and is spoken from the stream; if it is a tool, function or plan, the reply is discarded. The
+    time saved on a win is min(intent parse time, chat time to first token): the overlap a serial
+    parse-then-chat flow would have spent waiting.
+
+    Methods:
+        start(prompt, system) -> Speculation: Starts a chat completion in the background.
+        use(speculation, intent_ms) -> Iterator[str]: Takes the reply (a win).
+        discard(speculation): Cancels the reply (a loss).
+        stats -> Dict: Turns, wins, win rate, latency saved and characters discarded.
+    """
+    def __init__(self, client, window: int = 1000):
+        """Initializes the speculator.
+
+        Args:
+            client: Chat client with query_stream(prompt, system=None).
+            window (int): Turns kept for the saved-latency percentiles.
+        """
+        self.client = client
+        self.wins = 0
+        self.losses = 0
+        self.wasted_chars = 0
+        self._saved_ms: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def start(self, prompt: str, system: Optional[str] = None) -> Speculation:
+        """Starts streaming a reply; the prompt should carry the same context the intent parse gets."""
+        return Speculation(self.client, prompt, system)
+
+    def use(self, speculation: Speculation, intent_ms: float) -> Iterator[str]:
+        """Counts a win and returns the reply's chunks; the saving is recorded at the first chunk."""
+        with self._lock:
+            self.wins += 1
+
+        def chunks():
+            recorded = False
+            for chunk in speculation.chunks():
+                if not recorded:
+                    recorded = True
+                    with self._lock:
+                        self._saved_ms.append(min(intent_ms, speculation.first_chunk_ms or 0.0))
+                yield chunk
+        return chunks()
+
+    def discard(self, speculation: Speculation) -> None:
+        speculation.cancel()
+        with self._lock:
+            self.losses += 1
+            self.wasted_chars += speculation.chars
+
+    @property
+    def stats(self) -> Dict:
+        with self._lock:
+            saved = list(self._saved_ms)
+            turns = self.wins + self.losses
+            return {
+                'turns': turns,
+                'wins': self.wins,
+                'win_rate': self.wins / turns if turns else 0.0,
+                'saved_p50_ms': float(np.percentile(saved, 50)) if saved else 0.0,
+                'saved_total_ms': float(sum(saved)),
+                'wasted_chars': self.wasted_chars,
+            }
@@ -0,0 +1,276 @@
+"""
+tool_executor.py
+
+Dispatches tool and function calls by name, caches results of side-effect-free tools and logs every call to tool_executions.
+"""
+
+import importlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from utils.path_guard import is_safe_path
+
+# Tool name -> 'module:attribute'; modules are imported on first use, so optional dependencies of
+# one tool (pyautogui, PyPDF2, psutil) never slow down or break startup
+TOOL_REGISTRY = {
+    'search_files': 'actions.search_files:search_files',
+    'list_files': 'actions.search_files:list_files_in_directory',
+    'get_system_info': 'actions.search_files:get_system_info',
+    'system_tools': 'actions.search_files:get_system_info',
+    'read_file': 'actions.read_file:read_file',
+    'summarize_pdf': 'actions.summarize_pdf:summarize_pdf',
+    'edit_text': 'actions.edit_text:edit_text',
+    'move_files': 'actions.move_files:move_file',
+    'launch_app': 'actions.launch_app:launch_app',
+    'get_current_time': 'actions.system_tools:get_current_time',
+    'get_current_date': 'actions.system_tools:get_current_date',
+    'get_battery_percentage': 'actions.system_tools:get_battery_percentage',
+    'get_cpu_usage': 'actions.system_tools:get_cpu_usage',
+    'get_ram_usage': 'actions.system_tools:get_ram_usage',
+    'get_clipboard': 'actions.system_tools:get_clipboard',
+    'set_clipboard': 'actions.system_tools:set_clipboard',
+    'open_url': 'actions.system_tools:open_url',
+    'get_weather': 'actions.system_tools:get_weather',
+    'get_random_joke': 'actions.system_tools:get_random_joke',
+}
+
+# Tools that only read state. Any other tool changes files, the clipboard, the browser or running
+# apps, so it runs only once the user confirms it and its paths pass the path guard.
+READ_ONLY_TOOLS = frozenset({
+    'search_files', 'list_files', 'get_system_info', 'system_tools', 'read_file', 'summarize_pdf',
+    'get_current_time', 'get_current_date', 'get_battery_percentage', 'get_cpu_usage', 'get_ram_usage',
+    'get_clipboard', 'get_weather', 'get_random_joke',
+})
+
+# Parameters of side-effect tools that name files or folders, checked with utils.path_guard
+PATH_PARAMETERS = {
+    'edit_text': ('file_path',),
+    'move_files': ('src', 'dst'),
+}
+
+# Seconds a result stays valid, for tools that only read state; tools not listed are never cached.
+# Results of tools given file or directory paths are also invalidated when those change. read_file
+# is not listed: it takes the spoken command, not a path, so a cached answer would outlive edits.
+CACHE_TTLS = {
+    'get_system_info': 5,
+    'system_tools': 5,
+    'list_files': 30,
+    'search_files': 60,
+    'summarize_pdf': 86400,
+    'get_weather': 600,
+}
+
+
+def _file_stamps(value: Any) -> Tuple:
+    """(path, mtime_ns, size) for every existing path among the parameter values."""
+    if isinstance(value, dict):
+        return tuple(stamp for v in value.values() for stamp in _file_stamps(v))
+    if isinstance(value, (list, tuple)):
+        return tuple(stamp for v in value for stamp in _file_stamps(v))
+    if isinstance(value, str) and len(value) < 260:
+        try:
+            st = os.stat(value)
+        except (OSError, ValueError):
+            return ()
+        return ((value, st.st_mtime_ns, st.st_size),)
+    return ()
+
+
+class ToolNotAllowedError(PermissionError):
+    """Raised instead of running a side-effect tool that was not confirmed or names an unsafe path."""
+
+
+class ToolExecutor:
+    """Runs tools by name with a result cache and an execution log.
+
+    Every call is timed and written to tool_executions through the memory manager's write queue,
+    so logging never waits on SQLite. Results of tools in `ttls` are cached on (tool, parameters,
+    mtime and size of any files the parameters name) until their TTL expires. With a vector memory,
+    each fresh result is also embedded in the background so later queries can recall it.
+
+    Only read-only tools (READ_ONLY_TOOLS by default) run unattended. Any other tool has its path parameters checked against
+    the allowed folders and needs the user's confirmation, unless the caller already confirmed it
+    (confirm_calls) as PlanExecutor does for a whole plan.
+
+    Methods:
+        execute(tool, parameters, session_id, run, confirmed) -> Any: Runs a tool, or returns its cached result.
+        is_read_only(tool) -> bool: Whether a tool runs without confirmation.
+        confirm_calls(calls) -> bool: Asks the user once to allow a list of side-effect tool calls.
+        report(limit) -> Dict: Calls, errors, cache hits and p50/p95 latency per tool.
+        clear_cache(): Drops all cached results.
+    """
+    def __init__(self, memory_manager=None, registry: Optional[Dict[str, str]] = None,
+                 ttls: Optional[Dict[str, float]] = None, max_entries: int = 256,
+                 result_preview_chars: int = 500, clock: Callable[[], float] = time.monotonic,
+                 vector_memory=None, confirm: Optional[Callable[[str], bool]] = None,
+                 allowed_dirs: Optional[List[str]] = None, read_only: Optional[Iterable[str]] = None):
+        """Initializes the executor.
+
+        Args:
+            memory_manager (optional): MemoryManager (log_tool_execution, get_tool_executions); no
+                logging without one.
+            registry (Dict[str, str], optional): Tool name -> 'module:attribute'; defaults to TOOL_REGISTRY.
+            ttls (Dict[str, float], optional): Cache TTL in seconds per tool; defaults to CACHE_TTLS.
+            max_entries (int): Cached results kept (least recently used are dropped first).
+            result_preview_chars (int): Characters of each result stored in the log.
+            clock (callable): Time source for TTLs.
+            vector_memory (VectorMemory, optional): Receives tool outputs (add_async) for recall.
+            confirm (callable, optional): prompt -> bool, e.g. utils.confirm.confirm_action; without
+                one, tools outside READ_ONLY_TOOLS are refused.
+            allowed_dirs (List[str], optional): Folders side-effect tools may touch; path_guard's
+                defaults if None.
+            read_only (Iterable[str], optional): Tools that run without confirmation; defaults to
+                READ_ONLY_TOOLS.
+        """
+        self.memory = memory_manager
+        self.registry = dict(TOOL_REGISTRY if registry is None else registry)
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.result_preview_chars = result_preview_chars
+        self.clock = clock
+        self.vector_memory = vector_memory
+        self.confirm = confirm
+        self.allowed_dirs = allowed_dirs
+        self.read_only = frozenset(READ_ONLY_TOOLS if read_only is None else read_only)
+        self._functions: Dict[str, Callable] = {}
+        self._cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._confirm_lock = threading.Lock()  # one prompt at a time, e.g. from parallel plan steps
+
+    def has_tool(self, tool: str) -> bool:
+        return tool in self.registry
+
+    def is_read_only(self, tool: str) -> bool:
+        return tool in self.read_only
+
+    def confirm_calls(self, calls: List[Tuple[str, Dict]]) -> bool:
+        """Asks the user once whether the given (tool, parameters) calls may run.
+
+        Returns:
+            bool: True if confirmed; False if declined or there is no confirm callback.
+        """
+        if self.confirm is None:
+            return False
+        listed = '; '.join(f"{tool} {json.dumps(parameters, default=str)}" for tool, parameters in calls)
+        with self._confirm_lock:
+            return bool(self.confirm(f"Allow {listed}?"))
+
+    def _check_paths(self, tool: str, parameters: Dict) -> None:
+        for name in PATH_PARAMETERS.get(tool, ()):
+            value = parameters.get(name)
+            if isinstance(value, str) and not is_safe_path(value, self.allowed_dirs):
+                raise ToolNotAllowedError(f"{tool}: {value} is outside the allowed folders")
+
+    def _resolve(self, tool: str) -> Callable:
+        function = self._functions.get(tool)
+        if function is None:
+            if tool not in self.registry:
+                raise KeyError(f"Unknown tool: {tool}")
+            module_name, attribute = self.registry[tool].split(':')
+            function = getattr(importlib.import_module(module_name), attribute)
+            self._functions[tool] = function
+        return function
+
+    def _cache_key(self, tool: str, parameters: Dict) -> Tuple:
+        return tool, json.dumps(parameters, sort_keys=True, default=str), _file_stamps(parameters)
+
+    def execute(self, tool: str, parameters: Optional[Dict] = None, session_id: Optional[str] = None,
+                run: Optional[Callable[[Callable, Dict], Any]] = None, confirmed: bool = False) -> Any:
+        """Runs a tool, or returns its cached result if it is still valid.
+
+        Args:
+            tool (str): Registered tool or function name.
+            parameters (Dict, optional): Keyword arguments for the tool.
+            session_id (str, optional): Session recorded in the log.
+            run (callable, optional): (function, parameters) -> result, e.g. to run the tool in a
+                process pool; by default it is called directly.
+            confirmed (bool): The user already allowed this call (its paths are still checked).
+
+        Returns:
+            Any: The tool's result.
+
+        Raises:
+            KeyError: If the tool is not registered.
+            ToolNotAllowedError: If a side-effect tool names an unsafe path or is not confirmed.
+            Exception: Whatever the tool raises; the failure is logged first.
+        """
+        parameters = parameters or {}
+        function = self._resolve(tool)
+        start = time.perf_counter()
+        if not self.is_read_only(tool):
+            try:
+                self._check_paths(tool, parameters)
+                if not confirmed and not self.confirm_calls([(tool, parameters)]):
+                    raise ToolNotAllowedError(f"{tool} was not confirmed")
+            except ToolNotAllowedError as e:
+                self._log(session_id, tool, parameters, f"Refused: {e}", False, start)
+                raise
+        ttl = self.ttls.get(tool)
+        key = self._cache_key(tool, parameters) if ttl is not None else None
+        if key is not None:
+            with self._lock:
+                entry = self._cache.get(key)
+                if entry is not None and entry[0] > self.clock():
+                    self._cache.move_to_end(key)
+                    self._log(session_id, tool, parameters, entry[1], True, start, cached=True)
+                    return entry[1]
+        try:
+            result = run(function, parameters) if run is not None else function(**parameters)
+        except Exception as e:
+            self._log(session_id, tool, parameters, f"{type(e).__name__}: {e}", False, start)
+            raise
+        if key is not None:
+            with self._lock:
+                self._cache[key] = (self.clock() + ttl, result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        self._log(session_id, tool, parameters, result, True, start)
+        if self.vector_memory is not None and result is not None:
+            text = result if isinstance(result, str) else json.dumps(result, default=str)
+            self.vector_memory.add_async(session_id, text, tool)
+        return result
+
+    def _log(self, session_id: Optional[str], tool: str, parameters: Dict, result: Any, success: bool,
+             start: float, cached: bool = False) -> None:
+        if self.memory is None:
+            return
+        duration_ms = 1000 * (time.perf_counter() - start)
+        text = result if isinstance(result, str) else json.dumps(result, default=str)
+        self.memory.log_tool_execution(session_id, tool, json.dumps(parameters, default=str),
+                                       text[:self.result_preview_chars], success, duration_ms, len(text), cached)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def report(self, limit: int = 10000) -> Dict[str, Dict]:
+        """Latency per tool over the most recent logged executions.
+
+        Args:
+            limit (int): Executions considered, newest first.
+
+        Returns:
+            Dict[str, Dict]: Per tool: calls, errors, cached (hits), p50_ms and p95_ms of the calls
+            that ran the tool (cache hits are excluded from the percentiles).
+        """
+        if self.memory is None:
+            return {}
+        by_tool: Dict[str, Dict] = {}
+        for row in self.memory.get_tool_executions(limit):
+            stats = by_tool.setdefault(row['tool_name'], {'calls': 0, 'errors': 0, 'cached': 0, 'durations': []})
+            stats['calls'] += 1
+            stats['errors'] += not row['success']
+            if row['cached']:
+                stats['cached'] += 1
+            else:
+                stats['durations'].append(row['duration_ms'])
+        for stats in by_tool.values():
+            durations = stats.pop('durations') or [0.0]
+            stats['p50_ms'] = float(np.percentile(durations, 50))
+            stats['p95_ms'] = float(np.percentile(durations, 95))
+        return dict(sorted(by_tool.items()))
@@ -0,0 +1,230 @@
+"""
+vector_memory.py
+
+Long-term retrieval memory: messages and tool outputs embedded into context_embeddings and searched by cosine top-k.
+"""
+
+import datetime
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+from llm.response_cache import HashedTrigramEmbedder, normalize_prompt
+
+
+class SentenceEmbedder:
+    """Local CPU sentence embeddings from sentence-transformers, L2-normalised.
+
+    Methods:
+        embed(text) -> np.ndarray: One unit vector.
+        embed_batch(texts) -> np.ndarray: One unit vector per row.
+    """
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', device: str = 'cpu'):
+        """Loads the model.
+
+        Args:
+            model_name (str): sentence-transformers model; the small MiniLM models embed a sentence
+                in a few milliseconds on a laptop CPU.
+            device (str): Torch device.
+
+        Raises:
+            ImportError: If sentence-transformers is not installed.
+        """
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device=device)
+        self.name = model_name
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def load_embedder(model_name: str = 'all-MiniLM-L6-v2'):
+    """SentenceEmbedder if sentence-transformers is installed, otherwise hashed trigram vectors."""
+    try:
+        return SentenceEmbedder(model_name)
+    except ImportError:
+        print("[VectorMemory] sentence-transformers not installed; using hashed trigram vectors")
+        return HashedTrigramEmbedder()
+
+
+class VectorMemory:
+    """Embeds conversation messages and tool outputs and retrieves the most similar ones.
+
+    Vectors are stored as packed float32 blobs in context_embeddings (tagged with the embedder that
+    made them) and held in one in-memory matrix, so a query is a single matrix-vector product plus
+    a partial sort. The matrix grows by doubling, so adding vectors never rebuilds the index; sync()
+    embeds only the messages stored since its last call. The *_async variants run on one background
+    worker, so embedding never holds up a request.
+
+    Methods:
+        add(session_id, content, source) -> bool: Embeds and stores one text, e.g. a tool output.
+        add_async(session_id, content, source) -> Future: add() on the background worker.
+        sync() -> int: Indexes messages stored since the last sync.
+        sync_async() -> Future: sync() on the background worker (the startup backfill).
+        search(query, k, session_id, min_score) -> List[Dict]: The k most similar stored texts.
+        stats -> Dict: Vector count and search latency.
+    """
+    def __init__(self, memory_manager, embedder=None, min_chars: int = 12, max_chars: int = 2000):
+        """Loads the stored vectors of this embedder.
+
+        Args:
+            memory_manager: MemoryManager (get_messages_after, store_embeddings, load_embeddings).
+            embedder (optional): Object with embed(text) -> unit np.ndarray and optionally
+                embed_batch(texts); defaults to load_embedder().
+            min_chars (int): Shorter texts ("ok", "thanks") are not indexed.
+            max_chars (int): Longer texts are embedded and stored truncated to this length.
+        """
+        self.memory = memory_manager
+        self.embedder = embedder or load_embedder()
+        self.dim = getattr(self.embedder, 'dim', None) or len(self.embedder.embed('dimension probe'))
+        self.model = f"{getattr(self.embedder, 'name', type(self.embedder).__name__)}:{self.dim}"
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._matrix = np.zeros((1024, self.dim), dtype=np.float32)
+        self._sessions = np.zeros(1024, dtype=np.int32)
+        self._session_codes: Dict[str, int] = {}
+        self._size = 0
+        self._items: List[Dict] = []
+        self._hashes = set()
+        self._last_message_id = 0
+        self._search_ms: List[float] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._load()
+
+    def _load(self) -> None:
+        rows = self.memory.load_embeddings(self.model)
+        if not rows:
+            return
+        vectors = np.frombuffer(b''.join(r[6] for r in rows), dtype=np.float32).reshape(len(rows), self.dim)
+        for _, session_id, message_id, source, content, timestamp, _ in rows:
+            self._items.append({'session_id': session_id, 'message_id': message_id, 'source': source,
+                                'content': content, 'timestamp': timestamp})
+            self._hashes.add((session_id, self._hash(content)))
+            self._last_message_id = max(self._last_message_id, message_id or 0)
+        self._append(vectors, [r[1] for r in rows])
+
+    @staticmethod
+    def _hash(content: str) -> str:
+        return hashlib.sha1(normalize_prompt(content).encode('utf-8')).hexdigest()
+
+    def _append(self, vectors: np.ndarray, session_ids: List[str]) -> None:
+        needed = self._size + len(vectors)
+        if needed > len(self._matrix):
+            capacity = max(needed, 2 * len(self._matrix))
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+            self._sessions = np.resize(self._sessions, capacity)
+        self._matrix[self._size:needed] = vectors
+        # Sessions are kept as integer codes so a session filter is one vectorised comparison
+        self._sessions[self._size:needed] = [self._session_codes.setdefault(s, len(self._session_codes))
+                                             for s in session_ids]
+        self._size = needed
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        batch = getattr(self.embedder, 'embed_batch', None)
+        if batch is not None:
+            return np.asarray(batch(texts), dtype=np.float32)
+        return np.stack([self.embedder.embed(t) for t in texts]).astype(np.float32)
+
+    def _index(self, entries: List[Dict]) -> int:
+        """Embeds and stores entries (session_id, content, source, message_id, timestamp) not seen before."""
+        fresh = []
+        for entry in entries:
+            content = (entry['content'] or '').strip()[:self.max_chars]
+            key = (entry['session_id'], self._hash(content))
+            if len(content) < self.min_chars or key in self._hashes:
+                continue
+            self._hashes.add(key)
+            fresh.append(dict(entry, content=content, content_hash=key[1]))
+        if not fresh:
+            return 0
+        vectors = self._embed([e['content'] for e in fresh])
+        self.memory.store_embeddings([
+            (e['session_id'], e['content_hash'], v.tobytes(), e['timestamp'], e['message_id'], e['source'],
+             e['content'], self.model) for e, v in zip(fresh, vectors)])
+        with self._lock:
+            self._items.extend({k: e[k] for k in ('session_id', 'message_id', 'source', 'content', 'timestamp')}
+                               for e in fresh)
+            self._append(vectors, [e['session_id'] for e in fresh])
+        return len(fresh)
+
+    def add(self, session_id: str, content: str, source: str = 'tool') -> bool:
+        """Embeds and stores a text that is not a conversation message, such as a tool output.
+
+        Returns:
+            bool: False if the text was too short or is already stored for the session.
+        """
+        now = datetime.datetime.now().isoformat()
+        return self._index([{'session_id': session_id, 'content': content, 'source': source,
+                             'message_id': None, 'timestamp': now}]) == 1
+
+    def _submit(self, function, *args) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vector-memory')
+        return self._executor.submit(function, *args)
+
+    def add_async(self, session_id: str, content: str, source: str = 'tool') -> Future:
+        return self._submit(self.add, session_id, content, source)
+
+    def sync_async(self, page_size: int = 500) -> Future:
+        return self._submit(self.sync, page_size)
+
+    def sync(self, page_size: int = 500) -> int:
+        """Indexes the messages stored since the last sync.
+
+        Returns:
+            int: Number of vectors added.
+        """
+        added = 0
+        with self._sync_lock:
+            while True:
+                messages = self.memory.get_messages_after(self._last_message_id, page_size)
+                if not messages:
+                    return added
+                added += self._index([{'session_id': m['session_id'], 'content': m['content'], 'source': m['role'],
+                                       'message_id': m['id'], 'timestamp': m['timestamp']} for m in messages])
+                self._last_message_id = messages[-1]['id']
+
+    def search(self, query: str, k: int = 5, session_id: Optional[str] = None,
+               min_score: float = 0.0) -> List[Dict]:
+        """Returns the stored texts most similar to the query.
+
+        Args:
+            query (str): Text to match.
+            k (int): Maximum number of results.
+            session_id (str, optional): Only search this session; all sessions by default.
+            min_score (float): Minimum cosine similarity.
+
+        Returns:
+            List[Dict]: Best first; session_id, message_id, source, content, timestamp and score.
+        """
+        start = time.perf_counter()
+        q = self._embed([query])[0]
+        with self._lock:
+            scores = self._matrix[:self._size] @ q
+            if session_id is not None:
+                code = self._session_codes.get(session_id, -1)
+                scores = np.where(self._sessions[:self._size] == code, scores, -np.inf)
+            k = min(k, self._size)
+            top = np.argpartition(-scores, k - 1)[:k] if 0 < k < self._size else np.arange(k)
+            top = top[np.argsort(-scores[top])]
+            results = [dict(self._items[i], score=float(scores[i])) for i in top if scores[i] >= min_score]
+        self._search_ms.append(1000 * (time.perf_counter() - start))
+        self._search_ms = self._search_ms[-1000:]
+        return results
+
+    @property
+    def stats(self) -> Dict:
+        latencies = self._search_ms or [0.0]
+        return {'vectors': self._size, 'model': self.model, 'searches': len(self._search_ms),
+                'p50_ms': float(np.percentile(latencies, 50)), 'p95_ms': float(np.percentile(latencies, 95))}
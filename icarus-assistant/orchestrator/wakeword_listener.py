@@ -3,16 +3,62 @@ wakeword_listener.py
 
 Wake-word detection for Icarus Assistant ("Icarus").
 """
-import speech_recognition as sr
-import pyaudio
 import time
 import difflib
+from types import SimpleNamespace
+from typing import Optional
+import numpy as np
+from orchestrator.keyword_spotter import DEFAULT_TEMPLATES, KeywordSpotter
+from utils.mic_stream import MicrophoneStream
+
+ENGINES = ('auto', 'local', 'google')
+
 
 class WakewordListener:
-    """Detects the 'Icarus' wake-word using microphone input."""
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.mic = sr.Microphone()
+    """Detects the 'Icarus' wake-word using microphone input.
+
+    The 'local' engine runs an on-device keyword spotter over the continuous microphone stream and
+    never touches the network. The 'google' engine records whole phrases and sends them to Google
+    speech recognition. 'auto' uses the local engine when enrolled templates exist.
+
+    Methods:
+        listen_for_wakeword(...) -> bool: Blocks until the wake-word is heard or the timeout expires.
+        enroll(count, seconds) -> int: Records keyword examples from the microphone and saves templates.
+    """
+    def __init__(self, engine: str = 'auto', spotter: Optional[KeywordSpotter] = None,
+                 templates_path: str = DEFAULT_TEMPLATES, chunk: int = 1600,
+                 mic_stream: Optional[MicrophoneStream] = None):
+        """Initializes the listener.
+
+        Args:
+            engine (str): 'auto', 'local' or 'google'.
+            spotter (KeywordSpotter, optional): Spotter to use instead of one loaded from templates_path.
+            templates_path (str): Enrolled keyword templates for the local engine.
+            chunk (int): Samples per microphone read for the local engine (1600 = 100 ms).
+            mic_stream (MicrophoneStream, optional): Shared capture stream to listen on instead of
+                opening the microphone for every call.
+        Raises:
+            ValueError: If the engine is unknown.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown wake-word engine '{engine}'. Expected one of {ENGINES}")
+        self.templates_path = templates_path
+        self.chunk = chunk
+        self.rate = 16000
+        self.mic_stream = mic_stream
+        self.spotter = spotter or KeywordSpotter()
+        if not self.spotter.ready and engine != 'google':
+            self.spotter.load(templates_path)
+        if engine == 'local' and not self.spotter.ready:
+            print(f"[WakewordListener] No wake-word templates at {templates_path}; run enroll() first.")
+        self.engine = 'local' if engine == 'local' or (engine == 'auto' and self.spotter.ready) else 'google'
+        self.last_detection = {}
+        self._audio = None
+        self._calibrated = False
+        if self.engine == 'google':
+            import speech_recognition as sr
+            self.recognizer = sr.Recognizer()
+            self.mic = _subscription_source(mic_stream) if mic_stream else sr.Microphone()
 
     def listen_for_wakeword(self, wakeword="icarus", callback=None, phrase_time_limit=3, timeout=10, feedback=True):
         """Listens for the 'Icarus' wake-word or similar-sounding words. Blocks until detected or callback returns True.
@@ -26,11 +72,66 @@ class WakewordListener:
         Returns:
             bool: True if wake-word detected, False if timeout.
         """
-        similar_words = [wakeword,"jarvis", "jar wish", "acer", "acres", "ikarus", "icaros", "eicarus", "ikeros", "akers", "icurus", "ikeras"]
         if feedback:
             print(f"[WakewordListener] Say '{wakeword}' to activate. Listening...")
+        if self.engine == 'local':
+            return self._listen_local(wakeword, callback, timeout, feedback)
+        return self._listen_google(wakeword, callback, phrase_time_limit, timeout, feedback)
+
+    def _open_stream(self):
+        import pyaudio
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+        return self._audio.open(format=pyaudio.paInt16, channels=1, rate=self.rate,
+                                input=True, frames_per_buffer=self.chunk)
+
+    def _listen_local(self, wakeword, callback, timeout, feedback) -> bool:
+        if not self.spotter.ready:
+            raise RuntimeError(f"No wake-word templates at {self.templates_path}")
+        if self.mic_stream is not None:
+            subscription = self.mic_stream.subscribe()
+            read = lambda: subscription.read(timeout=0.5)
+            close = subscription.close
+            origin = subscription.start
+        else:
+            stream = self._open_stream()
+            read = lambda: np.frombuffer(stream.read(self.chunk, exception_on_overflow=False), dtype=np.int16)
+            close = lambda: (stream.stop_stream(), stream.close())
+            origin = None
+        self.spotter.reset()
+        start = time.time()
+        try:
+            while True:
+                if timeout and (time.time() - start) > timeout:
+                    if feedback:
+                        print(f"[WakewordListener] Timeout: No wake-word detected.")
+                    return False
+                samples = read()
+                if samples is None:
+                    continue
+                detection = self.spotter.process(samples)
+                if detection is None:
+                    continue
+                if origin is not None:
+                    # Absolute mic_stream sample where the keyword ended, for the command recorder
+                    detection['end_sample'] = origin + int(detection['end_s'] * self.rate)
+                self.last_detection = detection
+                if feedback:
+                    print(f"[WakewordListener] Wake-word '{wakeword}' detected "
+                          f"(score {detection['score']:.3f})! I'm listening...")
+                if callback is None or callback():
+                    return True
+        finally:
+            close()
+
+    def _listen_google(self, wakeword, callback, phrase_time_limit, timeout, feedback) -> bool:
+        import speech_recognition as sr
+        similar_words = [wakeword,"jarvis", "jar wish", "acer", "acres", "ikarus", "icaros", "eicarus", "ikeros", "akers", "icurus", "ikeras"]
         with self.mic as source:
-            self.recognizer.adjust_for_ambient_noise(source)
+            # The ambient level barely changes between activations, so calibrate once
+            if not self._calibrated:
+                self.recognizer.adjust_for_ambient_noise(source)
+                self._calibrated = True
             start = time.time()
             while True:
                 if timeout and (time.time() - start) > timeout:
@@ -59,4 +160,61 @@ class WakewordListener:
                 except Exception as e:
                     if feedback:
                         print(f"[WakewordListener] Error: {e}")
-                    continue 
\ No newline at end of file
+                    continue
+
+    def enroll(self, count: int = 3, seconds: float = 1.5, wakeword: str = "icarus") -> int:
+        """Records examples of the wake-word and saves them as local templates.
+
+        Args:
+            count (int): Number of examples to record.
+            seconds (float): Recording length per example.
+            wakeword (str): Word to prompt for.
+        Returns:
+            int: Number of templates saved.
+        """
+        stream = self._open_stream()
+        try:
+            for i in range(count):
+                input(f"[WakewordListener] Press Enter, then say '{wakeword}' ({i + 1}/{count})...")
+                reads = int(self.rate * seconds / self.chunk) + 1
+                pcm = b''.join(stream.read(self.chunk, exception_on_overflow=False) for _ in range(reads))
+                try:
+                    self.spotter.enroll(np.frombuffer(pcm, dtype=np.int16))
+                except ValueError as e:
+                    print(f"[WakewordListener] {e}; skipping this example.")
+        finally:
+            stream.stop_stream()
+            stream.close()
+        self.spotter.save(self.templates_path)
+        self.engine = 'local' if self.spotter.ready else self.engine
+        print(f"[WakewordListener] Saved {len(self.spotter.templates)} templates to {self.templates_path}")
+        return len(self.spotter.templates)
+
+
+def _subscription_source(mic_stream: MicrophoneStream):
+    """Wraps a shared mic_stream as a speech_recognition AudioSource, subscribing on enter."""
+    import speech_recognition as sr
+
+    class SubscriptionSource(sr.AudioSource):
+        SAMPLE_RATE = mic_stream.rate
+        SAMPLE_WIDTH = 2
+        CHUNK = 1024
+
+        def __init__(self):
+            self.stream = None
+            self._subscription = None
+
+        def __enter__(self):
+            self._subscription = mic_stream.subscribe()
+            self.stream = SimpleNamespace(read=self._subscription.read_bytes)
+            return self
+
+        def __exit__(self, *exc):
+            self._subscription.close()
+            self.stream = None
+
+    return SubscriptionSource()
+
+
+if __name__ == '__main__':
+    WakewordListener(engine='local').enroll()
@@ -0,0 +1,154 @@
+"""
+model_pool.py
+
+Process-wide Whisper model pool: loads each model once, warms it up and serves concurrent transcriptions.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+BACKENDS = ('openai', 'ctranslate2')
+
+
+class OpenAIWhisperBackend:
+    """Reference openai-whisper (PyTorch) backend.
+
+    whisper installs per-call kv-cache hooks on the model, so calls are serialised with a lock.
+    """
+    def __init__(self, model_size: str, device: Optional[str] = None):
+        import whisper
+        self.model = whisper.load_model(model_size, device=device)
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio, **kwargs) -> Dict:
+        with self._lock:
+            return self.model.transcribe(audio, **kwargs)
+
+    def decode_mel(self, mel: np.ndarray, language: Optional[str] = None) -> str:
+        """Decodes a normalised (n_mels, 3000) log-mel window without recomputing features."""
+        import torch
+        import whisper
+        options = whisper.DecodingOptions(language=language, without_timestamps=True,
+                                          fp16=self.model.device.type != 'cpu')
+        with self._lock:
+            return whisper.decode(self.model, torch.from_numpy(mel).to(self.model.device), options).text
+
+
+class CTranslate2Backend:
+    """faster-whisper (CTranslate2) backend with int8 quantisation on CPU.
+
+    CTranslate2 runs up to `workers` transcriptions in parallel on a single loaded model.
+    """
+    def __init__(self, model_size: str, device: Optional[str] = None, compute_type: str = 'int8',
+                 workers: int = 1, cpu_threads: int = 0):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model_size, device=device or 'cpu', compute_type=compute_type,
+                                  num_workers=workers, cpu_threads=cpu_threads)
+
+    def transcribe(self, audio, **kwargs) -> Dict:
+        segments, info = self.model.transcribe(audio, **kwargs)
+        return {'text': ''.join(segment.text for segment in segments), 'language': info.language}
+
+
+class WhisperModelPool:
+    """One loaded, warmed-up Whisper model plus a small worker pool for concurrent requests.
+
+    Methods:
+        transcribe(audio) -> str: Transcribes on the calling thread.
+        submit(audio) -> Future: Queues a transcription on the worker pool.
+        warmup() -> float: Runs a dummy inference and returns its duration in seconds.
+    """
+    def __init__(self, model_size: str = 'base', backend: str = 'openai', compute_type: str = 'int8',
+                 device: Optional[str] = None, workers: int = 2, cpu_threads: int = 0, warmup: bool = True):
+        """Loads the model for the requested backend.
+
+        Args:
+            model_size (str): Whisper model size ('tiny', 'base', 'small', ...).
+            backend (str): 'openai' for openai-whisper or 'ctranslate2' for faster-whisper.
+            compute_type (str): CTranslate2 compute type, e.g. 'int8' or 'float32'.
+            device (str, optional): Device to load on; backend default if None.
+            workers (int): Number of concurrent transcription workers.
+            cpu_threads (int): CTranslate2 intra-op threads per worker (0 = library default).
+            warmup (bool): Run a dummy inference after loading so the first real request is fast.
+        Raises:
+            ValueError: If the backend is unknown.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown STT backend '{backend}'. Expected one of {BACKENDS}")
+        self.model_size = model_size
+        self.backend = backend
+        self.workers = max(1, workers)
+        start = time.perf_counter()
+        if backend == 'ctranslate2':
+            self.model = CTranslate2Backend(model_size, device, compute_type, self.workers, cpu_threads)
+        else:
+            self.model = OpenAIWhisperBackend(model_size, device)
+        self.load_s = time.perf_counter() - start
+        self.warmup_s = self.warmup() if warmup else None
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='whisper')
+
+    def warmup(self) -> float:
+        """Runs one inference on a second of silence to initialise kernels and caches."""
+        start = time.perf_counter()
+        self.model.transcribe(np.zeros(16000, dtype=np.float32))
+        return time.perf_counter() - start
+
+    def transcribe(self, audio) -> str:
+        """Transcribes audio (path or float32 16 kHz samples) on the calling thread."""
+        return self.model.transcribe(audio)['text']
+
+    def submit(self, audio) -> Future:
+        """Queues a transcription on the worker pool and returns a Future with the text."""
+        return self._executor.submit(self.transcribe, audio)
+
+    def shutdown(self) -> None:
+        """Stops the worker pool."""
+        self._executor.shutdown(wait=False)
+
+
+_pools: Dict[Tuple, WhisperModelPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_model_pool(model_size: str = 'base', backend: str = 'openai', compute_type: str = 'int8',
+                   device: Optional[str] = None, workers: int = 2, cpu_threads: int = 0,
+                   warmup: bool = True) -> WhisperModelPool:
+    """Returns the shared pool for this model configuration, loading it on first use.
+
+    Args:
+        See WhisperModelPool.
+
+    Returns:
+        WhisperModelPool: The process-wide pool for (model_size, backend, compute_type, device).
+    """
+    key = (model_size, backend, compute_type, device)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = WhisperModelPool(model_size, backend, compute_type, device, workers, cpu_threads, warmup)
+            _pools[key] = pool
+        return pool
+
+
+def preload_model_pool(**config) -> Future:
+    """Starts loading a pool in the background so startup can continue while the model loads.
+
+    Args:
+        **config: Keyword arguments for get_model_pool (typically the 'stt' config section).
+
+    Returns:
+        Future: Resolves to the WhisperModelPool.
+    """
+    future = Future()
+
+    def load():
+        try:
+            future.set_result(get_model_pool(**config))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=load, name='whisper-preload', daemon=True).start()
+    return future
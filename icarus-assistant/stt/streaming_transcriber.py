@@ -0,0 +1,214 @@
+"""
+streaming_transcriber.py
+
+Incremental Whisper transcription over sliding windows with partial and final hypotheses.
+"""
+
+import wave
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from utils.audio_features import (FRAMES_PER_SECOND, HOP_LENGTH, SAMPLE_RATE, IncrementalLogMel,
+                                  normalize_log_mel)
+from utils.pcm import AudioBuffer, as_float32
+
+WHISPER_FRAMES = 3000  # Whisper's fixed 30 s encoder input
+
+
+def pad_mel(log_mel: np.ndarray, n_frames: int = WHISPER_FRAMES) -> np.ndarray:
+    """Normalises raw log10 frames and pads them to Whisper's input length with the silence level.
+
+    Padding with the normalised value of silence matches what Whisper sees when the audio itself
+    is zero-padded to 30 s before the mel transform.
+    """
+    mel = normalize_log_mel(log_mel[:, -n_frames:])
+    if mel.shape[1] >= n_frames:
+        return mel
+    silence = (max(-10.0, float(log_mel.max()) - 8.0) + 4.0) / 4.0 if log_mel.size else -1.5
+    padded = np.full((mel.shape[0], n_frames), silence, dtype=np.float32)
+    padded[:, :mel.shape[1]] = mel
+    return padded
+
+
+def iter_wav_chunks(path: str, chunk: int = 1600) -> Iterator[np.ndarray]:
+    """Replays a 16 kHz mono int16 WAV as float32 chunks, e.g. to drive a transcriber from a fixture."""
+    with wave.open(path, 'rb') as wf:
+        if wf.getframerate() != SAMPLE_RATE or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError(f"Expected 16 kHz mono 16-bit WAV: {path}")
+        while True:
+            data = wf.readframes(chunk)
+            if not data:
+                break
+            yield as_float32(data)
+
+
+def _common_prefix(a: List[str], b: List[str]) -> List[str]:
+    prefix = []
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        prefix.append(x)
+    return prefix
+
+
+class AudioWindow:
+    """Buffers raw samples behind the same frame-indexed interface as IncrementalLogMel.
+
+    Used for decoders that take audio rather than mel features (e.g. faster-whisper), so the
+    transcriber's windowing is identical for both; a frame is HOP_LENGTH samples.
+    """
+    def __init__(self):
+        self.total_samples = 0
+        self.frames_computed = 0
+        self.finished = False
+        self._samples = np.zeros(0, dtype=np.float32)
+        self._start = 0  # absolute frame index of _samples[0]
+
+    @property
+    def first_frame(self) -> int:
+        return self._start
+
+    @property
+    def num_frames(self) -> int:
+        if self.finished:
+            return -(-self.total_samples // HOP_LENGTH)
+        return self.total_samples // HOP_LENGTH
+
+    def feed(self, samples: np.ndarray) -> int:
+        if self.finished:
+            raise RuntimeError("Stream already finished")
+        before = self.num_frames
+        samples = np.asarray(samples, dtype=np.float32).ravel()
+        self._samples = np.concatenate((self._samples, samples))
+        self.total_samples += len(samples)
+        self.frames_computed += self.num_frames - before
+        return self.num_frames - before
+
+    def finish(self) -> int:
+        if self.finished:
+            return 0
+        before = self.num_frames
+        self.finished = True
+        self.frames_computed += self.num_frames - before
+        return self.num_frames - before
+
+    def frames(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """Returns the samples of absolute frames [start, end).
+
+        Raises:
+            IndexError: If start precedes trimmed frames.
+        """
+        end = self.num_frames if end is None else min(end, self.num_frames)
+        if start < self._start:
+            raise IndexError(f"Frame {start} was already trimmed")
+        return self._samples[(start - self._start) * HOP_LENGTH:(end - self._start) * HOP_LENGTH]
+
+    def trim(self, before: int) -> None:
+        drop = max(0, before - self._start)
+        if drop:
+            self._samples = self._samples[drop * HOP_LENGTH:]
+            self._start += drop
+
+
+class StreamingTranscriber:
+    """Runs Whisper on a growing window while audio streams in and reports partial hypotheses.
+
+    Each decode step reuses the mel frames already computed for the overlapping part of the window,
+    so only the newly arrived audio is transformed. A word becomes stable once two consecutive
+    hypotheses agree on it (local agreement), and stable text never changes afterwards. When the
+    window reaches window_s seconds its text is committed and a new window starts.
+
+    Hypotheses are dicts: {'text', 'stable', 'final', 'audio_s'}.
+
+    With features='audio' the decoder is given the window's raw samples instead of its mel, for
+    backends that only transcribe audio; the windowing and agreement logic are the same.
+
+    Methods:
+        feed(samples) -> List[Dict]: Adds audio; returns any new partial hypotheses.
+        finish() -> List[Dict]: Ends the stream and returns the final hypothesis.
+        transcribe_stream(chunks) -> Iterator[Dict]: Generator over a chunk iterable.
+    """
+    def __init__(self, decoder: Callable[[np.ndarray], str], step_s: float = 1.0, window_s: float = 30.0,
+                 on_hypothesis: Optional[Callable[[Dict], None]] = None, features: str = 'mel'):
+        """Initializes the transcriber.
+
+        Args:
+            decoder (Callable[[np.ndarray], str]): Maps a normalised (80, 3000) mel to text, or
+                float32 16 kHz samples to text if features is 'audio'.
+            step_s (float): Seconds of new audio between decode steps.
+            window_s (float): Maximum window length before its text is committed (<= 30).
+            on_hypothesis (Callable[[Dict], None], optional): Called with every hypothesis.
+            features (str): 'mel' or 'audio', what the decoder is given.
+        Raises:
+            ValueError: If features is unknown.
+        """
+        if features not in ('mel', 'audio'):
+            raise ValueError(f"Unknown decoder features '{features}'")
+        self.decoder = decoder
+        self.features = features
+        self.step_frames = max(1, int(step_s * FRAMES_PER_SECOND))
+        self.window_frames = min(WHISPER_FRAMES, int(window_s * FRAMES_PER_SECOND))
+        self.on_hypothesis = on_hypothesis
+        self.mel = IncrementalLogMel() if features == 'mel' else AudioWindow()
+        self.frames_decoded = 0
+        self.decode_calls = 0
+        self._window_start = 0
+        self._last_decode_frame = 0
+        self._committed: List[str] = []
+        self._previous: List[str] = []
+        self._stable: List[str] = []
+
+    def feed(self, samples: AudioBuffer) -> List[Dict]:
+        """Adds streamed audio and decodes whenever step_s of new audio has accumulated."""
+        self.mel.feed(as_float32(samples))
+        hypotheses = []
+        while self.mel.num_frames - self._last_decode_frame >= self.step_frames:
+            end = min(self.mel.num_frames, self._window_start + self.window_frames)
+            hypotheses.append(self._decode(end, final=False))
+        return hypotheses
+
+    def finish(self) -> List[Dict]:
+        """Flushes the remaining audio and returns any last partials followed by the final hypothesis."""
+        self.mel.finish()
+        hypotheses = []
+        while self.mel.num_frames - self._window_start > self.window_frames:
+            hypotheses.append(self._decode(self._window_start + self.window_frames, final=False))
+        hypotheses.append(self._decode(self.mel.num_frames, final=True))
+        return hypotheses
+
+    def transcribe_stream(self, chunks: Iterable[AudioBuffer]) -> Iterator[Dict]:
+        """Yields partial hypotheses while consuming chunks, then the final one."""
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.finish()
+
+    def _decode(self, end: int, final: bool) -> Dict:
+        window = self.mel.frames(self._window_start, end)
+        n_frames = window.shape[1] if self.features == 'mel' else end - self._window_start
+        self.frames_decoded += n_frames
+        self.decode_calls += 1
+        if not n_frames:
+            words = []
+        else:
+            words = self.decoder(pad_mel(window) if self.features == 'mel' else window).split()
+        self._last_decode_frame = end
+
+        agreed = _common_prefix(self._previous, words)
+        if len(agreed) > len(self._stable) and agreed[:len(self._stable)] == self._stable:
+            self._stable = agreed
+        self._previous = words
+        if final:
+            self._stable = words
+
+        text = ' '.join(self._committed + words)
+        stable = ' '.join(self._committed + self._stable)
+        if final or end - self._window_start >= self.window_frames:
+            # Commit this window and slide past it; its frames are no longer needed
+            self._committed += words
+            self._previous, self._stable = [], []
+            self._window_start = end
+            self.mel.trim(end)
+        hypothesis = {'text': text, 'stable': text if final else stable, 'final': final,
+                      'audio_s': end / FRAMES_PER_SECOND}
+        if self.on_hypothesis:
+            self.on_hypothesis(hypothesis)
+        return hypothesis
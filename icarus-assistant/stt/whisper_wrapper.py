@@ -1,26 +1,46 @@
 """
 whisper_wrapper.py
 
-Speech-to-Text (STT) wrapper using Whisper base model.
+Speech-to-Text (STT) wrapper over the shared Whisper model pool.
 """
 
-import whisper
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Union
+from stt.model_pool import WhisperModelPool, get_model_pool
+from stt.streaming_transcriber import StreamingTranscriber
+from utils.pcm import AudioBuffer, as_float32
 
 class WhisperSTT:
-    """Wrapper for Whisper base model speech-to-text.
+    """Wrapper for Whisper speech-to-text (base model by default).
 
     Methods:
-        transcribe(audio_path: str) -> str: Transcribes audio to text.
+        transcribe(audio: str | AudioBuffer) -> str: Transcribes audio to text.
+        submit(audio: str | AudioBuffer) -> Future: Transcribes on the shared worker pool.
+        streaming(on_hypothesis) -> StreamingTranscriber: Starts an incremental transcription.
     """
-    def __init__(self):
-        """Initializes the Whisper model."""
-        self.model = whisper.load_model('base')
+    def __init__(self, model_size: str = 'base', backend: str = 'openai', compute_type: str = 'int8',
+                 workers: int = 2, pool: Optional[WhisperModelPool] = None):
+        """Attaches to the shared, warmed-up model pool, loading it if this is the first user.
 
-    def transcribe(self, audio_path: str) -> str:
-        """Transcribes audio file to text.
+        Args:
+            model_size (str): Whisper model size.
+            backend (str): 'openai' or 'ctranslate2' (int8 faster-whisper on CPU).
+            compute_type (str): CTranslate2 compute type.
+            workers (int): Concurrent transcription workers.
+            pool (WhisperModelPool, optional): An already-loaded pool to use instead.
+        """
+        self.pool = pool or get_model_pool(model_size=model_size, backend=backend,
+                                           compute_type=compute_type, workers=workers)
+        self.model = self.pool.model
+
+    def transcribe(self, audio: Union[str, AudioBuffer]) -> str:
+        """Transcribes an audio file or an in-memory buffer to text.
+
+        In-memory buffers (float32/int16 arrays, memoryviews or raw int16 bytes at 16 kHz) are
+        passed to the model directly, skipping the WAV write and the ffmpeg decode.
 
         Args:
-            audio_path (str): Path to the audio file.
+            audio (str | AudioBuffer): Path to an audio file, or captured 16 kHz mono samples.
 
         Returns:
             str: Transcribed text.
@@ -28,8 +48,44 @@ class WhisperSTT:
             Exception: If transcription fails.
         """
         try:
-            result = self.model.transcribe(audio_path)
+            if not isinstance(audio, str):
+                audio = as_float32(audio)
+            result = self.model.transcribe(audio)
             return result['text']
         except Exception as e:
             print(f"Error during transcription: {e}")
             raise
+
+    def submit(self, audio: Union[str, AudioBuffer]) -> Future:
+        """Queues a transcription on the model pool's workers.
+
+        Args:
+            audio (str | AudioBuffer): Path to an audio file, or captured 16 kHz mono samples.
+
+        Returns:
+            Future: Resolves to the transcribed text.
+        """
+        return self.pool.submit(audio if isinstance(audio, str) else as_float32(audio))
+
+    def streaming(self, on_hypothesis: Optional[Callable[[Dict], None]] = None, step_s: float = 1.0,
+                  language: Optional[str] = None) -> StreamingTranscriber:
+        """Creates a streaming transcriber that emits partial hypotheses while audio is still arriving.
+
+        Args:
+            on_hypothesis (Callable[[Dict], None], optional): Called with each partial/final hypothesis.
+            step_s (float): Seconds of new audio between decodes.
+            language (str, optional): Force a language instead of detecting it on every window.
+
+        Backends that cannot decode precomputed mel features (faster-whisper) transcribe the
+        buffered window audio at each step instead.
+
+        Returns:
+            StreamingTranscriber: Feed it captured chunks, then call finish().
+        """
+        decode_mel = getattr(self.model, 'decode_mel', None)
+        if decode_mel is not None:
+            return StreamingTranscriber(lambda mel: decode_mel(mel, language), step_s=step_s,
+                                        on_hypothesis=on_hypothesis)
+        options = {'language': language} if language else {}
+        return StreamingTranscriber(lambda audio: self.model.transcribe(audio, **options)['text'],
+                                    step_s=step_s, on_hypothesis=on_hypothesis, features='audio')
@@ -0,0 +1,142 @@
+"""
+openrouter_stub.py
+
+Local OpenAI-compatible chat completions server for tests and benchmarks.
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        stub = self.server.stub
+        with self.server.lock:
+            stub.requests.append({'body': body, 'headers': dict(self.headers)})
+            status, headers, payload = stub.next_response(body)
+        if stub.delay:
+            time.sleep(stub.delay)
+        if status == 200 and body.get('stream'):
+            self._stream(payload['choices'][0]['message']['content'], stub)
+            return
+        data = json.dumps(payload).encode() if not isinstance(payload, bytes) else payload
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, content: str, stub: 'OpenRouterStub') -> None:
+        """Sends `content` as SSE chat-completion chunks, one token every token_delay seconds."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [b": OPENROUTER PROCESSING"]
+        events += [b"data: " + json.dumps({'choices': [{'delta': {'content': token}}]}).encode()
+                   for token in stub.tokenize(content)]
+        events += stub.stream_tail + [b"data: [DONE]"]
+        for event in events:
+            data = event + b"\n\n"
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+            if stub.token_delay:
+                time.sleep(stub.token_delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # concurrent clients connect at once
+
+    def handle_error(self, request, client_address):
+        # Clients may stop reading a stream early (e.g. once an intent's action is known)
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+def completion(content: str) -> dict:
+    """An OpenAI-style chat completion body carrying `content`."""
+    return {'choices': [{'message': {'role': 'assistant', 'content': content}}]}
+
+
+class OpenRouterStub:
+    """Runs a threaded HTTP server on localhost that answers chat completion requests.
+
+    Scripted responses are served first, then a default echo of the last user message.
+    Requests with "stream": true get the content back as server-sent events, word by word.
+
+    Usage:
+        with OpenRouterStub() as stub:
+            stub.script(503, 200)
+            client = OpenRouterClient('key', 'model', api_url=stub.url)
+    """
+    def __init__(self, delay: float = 0.0, token_delay: float = 0.0):
+        self.delay = delay
+        self.token_delay = token_delay
+        self.stream_tail = []  # raw SSE events sent before [DONE], e.g. an error event
+        self.requests = []
+        self._script = []
+        self.server = _Server(("127.0.0.1", 0), _Handler)
+        self.server.stub = self
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1/chat/completions"
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def connections(self) -> int:
+        """TCP connections accepted so far."""
+        return self.server.connections
+
+    def script(self, *responses) -> None:
+        """Queues responses: a status code, or a (status, headers, payload) tuple."""
+        for response in responses:
+            self._script.append(response if isinstance(response, tuple) else (response, {}, None))
+
+    def next_response(self, body: dict):
+        if self._script:
+            status, headers, payload = self._script.pop(0)
+        else:
+            status, headers, payload = 200, {}, None
+        if payload is None:
+            last = body.get('messages', [{}])[-1].get('content', '')
+            payload = completion(f"echo: {last}") if status == 200 else {'error': {'code': status}}
+        return status, headers, payload
+
+    @staticmethod
+    def tokenize(content: str):
+        """Splits text into word-sized tokens that keep their leading space, like an LLM stream."""
+        return re.findall(r"\s*\S+", content) or [content]
+
+    def start(self) -> 'OpenRouterStub':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'OpenRouterStub':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,52 @@
+import asyncio
+import time
+import pytest
+from llm.async_openrouter_client import AsyncOpenRouterClient
+from tests.openrouter_stub import OpenRouterStub
+
+pytest.importorskip("aiohttp")
+
+@pytest.fixture
+def stub():
+    with OpenRouterStub(delay=0.1) as server:
+        yield server
+
+@pytest.fixture
+def client(stub):
+    c = AsyncOpenRouterClient(api_key="test-key", model="test-model", api_url=stub.url,
+                              per_host=4, backoff_base=0)
+    yield c
+    c.close()
+
+def test_gather_preserves_order_and_bounds_concurrency(client, stub):
+    start = time.perf_counter()
+    answers = client.gather_queries([f"p{i}" for i in range(8)])
+    elapsed = time.perf_counter() - start
+    assert answers == [f"echo: p{i}" for i in range(8)]
+    assert client.stats['max_in_flight'] == 4
+    assert stub.connections <= 4
+    assert elapsed < 0.6  # two waves of 0.1 s instead of eight
+
+def test_connections_reused_between_batches(client, stub):
+    client.gather_queries(["a", "b"])
+    opened = stub.connections
+    client.gather_queries(["c", "d"])
+    assert client.query("e") == "echo: e"
+    assert stub.connections == opened
+
+def test_retry_and_return_exceptions(client, stub):
+    stub.script(503)
+    assert client.query("x") == "echo: x"
+    assert client.stats['retries'] == 1
+    stub.script(400)
+    answers = client.gather_queries(["bad"], return_exceptions=True)
+    assert isinstance(answers[0], Exception)
+
+def test_aquery_in_callers_event_loop(stub):
+    async def run():
+        c = AsyncOpenRouterClient(api_key="k", model="m", api_url=stub.url)
+        try:
+            return await c.agather(["one", "two"])
+        finally:
+            await c.aclose()
+    assert asyncio.run(run()) == ["echo: one", "echo: two"]
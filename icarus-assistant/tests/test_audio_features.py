@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from utils.audio_features import IncrementalLogMel, log_mel_spectrogram, mel_filterbank, normalize_log_mel
+
+def reference_log_mel(audio):
+    padded = np.pad(audio, 200, mode='reflect')
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(400) / 400)
+    frames = np.lib.stride_tricks.sliding_window_view(padded, 400)[::160]
+    power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2
+    return np.log10(np.maximum(mel_filterbank() @ power.T, 1e-10))[:, :-1]
+
+@pytest.fixture
+def audio():
+    rng = np.random.default_rng(0)
+    return (0.1 * rng.standard_normal(16000 * 2 + 123)).astype(np.float32)
+
+def test_filterbank_shape_and_coverage():
+    filters = mel_filterbank()
+    assert filters.shape == (80, 201)
+    assert (filters >= 0).all()
+    assert (filters.sum(axis=1) > 0).all()
+
+def test_one_shot_matches_reference(audio):
+    mel = log_mel_spectrogram(audio)
+    assert mel.shape == (80, len(audio) // 160)
+    assert np.allclose(mel, reference_log_mel(audio), atol=1e-4)
+
+def test_incremental_matches_one_shot_for_any_chunking(audio):
+    rng = np.random.default_rng(1)
+    mel = IncrementalLogMel()
+    i = 0
+    while i < len(audio):
+        n = int(rng.integers(1, 2500))
+        mel.feed(audio[i:i + n])
+        i += n
+    mel.finish()
+    assert mel.frames_computed == len(audio) // 160
+    assert np.allclose(mel.frames(), log_mel_spectrogram(audio), atol=1e-5)
+
+def test_frames_emitted_before_stream_ends(audio):
+    mel = IncrementalLogMel()
+    assert mel.feed(audio[:100]) == 0
+    assert mel.feed(audio[100:16000]) > 90
+
+def test_trim_drops_old_frames(audio):
+    mel = IncrementalLogMel()
+    mel.feed(audio)
+    mel.trim(50)
+    assert mel.frames(50, 60).shape == (80, 10)
+    with pytest.raises(IndexError):
+        mel.frames(0, 10)
+
+def test_normalize_range():
+    log_spec = np.array([[-10.0, 0.0, 2.0]])
+    assert normalize_log_mel(log_spec).tolist() == [[-0.5, 1.0, 1.5]]
@@ -0,0 +1,103 @@
+import sqlite3
+import pytest
+from orchestrator.context_builder import ContextBuilder, extractive_summary
+from orchestrator.llm_brain import LLMBrain
+from orchestrator.memory_manager import MemoryManager
+
+class RecordingSummarizer:
+    def __init__(self):
+        self.calls = []
+    def __call__(self, summary, messages):
+        self.calls.append([m['content'] for m in messages])
+        return extractive_summary(summary, messages)
+
+class DummyLLM:
+    model = 'test-model'
+    def __init__(self):
+        self.last_prompt = None
+    def query(self, prompt, system=None):
+        self.last_prompt = prompt
+        return '{"action": "direct_response", "target": "ok", "parameters": {}}'
+
+@pytest.fixture
+def memory(tmp_path):
+    mm = MemoryManager(db_path=str(tmp_path / 'memory.sqlite'))
+    yield mm
+    mm.close()
+
+def add_turns(memory, session_id, start, count, text="Tell me more about item {i} in the inventory list."):
+    for i in range(start, start + count):
+        memory.store_message(session_id, 'user' if i % 2 == 0 else 'assistant', text.format(i=i))
+
+def test_short_history_kept_verbatim(memory):
+    add_turns(memory, 's', 0, 4)
+    built = ContextBuilder(memory, RecordingSummarizer(), default_budget=500).build('s')
+    assert built['summary'] == '' and len(built['messages']) == 4
+
+def test_older_turns_folded_incrementally(memory):
+    summarizer = RecordingSummarizer()
+    builder = ContextBuilder(memory, summarizer, default_budget=200)
+    add_turns(memory, 's', 0, 20)
+    built = builder.build('s')
+    assert built['tokens'] <= 200 and built['summary']
+    assert summarizer.calls[0][0].startswith('Tell me more about item 0 ')
+    summary, upto = memory.get_summary('s')
+    assert summary == built['summary'] and upto > 0
+    assert len(builder.build('s')['messages']) == len(built['messages'])  # headroom: no refold
+    add_turns(memory, 's', 20, 10)
+    builder.build('s')
+    assert len(summarizer.calls) == 2
+    assert not set(summarizer.calls[0]) & set(summarizer.calls[1])  # only newly evicted turns
+
+def test_failing_summarizer_falls_back_to_extractive(memory):
+    def broken(summary, messages):
+        raise TimeoutError("summary model timed out")
+    builder = ContextBuilder(memory, broken, default_budget=200)
+    add_turns(memory, 's', 0, 20)
+    built = builder.build('s')
+    assert 'item 12' in built['summary'] and built['tokens'] <= 200
+    assert builder.stats['summary_failures'] == 1
+
+def test_background_fold_keeps_summarizer_off_build(memory):
+    summarizer = RecordingSummarizer()
+    builder = ContextBuilder(memory, summarizer, default_budget=200, background_fold=True)
+    add_turns(memory, 's', 0, 20)
+    built = builder.build('s')
+    assert summarizer.calls == [] and built['tokens'] <= 200 and 'item 12' in built['summary']
+    assert memory.get_summary('s') == ('', 0)
+    assert builder.refresh_async('s').result() is True
+    summary, upto = memory.get_summary('s')
+    assert len(summarizer.calls) == 1 and upto > 0
+    assert builder.build('s')['summary'] == summary and len(summarizer.calls) == 1
+
+def test_budget_per_model_and_long_messages_clipped(memory):
+    builder = ContextBuilder(memory, RecordingSummarizer(), budgets={'big': 5000}, default_budget=300,
+                             message_max_tokens=50)
+    memory.store_message('s', 'assistant', 'x' * 5000)
+    built = builder.build('s', model='big')
+    assert built['budget'] == 5000
+    assert len(built['messages'][0]['content']) < 300 and 'omitted' in built['messages'][0]['content']
+    assert builder.budget_for('other') == 300
+
+def test_old_database_migrated(tmp_path):
+    path = str(tmp_path / 'old.sqlite')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE sessions (id INTEGER PRIMARY KEY, session_id TEXT UNIQUE, created_at TIMESTAMP, '
+                 'last_activity TIMESTAMP, context_summary TEXT, session_name TEXT)')
+    conn.execute("INSERT INTO sessions (session_id, context_summary) VALUES ('s', 'old text')")
+    conn.commit()
+    conn.close()
+    memory = MemoryManager(db_path=path)
+    assert memory.get_summary('s') == ('old text', 0)
+    memory.set_summary('s', 'new', 7)
+    assert memory.get_summary('s') == ('new', 7)
+    memory.close()
+    assert sqlite3.connect(path).execute('PRAGMA user_version').fetchone()[0] >= 1
+
+def test_brain_prompt_includes_summary(memory):
+    add_turns(memory, 's', 0, 20)
+    llm = DummyLLM()
+    brain = LLMBrain(llm, memory, ContextBuilder(memory, RecordingSummarizer(), default_budget=150))
+    brain.parse_intent('And the next one?', 's')
+    summary_line = llm.last_prompt.split('\nHistory: ')[0]
+    assert summary_line.startswith('Earlier conversation (summary): ') and 'item' in summary_line
@@ -0,0 +1,49 @@
+import pytest
+from orchestrator.fast_intent import FastIntentClassifier, KeywordTrie, TieredIntentRouter, tokenize
+
+class DummyFallback:
+    def __init__(self):
+        self.calls = []
+    def route_intent(self, user_input, session_id):
+        self.calls.append(user_input)
+        return [('direct_response', {'target': 'from llm'})]
+
+@pytest.fixture(scope='module')
+def classifier():
+    return FastIntentClassifier()
+
+def test_trie_prefers_longest_phrase():
+    trie = KeywordTrie()
+    trie.add('cpu', 'system_info')
+    trie.add('cpu usage', 'system_cpu')
+    assert trie.find(tokenize('show cpu usage')) == [('system_cpu', 1, 3)]
+
+def test_keyword_tier_confidence(classifier):
+    assert classifier.classify('What time is it, Icarus?') == ('system_time', 1.0, 'keyword')
+    verb, confidence, _ = classifier.classify('what time did the titanic sink')
+    assert verb == 'system_time' and confidence < 0.75
+    assert classifier.classify('cpu usage and battery')[0] is None  # two verbs: leave it to the LLM
+
+def test_ngram_tier_handles_paraphrase(classifier):
+    verb, confidence, tier = classifier.classify('whats the time')
+    assert (verb, tier) == ('system_time', 'ngram') and confidence >= 0.75
+    assert classifier.classify('write me a poem about the sea')[1] < 0.75
+
+def test_router_answers_locally_and_counts_tiers():
+    fallback = DummyFallback()
+    router = TieredIntentRouter(fallback)
+    action, params = router.route_intent('cpu usage', 's1')[0]
+    assert action == 'function_call' and params['target'] == 'get_cpu_usage'
+    assert 'CPU' in params['result']
+    assert router.route_intent('hello', 's1')[0][0] == 'greeting'
+    assert router.route_intent('explain black holes', 's1')[0][1]['target'] == 'from llm'
+    stats = router.stats
+    assert stats['keyword']['hits'] == 2 and stats['llm']['hits'] == 1
+    assert fallback.calls == ['explain black holes']
+
+def test_state_changing_commands_go_to_llm():
+    fallback = DummyFallback()
+    router = TieredIntentRouter(fallback)
+    for text in ['delete notes.txt', 'open chrome', 'set volume to 5']:
+        router.route_intent(text, 's1')
+    assert len(fallback.calls) == 3
@@ -34,4 +34,17 @@ def test_no_intent_matched():
 def test_multiple_verbs():
     intents = route_intent("launch notepad and search for plan.md")
     assert any(i[0] == 'launch_app' for i in intents)
-    assert any(i[0] == 'search_files' for i in intents) 
\ No newline at end of file
+    assert any(i[0] == 'search_files' for i in intents)
+
+def test_keyword_priority_follows_table_order():
+    # 'cpu' (system_info) is checked before 'cpu usage' (system_cpu); 'hi' matches inside words
+    assert route_intent("cpu usage") == [('system_info', {})]
+    assert route_intent("this") == [('greeting', {'query': 'this'})]
+    assert route_intent("open url example.com")[0][0] == 'launch_app'
+
+def test_parameters_extracted():
+    assert route_intent("set volume to 0.5.") == [('tts_set_volume', {'volume': 0.5})]
+    assert route_intent("list files in docs and set speed to 180") == [
+        ('list_files', {'directory': 'docs'}), ('tts_set_speed', {'speed': 180})]
+    assert route_intent("add app chrome") == [('llm_chat', {'query': 'add app chrome'})]
+    assert route_intent("go to example.com") == [('system_open_url', {'url': 'example.com'})]
@@ -0,0 +1,41 @@
+import pytest
+from utils.json_extractor import (INTENT_SCHEMA, PLAN_SCHEMA, JSONExtractionError, StreamingJSONExtractor,
+                                  extract_json, extract_json_stream, validate)
+
+REPLY = ('<think>The user wants {files}. I\'ll answer with "json".</think>\nSure:\n```json\n'
+         '{"action": "tool_call", "target": "search_files", "parameters": {"query": "a}b"}, '
+         '"confidence": 0.9, "reasoning": "files",}\n```')
+
+def test_extract_skips_reasoning_fences_and_trailing_comma():
+    intent = extract_json(REPLY, INTENT_SCHEMA)
+    assert intent['target'] == 'search_files' and intent['parameters'] == {'query': 'a}b'}
+    assert extract_json('notes </think> {"action": "plan_mode"}')['action'] == 'plan_mode'
+    with pytest.raises(JSONExtractionError) as error:
+        extract_json('<think>hmm</think> Just a plain answer.', INTENT_SCHEMA)
+    assert error.value.text == 'Just a plain answer.'
+
+@pytest.mark.parametrize('size', [1, 4, 50])
+def test_streaming_reports_fields_as_they_complete(size):
+    extractor = StreamingJSONExtractor(INTENT_SCHEMA)
+    order = []
+    for i in range(0, len(REPLY), size):
+        order += list(extractor.feed(REPLY[i:i + size]))
+    assert order == ['action', 'target', 'parameters', 'confidence', 'reasoning']
+    assert extractor.done and extractor.result() == extract_json(REPLY)
+
+def test_stream_stops_once_caller_has_what_it_needs():
+    consumed = []
+    def chunks():
+        for chunk in ['<thi', 'nk>plan {it}</th', 'ink>{"act', 'ion": "plan_mode", ', '"reasoning": "', 'long...']:
+            consumed.append(chunk)
+            yield chunk
+    assert extract_json_stream(chunks(), INTENT_SCHEMA, until=lambda f: 'action' in f) == {'action': 'plan_mode'}
+    assert len(consumed) == 4
+
+def test_schema_validation():
+    assert validate({'steps': [{'step_id': 1, 'action': 'llm_query', 'depends_on': []}]}, PLAN_SCHEMA) == []
+    errors = validate({'steps': [{'step_id': True, 'action': 'dance'}]}, PLAN_SCHEMA)
+    assert errors == ["$.steps[0].step_id: expected integer or string, got bool",
+                      "$.steps[0].action: 'dance' is not one of ['tool_call', 'function_call', 'llm_query']"]
+    # An object that fails the schema is skipped in favour of a later one that matches
+    assert extract_json('{"action": "fly"} {"action": "plan_mode"}', INTENT_SCHEMA) == {'action': 'plan_mode'}
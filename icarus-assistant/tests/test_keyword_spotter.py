@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from orchestrator.keyword_spotter import KeywordSpotter, subsequence_dtw
+
+RATE = 16000
+rng = np.random.default_rng(0)
+
+def keyword(stretch=1.0, pitch=1.0, amp=0.3):
+    """Synthetic three-syllable word made of gliding harmonic tones."""
+    parts = []
+    for a, b, d in [(300, 500, 0.15), (700, 400, 0.2), (450, 900, 0.18)]:
+        n = int(RATE * d * stretch)
+        phase = 2 * np.pi * np.cumsum(np.linspace(a, b, n) * pitch) / RATE
+        parts.append(amp * np.hanning(n) * sum(np.sin(k * phase) / k for k in range(1, 6)))
+        parts.append(np.zeros(int(RATE * 0.03)))
+    return np.concatenate(parts).astype(np.float32)
+
+def distractor(amp=0.3):
+    n = int(RATE * 0.55)
+    phase = 2 * np.pi * np.cumsum(np.linspace(1200, 600, n)) / RATE
+    return (amp * np.hanning(n) * sum(np.sin(k * phase) / k for k in range(1, 4))).astype(np.float32)
+
+def noise(seconds):
+    return (0.003 * rng.standard_normal(int(RATE * seconds))).astype(np.float32)
+
+def run(spotter, parts):
+    spotter.reset()
+    stream = np.concatenate(parts)
+    detections = []
+    for i in range(0, len(stream), 1600):
+        chunk = stream[i:i + 1600]
+        result = spotter.process(chunk + noise(len(chunk) / RATE))
+        if result:
+            detections.append(result)
+    return detections
+
+@pytest.fixture(scope='module')
+def spotter():
+    s = KeywordSpotter()
+    for stretch in (0.95, 1.0, 1.05):
+        s.enroll(np.concatenate([noise(0.3), keyword(stretch), noise(0.3)]))
+    return s
+
+def test_subsequence_dtw_finds_embedded_template():
+    feats = rng.standard_normal((40, 12))
+    feats /= np.linalg.norm(feats, axis=1, keepdims=True)
+    costs = subsequence_dtw(feats[10:20], feats)
+    assert int(np.argmin(costs)) == 19
+    assert costs[19] == pytest.approx(0.0, abs=1e-6)
+
+def test_detects_quieter_slower_keyword(spotter):
+    detections = run(spotter, [noise(1), keyword(1.1, 1.03, 0.1), noise(1)])
+    assert len(detections) == 1
+    assert 1.4 < detections[0]['end_s'] < 1.8
+
+def test_rejects_distractor_and_silence(spotter):
+    assert run(spotter, [noise(1), distractor(), noise(1), distractor(0.05), noise(1)]) == []
+    passes = spotter.scoring_passes
+    run(spotter, [noise(3)])
+    assert spotter.scoring_passes == passes  # energy gate skips the matcher in silence
+
+def test_two_keywords_detected_once_each(spotter):
+    detections = run(spotter, [noise(1), keyword(0.85, 0.97), noise(0.5), keyword(1.2), noise(1)])
+    assert len(detections) == 2
+    assert detections[0]['end_s'] < detections[1]['end_s']
+
+def test_save_and_load_templates(spotter, tmp_path):
+    path = str(tmp_path / 'wake.npz')
+    spotter.save(path)
+    loaded = KeywordSpotter()
+    assert loaded.load(path)
+    assert len(loaded.templates) == len(spotter.templates)
+    assert np.allclose(loaded.templates[0], spotter.templates[0])
+    assert not KeywordSpotter().load(str(tmp_path / 'missing.npz'))
+
+def test_requires_templates_and_speech():
+    s = KeywordSpotter()
+    with pytest.raises(RuntimeError):
+        s.process(noise(0.1))
+    with pytest.raises(ValueError):
+        s.enroll(np.zeros(1600, dtype=np.float32))
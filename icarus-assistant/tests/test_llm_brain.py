@@ -5,8 +5,10 @@ class DummyLLM:
     def __init__(self, response):
         self._response = response
         self.last_prompt = None
-    def query(self, prompt):
+        self.last_system = None
+    def query(self, prompt, system=None):
         self.last_prompt = prompt
+        self.last_system = system
         return self._response
 
 class DummySessionManager:
@@ -14,7 +16,7 @@ class DummySessionManager:
         return {'session_id': session_id, 'meta': 'test'}
 
 class DummyMemory:
-    def get_history(self, session_id):
+    def get_recent(self, session_id, n):
         return [{'role': 'user', 'content': 'Hi'}, {'role': 'assistant', 'content': 'Hello'}]
     session_manager = DummySessionManager()
 
@@ -52,10 +54,48 @@ def test_edge_case_empty_history():
         def get_active_session(self, session_id):
             return None
     class EmptyMemory:
-        def get_history(self, session_id):
+        def get_recent(self, session_id, n):
             return []
         session_manager = EmptySessionManager()
     llm = DummyLLM('{}')
     brain = LLMBrain(llm, EmptyMemory())
     context = brain._build_context('sess5')
-    assert context['conversation_history'] == [] 
\ No newline at end of file
+    assert context['conversation_history'] == []
+
+def test_static_instructions_sent_as_system_message():
+    llm = DummyLLM('{"action": "direct_response", "target": "Hi", "parameters": {}}')
+    brain = LLMBrain(llm, DummyMemory())
+    brain.parse_intent('What can you do?', 'sess6')
+    first_system = llm.last_system
+    assert 'perplexity_search' in first_system and 'get_current_time' in first_system
+    assert 'perplexity_search' not in llm.last_prompt
+    assert '"What can you do?"' in llm.last_prompt and '"content":"Hello"' in llm.last_prompt
+    brain.parse_intent('Something else', 'sess6')
+    assert llm.last_system is first_system  # rendered once, reused verbatim
+
+def test_parse_intent_streams_until_dispatchable():
+    class StreamingLLM(DummyLLM):
+        read = 0
+        def query_stream(self, prompt, system=None):
+            for chunk in ['<think>Open the ', 'weather</think>{"action": "function_call", ', '"target": "get_weather", ',
+                          '"parameters": {}, ', '"confidence": 0.9, "reasoning": "The user asks about weather"}']:
+                self.read += 1
+                yield chunk
+    llm = StreamingLLM('')
+    result = LLMBrain(llm, DummyMemory()).parse_intent('Weather?', 'sess7')
+    assert result == {'action': 'function_call', 'target': 'get_weather', 'parameters': {}}
+    assert llm.read == 4
+
+def test_parse_intent_reasoning_and_fences_stripped():
+    llm = DummyLLM('<think>Simple.</think>\n```json\n{"action": "direct_response", "target": "Hi!"}\n```')
+    assert LLMBrain(llm, DummyMemory()).parse_intent('Hi', 'sess8')['target'] == 'Hi!'
+    llm = DummyLLM('<think>No JSON needed.</think> Hello there.')
+    assert LLMBrain(llm, DummyMemory()).parse_intent('Hi', 'sess8')['target'] == 'Hello there.'
+
+def test_parse_intent_without_reply_stops_at_direct_response():
+    class StreamingLLM(DummyLLM):
+        def query_stream(self, prompt, system=None):
+            yield '{"action": "direct_response", '
+            raise AssertionError('the reply text should not be awaited')
+    result = LLMBrain(StreamingLLM(''), DummyMemory()).parse_intent('Tell me a joke', 'sess9', with_reply=False)
+    assert result == {'action': 'direct_response'}
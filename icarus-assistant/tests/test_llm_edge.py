@@ -7,7 +7,7 @@ import uuid
 
 @pytest.fixture
 def llm():
-    return OpenRouterClient(api_key="invalid", model="test-model")
+    return OpenRouterClient(api_key="invalid", model="test-model", backoff_base=0)
 
 def test_invalid_api_key(llm, monkeypatch):
     def fake_post(*a, **k):
@@ -17,12 +17,12 @@ def test_invalid_api_key(llm, monkeypatch):
             def json(self): return {}
             text = "Unauthorized"
         return R()
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(requests.Session, "post", fake_post)
     with pytest.raises(Exception):
         llm.query("test")
 
 def test_network_error(llm, monkeypatch):
-    monkeypatch.setattr(requests, "post", lambda *a, **k: (_ for _ in ()).throw(requests.ConnectionError))
+    monkeypatch.setattr(requests.Session, "post", lambda *a, **k: (_ for _ in ()).throw(requests.ConnectionError))
     with pytest.raises(Exception):
         llm.query("test")
 
@@ -32,7 +32,7 @@ def test_malformed_response(llm, monkeypatch):
         def raise_for_status(self): pass
         def json(self): return {"bad": "data"}
         text = "ok"
-    monkeypatch.setattr(requests, "post", lambda *a, **k: R())
+    monkeypatch.setattr(requests.Session, "post", lambda *a, **k: R())
     with pytest.raises(Exception):
         llm.query("test")
 
@@ -4,11 +4,22 @@ import pytest
 from orchestrator.memory_manager import MemoryManager
 
 @pytest.fixture
-def temp_db():
+def temp_db(monkeypatch):
     db_fd, db_path = tempfile.mkstemp()
     os.close(db_fd)
+    # Every manager a test opens is closed, so no -wal/-shm files are left behind
+    opened = []
+    init = MemoryManager.__init__
+    def tracking_init(self, *args, **kwargs):
+        opened.append(self)
+        init(self, *args, **kwargs)
+    monkeypatch.setattr(MemoryManager, '__init__', tracking_init)
     yield db_path
-    os.remove(db_path)
+    for mm in opened:
+        mm.close()
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
 
 def test_create_and_retrieve_session(temp_db):
     mm = MemoryManager(db_path=temp_db)
@@ -57,4 +68,99 @@ def test_edge_case_long_history(temp_db):
         mm.store_message(session_id, 'assistant', f'A{i}')
     summary = mm.summarize_session(session_id)
     assert summary.count('user:') <= 10
-    assert summary.count('assistant:') <= 10 
\ No newline at end of file
+    assert summary.count('assistant:') <= 10 
+
+
+def test_history_limit_returns_latest_in_order(temp_db):
+    mm = MemoryManager(db_path=temp_db)
+    mm.create_session('limited')
+    for i in range(15):
+        mm.store_message('limited', 'user', f'U{i}')
+    recent = mm.get_history('limited', limit=10)
+    assert [m['content'] for m in recent] == [f'U{i}' for i in range(5, 15)]
+
+def test_wal_mode_and_connection_reused(temp_db):
+    mm = MemoryManager(db_path=temp_db)
+    conn = mm._conn()
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+    mm.get_history('any')
+    assert mm._conn() is conn
+    mm.close()
+
+def test_connection_of_exited_thread_is_closed(temp_db):
+    import gc
+    import threading
+    mm = MemoryManager(db_path=temp_db)
+    worker = threading.Thread(target=lambda: mm.get_history('any'))
+    worker.start()
+    worker.join()
+    gc.collect()
+    assert mm._connections == [mm._conn()]
+
+def test_queued_messages_committed_in_one_transaction(temp_db):
+    mm = MemoryManager(db_path=temp_db, batch_window_s=0.5)
+    batches = []
+    write = mm._write_batch
+    mm._write_batch = lambda rows: (batches.append(len(rows)), write(rows))
+    mm.create_session('batched')
+    for i in range(50):
+        mm.store_message('batched', 'user', f'U{i}')
+    assert [m['content'] for m in mm.get_history('batched')] == [f'U{i}' for i in range(50)]
+    assert batches == [50]
+    assert mm.get_session_info('batched')['last_activity'] == mm.get_history('batched', limit=1)[0]['timestamp']
+    mm.close()
+
+def test_close_commits_pending_writes_from_threads(temp_db):
+    import threading
+    mm = MemoryManager(db_path=temp_db, batch_window_s=0.05)
+    threads = [threading.Thread(target=lambda n=n: [mm.store_message(f's{n}', 'user', str(i)) for i in range(25)])
+               for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    mm.close()
+    reopened = MemoryManager(db_path=temp_db, batch_writes=False)
+    assert all(len(reopened.get_history(f's{n}')) == 25 for n in range(4))
+    reopened.close()
+
+
+def test_recent_and_paginated_history(temp_db):
+    mm = MemoryManager(db_path=temp_db)
+    for i in range(10):
+        mm.store_message('paged', 'user', f'U{i}')
+    mm.store_message('other', 'user', 'X')
+    assert [m['content'] for m in mm.get_recent('paged', 3)] == ['U7', 'U8', 'U9']
+    streamed = list(mm.iter_history('paged', page_size=3))
+    assert [m['content'] for m in streamed] == [f'U{i}' for i in range(10)]
+    last = streamed[5]
+    resumed = mm.iter_history('paged', page_size=3, after=(last['timestamp'], last['id']))
+    assert [m['content'] for m in resumed] == ['U6', 'U7', 'U8', 'U9']
+    indexes = {row[1] for row in mm._conn().execute('PRAGMA index_list(messages)')}
+    assert 'idx_messages_session_time' in indexes
+    mm.close()
+
+def test_full_text_search_ranks_and_tracks_deletes(temp_db):
+    mm = MemoryManager(db_path=temp_db)
+    mm.store_message('s1', 'user', 'Book a table for dinner on Friday')
+    mm.store_message('s1', 'assistant', 'The quarterly budget review is on Friday, sir.')
+    mm.store_message('s2', 'user', 'What did we say about the budget?')
+    hits = mm.search('what did we decide about the budget review')
+    assert [h['role'] for h in hits[:1]] == ['assistant']
+    assert '[budget]' in hits[0]['snippet'] and '[review]' in hits[0]['snippet']
+    assert [h['session_id'] for h in mm.search('budget', session_id='s2')] == ['s2']
+    assert mm.search('the of what') == []
+    mm.store_message('3f2a9c1e-77b0-4d1c-9a51-0c2e1b7d8e55', 'user', 'budget for the offsite')
+    assert len(mm.search('budget', session_id='3f2a9c1e-77b0-4d1c-9a51-0c2e1b7d8e55')) == 1
+    mm.clear_session('s1')
+    assert [h['session_id'] for h in mm.search('budget friday')] == ['s2', '3f2a9c1e-77b0-4d1c-9a51-0c2e1b7d8e55']
+    mm.close()
+
+def test_search_session_filter_is_exact(temp_db):
+    mm = MemoryManager(db_path=temp_db)
+    mm.store_message('user-1', 'user', 'Renew the car insurance')
+    mm.store_message('user-1-old', 'user', 'Compare car insurance quotes')
+    mm.store_message('old-user-1', 'user', 'Car insurance claim form')
+    assert [h['session_id'] for h in mm.search('car insurance', session_id='user-1')] == ['user-1']
+    assert len(mm.search('car insurance')) == 3
@@ -0,0 +1,85 @@
+import queue
+import time
+import numpy as np
+import pytest
+from utils.mic_stream import MicrophoneStream
+
+CHUNK = 160
+
+class FakeDevice:
+    """Hands the capture thread chunks pushed by the test; b'' ends the stream."""
+    def __init__(self):
+        self.feed = queue.Queue()
+        self.reads = 0
+    def read(self, n):
+        self.reads += 1
+        return self.feed.get(timeout=2)
+    def push(self, *values):
+        for value in values:
+            self.feed.put(np.full(CHUNK, value, dtype=np.int16).tobytes())
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.001)
+
+@pytest.fixture
+def device():
+    return FakeDevice()
+
+@pytest.fixture
+def mic(device):
+    stream = MicrophoneStream(chunk=CHUNK, pre_roll_s=0.05, reader=device.read)
+    yield stream
+    device.feed.put(b'')
+    stream.stop()
+
+def test_fans_out_to_all_subscribers(mic, device):
+    a, b = mic.subscribe(), mic.subscribe()
+    device.push(1, 2)
+    assert [a.read(timeout=1)[0] for _ in range(2)] == [1, 2]
+    assert [b.read(timeout=1)[0] for _ in range(2)] == [1, 2]
+    assert mic.stats['subscribers'] == 2
+    a.close()
+    device.push(3)
+    assert b.read(timeout=1)[0] == 3
+    assert mic.stats['subscribers'] == 1
+
+def test_device_opened_once_across_subscriptions(mic, device):
+    for value in range(5):
+        with mic.subscribe() as sub:
+            device.push(value)
+            assert sub.read(timeout=1)[0] == value
+    assert mic.stats['device_opens'] == 1
+    assert mic.stats['subscribers'] == 0
+
+def test_late_subscriber_gets_pre_roll(mic, device):
+    first = mic.subscribe()
+    device.push(1, 2, 3)
+    wait_for(lambda: mic.position == 3 * CHUNK)
+    late = mic.subscribe(start=CHUNK)
+    assert late.start == CHUNK and late.pre_roll == 2 * CHUNK
+    backlog = late.read(timeout=1)
+    assert backlog.tolist() == [2] * CHUNK + [3] * CHUNK
+    device.push(4)
+    assert late.read(timeout=1)[0] == 4
+    first.close()
+
+def test_pre_roll_clipped_to_buffer(mic, device):
+    mic.subscribe()
+    device.push(*range(10))
+    wait_for(lambda: mic.position == 10 * CHUNK)
+    sub = mic.subscribe(pre_roll_s=1.0)
+    assert sub.start == 10 * CHUNK - 800  # 50 ms ring at 16 kHz
+
+def test_read_bytes_and_end_of_stream(mic, device):
+    sub = mic.subscribe()
+    device.push(7, 8)
+    data = sub.read_bytes(CHUNK + 10)
+    assert len(data) == 2 * (CHUNK + 10)
+    assert sub.read(timeout=1).tolist() == [8] * (CHUNK - 10)
+    device.feed.put(b'')
+    assert sub.read(timeout=1) is None and sub.closed
+    with pytest.raises(EOFError):
+        sub.read_bytes(1)
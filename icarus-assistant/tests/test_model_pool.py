@@ -0,0 +1,60 @@
+import threading
+import time
+import pytest
+from stt import model_pool
+from stt.model_pool import WhisperModelPool, get_model_pool, preload_model_pool
+
+class FakeBackend:
+    loads = 0
+    def __init__(self, model_size, device=None, *args):
+        FakeBackend.loads += 1
+        self.model_size = model_size
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+    def transcribe(self, audio, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return {'text': f'{self.model_size}:{len(audio)}'}
+
+@pytest.fixture(autouse=True)
+def fake_backends(monkeypatch):
+    FakeBackend.loads = 0
+    monkeypatch.setattr(model_pool, '_pools', {})
+    monkeypatch.setattr(model_pool, 'OpenAIWhisperBackend', FakeBackend)
+    monkeypatch.setattr(model_pool, 'CTranslate2Backend', FakeBackend)
+
+def test_model_loaded_once_and_warmed():
+    pool = get_model_pool(model_size='tiny')
+    assert get_model_pool(model_size='tiny') is pool
+    assert FakeBackend.loads == 1
+    assert pool.model.calls == 1  # warm-up inference
+    assert pool.warmup_s is not None
+
+def test_distinct_configs_get_distinct_pools():
+    a = get_model_pool(model_size='tiny', backend='openai')
+    b = get_model_pool(model_size='tiny', backend='ctranslate2')
+    assert a is not b
+    assert FakeBackend.loads == 2
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        WhisperModelPool(backend='onnx')
+
+def test_submit_runs_concurrently():
+    pool = WhisperModelPool(model_size='base', workers=3, warmup=False)
+    futures = [pool.submit([0.0] * 10) for _ in range(6)]
+    assert [f.result(timeout=2) for f in futures] == ['base:10'] * 6
+    assert pool.model.max_active > 1
+    pool.shutdown()
+
+def test_preload_in_background():
+    future = preload_model_pool(model_size='small', warmup=False)
+    pool = future.result(timeout=2)
+    assert pool.transcribe([0.0]) == 'small:1'
@@ -0,0 +1,68 @@
+import time
+import pytest
+from llm.model_router import ModelRouter, json_validator
+from orchestrator.llm_brain import LLMBrain
+from utils.json_extractor import INTENT_SCHEMA
+
+class FakeClient:
+    def __init__(self, model, delay=0.0, answer=None, fail=False):
+        self.model, self.delay, self.answer, self.fail = model, delay, answer, fail
+        self.calls = 0
+    def query(self, prompt, system=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.model} down")
+        return self.answer or f"{self.model}: {prompt}"
+    def query_stream(self, prompt, system=None):
+        yield from self.query(prompt, system).split(' ')
+
+def factory(**clients):
+    return lambda model: clients[model]
+
+def test_routes_pick_models_by_profile():
+    router = ModelRouter('key', ['openai/gpt-4o-mini', 'anthropic/claude-3.5-sonnet', 'meta-llama/llama-3.1-8b-instruct'])
+    assert router.models_for('intent') == ['openai/gpt-4o-mini']
+    assert router.models_for('disambiguation') == ['meta-llama/llama-3.1-8b-instruct']
+    assert router.models_for('planning') == ['anthropic/claude-3.5-sonnet']
+    assert router.models_for('summary') == ['meta-llama/llama-3.1-8b-instruct']
+    single = ModelRouter('key', ['deepseek/deepseek-r1-0528:free'], routes={'chat': {'model': 'openai/gpt-4o'}})
+    assert single.models_for('intent') == single.models_for('planning') == ['deepseek/deepseek-r1-0528:free']
+    assert single.models_for('chat') == ['openai/gpt-4o']
+
+def test_routed_client_records_latency_per_route():
+    clients = {'a': FakeClient('a'), 'b': FakeClient('b')}
+    router = ModelRouter('key', {'a': {'quality': 3, 'latency_s': 0.1}, 'b': {'quality': 5, 'latency_s': 2.0}},
+                         client_factory=factory(**clients))
+    assert router.client('intent').query('hi') == 'a: hi'
+    assert ''.join(router.client('planning').query_stream('make a plan')) == 'b:makeaplan'
+    assert router.client('planning').model == 'b'
+    report = router.report()
+    assert report['intent']['calls'] == 1 and report['intent']['answers'] == {'a': 1}
+    assert report['planning']['answers'] == {'b': 1} and report['chat']['calls'] == 0
+
+def test_speculative_race_takes_first_valid_answer():
+    intent = '{"action": "plan_mode"}'
+    clients = {'fast': FakeClient('fast', 0.01, answer='not json'), 'slow': FakeClient('slow', 0.1, answer=intent),
+               'down': FakeClient('down', fail=True)}
+    router = ModelRouter('key', ['fast', 'slow', 'down'], routes={'intent': {'race': ['fast', 'slow']},
+                                                                 'chat': {'race': ['down', 'slow']}},
+                         client_factory=factory(**clients))
+    client = router.client('intent', json_validator(INTENT_SCHEMA))
+    assert list(client.query_stream('plan my day')) == [intent]
+    assert router.report()['intent']['answers'] == {'slow': 1}
+    assert router.client('chat').query('hi') == intent
+    router.routes['chat']['race'] = ['down', 'down']
+    with pytest.raises(RuntimeError, match='down'):
+        router.client('chat').query('hi')
+
+def test_speculative_intent_without_json_falls_back_to_direct_response():
+    class Memory:
+        def get_recent(self, session_id, n):
+            return []
+    clients = {'a': FakeClient('a', 0.01, answer='Hello there!'), 'b': FakeClient('b', 0.05, answer='Hi, how can I help?')}
+    router = ModelRouter('key', ['a', 'b'], routes={'intent': {'race': ['a', 'b']}}, client_factory=factory(**clients))
+    brain = LLMBrain(router.client('intent', json_validator(INTENT_SCHEMA)), Memory())
+    intent = brain.parse_intent('hello', 'sess')
+    assert intent['action'] == 'direct_response' and intent['target'] == 'Hello there!'
+    assert router.report()['intent']['answers'] == {'a': 1}
@@ -0,0 +1,137 @@
+import time
+from types import SimpleNamespace
+import pytest
+import requests
+from llm.openrouter_client import OpenRouterClient
+from tests.openrouter_stub import OpenRouterStub
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+@pytest.fixture
+def stub():
+    with OpenRouterStub() as server:
+        yield server
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    # Replace only the client's view of time so the stub server can still sleep
+    monkeypatch.setattr("llm.openrouter_client.time", SimpleNamespace(sleep=calls.append))
+    return calls
+
+def make_client(stub, **kwargs):
+    return OpenRouterClient(api_key="test-key", model="test-model", api_url=stub.url, **kwargs)
+
+def test_connection_reused_across_calls(stub):
+    client = make_client(stub)
+    answers = [client.query(f"q{i}") for i in range(10)]
+    assert answers[3] == "echo: q3"
+    assert stub.connections == 1
+    assert stub.requests[0]['headers']['Authorization'] == "Bearer test-key"
+
+def test_retries_server_errors_with_backoff(stub, sleeps):
+    stub.script(503, 502, (429, {'Retry-After': '2'}, None))
+    client = make_client(stub, max_retries=3, backoff_base=0.5)
+    assert client.query("hi") == "echo: hi"
+    assert client.stats['retries'] == 3
+    assert 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
+    assert sleeps[2] == 2.0  # Retry-After wins over the computed backoff
+
+def test_client_errors_not_retried(stub, sleeps):
+    stub.script(401)
+    client = make_client(stub)
+    with pytest.raises(requests.HTTPError):
+        client.query("hi")
+    assert len(stub.requests) == 1 and sleeps == []
+
+def test_gives_up_and_opens_circuit(stub, sleeps):
+    stub.script(*[500] * 4)
+    client = make_client(stub, max_retries=1, breaker_threshold=2)
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.query("hi")
+    with pytest.raises(CircuitOpenError):
+        client.query("hi")
+    assert len(stub.requests) == 4
+    assert client.stats['short_circuited'] == 1
+
+def test_read_timeout_is_retried(sleeps):
+    with OpenRouterStub(delay=0.3) as slow:
+        client = make_client(slow, read_timeout=0.05, max_retries=1)
+        with pytest.raises(requests.Timeout):
+            client.query("hi")
+        assert client.stats['attempts'] == 2
+
+def test_circuit_breaker_half_open_trial():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_s=10, clock=lambda: now[0])
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+    now[0] = 10.0
+    assert breaker.allow() and not breaker.allow()  # a single trial call
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow()
+
+def test_unexpected_error_in_half_open_trial_reopens_circuit(stub, monkeypatch):
+    now = [0.0]
+    client = make_client(stub, max_retries=0, breaker_threshold=1)
+    client.breaker.clock = lambda: now[0]
+    client.breaker.record_failure()
+    now[0] += client.breaker.reset_s
+    def broken_post(*args, **kwargs):
+        raise requests.exceptions.ChunkedEncodingError("connection broken mid-body")
+    monkeypatch.setattr(client.session, 'post', broken_post)
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        client.query("hi")
+    assert client.breaker.state == 'open'
+    now[0] += client.breaker.reset_s
+    monkeypatch.undo()
+    assert client.query("hi") == "echo: hi"
+    assert client.breaker.state == 'closed'
+
+def test_retried_stream_response_is_closed(stub, sleeps, monkeypatch):
+    stub.script(503)
+    client = make_client(stub, max_retries=1)
+    closed, post = [], client.session.post
+    def recording_post(*args, **kwargs):
+        response = post(*args, **kwargs)
+        response.close = lambda: closed.append(response.status_code)
+        return response
+    monkeypatch.setattr(client.session, 'post', recording_post)
+    assert ''.join(client.query_stream("hi"))
+    assert closed[:1] == [503]
+
+def test_system_message_sent_first(stub):
+    client = make_client(stub)
+    assert client.query("hi", system="Be brief.") == "echo: hi"
+    assert stub.requests[0]['body']['messages'] == [
+        {'role': 'system', 'content': 'Be brief.'}, {'role': 'user', 'content': 'hi'}]
+
+def test_query_stream_yields_deltas(stub):
+    client = make_client(stub)
+    chunks = list(client.query_stream("tell me a story"))
+    assert chunks == ["echo:", " tell", " me", " a", " story"]
+    assert stub.requests[0]['body']['stream'] is True
+    assert stub.connections == 1
+
+def test_query_stream_first_chunk_before_end():
+    with OpenRouterStub(token_delay=0.05) as slow:
+        client = make_client(slow)
+        start = time.perf_counter()
+        stream = client.query_stream("one two three four five six")
+        next(stream)
+        first = time.perf_counter() - start
+        rest = list(stream)
+        total = time.perf_counter() - start
+    assert len(rest) == 6
+    assert first < total / 2
+
+def test_query_stream_error_event(stub):
+    stub.stream_tail = [b'data: {"error": {"message": "overloaded"}}']
+    client = make_client(stub)
+    with pytest.raises(RuntimeError):
+        list(client.query_stream("hi"))
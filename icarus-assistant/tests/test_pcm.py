@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from utils.pcm import as_float32, as_int16
+
+def test_float32_array_is_not_copied():
+    audio = np.zeros(1600, dtype=np.float32)
+    out = as_float32(audio)
+    assert out.dtype == np.float32
+    assert np.shares_memory(out, audio)
+
+def test_float_memoryview_is_zero_copy():
+    audio = np.linspace(-1, 1, 100, dtype=np.float32)
+    out = as_float32(memoryview(audio))
+    assert np.shares_memory(out, audio)
+    assert np.allclose(out, audio)
+
+def test_int16_buffers_are_scaled():
+    pcm = np.array([0, 16384, -32768], dtype=np.int16)
+    for buf in (pcm, memoryview(pcm), pcm.tobytes()):
+        out = as_float32(buf)
+        assert out.dtype == np.float32
+        assert out.tolist() == [0.0, 0.5, -1.0]
+
+def test_unsupported_types():
+    with pytest.raises(TypeError):
+        as_float32([0, 1, 2])
+    with pytest.raises(TypeError):
+        as_float32(np.zeros(4, dtype=np.int32))
+
+def test_round_trip_to_int16():
+    pcm = np.array([0, 1000, -1000, 32767], dtype=np.int16)
+    assert np.abs(as_int16(as_float32(pcm)).astype(int) - pcm).max() <= 1
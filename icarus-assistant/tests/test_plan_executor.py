@@ -1,5 +1,21 @@
+import os
+import threading
+import time
 import pytest
 from orchestrator.plan_executor import PlanExecutor
+from orchestrator.tool_executor import ToolExecutor
+
+def fake_search(**kwargs):
+    return ['notes.txt']
+
+def slow_tool(seconds=0.5):
+    time.sleep(seconds)
+    return 'done'
+
+def worker_pid():
+    return os.getpid()
+
+REGISTRY = {'search_files': f'{__name__}:fake_search', 'slow': f'{__name__}:slow_tool', 'pid': f'{__name__}:worker_pid'}
 
 class DummyLLM:
     def __init__(self, response):
@@ -33,4 +49,109 @@ def test_execute_plan_malformed():
     # Plan with missing steps/parallel_groups
     plan = {'steps': [], 'parallel_groups': []}
     results = pe._execute_plan(plan, 'sess3')
-    assert results == [] 
\ No newline at end of file
+    assert results == [] 
+
+
+def test_llm_query_steps_sent_as_one_batch():
+    plan = {'steps': [
+        {'step_id': 1, 'description': 'Draft intro', 'action': 'llm_query', 'target': 'llm', 'parameters': {'prompt': 'intro'}},
+        {'step_id': 2, 'description': 'Find notes', 'action': 'tool_call', 'target': 'search_files', 'parameters': {}},
+        {'step_id': 3, 'description': 'Draft outro', 'action': 'llm_query', 'target': 'llm', 'parameters': {'prompt': 'outro'}},
+    ], 'parallel_groups': [[1, 2, 3]]}
+    class DummyAsyncLLM:
+        batches = []
+        def gather_queries(self, prompts, return_exceptions=False):
+            self.batches.append(prompts)
+            return [f"text for {p}" if p != 'outro' else RuntimeError('boom') for p in prompts]
+    async_llm = DummyAsyncLLM()
+    pe = PlanExecutor(DummyBrain(), DummyLLM('{}'), async_llm, ToolExecutor(registry=REGISTRY, read_only=REGISTRY))
+    results = pe._execute_plan(plan, 'sess4')
+    assert async_llm.batches == [['intro', 'outro']]
+    assert [r['output'] for r in results][0] == 'text for intro'
+    assert results[1]['output'] == ['notes.txt'] and results[1]['status'] == 'ok'
+    assert results[2]['output'] == 'Error: boom'
+
+def test_step_timeout_and_timing():
+    plan = {'steps': [
+        {'step_id': 1, 'description': 'Slow', 'action': 'tool_call', 'target': 'slow', 'parameters': {'seconds': 1.0}, 'timeout_s': 0.1},
+        {'step_id': 2, 'description': 'Quick', 'action': 'tool_call', 'target': 'slow', 'parameters': {'seconds': 0.05}},
+    ], 'parallel_groups': [[1, 2]]}
+    pe = PlanExecutor(DummyBrain(), DummyLLM('{}'), tool_executor=ToolExecutor(registry=REGISTRY, read_only=REGISTRY))
+    start = time.monotonic()
+    slow, quick = pe._execute_plan(plan, 'sess5')
+    assert time.monotonic() - start < 0.5
+    assert slow['status'] == 'timeout' and slow['output'].startswith('Error: timed out')
+    assert quick['status'] == 'ok' and quick['output'] == 'done' and quick['duration_ms'] >= 50
+
+def test_cpu_bound_tool_runs_in_process_pool():
+    plan = {'steps': [{'step_id': 1, 'description': 'Pid', 'action': 'tool_call', 'target': 'pid', 'parameters': {}}],
+            'parallel_groups': [[1]]}
+    pe = PlanExecutor(DummyBrain(), DummyLLM('{}'), tool_executor=ToolExecutor(registry=REGISTRY, read_only=REGISTRY), process_tools=('pid',))
+    result = pe._execute_plan(plan, 'sess6')[0]
+    assert result['status'] == 'ok' and result['output'] != os.getpid()
+
+def test_cancel_skips_later_groups():
+    plan = {'steps': [{'step_id': 1, 'description': 'First', 'action': 'tool_call', 'target': 'slow', 'parameters': {'seconds': 0.2}},
+                      {'step_id': 2, 'description': 'Second', 'action': 'tool_call', 'target': 'slow', 'parameters': {'seconds': 0.01}}],
+            'parallel_groups': [[1], [2]]}
+    pe = PlanExecutor(DummyBrain(), DummyLLM('{}'), tool_executor=ToolExecutor(registry=REGISTRY, read_only=REGISTRY))
+    threading.Timer(0.05, pe.cancel).start()
+    first, second = pe._execute_plan(plan, 'sess7')
+    assert first['status'] == 'ok' and second['status'] == 'cancelled'
+
+def test_steps_start_when_their_dependencies_finish():
+    plan = {'steps': [
+        {'step_id': 1, 'description': 'Slow', 'action': 'tool_call', 'target': 'slow', 'parameters': {'seconds': 0.3}, 'depends_on': []},
+        {'step_id': 2, 'description': 'Find', 'action': 'tool_call', 'target': 'search_files', 'parameters': {}, 'depends_on': []},
+        {'step_id': 3, 'description': 'Use found', 'action': 'tool_call', 'target': 'slow',
+         'parameters': {'seconds': 0.05}, 'depends_on': [2]},
+        {'step_id': 4, 'description': 'Summarize', 'action': 'llm_query', 'target': 'llm',
+         'parameters': {'prompt': 'Summarize {{step_2.output}}'}, 'depends_on': [2]},
+    ]}
+    class RecordingLLM(DummyLLM):
+        prompts = []
+        def query(self, prompt):
+            self.prompts.append(prompt)
+            return 'summary'
+    llm = RecordingLLM('{}')
+    pe = PlanExecutor(DummyBrain(), llm, tool_executor=ToolExecutor(registry=REGISTRY, read_only=REGISTRY))
+    results = pe._execute_plan(plan, 'sess8')
+    assert [r['status'] for r in results] == ['ok'] * 4
+    # Step 3 did not wait for the unrelated slow step 1
+    assert results[2]['started_ms'] < 150
+    assert llm.prompts == ["Summarize ['notes.txt']"]
+    assert pe.last_report['critical_path'] == [1] and pe.last_report['wall_ms'] < 600
+
+def test_failed_step_skips_dependents_and_invalid_plan_is_reported():
+    plan = {'steps': [{'step_id': 1, 'description': 'Boom', 'action': 'tool_call', 'target': 'missing_tool', 'parameters': {}},
+                      {'step_id': 2, 'description': 'After', 'action': 'tool_call', 'target': 'slow',
+                       'parameters': {'seconds': 0.01}, 'depends_on': [1]}]}
+    pe = PlanExecutor(DummyBrain(), DummyLLM('{}'), tool_executor=ToolExecutor(registry=REGISTRY, read_only=REGISTRY))
+    first, second = pe._execute_plan(plan, 'sess9')
+    assert first['status'] == 'error' and second['status'] == 'skipped'
+    plan['steps'][0]['depends_on'] = [2]
+    results = pe._execute_plan(plan, 'sess9')
+    assert [r['status'] for r in results] == ['invalid', 'invalid'] and 'cycle' in results[0]['output']
+
+def test_plan_reply_with_reasoning_and_fences_is_used():
+    plan = ('<think>Two steps.</think>```json\n{"steps": [{"step_id": 1, "description": "Find", "action": "tool_call", '
+            '"target": "search_files", "parameters": {}, "depends_on": []}]}\n```')
+    pe = PlanExecutor(DummyBrain(), DummyLLM(plan), tool_executor=ToolExecutor(registry=REGISTRY, read_only=REGISTRY))
+    assert "['notes.txt']" in pe.create_and_execute_plan('Find my notes', 'sess10')
+    pe = PlanExecutor(DummyBrain(), DummyLLM('I cannot plan this.'), tool_executor=ToolExecutor(registry=REGISTRY, read_only=REGISTRY))
+    assert pe.create_and_execute_plan('Find my notes', 'sess10') == "I couldn't work out a plan for that request."
+
+def test_side_effect_steps_confirmed_once_before_running():
+    calls, prompts = [], []
+    def confirm(prompt):
+        prompts.append(prompt)
+        return False
+    registry = dict(REGISTRY, launch_app=f'{__name__}:fake_search')
+    executor = ToolExecutor(registry=registry, read_only={'search_files'}, confirm=confirm)
+    executor.execute = lambda *args, **kwargs: calls.append(args)
+    pe = PlanExecutor(DummyBrain(), DummyLLM('{}'), tool_executor=executor)
+    plan = {'steps': [{'step_id': 1, 'action': 'tool_call', 'target': 'search_files', 'parameters': {}},
+                      {'step_id': 2, 'action': 'tool_call', 'target': 'launch_app', 'parameters': {'app_query': 'spotify'}}]}
+    results = pe._execute_plan(plan, 's')
+    assert [r['status'] for r in results] == ['declined', 'declined'] and calls == []
+    assert len(prompts) == 1 and 'launch_app' in prompts[0] and 'search_files' not in prompts[0]
@@ -0,0 +1,35 @@
+import pytest
+from orchestrator.plan_scheduler import PlanValidationError, build_graph, critical_path, substitute, topological_levels
+
+def test_depends_on_and_placeholders_build_the_graph():
+    plan = {'steps': [
+        {'step_id': 1, 'parameters': {}, 'depends_on': []},
+        {'step_id': 2, 'parameters': {'path': '{{step_1.output}}'}, 'depends_on': []},
+        {'step_id': 3, 'parameters': {}, 'depends_on': [1, 2]},
+    ]}
+    steps, deps = build_graph(plan)
+    assert list(steps) == [1, 2, 3]
+    assert deps == {1: set(), 2: {1}, 3: {1, 2}}
+    assert topological_levels(deps) == [[1], [2], [3]]
+
+def test_parallel_groups_used_when_depends_on_missing():
+    plan = {'steps': [{'step_id': 1}, {'step_id': 2}, {'step_id': 3}], 'parallel_groups': [[1, 2], [3]]}
+    assert build_graph(plan)[1] == {1: set(), 2: set(), 3: {1, 2}}
+
+@pytest.mark.parametrize('steps, message', [
+    ([{'step_id': 1, 'depends_on': [2]}, {'step_id': 2, 'depends_on': [1]}], 'cycle'),
+    ([{'step_id': 1, 'depends_on': [7]}], 'missing'),
+    ([{'step_id': 1, 'parameters': {'q': 'see {{step_9.output}}'}}], 'missing'),
+    ([{'step_id': 1}, {'step_id': 1}], 'Duplicate'),
+])
+def test_invalid_plans_rejected(steps, message):
+    with pytest.raises(PlanValidationError, match=message):
+        build_graph({'steps': steps})
+
+def test_substitute_and_critical_path():
+    outputs = {'1': ['a.txt', 'b.txt'], '2': 'ok'}
+    params = {'files': '{{step_1.output}}', 'note': 'status: {{ step_2.output }}', 'n': 3}
+    assert substitute(params, outputs) == {'files': ['a.txt', 'b.txt'], 'note': 'status: ok', 'n': 3}
+    deps = {1: set(), 2: set(), 3: {1}, 4: {2, 3}}
+    assert critical_path(deps, {1: 50, 2: 200, 3: 100, 4: 10}) == ([2, 4], 210)
+    assert critical_path({}, {}) == ([], 0.0)
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import pytest
+from orchestrator.memory_manager import MemoryManager
+from orchestrator.plan_executor import PlanExecutor
+from orchestrator.plan_store import PlanStore
+from orchestrator.tool_executor import ToolExecutor
+
+def list_pdfs(directory, pattern):
+    return [f"{directory}/a.{pattern}"]
+
+REGISTRY = {'search_files': f'{__name__}:list_pdfs'}
+
+PLAN = {'steps': [
+    {'step_id': 1, 'description': 'Find PDFs', 'action': 'tool_call', 'target': 'search_files',
+     'parameters': {'directory': 'reports', 'pattern': 'pdf'}, 'depends_on': []},
+    {'step_id': 2, 'description': 'Totals', 'action': 'llm_query', 'target': 'llm',
+     'parameters': {'prompt': 'Read me the totals of the reports in {{step_1.output}}'}, 'depends_on': [1]},
+]}
+
+@pytest.fixture
+def memory():
+    db_fd, db_path = tempfile.mkstemp()
+    os.close(db_fd)
+    mm = MemoryManager(db_path=db_path)
+    yield mm
+    mm.close()
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+class DummyBrain:
+    def _build_context(self, session_id):
+        return {'conversation_history': [], 'available_tools': {}, 'available_functions': {}}
+
+class CountingLLM:
+    def __init__(self, plan):
+        self.plan, self.plan_calls = plan, 0
+    def query(self, prompt):
+        if prompt.lstrip().startswith('You are a task planner'):
+            self.plan_calls += 1
+            return json.dumps(self.plan)
+        return f"answer to: {prompt}"
+
+def test_template_slots_come_from_tool_parameters(memory):
+    store = PlanStore(memory)
+    template = store.promote('Summarize every PDF in reports and read me the totals', PLAN)
+    assert template == 'summarize every {{slot_0}} in {{slot_1}} and read me the totals'
+    hit = PlanStore(memory).lookup('summarize every docx in Invoices, and read me the totals!')
+    assert hit['slots'] == ['docx', 'Invoices']
+    assert hit['plan']['steps'][0]['parameters'] == {'directory': 'Invoices', 'pattern': 'docx'}
+    assert hit['plan']['steps'][1]['parameters']['prompt'] == 'Read me the totals of the Invoices in {{step_1.output}}'
+    assert PlanStore(memory).lookup('summarize every pdf in reports and email the totals') is None
+
+def test_failing_template_is_retired(memory):
+    store = PlanStore(memory)
+    template = store.promote('summarize every pdf in reports', PLAN)
+    store.record_use(template, False)
+    store.record_use(template, False)
+    assert store.lookup('summarize every pdf in reports') is None
+    assert PlanStore(memory).lookup('summarize every pdf in reports') is None
+
+def test_executor_plans_once_then_reuses_the_template(memory):
+    llm = CountingLLM(PLAN)
+    pe = PlanExecutor(DummyBrain(), llm, tool_executor=ToolExecutor(registry=REGISTRY, read_only=REGISTRY), plan_store=PlanStore(memory))
+    pe.create_and_execute_plan('summarize every pdf in reports and read me the totals', 's1')
+    result = pe.create_and_execute_plan('summarize every txt in notes and read me the totals', 's1')
+    assert llm.plan_calls == 1
+    assert "notes/a.txt" in result
+    assert pe.plan_store.stats == {'hits': 1, 'misses': 1, 'promoted': 1, 'templates': 1}
+    assert memory.get_plan_templates()[0]['successes'] == 2
+
+def test_failed_plan_is_not_promoted(memory):
+    plan = {'steps': [{'step_id': 1, 'description': 'Nope', 'action': 'tool_call', 'target': 'unknown_tool', 'parameters': {}}]}
+    pe = PlanExecutor(DummyBrain(), CountingLLM(plan), tool_executor=ToolExecutor(registry=REGISTRY, read_only=REGISTRY), plan_store=PlanStore(memory))
+    pe.create_and_execute_plan('do the unknown thing', 's2')
+    assert memory.get_plan_templates() == []
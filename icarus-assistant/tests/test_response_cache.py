@@ -0,0 +1,73 @@
+import pytest
+from llm.openrouter_client import OpenRouterClient
+from llm.response_cache import ResponseCache, normalize_prompt
+from tests.openrouter_stub import OpenRouterStub
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+def test_normalized_prompt_hits():
+    cache = ResponseCache(path=None)
+    cache.put("What time is it?", "m", "Noon, sir.")
+    assert normalize_prompt("  what   TIME is it ") == "what time is it"
+    assert cache.get("what time is it", "m") == "Noon, sir."
+    assert cache.get("What time is it?", "other-model") is None
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = ResponseCache(path=None, ttl_s=60, clock=clock)
+    cache.put("hello", "m", "Good day.")
+    clock.now += 59
+    assert cache.get("hello", "m") == "Good day."
+    clock.now += 2
+    assert cache.get("hello", "m") is None
+    assert cache.stats['entries'] == 0
+
+def test_lru_and_byte_cap_eviction():
+    cache = ResponseCache(path=None, max_entries=2)
+    cache.put("a", "m", "1")
+    cache.put("b", "m", "2")
+    cache.get("a", "m")  # b is now least recently used
+    cache.put("c", "m", "3")
+    assert cache.get("b", "m") is None and cache.get("a", "m") == "1"
+    small = ResponseCache(path=None, max_bytes=30)
+    small.put("first", "m", "x" * 10)
+    small.put("second", "m", "y" * 10)
+    assert small.get("first", "m") is None and small.stats['bytes'] <= 30
+    assert small.stats['evictions'] == 1
+
+def test_persists_across_restarts(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    clock = FakeClock()
+    cache = ResponseCache(path=path, ttl_s=60, clock=clock)
+    cache.put("cpu usage", "m", "12 percent.")
+    cache.put("ram usage", "m", "40 percent.")
+    cache.close()
+    assert ResponseCache(path=path, ttl_s=60, clock=clock).get("CPU usage", "m") == "12 percent."
+    clock.now += 61
+    assert ResponseCache(path=path, ttl_s=60, clock=clock).stats['entries'] == 0
+
+def test_similarity_tier():
+    cache = ResponseCache(path=None, similarity_threshold=0.85)
+    cache.put("what time is it", "m", "Noon.")
+    assert cache.get("what time is it now", "m") == "Noon."
+    assert cache.get("open notepad", "m") is None
+    cache.put("set volume to 5", "m", "Done.")
+    assert cache.get("set volume to 7", "m") is None  # numbers must agree
+    assert cache.stats['similar_hits'] == 1
+    long_prompt = "Context: " + "x " * 200 + "question one"
+    cache.put(long_prompt, "m", "A.")
+    assert cache.get(long_prompt.replace("one", "two"), "m") is None  # long prompts hit exactly only
+
+def test_client_skips_request_on_hit():
+    with OpenRouterStub() as stub:
+        client = OpenRouterClient(api_key="k", model="m", api_url=stub.url, cache=ResponseCache(path=None))
+        assert client.query("Hello") == "echo: Hello"
+        assert client.query("hello!") == "echo: Hello"
+        assert "".join(client.query_stream("hello")) == "echo: Hello"
+        assert len(stub.requests) == 1
+        client.close()
@@ -0,0 +1,34 @@
+import pytest
+from utils.sentence_segmenter import SentenceSegmenter
+
+def test_emits_sentence_once_followed_by_space():
+    seg = SentenceSegmenter()
+    assert seg.feed("Hello there, how are") == []
+    assert seg.feed(" you today?") == []
+    assert seg.feed(" I am fine") == ["Hello there, how are you today?"]
+    assert seg.flush() == ["I am fine"]
+    assert seg.flush() == []
+
+def test_decimals_and_filenames_not_split():
+    seg = SentenceSegmenter()
+    out = seg.feed("The value is 3")
+    out += seg.feed(".14 and it is in notes")
+    out += seg.feed(".txt for reference. Next")
+    assert out == ["The value is 3.14 and it is in notes.txt for reference."]
+
+def test_abbreviations_do_not_end_sentences():
+    seg = SentenceSegmenter()
+    out = seg.feed("Ask Dr. Smith about it, e.g. tomorrow at noon. Then take a rest. ")
+    assert out == ["Ask Dr. Smith about it, e.g. tomorrow at noon.", "Then take a rest."]
+
+def test_short_sentences_merge_and_quotes_kept():
+    seg = SentenceSegmenter(min_chars=12)
+    out = seg.feed('Sure. I will open "notes." Done! ')
+    assert out == ['Sure. I will open "notes."']
+    assert seg.flush() == ["Done!"]
+
+def test_split_over_tokens_and_paragraphs():
+    text = "First line without a stop\n\nSecond paragraph ends here. Last bit"
+    tokens = [text[i:i + 3] for i in range(0, len(text), 3)]
+    assert list(SentenceSegmenter().split(tokens)) == [
+        "First line without a stop", "Second paragraph ends here.", "Last bit"]
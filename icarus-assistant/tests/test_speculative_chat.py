@@ -0,0 +1,72 @@
+import time
+from orchestrator.llm_brain import LLMBrain
+from orchestrator.speculative_chat import SpeculativeChat
+
+class SlowStreamClient:
+    def __init__(self, chunks, delay=0.02):
+        self._chunks, self.delay, self.sent, self.closed = chunks, delay, 0, False
+    def query_stream(self, prompt, system=None):
+        try:
+            for chunk in self._chunks:
+                time.sleep(self.delay)
+                self.sent += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+def test_used_reply_streams_and_records_saving():
+    client = SlowStreamClient(['Hello ', 'there, ', 'how can I help?'])
+    speculative = SpeculativeChat(client)
+    speculation = speculative.start('hi')
+    time.sleep(0.1)  # the intent parse
+    assert ''.join(speculative.use(speculation, intent_ms=100.0)) == 'Hello there, how can I help?'
+    stats = speculative.stats
+    assert stats['turns'] == 1 and stats['wins'] == 1 and stats['win_rate'] == 1.0
+    # Saving is the overlap: the first chunk arrived before the intent was known
+    assert 15 <= stats['saved_p50_ms'] < 100
+
+def test_discarded_reply_stops_the_stream():
+    client = SlowStreamClient([f'word{i} ' for i in range(100)])
+    speculative = SpeculativeChat(client)
+    speculation = speculative.start('open spotify')
+    time.sleep(0.05)
+    speculative.discard(speculation)
+    time.sleep(0.1)
+    assert client.closed and client.sent < 10
+    assert speculative.stats['wins'] == 0 and speculative.stats['turns'] == 1 and speculative.stats['wasted_chars'] > 0
+
+def test_stream_error_reaches_the_reader():
+    class FailingClient:
+        def query_stream(self, prompt, system=None):
+            yield 'Part'
+            raise RuntimeError('stream broke')
+    speculative = SpeculativeChat(FailingClient())
+    chunks = speculative.use(speculative.start('hi'), intent_ms=10.0)
+    assert next(chunks) == 'Part'
+    try:
+        next(chunks)
+        assert False, 'expected the stream error'
+    except RuntimeError as e:
+        assert 'stream broke' in str(e)
+
+def test_reply_gets_the_intent_context():
+    class RecordingClient:
+        def query_stream(self, prompt, system=None):
+            self.prompt, self.system = prompt, system
+            yield 'Still Paris.'
+    class Memory:
+        def get_recent(self, session_id, n):
+            return [{'role': 'user', 'content': 'I am flying to Paris'}, {'role': 'assistant', 'content': 'Noted.'}]
+    class IntentClient:
+        def query(self, prompt, system=None):
+            self.prompt = prompt
+            return '{"action": "direct_response", "target": "Paris", "parameters": {}}'
+    intent_client, chat_client = IntentClient(), RecordingClient()
+    brain = LLMBrain(intent_client, Memory())
+    context = brain._build_context('sess', 'where am I going?')
+    speculative = SpeculativeChat(chat_client)
+    speculation = speculative.start(brain.chat_prompt('where am I going?', context), brain.CHAT_SYSTEM_PROMPT)
+    assert brain.parse_intent('where am I going?', 'sess', with_reply=False, context=context)['action'] == 'direct_response'
+    assert ''.join(speculative.use(speculation, intent_ms=10.0)) == 'Still Paris.'
+    assert chat_client.system == LLMBrain.CHAT_SYSTEM_PROMPT
+    assert 'I am flying to Paris' in chat_client.prompt and chat_client.prompt == intent_client.prompt
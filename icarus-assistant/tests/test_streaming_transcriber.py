@@ -0,0 +1,88 @@
+import wave
+import numpy as np
+import pytest
+from stt.streaming_transcriber import StreamingTranscriber, iter_wav_chunks, pad_mel
+
+WORDS = ['turn', 'on', 'the', 'kitchen', 'lights']
+
+@pytest.fixture
+def fixture_wav(tmp_path):
+    """Writes a 'recording' of five voiced bursts separated by short pauses."""
+    t = np.arange(int(16000 * 0.4)) / 16000
+    burst = (8000 * np.sin(2 * np.pi * 200 * t)).astype(np.int16)
+    gap = np.zeros(int(16000 * 0.2), dtype=np.int16)
+    pcm = np.concatenate([np.concatenate([burst, gap]) for _ in WORDS])
+    path = tmp_path / 'command.wav'
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(pcm.tobytes())
+    return str(path)
+
+class BurstCountingDecoder:
+    """Stands in for Whisper: one word per 0.4 s voiced burst seen in the mel window."""
+    def __init__(self):
+        self.shapes = []
+    def __call__(self, mel):
+        self.shapes.append(mel.shape)
+        voiced = (mel.max(axis=0) > mel.min() + 1.0).sum()
+        return ' '.join(WORDS[:int(voiced // 38)])
+
+def test_partial_then_final_hypotheses(fixture_wav):
+    decoder = BurstCountingDecoder()
+    seen = []
+    st = StreamingTranscriber(decoder, step_s=0.5, on_hypothesis=seen.append)
+    hypotheses = list(st.transcribe_stream(iter_wav_chunks(fixture_wav)))
+    assert hypotheses == seen
+    assert hypotheses[-1]['final'] and hypotheses[-1]['text'] == ' '.join(WORDS)
+    partials = [h for h in hypotheses if not h['final']]
+    assert len(partials) >= 4
+    assert all(shape == (80, 3000) for shape in decoder.shapes)
+    # Stable text only ever grows and is always a prefix of the final transcript
+    stables = [h['stable'] for h in hypotheses]
+    for a, b in zip(stables, stables[1:]):
+        assert b.startswith(a)
+    assert any(h['stable'] for h in partials)
+
+def test_mel_frames_are_computed_once(fixture_wav):
+    st = StreamingTranscriber(BurstCountingDecoder(), step_s=0.25)
+    list(st.transcribe_stream(iter_wav_chunks(fixture_wav, chunk=800)))
+    assert st.mel.frames_computed == 300
+    assert st.frames_decoded > 3 * st.mel.frames_computed
+
+def test_window_commit_keeps_text(fixture_wav):
+    st = StreamingTranscriber(BurstCountingDecoder(), step_s=0.5, window_s=1.2)
+    final = list(st.transcribe_stream(iter_wav_chunks(fixture_wav)))[-1]
+    assert final['final'] and len(final['text'].split()) >= 2
+    assert st._window_start > 0
+    with pytest.raises(IndexError):
+        st.mel.frames(0, 10)  # frames of committed windows are released
+
+def test_pad_mel_uses_silence_level():
+    raw = np.full((80, 10), -2.0, dtype=np.float32)
+    mel = pad_mel(raw)
+    assert mel.shape == (80, 3000)
+    assert np.allclose(mel[:, 10:], (-10.0 + 4) / 4)
+
+def test_rejects_non_16k_wav(tmp_path):
+    path = tmp_path / 'bad.wav'
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(8000)
+        wf.writeframes(b'\x00\x00' * 10)
+    with pytest.raises(ValueError):
+        list(iter_wav_chunks(str(path)))
+
+def test_audio_decoder_gets_window_samples(fixture_wav):
+    calls = []
+    def decoder(audio):
+        calls.append(len(audio))
+        voiced = (np.abs(audio.reshape(-1, 160)).max(axis=1) > 0.1).sum()
+        return ' '.join(WORDS[:int(voiced // 38)])
+    st = StreamingTranscriber(decoder, step_s=0.5, features='audio')
+    hypotheses = list(st.transcribe_stream(iter_wav_chunks(fixture_wav)))
+    assert hypotheses[-1]['final'] and hypotheses[-1]['text'] == ' '.join(WORDS)
+    assert calls[-1] == 48000 and all(n % 160 == 0 for n in calls)
+    assert len(hypotheses) >= 5
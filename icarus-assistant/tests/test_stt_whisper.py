@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from unittest.mock import patch, MagicMock
 from stt.whisper_wrapper import WhisperSTT
@@ -30,4 +31,26 @@ def test_transcribe_corrupted(monkeypatch):
     stt = WhisperSTT()
     monkeypatch.setattr(stt, 'model', MagicMock(side_effect=Exception('corrupted')))
     with pytest.raises(Exception):
-        stt.transcribe('corrupt.wav') 
\ No newline at end of file
+        stt.transcribe('corrupt.wav') 
+
+
+def test_transcribe_in_memory_buffer(monkeypatch):
+    stt = WhisperSTT()
+    monkeypatch.setattr(stt, 'model', MagicMock())
+    stt.model.transcribe.return_value = {'text': 'from memory'}
+    pcm = np.zeros(16000, dtype=np.int16)
+    assert stt.transcribe(memoryview(pcm)) == 'from memory'
+    passed = stt.model.transcribe.call_args[0][0]
+    assert isinstance(passed, np.ndarray) and passed.dtype == np.float32
+
+def test_streaming_falls_back_to_audio_transcription():
+    class AudioOnlyModel:
+        def transcribe(self, audio, **kwargs):
+            return {'text': f'{len(audio)} samples'}
+    class Pool:
+        model = AudioOnlyModel()
+        backend = 'ctranslate2'
+    stt = WhisperSTT(pool=Pool())
+    st = stt.streaming(step_s=0.5)
+    st.feed(np.zeros(16000, dtype=np.float32))
+    assert st.finish()[-1]['text'] == '16000 samples'
@@ -0,0 +1,113 @@
+import os
+import pytest
+from orchestrator.memory_manager import MemoryManager
+from orchestrator.tool_executor import ToolExecutor, ToolNotAllowedError
+
+calls = []
+
+def count_lines(file_path):
+    calls.append(file_path)
+    with open(file_path) as f:
+        return f"{len(f.readlines())} lines"
+
+def write_note(file_path, content):
+    with open(file_path, 'w') as f:
+        f.write(content)
+    return 'written'
+
+def fail(**kwargs):
+    raise ValueError('broken tool')
+
+REGISTRY = {'count_lines': f'{__name__}:count_lines', 'fail': f'{__name__}:fail',
+            'edit_text': f'{__name__}:write_note',
+            'clock': 'actions.system_tools:get_current_time'}
+
+READ_ONLY = {'count_lines', 'fail', 'clock'}
+
+class Clock:
+    now = 0.0
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def memory(tmp_path):
+    mm = MemoryManager(db_path=str(tmp_path / 'memory.sqlite'))
+    yield mm
+    mm.close()
+
+def test_result_cached_until_file_changes(memory, tmp_path):
+    calls.clear()
+    path = tmp_path / 'notes.txt'
+    path.write_text('a\nb\n')
+    executor = ToolExecutor(memory, REGISTRY, ttls={'count_lines': 60}, read_only=READ_ONLY)
+    assert executor.execute('count_lines', {'file_path': str(path)}) == '2 lines'
+    assert executor.execute('count_lines', {'file_path': str(path)}) == '2 lines'
+    assert len(calls) == 1
+    path.write_text('a\nb\nc\n')
+    os.utime(path, ns=(1, 1))
+    assert executor.execute('count_lines', {'file_path': str(path)}) == '3 lines'
+    assert len(calls) == 2
+
+def test_ttl_expiry_and_uncached_tools(memory, tmp_path):
+    calls.clear()
+    path = tmp_path / 'notes.txt'
+    path.write_text('a\n')
+    clock = Clock()
+    executor = ToolExecutor(memory, REGISTRY, ttls={'count_lines': 10}, clock=clock, read_only=READ_ONLY)
+    executor.execute('count_lines', {'file_path': str(path)})
+    clock.now = 11
+    executor.execute('count_lines', {'file_path': str(path)})
+    assert len(calls) == 2
+    no_cache = ToolExecutor(memory, REGISTRY, ttls={}, read_only=READ_ONLY)
+    no_cache.execute('count_lines', {'file_path': str(path)})
+    no_cache.execute('count_lines', {'file_path': str(path)})
+    assert len(calls) == 4
+
+def test_executions_logged_and_reported(memory, tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('a\n')
+    executor = ToolExecutor(memory, REGISTRY, ttls={'count_lines': 60}, read_only=READ_ONLY)
+    for _ in range(3):
+        executor.execute('count_lines', {'file_path': str(path)}, session_id='s')
+    with pytest.raises(ValueError):
+        executor.execute('fail', {}, session_id='s')
+    report = executor.report()
+    assert report['count_lines']['calls'] == 3 and report['count_lines']['cached'] == 2
+    assert report['fail'] == dict(report['fail'], calls=1, errors=1)
+    assert report['count_lines']['p95_ms'] >= report['count_lines']['p50_ms'] >= 0
+
+def test_unknown_tool_and_lazy_import(memory):
+    executor = ToolExecutor(memory, REGISTRY, read_only=READ_ONLY)
+    assert executor._functions == {}
+    with pytest.raises(KeyError):
+        executor.execute('missing')
+    assert len(executor.execute('clock')) == len('12:00:00')
+    assert list(executor._functions) == ['clock']
+
+def test_side_effect_tools_need_confirmation_and_safe_paths(memory, tmp_path):
+    note = str(tmp_path / 'note.txt')
+    answers, prompts = [False, True], []
+    def confirm(prompt):
+        prompts.append(prompt)
+        return answers.pop(0)
+    executor = ToolExecutor(memory, REGISTRY, read_only=READ_ONLY, confirm=confirm, allowed_dirs=[str(tmp_path)])
+    with pytest.raises(ToolNotAllowedError):
+        executor.execute('edit_text', {'file_path': note, 'content': 'x'})
+    assert not os.path.exists(note)
+    assert executor.execute('edit_text', {'file_path': note, 'content': 'x'}) == 'written'
+    assert 'edit_text' in prompts[0] and note in prompts[0]
+    with pytest.raises(ToolNotAllowedError):
+        executor.execute('edit_text', {'file_path': '/etc/passwd', 'content': 'x'}, confirmed=True)
+    assert len(prompts) == 2  # an unsafe path is refused without asking
+    with pytest.raises(ToolNotAllowedError):
+        ToolExecutor(memory, REGISTRY, read_only=READ_ONLY).execute('edit_text', {'file_path': note, 'content': 'y'})
+    assert executor.report()['edit_text']['errors'] == 3
+
+def test_read_file_sees_edits(memory, tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('first draft')
+    executor = ToolExecutor(memory)
+    command = {'user_command': 'read notes.txt', 'search_dirs': [str(tmp_path)]}
+    assert 'first draft' in executor.execute('read_file', command)
+    path.write_text('second draft')
+    assert 'second draft' in executor.execute('read_file', command)
@@ -40,4 +40,21 @@ def test_engine_unavailable(monkeypatch, capsys):
     monkeypatch.setattr(tts, 'engine', None)
     tts.speak('hello')
     out = capsys.readouterr().out
-    assert 'pyttsx3 not available' in out or 'TTS fallback' in out 
\ No newline at end of file
+    assert 'pyttsx3 not available' in out or 'TTS fallback' in out 
+
+
+def test_speak_stream_queues_each_sentence(monkeypatch):
+    tts = OpenVoiceTTS()
+    monkeypatch.setattr(tts, 'engine', MagicMock())
+    tts.available = True
+    tts._start_tts_thread()
+    chunks = iter(["The first sen", "tence is here. The sec", "ond one follows! And a tail"])
+    heard = []
+    result = tts.speak_stream(chunks, on_sentence=heard.append)
+    tts.wait_until_done()
+    assert heard == ["The first sentence is here.", "The second one follows!", "And a tail"]
+    assert [c.args[0] for c in tts.engine.say.call_args_list] == heard
+    assert result['text'] == "The first sentence is here. The second one follows! And a tail"
+    assert result['sentences'] == 3
+    assert result['first_sentence_s'] <= result['total_s']
+    tts.stop()
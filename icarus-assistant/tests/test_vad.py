@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from utils.vad import RingBuffer, EnergyVAD, VADEndpointer
+
+RATE = 16000
+
+def tone(seconds, amplitude=8000, freq=220):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+def silence(seconds, noise=20):
+    rng = np.random.default_rng(0)
+    return rng.integers(-noise, noise, int(RATE * seconds)).astype(np.int16)
+
+def chunked(samples, size=1024, as_bytes=True):
+    for i in range(0, len(samples), size):
+        chunk = samples[i:i + size]
+        yield chunk.tobytes() if as_bytes else chunk
+
+def test_ring_buffer_wraps_and_keeps_newest():
+    rb = RingBuffer(5)
+    rb.write(np.array([1, 2, 3], dtype=np.int16))
+    rb.write(np.array([4, 5, 6, 7], dtype=np.int16))
+    assert rb.full
+    assert rb.read_all().tolist() == [3, 4, 5, 6, 7]
+    rb.write(np.arange(10, dtype=np.int16))
+    assert rb.read_all().tolist() == [5, 6, 7, 8, 9]
+    rb.clear()
+    assert len(rb) == 0
+
+def test_ring_buffer_invalid_capacity():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+def test_energy_vad_separates_tone_from_silence():
+    vad = EnergyVAD()
+    assert not vad.is_speech(silence(0.03))
+    assert vad.is_speech(tone(0.03))
+
+def test_endpoint_after_trailing_silence():
+    pcm = np.concatenate([silence(0.5), tone(1.0), silence(2.0)])
+    ep = VADEndpointer(silence_ms=300)
+    samples = ep.process(chunked(pcm))
+    assert ep.metrics['reason'] == 'silence'
+    # Stops well before the end of the stream instead of consuming all 3.5 s
+    assert ep.metrics['audio_ms'] < 2000
+    assert 300 <= ep.metrics['endpoint_lag_ms'] < 400
+    assert 1000 <= len(samples) * 1000 / RATE < 1700
+
+def test_short_pause_does_not_end_utterance():
+    pcm = np.concatenate([tone(0.5), silence(0.2), tone(0.5), silence(1.0)])
+    ep = VADEndpointer(silence_ms=400)
+    samples = ep.process(chunked(pcm, as_bytes=False))
+    assert ep.metrics['reason'] == 'silence'
+    assert ep.metrics['speech_ms'] >= 900
+    assert len(samples) / RATE > 1.2
+
+def test_pre_roll_included_before_onset():
+    pcm = np.concatenate([silence(1.0), tone(0.5), silence(1.0)])
+    ep = VADEndpointer(silence_ms=300, pre_roll_ms=200)
+    samples = ep.process(chunked(pcm))
+    assert ep.metrics['onset_ms'] == pytest.approx(1000, abs=40)
+    assert np.abs(samples[:RATE // 10]).max() < 100  # leading pre-roll is the quiet lead-in
+
+def test_timeout_without_speech():
+    ep = VADEndpointer(start_timeout=1.0)
+    samples = ep.process(chunked(silence(3.0)))
+    assert ep.metrics['reason'] == 'timeout'
+    assert len(samples) == 0
+
+def test_max_duration_cap():
+    ep = VADEndpointer(max_duration=1.0)
+    samples = ep.process(chunked(tone(3.0)))
+    assert ep.metrics['reason'] == 'max_duration'
+    assert len(samples) / RATE <= 1.4
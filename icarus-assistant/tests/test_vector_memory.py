@@ -0,0 +1,70 @@
+import pytest
+from orchestrator.llm_brain import LLMBrain
+from orchestrator.memory_manager import MemoryManager
+from orchestrator.tool_executor import ToolExecutor
+from orchestrator.vector_memory import VectorMemory
+from llm.response_cache import HashedTrigramEmbedder
+
+class DummyLLM:
+    def __init__(self):
+        self.last_prompt = None
+    def query(self, prompt, system=None):
+        self.last_prompt = prompt
+        return '{"action": "direct_response", "target": "ok", "parameters": {}}'
+
+@pytest.fixture
+def memory(tmp_path):
+    mm = MemoryManager(db_path=str(tmp_path / 'memory.sqlite'))
+    yield mm
+    mm.close()
+
+def test_sync_indexes_new_messages_once(memory):
+    vectors = VectorMemory(memory, HashedTrigramEmbedder())
+    memory.store_message('s', 'user', 'My dentist appointment is on Friday at 3pm')
+    memory.store_message('s', 'assistant', 'ok')
+    assert vectors.sync() == 1  # 'ok' is too short to index
+    assert vectors.sync() == 0
+    memory.store_message('s', 'user', 'My dentist appointment is on Friday at 3pm')
+    assert vectors.sync() == 0  # duplicate text in the same session
+    assert vectors.stats['vectors'] == 1
+
+def test_search_ranks_similar_text_first(memory):
+    vectors = VectorMemory(memory, HashedTrigramEmbedder())
+    vectors.add('s', 'The wifi password for the office is tangerine42')
+    vectors.add('s', 'Quarterly revenue grew eight percent over last year')
+    vectors.add('t', 'Remember to water the plants on the balcony')
+    hits = vectors.search('what is the office wifi password', k=2)
+    assert hits[0]['content'].startswith('The wifi password') and hits[0]['source'] == 'tool'
+    assert hits[0]['score'] > hits[1]['score']
+    assert [h['session_id'] for h in vectors.search('plants', k=5, session_id='t')] == ['t']
+
+def test_vectors_reloaded_from_database(memory):
+    VectorMemory(memory, HashedTrigramEmbedder()).add('s', 'The car is parked on level three')
+    reloaded = VectorMemory(memory, HashedTrigramEmbedder())
+    assert reloaded.stats['vectors'] == 1
+    assert reloaded.search('where is the car parked', k=1)[0]['content'] == 'The car is parked on level three'
+    assert VectorMemory(memory, HashedTrigramEmbedder(dim=64)).stats['vectors'] == 0  # other embedder
+
+def test_brain_prompt_includes_relevant_memory(memory):
+    memory.store_message('old', 'user', 'My flight to Lisbon leaves at 7:45 on Monday')
+    for i in range(12):
+        memory.store_message('s', 'user', f'Unrelated chat message number {i}')
+    llm = DummyLLM()
+    vectors = VectorMemory(memory, HashedTrigramEmbedder())
+    vectors.sync_async().result()  # the startup backfill
+    brain = LLMBrain(llm, memory, vector_memory=vectors)
+    brain.parse_intent('When does my flight to Lisbon leave?', 's')
+    assert 'Relevant memory: ["user: My flight to Lisbon leaves at 7:45 on Monday"]' in llm.last_prompt
+
+
+def lookup_order(order_id):
+    return f"Order {order_id} shipped to Lisbon on Monday by courier"
+
+def test_tool_outputs_embedded_in_background(memory):
+    vectors = VectorMemory(memory, HashedTrigramEmbedder())
+    registry = {'lookup_order': f'{__name__}:lookup_order'}
+    executor = ToolExecutor(memory, registry, vector_memory=vectors, read_only=registry)
+    executor.execute('lookup_order', {'order_id': 1182}, session_id='s')
+    vectors.sync_async().result()  # runs after the queued add on the same worker
+    hit = vectors.search('where was order 1182 shipped', k=1)[0]
+    assert hit['source'] == 'lookup_order' and hit['content'].startswith('Order 1182 shipped')
@@ -26,6 +26,7 @@ def test_corrupted_audio(tmp_path, stt):
         stt.transcribe(str(fname))
 
 def test_model_load_error(monkeypatch):
+    monkeypatch.setattr("stt.model_pool._pools", {})
     monkeypatch.setattr("whisper.load_model", lambda *a, **k: (_ for _ in ()).throw(Exception("fail")))
     with pytest.raises(Exception):
         WhisperSTT()
@@ -7,18 +7,22 @@ Text-to-Speech (TTS) wrapper for OpenVoice (manual setup required). Falls back t
 import threading
 import time
 import queue
-from typing import Optional
+from typing import Dict, Iterable, Optional
+from utils.sentence_segmenter import SentenceSegmenter
 
 class OpenVoiceTTS:
     """Wrapper for OpenVoice TTS. Falls back to pyttsx3 if OpenVoice is not available.
 
     Methods:
         speak(text: str) -> None: Speaks the given text aloud.
+        speak_stream(chunks: Iterable[str]) -> Dict: Speaks streamed text sentence by sentence.
+        wait_until_done() -> None: Blocks until queued speech has been spoken.
         set_voice(voice_name: str) -> None: Sets the TTS voice.
         set_speed(rate: int) -> None: Sets the TTS speech rate.
         set_volume(volume: float) -> None: Sets the TTS volume (0.0 to 1.0).
         mute() -> None: Mutes TTS output.
         unmute() -> None: Unmutes TTS output.
+        restart() -> bool: Reinitializes the engine and worker in place.
     """
     def __init__(self):
         """Initializes the OpenVoice TTS system or fallback TTS."""
@@ -28,6 +32,7 @@ class OpenVoiceTTS:
         self.speech_queue = queue.Queue()
         self.tts_thread = None
         self.should_stop = False
+        self.first_audio_at = None  # perf_counter() when the worker started speaking queued text
         
         # Initialize TTS engine
         self._init_tts_engine()
@@ -76,10 +81,16 @@ class OpenVoiceTTS:
                 text = self.speech_queue.get(timeout=1.0)
                 
                 if text is None:  # Shutdown signal
+                    self.speech_queue.task_done()
                     break
                     
-                if not self.muted and self.available and self.engine:
-                    self._speak_text(text)
+                try:
+                    if not self.muted and self.available and self.engine:
+                        if self.first_audio_at is None:
+                            self.first_audio_at = time.perf_counter()
+                        self._speak_text(text)
+                finally:
+                    self.speech_queue.task_done()
                     
             except queue.Empty:
                 continue
@@ -135,6 +146,53 @@ class OpenVoiceTTS:
         except Exception as e:
             print(f"[TTS] Error queuing speech: {e}")
 
+    def speak_stream(self, chunks: Iterable[str], on_sentence=None) -> Dict:
+        """Speaks streamed text as it arrives: each sentence is queued as soon as it is complete.
+
+        The stream is always consumed in full, so the caller gets the whole text back even when
+        TTS is muted or unavailable.
+
+        Args:
+            chunks (Iterable[str]): Text fragments, e.g. from OpenRouterClient.query_stream.
+            on_sentence (callable, optional): Called with each sentence when it is queued.
+
+        Returns:
+            Dict: {'text', 'sentences', 'first_chunk_s', 'first_sentence_s', 'first_audio_s', 'total_s'}
+            with times in seconds from the call; first_audio_s is None if nothing was spoken yet.
+        """
+        start = time.perf_counter()
+        self.first_audio_at = None
+        segmenter = SentenceSegmenter()
+        parts, first_chunk, first_sentence, sentences = [], None, None, 0
+
+        def emit(sentence):
+            nonlocal first_sentence, sentences
+            if first_sentence is None:
+                first_sentence = time.perf_counter() - start
+            sentences += 1
+            if on_sentence:
+                on_sentence(sentence)
+            if self.available and not self.muted:
+                self.speak(sentence)
+
+        for chunk in chunks:
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            parts.append(chunk)
+            for sentence in segmenter.feed(chunk):
+                emit(sentence)
+        for sentence in segmenter.flush():
+            emit(sentence)
+        first_audio = self.first_audio_at - start if self.first_audio_at is not None else None
+        return {'text': ''.join(parts), 'sentences': sentences, 'first_chunk_s': first_chunk,
+                'first_sentence_s': first_sentence, 'first_audio_s': first_audio,
+                'total_s': time.perf_counter() - start}
+
+    def wait_until_done(self) -> None:
+        """Blocks until every queued sentence has been spoken."""
+        if self.tts_thread is not None and self.tts_thread.is_alive():
+            self.speech_queue.join()
+
     def speak_sync(self, text: str) -> None:
         """Speaks text synchronously (blocking) for immediate feedback."""
         if not text or not text.strip() or self.muted:
@@ -209,6 +267,17 @@ class OpenVoiceTTS:
         print("[TTS] Unmuted.")
         self.speak_sync("TTS unmuted.")
 
+    def restart(self) -> bool:
+        """Reinitialize the engine and worker thread in place instead of building a new wrapper.
+
+        Returns:
+            bool: True if TTS is available after the restart.
+        """
+        self._reinit_engine()
+        if self.available:
+            self._start_tts_thread()
+        return self.available
+
     def stop(self):
         """Stop the TTS system and clean up."""
         self.should_stop = True
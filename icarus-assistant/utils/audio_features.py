@@ -0,0 +1,213 @@
+"""
+audio_features.py
+
+NumPy log-mel front end matching Whisper's, computed incrementally so streaming windows reuse frames.
+"""
+
+from typing import Optional
+import numpy as np
+
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+N_MELS = 80
+FRAMES_PER_SECOND = SAMPLE_RATE // HOP_LENGTH
+
+
+def _hz_to_mel(freqs: np.ndarray) -> np.ndarray:
+    """Slaney mel scale (linear below 1 kHz, logarithmic above), as used by librosa and Whisper."""
+    freqs = np.asanyarray(freqs, dtype=np.float64)
+    f_sp = 200.0 / 3
+    mels = freqs / f_sp
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    return np.where(freqs >= min_log_hz,
+                    min_log_mel + np.log(np.maximum(freqs, min_log_hz) / min_log_hz) / logstep, mels)
+
+
+def _mel_to_hz(mels: np.ndarray) -> np.ndarray:
+    mels = np.asanyarray(mels, dtype=np.float64)
+    f_sp = 200.0 / 3
+    freqs = f_sp * mels
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    return np.where(mels >= min_log_mel, min_log_hz * np.exp(logstep * (mels - min_log_mel)), freqs)
+
+
+def mel_filterbank(n_mels: int = N_MELS, sample_rate: int = SAMPLE_RATE, n_fft: int = N_FFT) -> np.ndarray:
+    """Returns a Slaney-normalised mel filterbank of shape (n_mels, n_fft // 2 + 1).
+
+    Equivalent to librosa.filters.mel(sr=sample_rate, n_fft=n_fft, n_mels=n_mels), which is what
+    Whisper ships as its precomputed filters.
+    """
+    fft_freqs = np.linspace(0, sample_rate / 2, 1 + n_fft // 2)
+    mel_f = _mel_to_hz(np.linspace(_hz_to_mel(0.0), _hz_to_mel(sample_rate / 2), n_mels + 2))
+    fdiff = np.diff(mel_f)
+    ramps = np.subtract.outer(mel_f, fft_freqs)
+    lower = -ramps[:-2] / fdiff[:-1, None]
+    upper = ramps[2:] / fdiff[1:, None]
+    weights = np.maximum(0, np.minimum(lower, upper))
+    weights *= (2.0 / (mel_f[2:n_mels + 2] - mel_f[:n_mels]))[:, None]
+    return weights.astype(np.float32)
+
+
+def normalize_log_mel(log_spec: np.ndarray) -> np.ndarray:
+    """Applies Whisper's dynamic-range clamp and scaling to raw log10 mel frames."""
+    if log_spec.size == 0:
+        return log_spec.astype(np.float32)
+    log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+    return ((log_spec + 4.0) / 4.0).astype(np.float32)
+
+
+class IncrementalLogMel:
+    """Computes raw log10 mel frames as audio arrives, computing every frame exactly once.
+
+    Framing follows Whisper (400-sample Hann window, 160-sample hop, reflect padding at both ends,
+    last frame dropped), so feeding a clip in any chunking and calling finish() yields the same
+    frames as a one-shot computation. Frames are emitted as soon as their window is complete.
+
+    Methods:
+        feed(samples) -> int: Adds float32 samples, returns the number of new frames.
+        finish() -> int: Flushes the tail frames once the stream has ended.
+        frames(start, end) -> np.ndarray: Returns cached frames (n_mels, end - start).
+        trim(before) -> None: Drops cached frames older than `before` to bound memory.
+    """
+    def __init__(self, n_mels: int = N_MELS, filters: Optional[np.ndarray] = None):
+        self.n_mels = n_mels
+        self.filters = filters if filters is not None else mel_filterbank(n_mels)
+        self.window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(N_FFT) / N_FFT)).astype(np.float32)
+        self.total_samples = 0
+        self.frames_computed = 0
+        self.finished = False
+        self._pad = N_FFT // 2
+        self._head = np.zeros(0, dtype=np.float32)  # samples buffered before the start pad is known
+        self._buffer = None                          # padded samples still needed for future frames
+        self._buffer_start = -self._pad              # absolute sample index of _buffer[0]
+        self._cache = np.zeros((n_mels, 0), dtype=np.float32)
+        self._cache_start = 0                        # absolute frame index of _cache[:, 0]
+        self._cache_len = 0
+
+    @property
+    def first_frame(self) -> int:
+        """Absolute index of the oldest frame still cached."""
+        return self._cache_start
+
+    @property
+    def num_frames(self) -> int:
+        """Absolute index one past the newest computed frame."""
+        return self._cache_start + self._cache_len
+
+    def feed(self, samples: np.ndarray) -> int:
+        """Adds samples and computes every frame whose analysis window is now complete.
+
+        Args:
+            samples (np.ndarray): float32 16 kHz mono samples.
+
+        Returns:
+            int: Number of frames computed by this call.
+        """
+        if self.finished:
+            raise RuntimeError("Stream already finished")
+        samples = np.asarray(samples, dtype=np.float32).ravel()
+        self.total_samples += len(samples)
+        if self._buffer is None:
+            self._head = np.concatenate((self._head, samples))
+            if len(self._head) <= self._pad:
+                return 0
+            # Reflect-pad the start exactly like torch.stft(center=True, pad_mode='reflect')
+            self._buffer = np.concatenate((self._head[1:self._pad + 1][::-1], self._head))
+            self._head = None
+        else:
+            self._buffer = np.concatenate((self._buffer, samples))
+        last = (self.total_samples - self._pad) // HOP_LENGTH  # newest frame with a complete window
+        return self._compute(last + 1)
+
+    def finish(self) -> int:
+        """Reflect-pads the end of the stream and computes the remaining frames.
+
+        Returns:
+            int: Number of frames computed by this call.
+        """
+        if self.finished:
+            return 0
+        self.finished = True
+        if self._buffer is None:
+            head = self._head
+            if len(head) == 0:
+                return 0
+            # Too short to reflect; zero-pad instead
+            self._buffer = np.concatenate((np.zeros(self._pad, dtype=np.float32), head))
+        tail = self._buffer[-self._pad - 1:-1][::-1]
+        if len(tail) < self._pad:
+            tail = np.concatenate((tail, np.zeros(self._pad - len(tail), dtype=np.float32)))
+        self._buffer = np.concatenate((self._buffer, tail))
+        return self._compute(self.total_samples // HOP_LENGTH)
+
+    def _compute(self, end_frame: int) -> int:
+        start_frame = self.num_frames
+        if end_frame <= start_frame:
+            return 0
+        offset = start_frame * HOP_LENGTH - self._pad - self._buffer_start
+        needed = (end_frame - start_frame - 1) * HOP_LENGTH + N_FFT
+        segment = self._buffer[offset:offset + needed]
+        windows = np.lib.stride_tricks.sliding_window_view(segment, N_FFT)[::HOP_LENGTH]
+        power = np.abs(np.fft.rfft(windows * self.window, axis=1)) ** 2
+        log_mel = np.log10(np.maximum(self.filters @ power.T.astype(np.float32), 1e-10))
+        self._append(log_mel.astype(np.float32))
+        # Drop samples that no future frame will touch
+        keep_from = end_frame * HOP_LENGTH - self._pad - self._buffer_start
+        self._buffer = self._buffer[keep_from:]
+        self._buffer_start += keep_from
+        self.frames_computed += log_mel.shape[1]
+        return log_mel.shape[1]
+
+    def _append(self, frames: np.ndarray) -> None:
+        n = frames.shape[1]
+        if self._cache_len + n > self._cache.shape[1]:
+            grown = np.zeros((self.n_mels, max(2 * self._cache.shape[1], self._cache_len + n, 256)), dtype=np.float32)
+            grown[:, :self._cache_len] = self._cache[:, :self._cache_len]
+            self._cache = grown
+        self._cache[:, self._cache_len:self._cache_len + n] = frames
+        self._cache_len += n
+
+    def frames(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """Returns cached raw log10 frames for absolute frame indices [start, end).
+
+        Raises:
+            IndexError: If start precedes trimmed frames.
+        """
+        end = self.num_frames if end is None else min(end, self.num_frames)
+        if start < self._cache_start:
+            raise IndexError(f"Frame {start} was already trimmed")
+        return self._cache[:, start - self._cache_start:end - self._cache_start]
+
+    def trim(self, before: int) -> None:
+        """Discards cached frames with absolute index below `before`."""
+        drop = min(max(0, before - self._cache_start), self._cache_len)
+        if drop:
+            self._cache[:, :self._cache_len - drop] = self._cache[:, drop:self._cache_len]
+            self._cache_len -= drop
+            self._cache_start += drop
+
+
+def log_mel_spectrogram(audio: np.ndarray, n_mels: int = N_MELS) -> np.ndarray:
+    """One-shot raw log10 mel spectrogram (n_mels, len(audio) // 160) of float32 audio."""
+    mel = IncrementalLogMel(n_mels)
+    mel.feed(audio)
+    mel.finish()
+    return mel.frames().copy()
+
+
+def dct_matrix(n_mfcc: int, n_mels: int = N_MELS) -> np.ndarray:
+    """Orthonormal DCT-II basis of shape (n_mfcc, n_mels) for turning log-mel frames into MFCCs."""
+    n = np.arange(n_mels)
+    basis = np.cos(np.pi / n_mels * (n + 0.5)[None, :] * np.arange(n_mfcc)[:, None])
+    basis[0] *= 1.0 / np.sqrt(2)
+    return (basis * np.sqrt(2.0 / n_mels)).astype(np.float32)
+
+
+def mfcc(log_mel: np.ndarray, n_mfcc: int = 13) -> np.ndarray:
+    """MFCCs (n_mfcc, n_frames) from raw log10 mel frames (n_mels, n_frames)."""
+    return dct_matrix(n_mfcc, log_mel.shape[0]) @ log_mel
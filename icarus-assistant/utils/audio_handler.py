@@ -8,21 +8,39 @@ import pyaudio
 import wave
 import os
 import time
+from typing import Optional
+import numpy as np
+from utils.mic_stream import MicrophoneStream
+from utils.vad import VADEndpointer
+from utils.pcm import as_float32
 
 class AudioHandler:
     """Handles microphone input and audio file operations.
 
     Methods:
         record(duration: int) -> str: Records audio and saves to file.
+        record_until_silence(max_duration: float) -> np.ndarray: Streams audio until the speaker stops.
     """
-    def __init__(self):
-        """Initializes the audio handler."""
+    def __init__(self, debug_sink: bool = False, mic_stream: Optional[MicrophoneStream] = None):
+        """Initializes the audio handler.
+
+        Args:
+            debug_sink (bool): If True, streamed utterances are also written to output_dir as WAV files.
+            mic_stream (MicrophoneStream, optional): Shared capture stream; record_until_silence reads
+                from it instead of opening the device itself.
+        """
         self.format = pyaudio.paInt16
         self.channels = 1
         self.rate = 16000
         self.chunk = 1024
         self.audio = pyaudio.PyAudio()
         self.output_dir = 'scratch'  # Save temp audio files here
+        self.debug_sink = debug_sink
+        self.mic_stream = mic_stream
+        self.last_metrics = {}
+
+    def _ensure_output_dir(self) -> None:
+        """Creates output_dir on first use; only file-based recording needs it."""
         if not os.path.exists(self.output_dir):
             try:
                 os.makedirs(self.output_dir)
@@ -30,6 +48,35 @@ class AudioHandler:
                 print(f"[AudioHandler] Permission denied creating output_dir: {e}")
                 raise
 
+    def _write_wav(self, pcm: bytes) -> str:
+        """Writes int16 PCM to a timestamped WAV in output_dir and prunes old recordings.
+
+        Args:
+            pcm (bytes): Raw int16 mono PCM.
+
+        Returns:
+            str: Path to the written file.
+        """
+        self._ensure_output_dir()
+        timestamp = int(time.time())
+        filename = f"audio_{timestamp}.wav"
+        filepath = os.path.join(self.output_dir, filename)
+        with wave.open(filepath, 'wb') as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(self.audio.get_sample_size(self.format))
+            wf.setframerate(self.rate)
+            wf.writeframes(pcm)
+        # Retain only the 5 most recent audio files
+        audio_files = [f for f in os.listdir(self.output_dir) if f.startswith('audio_') and f.endswith('.wav')]
+        audio_files.sort(reverse=True)  # Newest first
+        for old_file in audio_files[5:]:
+            try:
+                os.remove(os.path.join(self.output_dir, old_file))
+                print(f"[AudioHandler] Deleted old audio file: {old_file}")
+            except Exception as e:
+                print(f"[AudioHandler] Could not delete old audio file {old_file}: {e}")
+        return filepath
+
     def record(self, duration: int) -> str:
         """Records audio from the microphone.
 
@@ -43,9 +90,6 @@ class AudioHandler:
         """
         if duration <= 0:
             raise ValueError("Duration must be positive")
-        timestamp = int(time.time())
-        filename = f"audio_{timestamp}.wav"
-        filepath = os.path.join(self.output_dir, filename)
         try:
             stream = self.audio.open(format=self.format,
                                      channels=self.channels,
@@ -58,21 +102,7 @@ class AudioHandler:
                 frames.append(data)
             stream.stop_stream()
             stream.close()
-            with wave.open(filepath, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(self.audio.get_sample_size(self.format))
-                wf.setframerate(self.rate)
-                wf.writeframes(b''.join(frames))
-            # Retain only the 5 most recent audio files
-            audio_files = [f for f in os.listdir(self.output_dir) if f.startswith('audio_') and f.endswith('.wav')]
-            audio_files.sort(reverse=True)  # Newest first
-            for old_file in audio_files[5:]:
-                try:
-                    os.remove(os.path.join(self.output_dir, old_file))
-                    print(f"[AudioHandler] Deleted old audio file: {old_file}")
-                except Exception as e:
-                    print(f"[AudioHandler] Could not delete old audio file {old_file}: {e}")
-            return filepath
+            return self._write_wav(b''.join(frames))
         except PermissionError as e:
             print(f"[AudioHandler] Permission denied during recording: {e}")
             raise
@@ -80,6 +110,74 @@ class AudioHandler:
             print(f"[AudioHandler] Error during recording: {e}")
             raise
 
+    def record_until_silence(self, max_duration: float = 10.0, silence_ms: int = 600,
+                             start_timeout: float = 5.0, start_sample: Optional[int] = None) -> np.ndarray:
+        """Streams microphone audio through a VAD endpointer and stops as soon as the speaker goes quiet.
+
+        The utterance stays in memory; nothing touches the disk unless debug_sink is enabled.
+
+        Args:
+            max_duration (float): Hard cap on utterance length in seconds.
+            silence_ms (int): Trailing silence that ends the utterance.
+            start_timeout (float): Seconds to wait for speech to begin.
+            start_sample (int, optional): With a shared mic_stream, absolute sample to start from
+                (e.g. the end of the wake-word), so speech that began before this call is kept.
+
+        Returns:
+            np.ndarray: float32 samples in [-1, 1], ready for WhisperSTT (empty if nothing was said).
+        Raises:
+            Exception: If the microphone stream cannot be read.
+        """
+        if max_duration <= 0:
+            raise ValueError("Duration must be positive")
+        endpointer = VADEndpointer(sample_rate=self.rate, silence_ms=silence_ms,
+                                   max_duration=max_duration, start_timeout=start_timeout)
+        # Upper bound on audio read so a broken VAD can never record forever
+        max_samples = int(self.rate * (max_duration + start_timeout)) + self.chunk
+        if self.mic_stream is not None:
+            with self.mic_stream.subscribe(start=start_sample) as subscription:
+                samples = endpointer.process(self._subscription_chunks(subscription, max_samples))
+            self.last_metrics = endpointer.metrics
+            self.last_metrics['pre_roll_ms'] = 1000.0 * subscription.pre_roll / self.rate
+        else:
+            stream = None
+            try:
+                stream = self.audio.open(format=self.format,
+                                         channels=self.channels,
+                                         rate=self.rate,
+                                         input=True,
+                                         frames_per_buffer=self.chunk)
+                chunks = (stream.read(self.chunk, exception_on_overflow=False)
+                          for _ in range(max_samples // self.chunk))
+                samples = endpointer.process(chunks)
+                self.last_metrics = endpointer.metrics
+            except Exception as e:
+                print(f"[AudioHandler] Error during streaming capture: {e}")
+                raise
+            finally:
+                if stream is not None:
+                    stream.stop_stream()
+                    stream.close()
+        if self.debug_sink and len(samples):
+            try:
+                self.last_metrics['debug_wav'] = self._write_wav(samples.tobytes())
+            except Exception as e:
+                print(f"[AudioHandler] Could not write debug audio: {e}")
+        return as_float32(samples)
+
+    @staticmethod
+    def _subscription_chunks(subscription, max_samples: int):
+        """Yields chunks from a mic_stream subscription until max_samples or the stream stops."""
+        read = 0
+        while read < max_samples:
+            chunk = subscription.read(timeout=1.0)
+            if chunk is None:
+                if subscription.closed or not subscription.stream.running:
+                    return
+                continue
+            read += len(chunk)
+            yield chunk
+
     def record_audio(self, duration: int) -> str:
         """Alias for record method for compatibility."""
         return self.record(duration)
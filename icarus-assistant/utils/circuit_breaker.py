@@ -0,0 +1,72 @@
+"""
+circuit_breaker.py
+
+Circuit breaker that stops calling a failing upstream service until it has had time to recover.
+"""
+
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the service while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Counts consecutive failures and short-circuits calls once a threshold is reached.
+
+    States: 'closed' (calls pass), 'open' (calls fail fast for reset_s seconds) and 'half_open'
+    (one trial call is let through; success closes the circuit, failure reopens it).
+
+    Methods:
+        allow() -> bool: Whether a call may be attempted now.
+        record_success() -> None: Resets the failure count and closes the circuit.
+        record_failure() -> None: Counts a failure and opens the circuit at the threshold.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_s: float = 30.0, clock=time.monotonic):
+        """Initializes the breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_s (float): Seconds the circuit stays open before a trial call.
+            clock (callable): Monotonic time source (replaceable in tests).
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_s:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Returns True if a call may go ahead; in half-open state only one trial call is allowed."""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._trial_in_flight = False
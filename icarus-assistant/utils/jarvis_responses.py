@@ -6,9 +6,43 @@ Jarvis-style response templates for Icarus Assistant.
 
 import random
 from datetime import datetime
+from typing import Iterable, Iterator
 
 class JarvisResponses:
     """Jarvis-style response templates and utilities."""
+
+    RESPONSE_PREFIXES = [
+        "Sir, ",
+        "I should mention that ",
+        "I've found that ",
+        "According to my analysis, ",
+        "I can tell you that ",
+        "Based on my assessment, ",
+        "I should note that ",
+        "I've discovered that ",
+        "From what I can see, ",
+        "I believe that ",
+        "I can confirm that ",
+        "I've determined that ",
+        "I should point out that ",
+        "I've observed that ",
+        "I can assure you that ",
+        ""
+    ]
+
+    RESPONSE_SUFFIXES = [
+        ", sir.",
+        ", if you need anything else.",
+        ". Is there anything else I can assist you with?",
+        ". I'm here if you need me.",
+        ". Let me know if you require further assistance.",
+        ". I'm ready for your next command.",
+        ". How else may I be of service?",
+        ". I'm at your disposal.",
+        ". I'm listening for your next request.",
+        ". I'm here to help.",
+        ""
+    ]
     
     @staticmethod
     def get_greeting() -> str:
@@ -91,6 +125,31 @@ class JarvisResponses:
         
         return random.choice(thinking_responses)
     
+    @staticmethod
+    def get_prefix() -> str:
+        """Get a Jarvis-style lead-in for a response (80% chance, may be empty)."""
+        if random.random() < 0.8:
+            return random.choice(JarvisResponses.RESPONSE_PREFIXES)
+        return ""
+    
+    @staticmethod
+    def get_suffix() -> str:
+        """Get a Jarvis-style closing for a response (30% chance, may be empty)."""
+        if random.random() < 0.3:
+            return random.choice(JarvisResponses.RESPONSE_SUFFIXES)
+        return ""
+    
+    @staticmethod
+    def style_stream(chunks: Iterable[str]) -> Iterator[str]:
+        """Style a streamed response like style_response, without waiting for the full text."""
+        prefix = JarvisResponses.get_prefix()
+        if prefix:
+            yield prefix
+        yield from chunks
+        suffix = JarvisResponses.get_suffix()
+        if suffix:
+            yield suffix
+    
     @staticmethod
     def style_response(response: str, context: str = "general") -> str:
         """Style a response to be more Jarvis-like."""
@@ -106,49 +165,7 @@ class JarvisResponses:
             return JarvisResponses.get_thinking_response()
         else:
             # For ALL responses, add Jarvis-style prefixes consistently
-            prefixes = [
-                "Sir, ",
-                "I should mention that ",
-                "I've found that ",
-                "According to my analysis, ",
-                "I can tell you that ",
-                "Based on my assessment, ",
-                "I should note that ",
-                "I've discovered that ",
-                "From what I can see, ",
-                "I believe that ",
-                "I can confirm that ",
-                "I've determined that ",
-                "I should point out that ",
-                "I've observed that ",
-                "I can assure you that ",
-                ""
-            ]
-            
-            # Always add a prefix for consistency (80% chance)
-            if random.random() < 0.8:
-                prefix = random.choice(prefixes)
-                styled_response = f"{prefix}{response}"
-            else:
-                styled_response = response
+            styled_response = f"{JarvisResponses.get_prefix()}{response}"
             
             # Add Jarvis-style suffixes occasionally (30% chance)
-            suffixes = [
-                ", sir.",
-                ", if you need anything else.",
-                ". Is there anything else I can assist you with?",
-                ". I'm here if you need me.",
-                ". Let me know if you require further assistance.",
-                ". I'm ready for your next command.",
-                ". How else may I be of service?",
-                ". I'm at your disposal.",
-                ". I'm listening for your next request.",
-                ". I'm here to help.",
-                ""
-            ]
-            
-            if random.random() < 0.3:
-                suffix = random.choice(suffixes)
-                return f"{styled_response}{suffix}"
-            else:
-                return styled_response 
\ No newline at end of file
+            return f"{styled_response}{JarvisResponses.get_suffix()}" 
\ No newline at end of file
@@ -0,0 +1,354 @@
+"""
+json_extractor.py
+
+Extracts and validates JSON objects from LLM output, whole or while it streams, skipping reasoning blocks and prose.
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+THINK_OPEN = '<think>'
+THINK_CLOSE = '</think>'
+_THINK_BLOCK = re.compile(r'<think>.*?(?:</think>|$)', re.DOTALL)
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+# Structured outputs the assistant asks for, in a small subset of JSON Schema (see validate)
+INTENT_SCHEMA = {
+    'type': 'object',
+    'required': ['action'],
+    'properties': {
+        'action': {'type': 'string', 'enum': ['tool_call', 'function_call', 'direct_response', 'plan_mode']},
+        'target': {'type': 'string'},
+        'parameters': {'type': 'object'},
+        'confidence': {'type': 'number'},
+        'reasoning': {'type': 'string'},
+    },
+}
+PLAN_SCHEMA = {
+    'type': 'object',
+    'required': ['steps'],
+    'properties': {
+        'steps': {'type': 'array', 'items': {
+            'type': 'object',
+            'required': ['step_id', 'action'],
+            'properties': {
+                'step_id': {'type': ['integer', 'string']},
+                'description': {'type': 'string'},
+                'action': {'type': 'string', 'enum': ['tool_call', 'function_call', 'llm_query']},
+                'target': {'type': 'string'},
+                'parameters': {'type': 'object'},
+                'depends_on': {'type': 'array', 'items': {'type': ['integer', 'string']}},
+            },
+        }},
+        'parallel_groups': {'type': 'array', 'items': {'type': 'array'}},
+    },
+}
+
+_TYPES = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+}
+
+
+class JSONExtractionError(ValueError):
+    """Raised when no JSON object (or none matching the schema) is found.
+
+    Attributes:
+        text (str): The output with reasoning blocks removed, e.g. to show as a plain reply.
+    """
+    def __init__(self, message: str, text: str = ''):
+        super().__init__(message)
+        self.text = text
+
+
+def strip_reasoning(text: str) -> str:
+    """Removes <think>...</think> blocks (an unclosed one runs to the end), and anything before a
+    lone </think> whose opening tag the provider left out."""
+    text = _THINK_BLOCK.sub('', text)
+    if THINK_CLOSE in text:
+        text = text.rsplit(THINK_CLOSE, 1)[1]
+    return text.strip()
+
+
+def validate(value: Any, schema: Dict, path: str = '$') -> List[str]:
+    """Checks a value against a JSON Schema subset: type, enum, required, properties and items.
+
+    Returns:
+        List[str]: One message per violation; empty if the value conforms.
+    """
+    types = schema.get('type')
+    if types is not None:
+        types = [types] if isinstance(types, str) else types
+        if not any(_TYPES[t](value) for t in types):
+            return [f"{path}: expected {' or '.join(types)}, got {type(value).__name__}"]
+    if 'enum' in schema and value not in schema['enum']:
+        return [f"{path}: {value!r} is not one of {schema['enum']}"]
+    errors = []
+    if isinstance(value, dict):
+        errors += [f"{path}: missing '{key}'" for key in schema.get('required', []) if key not in value]
+        for key, subschema in schema.get('properties', {}).items():
+            if key in value:
+                errors += validate(value[key], subschema, f"{path}.{key}")
+    if isinstance(value, list) and 'items' in schema:
+        for i, item in enumerate(value):
+            errors += validate(item, schema['items'], f"{path}[{i}]")
+    return errors
+
+
+def _loads(candidate: str) -> Any:
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        # Models often leave a trailing comma after the last item
+        return json.loads(_TRAILING_COMMA.sub(r'\1', candidate))
+
+
+def _object_end(text: str, start: int) -> int:
+    """Index just past the object opening at text[start], or -1 if it is not closed."""
+    depth, in_string, escaped = 0, False, False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            depth += 1
+        elif ch in '}]':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+def extract_json(text: str, schema: Optional[Dict] = None) -> Dict:
+    """Finds the first JSON object in an LLM completion that parses (and matches the schema).
+
+    Reasoning blocks are removed first; markdown fences and prose around the object are skipped.
+
+    Raises:
+        JSONExtractionError: If there is no such object.
+    """
+    visible = strip_reasoning(text)
+    problems = []
+    start = visible.find('{')
+    while start != -1:
+        end = _object_end(visible, start)
+        if end == -1:
+            break
+        try:
+            value = _loads(visible[start:end])
+        except json.JSONDecodeError:
+            value = None
+        if isinstance(value, dict):
+            problems = validate(value, schema) if schema else []
+            if not problems:
+                return value
+        start = visible.find('{', start + 1)
+    raise JSONExtractionError('; '.join(problems) or 'no JSON object in response', visible)
+
+
+class StreamingJSONExtractor:
+    """Parses a JSON object out of streamed LLM text, reporting each top-level field once it is complete.
+
+    Text inside <think> blocks is skipped as it arrives (tags may be split across chunks), as is
+    anything before the first '{'. Each top-level value is parsed the moment the ',' or '}' after
+    it arrives, so a caller can act on {"action": ...} while the rest of the object is still
+    being generated. Fields that violate the schema's property types are not reported.
+
+    Methods:
+        feed(chunk) -> Dict: Adds text; returns the top-level fields it completed.
+        result() -> Dict: The complete object, or the fields seen so far if the stream was cut short.
+    """
+    def __init__(self, schema: Optional[Dict] = None):
+        self.schema = schema
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self.raw = ''
+        self.text = ''  # raw minus reasoning blocks
+        self._raw_pos = 0
+        self._in_think = False
+        self._reset(0)
+
+    def _reset(self, position: int) -> None:
+        self._pos = position
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = -1
+        self._key: Optional[str] = None
+        self._value_start = -1
+        self.fields = {}
+
+    def _take_visible(self) -> None:
+        """Moves newly received raw text outside reasoning blocks into self.text."""
+        while self._raw_pos < len(self.raw):
+            if self._in_think:
+                end = self.raw.find(THINK_CLOSE, self._raw_pos)
+                if end == -1:
+                    self._raw_pos = max(self._raw_pos, len(self.raw) - len(THINK_CLOSE) + 1)
+                    return
+                self._raw_pos = end + len(THINK_CLOSE)
+                self._in_think = False
+                continue
+            open_at = self.raw.find(THINK_OPEN, self._raw_pos)
+            close_at = self.raw.find(THINK_CLOSE, self._raw_pos)
+            if close_at != -1 and (open_at == -1 or close_at < open_at):
+                # The opening tag was left out: everything so far was reasoning
+                self.text = ''
+                self._reset(0)
+                self._raw_pos = close_at + len(THINK_CLOSE)
+                continue
+            if open_at != -1:
+                self.text += self.raw[self._raw_pos:open_at]
+                self._raw_pos = open_at + len(THINK_OPEN)
+                self._in_think = True
+                continue
+            # Hold back a tail that may be the start of a tag split across chunks
+            safe = len(self.raw)
+            for tag in (THINK_OPEN, THINK_CLOSE):
+                for n in range(len(tag) - 1, 0, -1):
+                    if self.raw.endswith(tag[:n]):
+                        safe = min(safe, len(self.raw) - n)
+                        break
+            self.text += self.raw[self._raw_pos:max(safe, self._raw_pos)]
+            self._raw_pos = max(safe, self._raw_pos)
+            return
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """Adds a chunk of the completion.
+
+        Returns:
+            Dict[str, Any]: Top-level fields completed by this chunk (empty if none).
+        """
+        if self.done:
+            return {}
+        self.raw += chunk
+        self._take_visible()
+        completed: Dict[str, Any] = {}
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+            if self._start == -1:
+                if ch == '{':
+                    self._start, self._depth, self._key = i, 1, None
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key is None and self._value_start == -1:
+                        try:
+                            self._key = json.loads(text[self._string_start:i + 1])
+                        except json.JSONDecodeError:
+                            self._restart()
+                continue
+            if ch == '"':
+                self._in_string, self._string_start = True, i
+            elif self._depth == 1 and self._key is None and not ch.isspace() and ch not in ',}':
+                # Only a key can follow '{' or ',': this brace was prose, not JSON
+                self._restart()
+            elif ch == ':' and self._depth == 1 and self._key is not None and self._value_start == -1:
+                self._value_start = i + 1
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    if not self._complete_field(text[self._value_start:i], completed):
+                        continue
+                    self.done = True
+            elif ch == ',' and self._depth == 1:
+                self._complete_field(text[self._value_start:i], completed)
+        return completed
+
+    def _restart(self) -> None:
+        """Drops an object that turned out not to be JSON and scans again after its '{'."""
+        self._reset(self._start + 1)
+
+    def _complete_field(self, value_text: str, completed: Dict[str, Any]) -> bool:
+        if self._key is None:
+            # A trailing comma before "}" is tolerated; an empty object is skipped
+            if not self.fields:
+                self._restart()
+                return False
+            return True
+        if self._value_start == -1:
+            self._restart()
+            return False
+        try:
+            value = json.loads(value_text)
+        except json.JSONDecodeError:
+            self._restart()
+            return False
+        subschema = (self.schema or {}).get('properties', {}).get(self._key)
+        if subschema is None or not validate(value, subschema, f"$.{self._key}"):
+            self.fields[self._key] = completed[self._key] = value
+        self._key, self._value_start = None, -1
+        return True
+
+    def result(self) -> Dict:
+        """The extracted object, validated against the schema.
+
+        Raises:
+            JSONExtractionError: If no field was found or required fields are missing.
+        """
+        if not self.fields and not self.done:
+            raise JSONExtractionError('no JSON object in response', strip_reasoning(self.raw))
+        problems = validate(self.fields, self.schema) if self.schema else []
+        if problems:
+            raise JSONExtractionError('; '.join(problems), strip_reasoning(self.raw))
+        return dict(self.fields)
+
+
+def extract_json_stream(chunks: Iterable[str], schema: Optional[Dict] = None,
+                        until: Optional[Callable[[Dict], bool]] = None) -> Dict:
+    """Reads chunks until the object is complete, or until `until(fields)` is satisfied.
+
+    Stopping early closes the chunk iterator (ending the HTTP stream), so fields the caller does
+    not need, like a trailing "reasoning", are never waited for.
+
+    Args:
+        chunks (Iterable[str]): Streamed completion, e.g. OpenRouterClient.query_stream(...).
+        schema (Dict, optional): Schema the object must match.
+        until (callable, optional): Called with the fields seen so far after each completed field.
+
+    Returns:
+        Dict: The object, or the fields read before stopping.
+
+    Raises:
+        JSONExtractionError: If the stream ends without a matching object.
+    """
+    extractor = StreamingJSONExtractor(schema)
+    iterator = iter(chunks)
+    try:
+        for chunk in iterator:
+            if extractor.feed(chunk) and until is not None and until(extractor.fields):
+                break
+            if extractor.done:
+                break
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
+    if not extractor.done and not (until is not None and until(extractor.fields)):
+        # The stream ended mid-object or held none: fall back to a whole-text scan
+        return extract_json(extractor.raw, schema)
+    return extractor.result()
@@ -0,0 +1,211 @@
+"""
+mic_stream.py
+
+One long-lived microphone capture thread that fans PCM chunks out to any number of consumers.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Optional
+import numpy as np
+from utils.vad import RingBuffer
+
+
+class Subscription:
+    """A consumer's view of the microphone stream: int16 chunks in capture order.
+
+    Chunks arrive through a queue.SimpleQueue, so the capture thread never blocks on a slow consumer.
+
+    Methods:
+        read(timeout) -> Optional[np.ndarray]: Next chunk, or None on timeout or once the stream stopped.
+        read_bytes(n) -> bytes: Exactly n samples as int16 PCM (a PyAudio-style blocking read).
+        close() -> None: Stops delivery to this subscription.
+    """
+    def __init__(self, stream: 'MicrophoneStream', start: int, backlog: np.ndarray):
+        self.stream = stream
+        self.start = start          # absolute sample index of the first sample delivered
+        self.position = start       # absolute sample index of the next sample returned
+        self.pre_roll = len(backlog)  # samples captured before subscribing
+        self.closed = False
+        self._queue = queue.SimpleQueue()
+        self._leftover = backlog
+
+    def _put(self, chunk: Optional[np.ndarray]) -> None:
+        self._queue.put(chunk)
+
+    def read(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Returns the next chunk of int16 samples.
+
+        Args:
+            timeout (float, optional): Seconds to wait; None waits until audio arrives.
+
+        Returns:
+            Optional[np.ndarray]: Samples, or None on timeout or when the stream has stopped.
+        """
+        if len(self._leftover):
+            chunk, self._leftover = self._leftover, self._leftover[:0]
+        elif self.closed:
+            return None
+        else:
+            try:
+                chunk = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                return None
+            if chunk is None:
+                self.closed = True
+                return None
+        self.position += len(chunk)
+        return chunk
+
+    def read_bytes(self, n: int) -> bytes:
+        """Blocks until n samples are available and returns them as int16 PCM bytes.
+
+        Raises:
+            EOFError: If the stream stops first.
+        """
+        parts, have = [], 0
+        while have < n:
+            chunk = self.read()
+            if chunk is None:
+                raise EOFError("Microphone stream stopped")
+            parts.append(chunk)
+            have += len(chunk)
+        samples = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        # Hand back the surplus on the next read
+        self._leftover = np.concatenate((samples[n:], self._leftover))
+        self.position -= len(samples) - n
+        return samples[:n].tobytes()
+
+    def close(self) -> None:
+        """Unsubscribes from the stream."""
+        self.stream.unsubscribe(self)
+        self.closed = True
+
+    def __enter__(self) -> 'Subscription':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class MicrophoneStream:
+    """Owns a single PyAudio input stream for the whole session and shares it between consumers.
+
+    The capture thread keeps the device open, writes every chunk into a pre-roll ring buffer and
+    hands it to each subscriber. A new subscriber can start a little in the past, so audio spoken
+    right after the wake-word (while the detector was still deciding) reaches the command recorder.
+
+    Methods:
+        start() -> None: Opens the device and starts the capture thread (idempotent).
+        subscribe(start, pre_roll_s) -> Subscription: Registers a consumer.
+        stop() -> None: Stops capture and closes the device.
+    """
+    def __init__(self, rate: int = 16000, chunk: int = 1600, pre_roll_s: float = 2.0,
+                 reader: Optional[Callable[[int], bytes]] = None):
+        """Initializes the stream without touching the device.
+
+        Args:
+            rate (int): Sample rate in Hz.
+            chunk (int): Samples per device read (1600 = 100 ms).
+            pre_roll_s (float): Seconds of recent audio kept for late subscribers.
+            reader (Callable[[int], bytes], optional): Replaces the PyAudio device (e.g. a WAV replay).
+        """
+        self.rate = rate
+        self.chunk = chunk
+        self.position = 0  # absolute index of the next captured sample
+        self.stats = {'device_opens': 0, 'chunks': 0, 'read_errors': 0, 'subscribers': 0,
+                      'max_subscriber_backlog': 0}
+        self._reader = reader
+        self._pre_roll = RingBuffer(max(chunk, int(rate * pre_roll_s)))
+        self._subscribers: tuple = ()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+        self._audio = None
+        self._device = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        """Opens the input device once and starts the capture thread."""
+        if self._running:
+            return
+        if self._reader is None:
+            import pyaudio
+            if self._audio is None:
+                self._audio = pyaudio.PyAudio()
+            self._device = self._audio.open(format=pyaudio.paInt16, channels=1, rate=self.rate,
+                                            input=True, frames_per_buffer=self.chunk)
+            self._reader = lambda n: self._device.read(n, exception_on_overflow=False)
+        self.stats['device_opens'] += 1
+        self._running = True
+        self._thread = threading.Thread(target=self._capture, name='mic-capture', daemon=True)
+        self._thread.start()
+
+    def _capture(self) -> None:
+        while self._running:
+            try:
+                data = self._reader(self.chunk)
+            except Exception as e:
+                self.stats['read_errors'] += 1
+                print(f"[MicrophoneStream] Read error: {e}")
+                time.sleep(0.05)
+                continue
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype=np.int16)
+            with self._lock:
+                self._pre_roll.write(samples)
+                self.position += len(samples)
+                subscribers = self._subscribers
+            for subscriber in subscribers:
+                subscriber._put(samples)
+                backlog = subscriber._queue.qsize()
+                if backlog > self.stats['max_subscriber_backlog']:
+                    self.stats['max_subscriber_backlog'] = backlog
+            self.stats['chunks'] += 1
+        self._running = False
+        for subscriber in self._subscribers:
+            subscriber._put(None)
+
+    def subscribe(self, start: Optional[int] = None, pre_roll_s: float = 0.0) -> Subscription:
+        """Registers a consumer, starting capture if needed.
+
+        Args:
+            start (int, optional): Absolute sample index to start from; clipped to the pre-roll buffer.
+            pre_roll_s (float): If start is None, begin this many seconds in the past.
+
+        Returns:
+            Subscription: Receives every chunk captured from `start` on.
+        """
+        self.start()
+        with self._lock:
+            if start is None:
+                start = self.position - int(pre_roll_s * self.rate)
+            backlog = self._pre_roll.read_all()
+            start = min(self.position, max(start, self.position - len(backlog)))
+            subscription = Subscription(self, start, backlog[len(backlog) - (self.position - start):])
+            self._subscribers = self._subscribers + (subscription,)
+            self.stats['subscribers'] = len(self._subscribers)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stops delivering chunks to a subscription."""
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+            self.stats['subscribers'] = len(self._subscribers)
+
+    def stop(self) -> None:
+        """Stops the capture thread and closes the device."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._device is not None:
+            self._device.stop_stream()
+            self._device.close()
+            self._device = None
+            self._reader = None
@@ -0,0 +1,50 @@
+"""
+pcm.py
+
+Conversions between captured PCM buffers and the float32 arrays Whisper consumes.
+"""
+
+from typing import Union
+import numpy as np
+
+AudioBuffer = Union[np.ndarray, memoryview, bytes, bytearray]
+
+
+def as_float32(audio: AudioBuffer) -> np.ndarray:
+    """Returns the audio as a mono float32 array in [-1, 1] without copying when possible.
+
+    float32 arrays and float ('f') memoryviews are returned as views over the same memory;
+    int16 arrays, int16 memoryviews and raw PCM bytes are scaled into a new float32 array.
+
+    Args:
+        audio (AudioBuffer): Captured samples as an ndarray, memoryview or raw int16 bytes.
+
+    Returns:
+        np.ndarray: float32 samples.
+    Raises:
+        TypeError: If the buffer type or sample format is unsupported.
+    """
+    if isinstance(audio, memoryview):
+        if audio.format == 'f':
+            return np.frombuffer(audio, dtype=np.float32)
+        if audio.format not in ('h', 'B', 'b', 'c'):
+            raise TypeError(f"Unsupported memoryview format: {audio.format}")
+        audio = np.frombuffer(audio, dtype=np.int16)
+    elif isinstance(audio, (bytes, bytearray)):
+        audio = np.frombuffer(audio, dtype=np.int16)
+    if not isinstance(audio, np.ndarray):
+        raise TypeError(f"Unsupported audio buffer type: {type(audio).__name__}")
+    if audio.dtype == np.float32:
+        return audio.ravel()
+    if audio.dtype == np.int16:
+        return audio.ravel().astype(np.float32) / 32768.0
+    if np.issubdtype(audio.dtype, np.floating):
+        return audio.ravel().astype(np.float32)
+    raise TypeError(f"Unsupported sample dtype: {audio.dtype}")
+
+
+def as_int16(audio: np.ndarray) -> np.ndarray:
+    """Converts float32 samples in [-1, 1] back to int16 PCM (e.g. for writing a WAV)."""
+    if audio.dtype == np.int16:
+        return audio
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
@@ -0,0 +1,79 @@
+"""
+sentence_segmenter.py
+
+Splits streamed LLM text into complete sentences as soon as each one ends, for incremental TTS.
+"""
+
+import re
+from typing import Iterable, Iterator, List
+
+# Words whose trailing period does not end a sentence
+ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'e.g', 'i.e', 'approx', 'no', 'fig'}
+
+# Terminal punctuation (optionally followed by closing quotes/brackets) and then whitespace, or a blank line
+_BOUNDARY = re.compile(r'([.!?…]+["\')\]]*)\s+|\n\s*\n')
+
+
+class SentenceSegmenter:
+    """Buffers text fragments and emits each sentence once its end is certain.
+
+    A sentence ends at '.', '!', '?' or '…' followed by whitespace, or at a blank line. The
+    whitespace is required so that decimals ("3.14") and file names ("notes.txt") arriving in
+    separate fragments are not split. Known abbreviations never end a sentence, and sentences
+    shorter than min_chars are merged with the next so TTS doesn't speak fragments like "Sure.".
+
+    Methods:
+        feed(text) -> List[str]: Adds a fragment and returns sentences completed by it.
+        flush() -> List[str]: Returns whatever is left once the stream has ended.
+    """
+    def __init__(self, min_chars: int = 12):
+        """Initializes the segmenter.
+
+        Args:
+            min_chars (int): Shortest sentence emitted on its own.
+        """
+        self.min_chars = min_chars
+        self._buffer = ''
+        self._scan_from = 0
+
+    def feed(self, text: str) -> List[str]:
+        """Adds a text fragment.
+
+        Args:
+            text (str): Next piece of streamed text (any length, may split words).
+
+        Returns:
+            List[str]: Sentences completed by this fragment, stripped.
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer, self._scan_from):
+            end = match.end(1) if match.group(1) else match.start()
+            candidate = self._buffer[start:end].strip()
+            if match.group(1) and match.group(1).startswith('.') and self._is_abbreviation(candidate):
+                continue
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        # Resume scanning near the end; a boundary needs at most the trailing punctuation run plus one space
+        self._scan_from = max(0, len(self._buffer) - 8)
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Returns the remaining buffered text as a final sentence, if any."""
+        rest, self._buffer, self._scan_from = self._buffer.strip(), '', 0
+        return [rest] if rest else []
+
+    def split(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Yields sentences from an iterable of text fragments, flushing at the end."""
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.flush()
+
+    @staticmethod
+    def _is_abbreviation(candidate: str) -> bool:
+        last = candidate.rsplit(None, 1)[-1].rstrip('.').lower() if candidate else ''
+        return last in ABBREVIATIONS or (len(last) == 1 and last.isalpha())
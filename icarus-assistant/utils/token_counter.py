@@ -0,0 +1,58 @@
+"""
+token_counter.py
+
+Token counting for prompts with tiktoken, with a character-based estimate when it is unavailable.
+"""
+
+from functools import lru_cache
+from typing import Dict, List
+
+DEFAULT_ENCODING = 'cl100k_base'
+CHARS_PER_TOKEN = 4  # rough average for English text
+
+
+@lru_cache(maxsize=None)
+def _encoding(name: str):
+    """Loads a tiktoken encoding once, or returns None if tiktoken or its data file is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        # tiktoken downloads encoding files on first use, which fails offline
+        print(f"[Tokens] tiktoken encoding '{name}' unavailable ({type(e).__name__}); estimating tokens from length")
+        return None
+
+
+def is_exact(encoding: str = DEFAULT_ENCODING) -> bool:
+    """True if counts come from tiktoken rather than the length estimate."""
+    return _encoding(encoding) is not None
+
+
+def count_tokens(text: str, encoding: str = DEFAULT_ENCODING) -> int:
+    """Returns the number of tokens in text.
+
+    Args:
+        text (str): Text to count.
+        encoding (str): tiktoken encoding name.
+
+    Returns:
+        int: Token count (estimated as len / 4 if tiktoken cannot load the encoding).
+    """
+    enc = _encoding(encoding)
+    if enc is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Dict], encoding: str = DEFAULT_ENCODING) -> int:
+    """Returns the tokens a chat request's messages take, including per-message framing.
+
+    Args:
+        messages (List[Dict]): Chat messages with 'role' and 'content'.
+        encoding (str): tiktoken encoding name.
+
+    Returns:
+        int: Token count, using the OpenAI chat format overhead of 3 tokens per message plus 3.
+    """
+    return sum(3 + count_tokens(m['role'], encoding) + count_tokens(m['content'], encoding)
+               for m in messages) + 3
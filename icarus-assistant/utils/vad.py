@@ -0,0 +1,223 @@
+"""
+vad.py
+
+Voice-activity detection and utterance endpointing for streaming 16 kHz int16 PCM.
+"""
+
+import time
+from typing import Iterable, Optional, Union
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity ring buffer of int16 samples.
+
+    Methods:
+        write(samples) -> None: Appends samples, overwriting the oldest when full.
+        read_all() -> np.ndarray: Returns buffered samples oldest-first.
+        clear() -> None: Empties the buffer.
+    """
+    def __init__(self, capacity: int):
+        """Initializes the buffer.
+
+        Args:
+            capacity (int): Maximum number of samples held.
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        return self._size == self.capacity
+
+    def write(self, samples: np.ndarray) -> None:
+        """Appends samples to the buffer, dropping the oldest ones on overflow."""
+        samples = np.asarray(samples, dtype=np.int16).ravel()
+        n = len(samples)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            self._data[:] = samples[-self.capacity:]
+            self._start = 0
+            self._size = self.capacity
+            return
+        end = (self._start + self._size) % self.capacity
+        first = min(n, self.capacity - end)
+        self._data[end:end + first] = samples[:first]
+        self._data[:n - first] = samples[first:]
+        overflow = max(0, self._size + n - self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+        self._size = min(self.capacity, self._size + n)
+
+    def read_all(self) -> np.ndarray:
+        """Returns a copy of the buffered samples in chronological order."""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return self._data[self._start:end].copy()
+        return np.concatenate((self._data[self._start:], self._data[:end - self.capacity]))
+
+    def clear(self) -> None:
+        """Discards all buffered samples."""
+        self._start = 0
+        self._size = 0
+
+
+class EnergyVAD:
+    """Frame-level voice-activity detector based on RMS energy with an adaptive noise floor.
+
+    Methods:
+        is_speech(frame: np.ndarray) -> bool: Classifies one frame as speech or silence.
+    """
+    def __init__(self, min_energy: float = 300.0, noise_ratio: float = 3.0, noise_adapt: float = 0.05):
+        """Initializes the detector.
+
+        Args:
+            min_energy (float): Absolute RMS floor (int16 scale) below which a frame is never speech.
+            noise_ratio (float): Frame RMS must exceed the noise floor by this factor to count as speech.
+            noise_adapt (float): Smoothing factor used to track the noise floor on silent frames.
+        """
+        self.min_energy = min_energy
+        self.noise_ratio = noise_ratio
+        self.noise_adapt = noise_adapt
+        self.noise_floor = None
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        """Classifies a frame as speech or silence.
+
+        Args:
+            frame (np.ndarray): int16 samples for one frame.
+
+        Returns:
+            bool: True if the frame contains speech.
+        """
+        rms = float(np.sqrt(np.mean(np.square(frame, dtype=np.float64)))) if len(frame) else 0.0
+        if self.noise_floor is None:
+            self.noise_floor = min(rms, self.min_energy)
+        speech = rms >= self.min_energy and rms >= self.noise_floor * self.noise_ratio
+        if not speech:
+            self.noise_floor += self.noise_adapt * (rms - self.noise_floor)
+        return speech
+
+    def reset(self) -> None:
+        """Forgets the tracked noise floor."""
+        self.noise_floor = None
+
+
+class VADEndpointer:
+    """Collects an utterance from a stream of PCM chunks and stops as soon as the speaker goes quiet.
+
+    Incoming chunks of any size are re-framed into fixed VAD frames. Audio before speech starts is
+    kept in a short pre-roll ring buffer so the first syllable is not clipped; the utterance itself
+    is accumulated in a ring buffer bounded by max_duration.
+
+    Methods:
+        process(chunks) -> np.ndarray: Consumes chunks until endpoint and returns the utterance.
+    """
+    def __init__(self, vad: Optional[EnergyVAD] = None, sample_rate: int = 16000, frame_ms: int = 30,
+                 silence_ms: int = 600, pre_roll_ms: int = 300, min_speech_ms: int = 90,
+                 max_duration: float = 10.0, start_timeout: float = 5.0):
+        """Initializes the endpointer.
+
+        Args:
+            vad (EnergyVAD, optional): Frame classifier. Defaults to a fresh EnergyVAD.
+            sample_rate (int): Sample rate of the incoming PCM.
+            frame_ms (int): VAD frame length in milliseconds.
+            silence_ms (int): Trailing silence that ends the utterance.
+            pre_roll_ms (int): Audio kept from before speech onset.
+            min_speech_ms (int): Consecutive speech needed to count as onset.
+            max_duration (float): Hard cap on utterance length in seconds.
+            start_timeout (float): Seconds of audio to wait for speech before giving up.
+        """
+        self.vad = vad or EnergyVAD()
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.frame_ms = frame_ms
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.onset_frames = max(1, min_speech_ms // frame_ms)
+        self.pre_roll_len = int(sample_rate * pre_roll_ms / 1000)
+        self.max_samples = int(sample_rate * max_duration)
+        self.start_timeout_samples = int(sample_rate * start_timeout)
+        self.metrics = {}
+
+    def process(self, chunks: Iterable[Union[bytes, np.ndarray]]) -> np.ndarray:
+        """Consumes PCM chunks until the utterance ends.
+
+        Args:
+            chunks (Iterable[bytes | np.ndarray]): int16 PCM chunks, e.g. from a microphone stream.
+
+        Returns:
+            np.ndarray: int16 samples of the utterance (empty if no speech was heard).
+        """
+        wall_start = time.perf_counter()
+        pre_roll = RingBuffer(max(self.pre_roll_len, self.frame_len))
+        utterance = RingBuffer(self.max_samples + self.pre_roll_len)
+        pending = np.zeros(0, dtype=np.int16)
+        consumed = 0
+        speech_run = 0
+        silence_run = 0
+        speech_frames = 0
+        in_speech = False
+        onset_sample = None
+        last_speech_sample = None
+        reason = 'eof'
+
+        for chunk in chunks:
+            if isinstance(chunk, (bytes, bytearray, memoryview)):
+                chunk = np.frombuffer(chunk, dtype=np.int16)
+            pending = np.concatenate((pending, chunk)) if len(pending) else np.asarray(chunk, dtype=np.int16)
+            done = False
+            while len(pending) >= self.frame_len:
+                frame, pending = pending[:self.frame_len], pending[self.frame_len:]
+                consumed += self.frame_len
+                speech = self.vad.is_speech(frame)
+                if not in_speech:
+                    pre_roll.write(frame)
+                    speech_run = speech_run + 1 if speech else 0
+                    if speech_run >= self.onset_frames:
+                        in_speech = True
+                        onset_sample = consumed - speech_run * self.frame_len
+                        last_speech_sample = consumed
+                        speech_frames = speech_run
+                        utterance.write(pre_roll.read_all())
+                    elif consumed >= self.start_timeout_samples:
+                        reason = 'timeout'
+                        done = True
+                        break
+                    continue
+                utterance.write(frame)
+                if speech:
+                    speech_frames += 1
+                    silence_run = 0
+                    last_speech_sample = consumed
+                else:
+                    silence_run += 1
+                if silence_run >= self.silence_frames:
+                    reason = 'silence'
+                    done = True
+                    break
+                if consumed - onset_sample >= self.max_samples:
+                    reason = 'max_duration'
+                    done = True
+                    break
+            if done:
+                break
+
+        samples = utterance.read_all() if in_speech else np.zeros(0, dtype=np.int16)
+        to_ms = lambda n: 1000.0 * n / self.sample_rate
+        self.metrics = {
+            'reason': reason,
+            'audio_ms': to_ms(consumed),
+            'utterance_ms': to_ms(len(samples)),
+            'speech_ms': speech_frames * self.frame_ms,
+            'onset_ms': to_ms(onset_sample) if onset_sample is not None else None,
+            'endpoint_lag_ms': to_ms(consumed - last_speech_sample) if last_speech_sample is not None else None,
+            'time_to_endpoint_ms': 1000.0 * (time.perf_counter() - wall_start),
+        }
+        return samples